@@ -16,6 +16,7 @@ from .model_interface import (
     ModelCapabilities,
     TokenUsage
 )
+from .token_stream import TokenStreamRelay, StreamMetrics
 
 __all__ = [
     "ai_manager",
@@ -26,5 +27,7 @@ __all__ = [
     "ModelProvider",
     "ModelConfig",
     "ModelCapabilities",
-    "TokenUsage"
+    "TokenUsage",
+    "TokenStreamRelay",
+    "StreamMetrics"
 ]
@@ -0,0 +1,154 @@
+"""
+Token Stream Relay
+
+Relays incremental model output to a (possibly slow) HTTP client. The model is
+read by a producer task into a bounded buffer; the client drains whatever has
+accumulated since its last write as a single chunk, so a slow client receives
+fewer, larger chunks instead of stalling the model. When the buffer is full the
+producer stops reading from the model until the client catches up.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamMetrics:
+    """Timing and volume of one relayed stream."""
+
+    started_at: float
+    first_token_at: Optional[float] = None
+    first_chunk_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    tokens: int = 0
+    characters: int = 0
+    chunks: int = 0
+    producer_pauses: int = 0
+    model: Optional[str] = None
+    error: Optional[str] = None
+
+    @staticmethod
+    def _elapsed_ms(start: float, end: Optional[float]) -> Optional[float]:
+        return round((end - start) * 1000, 1) if end is not None else None
+
+    @property
+    def time_to_first_token_ms(self) -> Optional[float]:
+        """Request start until the model produced its first token."""
+        return self._elapsed_ms(self.started_at, self.first_token_at)
+
+    @property
+    def time_to_first_chunk_ms(self) -> Optional[float]:
+        """Request start until the first chunk was handed to the client."""
+        return self._elapsed_ms(self.started_at, self.first_chunk_at)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return self._elapsed_ms(self.started_at, self.finished_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "time_to_first_token_ms": self.time_to_first_token_ms,
+            "time_to_first_chunk_ms": self.time_to_first_chunk_ms,
+            "duration_ms": self.duration_ms,
+            "tokens": self.tokens,
+            "characters": self.characters,
+            "chunks": self.chunks,
+            "producer_pauses": self.producer_pauses,
+            "error": self.error,
+        }
+
+
+class TokenStreamRelay:
+    """Relay model chunks ({"content", "done", ...} dicts) to a client with backpressure."""
+
+    def __init__(
+        self,
+        source: AsyncIterator[Dict[str, Any]],
+        max_buffered_chars: int = 8192,
+        idle_timeout: float = 120.0,
+        started_at: Optional[float] = None,
+    ):
+        self.source = source
+        self.max_buffered_chars = max_buffered_chars
+        self.idle_timeout = idle_timeout
+        self.metrics = StreamMetrics(started_at=started_at if started_at is not None else time.perf_counter())
+
+        self._pending: List[str] = []
+        self._buffered_chars = 0
+        self._finished = False
+        self._ready = asyncio.Event()
+        self._drained = asyncio.Event()
+
+    async def _produce(self) -> None:
+        """Read the model stream into the buffer, pausing while the buffer is full."""
+        try:
+            async for chunk in self.source:
+                if chunk.get("model"):
+                    self.metrics.model = chunk["model"]
+                if chunk.get("error"):
+                    self.metrics.error = chunk["error"]
+
+                text = chunk.get("content") or ""
+                if text:
+                    if self.metrics.first_token_at is None:
+                        self.metrics.first_token_at = time.perf_counter()
+                    self.metrics.tokens += 1
+                    self.metrics.characters += len(text)
+
+                    while self._buffered_chars >= self.max_buffered_chars:
+                        self.metrics.producer_pauses += 1
+                        self._drained.clear()
+                        await self._drained.wait()
+
+                    self._pending.append(text)
+                    self._buffered_chars += len(text)
+                    self._ready.set()
+
+                if chunk.get("done"):
+                    break
+        except Exception as e:
+            self.metrics.error = str(e)
+            logger.error(f"Token stream failed: {e}")
+        finally:
+            self._finished = True
+            self._ready.set()
+
+    async def stream(self) -> AsyncIterator[str]:
+        """Yield text chunks as fast as the consumer takes them."""
+        producer = asyncio.create_task(self._produce())
+        try:
+            while True:
+                if not self._pending:
+                    if self._finished:
+                        break
+                    self._ready.clear()
+                    try:
+                        await asyncio.wait_for(self._ready.wait(), timeout=self.idle_timeout)
+                    except asyncio.TimeoutError:
+                        self.metrics.error = f"No tokens received for {self.idle_timeout}s"
+                        logger.warning(self.metrics.error)
+                        break
+                    continue
+
+                # Coalesce everything produced since the last write
+                text = "".join(self._pending)
+                self._pending.clear()
+                self._buffered_chars = 0
+                self._drained.set()
+
+                if self.metrics.first_chunk_at is None:
+                    self.metrics.first_chunk_at = time.perf_counter()
+                self.metrics.chunks += 1
+                yield text
+        finally:
+            # Client went away (or we are done): stop reading from the model
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            self.metrics.finished_at = time.perf_counter()
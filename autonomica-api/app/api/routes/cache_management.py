@@ -59,6 +59,14 @@ class CacheStatsResponse(BaseModel):
     compression_savings_bytes: int
     compression_savings_percent: float
     eviction_count: int
+    lru_evictions: int = 0
+    size_evictions: int = 0
+    expired_removals: int = 0
+    max_entries: int = 0
+    max_size_bytes: int = 0
+    occupancy_percent: float = 0.0
+    codec: str = "json"
+    compression_ratio: float = 1.0
     last_cleanup: Optional[str]
 
 class CacheEntryInfo(BaseModel):
@@ -149,6 +157,14 @@ async def get_cache_statistics(
             compression_savings_bytes=stats.compression_savings_bytes,
             compression_savings_percent=stats.compression_savings_percent,
             eviction_count=stats.eviction_count,
+            lru_evictions=stats.lru_evictions,
+            size_evictions=stats.size_evictions,
+            expired_removals=stats.expired_removals,
+            max_entries=stats.max_entries,
+            max_size_bytes=stats.max_size_bytes,
+            occupancy_percent=round(stats.occupancy_percent, 2),
+            codec=stats.codec,
+            compression_ratio=round(stats.compression_ratio, 3),
             last_cleanup=stats.last_cleanup.isoformat() if stats.last_cleanup else None
         )
         
@@ -414,7 +430,9 @@ async def get_cache_performance(
                 "miss_rate_percent": 100 - hit_rate,
                 "memory_efficiency_percent": min(memory_efficiency * 100, 100),
                 "compression_savings_percent": stats.compression_savings_percent,
-                "eviction_rate": stats.eviction_count / max(total_requests, 1) * 100
+                "compression_ratio": round(stats.compression_ratio, 3),
+                "eviction_rate": stats.eviction_count / max(total_requests, 1) * 100,
+                "occupancy_percent": round(stats.occupancy_percent, 2)
             },
             "recommendations": _generate_performance_recommendations(stats, cache_service.config),
             "timestamp": datetime.now().isoformat()
@@ -430,9 +448,12 @@ def _generate_performance_recommendations(stats, config) -> List[str]:
     if stats.hit_rate < 50:
         recommendations.append("Consider increasing cache TTL to improve hit rate")
     
-    if stats.eviction_count > stats.total_requests * 0.1:
+    if stats.lru_evictions > stats.total_requests * 0.1:
         recommendations.append("Consider increasing LRU cache size to reduce evictions")
     
+    if stats.size_evictions > stats.total_requests * 0.1:
+        recommendations.append("Consider increasing max_memory_mb; entries are evicted by the byte budget")
+    
     if stats.compression_savings_percent > 20:
         recommendations.append("Compression is working well, consider enabling for more data types")
     
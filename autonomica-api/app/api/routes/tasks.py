@@ -9,6 +9,14 @@ from datetime import datetime
 import uuid
 from app.auth.clerk_middleware import get_current_user, ClerkUser
 from app.owl.workforce import AutonomicaWorkforce
+from app.services.task_events import task_event_hub
+from app.services.task_repository import (
+    ACTIVE_STATUSES,
+    MAX_PAGE_SIZE,
+    InvalidCursorError,
+    TaskRepository,
+    get_task_repository
+)
 
 router = APIRouter()
 
@@ -44,6 +52,7 @@ class TaskListResponse(BaseModel):
     total_count: int
     pending_count: int
     completed_count: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
 
 
 class TaskStatusResponse(BaseModel):
@@ -141,42 +150,73 @@ def get_workforce(request: Request) -> AutonomicaWorkforce:
     return request.app.state.workforce
 
 
-# In-memory task storage for demo (would use database in production)
-# Structure: {task_id: task_data}
-tasks_storage: Dict[str, Dict[str, Any]] = {}
+def index_task_executions(workforce: AutonomicaWorkforce) -> Dict[str, Any]:
+    """Map execution id -> OWL task execution, built once per request"""
+    return {str(execution.id): execution for execution in getattr(workforce, "task_executions", [])}
+
+
+async def get_owned_task(repository: TaskRepository, task_id: str, user_id: str, action: str = "access") -> Dict[str, Any]:
+    """Load a task and check it belongs to the user"""
+    task = await repository.get(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    
+    # Check if the task belongs to the authenticated user
+    if task["user_id"] != user_id:
+        raise HTTPException(status_code=403, detail=f"Access denied: You can only {action} your own tasks")
+    return task
+
+
+async def publish_task_change(
+    repository: TaskRepository,
+    task: Dict[str, Any],
+    previous_status: Optional[str] = None,
+    deleted: bool = False
+) -> None:
+    """Push a task delta (plus the user's status counts) to their /api/tasks/events streams"""
+    stats = await repository.get_stats(task["user_id"])
+    task_event_hub.publish(task["user_id"], "task.deleted" if deleted else "task.status", {
+        "task_id": task["id"],
+        "status": task["status"],
+        "previous_status": previous_status,
+        "agent_id": task.get("agent_id"),
+        "execution_id": task.get("execution_id"),
+        "updated_at": task["updated_at"],
+        "counts": stats["by_status"]
+    })
 
 
 async def get_enhanced_task_status(
     task: Dict[str, Any], 
-    workforce: AutonomicaWorkforce
+    workforce: AutonomicaWorkforce,
+    executions: Optional[Dict[str, Any]] = None
 ) -> TaskStatusResponse:
     """Get enhanced task status with OWL execution details"""
     
     # Get agent details if assigned
     agent_name = None
-    agent_status = None
     execution_details = {}
     
     if task.get("agent_id"):
         agent = workforce.get_agent(task["agent_id"])
         if agent:
             agent_name = agent.name
-            agent_status = agent.status
             
-            # Look for execution details in workforce task executions
-            for execution in workforce.task_executions:
-                if execution.agent_id == agent.id and str(execution.id) == task.get("execution_id"):
-                    execution_details = {
-                        "execution_id": execution.id,
-                        "execution_status": execution.status,
-                        "execution_progress": 1.0 if execution.status == "completed" else (0.5 if execution.status == "running" else 0.0),
-                        "input_tokens": execution.input_tokens,
-                        "output_tokens": execution.output_tokens,
-                        "execution_cost": execution.cost,
-                        "execution_result": execution.result,
-                        "error_message": execution.result.get("error") if execution.result and "error" in execution.result else None
-                    }
-                    break
+            # Look up execution details by id in the workforce task executions
+            if executions is None:
+                executions = index_task_executions(workforce)
+            execution = executions.get(str(task.get("execution_id")))
+            if execution and execution.agent_id == agent.id:
+                execution_details = {
+                    "execution_id": execution.id,
+                    "execution_status": execution.status,
+                    "execution_progress": 1.0 if execution.status == "completed" else (0.5 if execution.status == "running" else 0.0),
+                    "input_tokens": execution.input_tokens,
+                    "output_tokens": execution.output_tokens,
+                    "execution_cost": execution.cost,
+                    "execution_result": execution.result,
+                    "error_message": execution.result.get("error") if execution.result and "error" in execution.result else None
+                }
     
     return TaskStatusResponse(
         id=task["id"],
@@ -201,7 +241,8 @@ async def get_enhanced_task_status(
 async def create_task(
     task_request: TaskRequest,
     current_user: ClerkUser = Depends(get_current_user),
-    workforce: AutonomicaWorkforce = Depends(get_workforce)
+    workforce: AutonomicaWorkforce = Depends(get_workforce),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
     """Create a new task and associate it with the authenticated user"""
     
@@ -250,7 +291,7 @@ async def create_task(
         "metadata": task_request.metadata or {}
     }
     
-    tasks_storage[task_id] = task
+    task = await repository.create(task)
     
     # If an agent is assigned, queue the task with OWL framework
     if assigned_agent:
@@ -262,15 +303,23 @@ async def create_task(
                 task_description=task_request.description,
                 task_metadata=task.copy()
             )
-            task["status"] = "queued"
-            task["execution_id"] = execution_id
-            task["started_at"] = datetime.utcnow().isoformat()
-            task["updated_at"] = datetime.utcnow().isoformat()
+            task = await repository.update(task_id, {
+                "status": "queued",
+                "execution_id": execution_id,
+                "started_at": datetime.utcnow().isoformat(),
+                "updated_at": datetime.utcnow().isoformat()
+            })
             
         except Exception as e:
             # If assignment fails, keep task as pending for manual assignment later
             print(f"Warning: Failed to assign task to agent {assigned_agent.id}: {e}")
     
+    # update() returns None when the task was deleted in the meantime
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    
+    await publish_task_change(repository, task)
+    
     return TaskResponse(**task)
 
 
@@ -280,64 +329,49 @@ async def list_tasks(
     agent_type: Optional[str] = None,
     priority: Optional[str] = None,
     limit: int = 100,
-    offset: int = 0,
-    current_user: ClerkUser = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    current_user: ClerkUser = Depends(get_current_user),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
-    """List tasks for the authenticated user with optional filtering"""
-    
-    # Filter tasks to only show user's own tasks
-    user_tasks = [
-        task for task in tasks_storage.values() 
-        if task["user_id"] == current_user.user_id
-    ]
-    
-    # Apply additional filters
-    if status:
-        user_tasks = [t for t in user_tasks if t["status"] == status]
-    
-    if agent_type:
-        user_tasks = [t for t in user_tasks if t["agent_type"] == agent_type]
-    
-    if priority:
-        user_tasks = [t for t in user_tasks if t["priority"] == priority]
+    """List tasks for the authenticated user with optional filtering (pass next_cursor to get the next page)"""
     
-    # Apply pagination
-    total_count = len(user_tasks)
-    user_tasks = user_tasks[offset:offset + limit]
+    try:
+        user_tasks, next_cursor = await repository.list_tasks(
+            current_user.user_id,
+            status=status,
+            agent_type=agent_type,
+            priority=priority,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Count statuses for user's tasks only
-    all_user_tasks = [
-        task for task in tasks_storage.values() 
-        if task["user_id"] == current_user.user_id
-    ]
-    pending_count = len([t for t in all_user_tasks if t["status"] == "pending"])
-    completed_count = len([t for t in all_user_tasks if t["status"] == "completed"])
+    total_count = await repository.count_tasks(
+        current_user.user_id, status=status, agent_type=agent_type, priority=priority
+    )
     
-    task_responses = [TaskResponse(**task) for task in user_tasks]
+    # Status counts come from the user's precomputed counters
+    counters = await repository.get_counters(current_user.user_id)
     
     return TaskListResponse(
-        tasks=task_responses,
+        tasks=[TaskResponse(**task) for task in user_tasks],
         total_count=total_count,
-        pending_count=pending_count,
-        completed_count=completed_count
+        pending_count=counters.get("status:pending", 0),
+        completed_count=counters.get("status:completed", 0),
+        next_cursor=next_cursor
     )
 
 
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
-    current_user: ClerkUser = Depends(get_current_user)
+    current_user: ClerkUser = Depends(get_current_user),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
     """Get a specific task by ID (user can only access their own tasks)"""
     
-    task = tasks_storage.get(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-    
-    # Check if the task belongs to the authenticated user
-    if task["user_id"] != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Access denied: You can only access your own tasks")
-    
+    task = await get_owned_task(repository, task_id, current_user.user_id)
     return TaskResponse(**task)
 
 
@@ -346,25 +380,21 @@ async def update_task_status(
     task_id: str, 
     status: str,
     current_user: ClerkUser = Depends(get_current_user),
-    workforce: AutonomicaWorkforce = Depends(get_workforce)
+    workforce: AutonomicaWorkforce = Depends(get_workforce),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
     """Update task status (user can only update their own tasks)"""
     
     if status not in ["pending", "queued", "in_progress", "completed", "failed", "cancelled"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    task = tasks_storage.get(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-    
-    # Check if the task belongs to the authenticated user
-    if task["user_id"] != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Access denied: You can only update your own tasks")
+    task = await get_owned_task(repository, task_id, current_user.user_id, action="update")
     
     # Update task status
     old_status = task["status"]
-    task["status"] = status
-    task["updated_at"] = datetime.utcnow().isoformat()
+    task = await repository.update(task_id, {"status": status, "updated_at": datetime.utcnow().isoformat()})
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
     
     # If task is being assigned to an agent and has an agent_id, notify OWL framework
     if status == "queued" and task.get("agent_id") and old_status != "queued":
@@ -377,62 +407,38 @@ async def update_task_status(
             )
         except Exception as e:
             # If assignment fails, revert status
-            task["status"] = old_status
+            await repository.update(task_id, {"status": old_status})
             raise HTTPException(status_code=500, detail=f"Failed to assign task to agent: {e}")
     
+    await publish_task_change(repository, task, previous_status=old_status)
+    
     return {"message": f"Task {task_id} status updated to {status}"}
 
 
 @router.delete("/tasks/{task_id}")
 async def delete_task(
     task_id: str,
-    current_user: ClerkUser = Depends(get_current_user)
+    current_user: ClerkUser = Depends(get_current_user),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
     """Delete a task (user can only delete their own tasks)"""
     
-    task = tasks_storage.get(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-    
-    # Check if the task belongs to the authenticated user
-    if task["user_id"] != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Access denied: You can only delete your own tasks")
-    
-    del tasks_storage[task_id]
+    task = await get_owned_task(repository, task_id, current_user.user_id, action="delete")
+    await repository.delete(task_id)
+    await publish_task_change(repository, task, deleted=True)
     
     return {"message": f"Task {task_id} deleted successfully"}
 
 
 @router.get("/tasks/stats")
-async def get_task_stats(current_user: ClerkUser = Depends(get_current_user)):
+async def get_task_stats(
+    current_user: ClerkUser = Depends(get_current_user),
+    repository: TaskRepository = Depends(get_task_repository)
+):
     """Get task statistics for the authenticated user"""
     
-    # Filter to user's tasks only
-    user_tasks = [
-        task for task in tasks_storage.values() 
-        if task["user_id"] == current_user.user_id
-    ]
-    
-    stats = {
-        "total_tasks": len(user_tasks),
-        "by_status": {},
-        "by_priority": {},
-        "by_agent_type": {}
-    }
-    
-    for task in user_tasks:
-        # Count by status
-        status = task["status"]
-        stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
-        
-        # Count by priority
-        priority = task["priority"]
-        stats["by_priority"][priority] = stats["by_priority"].get(priority, 0) + 1
-        
-        # Count by agent type
-        agent_type = task.get("agent_type", "unassigned")
-        stats["by_agent_type"][agent_type] = stats["by_agent_type"].get(agent_type, 0) + 1
-    
+    stats = await repository.get_stats(current_user.user_id)
+    stats.pop("by_agent")
     return stats
 
 
@@ -442,18 +448,12 @@ async def get_task_stats(current_user: ClerkUser = Depends(get_current_user)):
 async def get_task_status(
     task_id: str,
     current_user: ClerkUser = Depends(get_current_user),
-    workforce: AutonomicaWorkforce = Depends(get_workforce)
+    workforce: AutonomicaWorkforce = Depends(get_workforce),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
     """Get enhanced status of a specific task with OWL execution details"""
     
-    task = tasks_storage.get(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-    
-    # Check if the task belongs to the authenticated user
-    if task["user_id"] != current_user.user_id:
-        raise HTTPException(status_code=403, detail="Access denied: You can only access your own tasks")
-    
+    task = await get_owned_task(repository, task_id, current_user.user_id)
     return await get_enhanced_task_status(task, workforce)
 
 
@@ -461,7 +461,8 @@ async def get_task_status(
 async def get_batch_task_status(
     request: BatchStatusRequest,
     current_user: ClerkUser = Depends(get_current_user),
-    workforce: AutonomicaWorkforce = Depends(get_workforce)
+    workforce: AutonomicaWorkforce = Depends(get_workforce),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
     """Get status of multiple tasks in a single request"""
     
@@ -470,18 +471,15 @@ async def get_batch_task_status(
     
     task_statuses = []
     status_summary = {}
+    executions = index_task_executions(workforce)
     
-    for task_id in request.task_ids:
-        task = tasks_storage.get(task_id)
-        
-        if not task:
-            continue  # Skip non-existent tasks
-        
+    # Non-existent tasks are skipped by the repository
+    for task in await repository.get_many(request.task_ids):
         # Check if the task belongs to the authenticated user
         if task["user_id"] != current_user.user_id:
             continue  # Skip tasks that don't belong to user
         
-        task_status = await get_enhanced_task_status(task, workforce)
+        task_status = await get_enhanced_task_status(task, workforce, executions)
         task_statuses.append(task_status)
         
         # Count statuses for summary
@@ -498,7 +496,8 @@ async def get_batch_task_status(
 async def get_agent_task_status(
     agent_id: str,
     current_user: ClerkUser = Depends(get_current_user),
-    workforce: AutonomicaWorkforce = Depends(get_workforce)
+    workforce: AutonomicaWorkforce = Depends(get_workforce),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
     """Get all tasks assigned to a specific agent with their status"""
     
@@ -510,20 +509,25 @@ async def get_agent_task_status(
     if agent.user_id != current_user.user_id:
         raise HTTPException(status_code=403, detail="Access denied: You can only access your own agents")
     
-    # Find all tasks assigned to this agent
-    agent_tasks = [
-        task for task in tasks_storage.values()
-        if task.get("agent_id") == agent_id and task["user_id"] == current_user.user_id
-    ]
+    # Walk the user's per-agent index
+    agent_tasks = []
+    cursor = None
+    while True:
+        page, cursor = await repository.list_tasks(
+            current_user.user_id, agent_id=agent_id, limit=MAX_PAGE_SIZE, cursor=cursor
+        )
+        agent_tasks.extend(page)
+        if cursor is None:
+            break
     
     # Get enhanced status for each task
+    executions = index_task_executions(workforce)
     task_statuses = []
     for task in agent_tasks:
-        task_status = await get_enhanced_task_status(task, workforce)
+        task_status = await get_enhanced_task_status(task, workforce, executions)
         task_statuses.append(task_status)
     
-    # Count active (non-completed) tasks
-    active_tasks = len([t for t in task_statuses if t.status not in ["completed", "failed", "cancelled"]])
+    stats = await repository.get_stats(current_user.user_id)
     
     return AgentTasksResponse(
         agent_id=agent.id,
@@ -531,28 +535,26 @@ async def get_agent_task_status(
         agent_type=agent.type,
         tasks=task_statuses,
         total_tasks=len(task_statuses),
-        task_summary={t.status: 1 for t in task_statuses}
+        task_summary=stats["by_agent"].get(agent_id, {})
     )
 
 
 @router.get("/tasks/status/live")
 async def get_live_task_status(
     current_user: ClerkUser = Depends(get_current_user),
-    workforce: AutonomicaWorkforce = Depends(get_workforce)
+    workforce: AutonomicaWorkforce = Depends(get_workforce),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
     """Get live status summary of all user tasks with real-time execution info"""
     
-    # Get all user tasks
-    user_tasks = [
-        task for task in tasks_storage.values() 
-        if task["user_id"] == current_user.user_id
-    ]
+    # Task counts come from the user's precomputed counters
+    stats = await repository.get_stats(current_user.user_id)
     
     # Organize by status with execution details
     live_status = {
-        "total_tasks": len(user_tasks),
+        "total_tasks": stats["total_tasks"],
         "active_executions": 0,
-        "by_status": {},
+        "by_status": stats["by_status"],
         "by_agent": {},
         "execution_summary": {
             "total_cost": 0.0,
@@ -563,47 +565,39 @@ async def get_live_task_status(
         }
     }
     
-    for task in user_tasks:
-        status = task["status"]
-        
-        # Count by status
-        live_status["by_status"][status] = live_status["by_status"].get(status, 0) + 1
+    # Count by agent
+    for agent_id, agent_counts in stats["by_agent"].items():
+        agent = workforce.get_agent(agent_id)
+        if not agent:
+            continue
         
-        # Count by agent
-        if task.get("agent_id"):
-            agent = workforce.get_agent(task["agent_id"])
-            if agent:
-                agent_key = f"{agent.name} ({agent.type})"
-                if agent_key not in live_status["by_agent"]:
-                    live_status["by_agent"][agent_key] = {
-                        "total": 0,
-                        "active": 0,
-                        "completed": 0
-                    }
-                
-                live_status["by_agent"][agent_key]["total"] += 1
-                
-                if status in ["queued", "in_progress"]:
-                    live_status["by_agent"][agent_key]["active"] += 1
-                    live_status["active_executions"] += 1
-                elif status == "completed":
-                    live_status["by_agent"][agent_key]["completed"] += 1
+        agent_key = f"{agent.name} ({agent.type})"
+        active = sum(agent_counts.get(status, 0) for status in ACTIVE_STATUSES)
+        live_status["by_agent"][agent_key] = {
+            "total": sum(agent_counts.values()),
+            "active": active,
+            "completed": agent_counts.get("completed", 0)
+        }
+        live_status["active_executions"] += active
+    
+    # Add execution summary from OWL: one pass over executions of agents with user tasks
+    user_agent_ids = set(stats["by_agent"])
+    summary = live_status["execution_summary"]
+    for execution in getattr(workforce, "task_executions", []):
+        if execution.agent_id not in user_agent_ids:
+            continue
+        summary["total_cost"] += execution.cost
+        summary["total_tokens"] += execution.input_tokens + execution.output_tokens
         
-        # Add execution summary from OWL
-        for execution in workforce.task_executions:
-            if execution.agent_id == task.get("agent_id"):
-                live_status["execution_summary"]["total_cost"] += execution.cost
-                live_status["execution_summary"]["total_tokens"] += execution.input_tokens + execution.output_tokens
-                
-                if execution.status == "running":
-                    live_status["execution_summary"]["running_tasks"] += 1
-                elif execution.status == "completed":
-                    live_status["execution_summary"]["completed_tasks"] += 1
-                elif execution.status == "failed":
-                    live_status["execution_summary"]["failed_tasks"] += 1
+        if execution.status == "running":
+            summary["running_tasks"] += 1
+        elif execution.status == "completed":
+            summary["completed_tasks"] += 1
+        elif execution.status == "failed":
+            summary["failed_tasks"] += 1
     
     # Round cost for display
-    live_status["execution_summary"]["total_cost"] = round(live_status["execution_summary"]["total_cost"], 4)
+    summary["total_cost"] = round(summary["total_cost"], 4)
     
     return live_status
 
@@ -810,7 +804,8 @@ async def add_task_to_workflow(
     workflow_id: str,
     task_request: TaskRequest,
     current_user: ClerkUser = Depends(get_current_user),
-    workforce: AutonomicaWorkforce = Depends(get_workforce)
+    workforce: AutonomicaWorkforce = Depends(get_workforce),
+    repository: TaskRepository = Depends(get_task_repository)
 ):
     """Add a new task to an existing workflow"""
     
@@ -833,8 +828,6 @@ async def add_task_to_workflow(
         "metadata": task_request.metadata or {}
     }
     
-    tasks_storage[task_id] = task
-    
     # If an agent is assigned, queue the task with OWL framework
     if task_request.agent_type:
         # Find available agents of the specified type belonging to the user
@@ -850,6 +843,9 @@ async def add_task_to_workflow(
         # Assign to the first available agent of this type
         task["agent_id"] = user_agents[0].id
     
+    task = await repository.create(task)
+    await publish_task_change(repository, task)
+    
     return TaskResponse(**task)
 
 
@@ -2,8 +2,15 @@
 Clerk Authentication Middleware for FastAPI
 """
 
+import asyncio
 import os
-from typing import Dict, Any
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+
+import httpx
+import jwt
 from fastapi import Request, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from clerk_backend_api import Clerk
@@ -18,9 +25,12 @@ except TypeError:
     try:
         clerk_client = Clerk(api_key=settings.CLERK_SECRET_KEY)
     except TypeError:
-        clerk_client = Clerk()
+        clerk_client = Clerk(bearer_auth=settings.CLERK_SECRET_KEY)
 security = HTTPBearer()
 
+# Clerk signs session tokens with RS256; never trust the algorithm in the token header
+ALLOWED_ALGORITHMS = ["RS256"]
+
 class ClerkUser:
     """Represents a validated and authenticated Clerk user"""
     def __init__(self, user_id: str, claims: Dict[str, Any]):
@@ -36,39 +46,228 @@ class ClerkUser:
             "email": self.email
         }
 
+@dataclass
+class AuthCacheStats:
+    """Hit/miss counters for the authentication caches"""
+    jwks_hits: int = 0
+    jwks_misses: int = 0
+    jwks_refreshes: int = 0
+    jwks_refresh_failures: int = 0
+    session_hits: int = 0
+    session_negative_hits: int = 0
+    session_misses: int = 0
+    session_remote_errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        jwks_lookups = self.jwks_hits + self.jwks_misses
+        session_lookups = self.session_hits + self.session_negative_hits + self.session_misses
+        stats["jwks_hit_rate"] = self.jwks_hits / jwks_lookups if jwks_lookups else 0.0
+        stats["session_hit_rate"] = (
+            (self.session_hits + self.session_negative_hits) / session_lookups if session_lookups else 0.0
+        )
+        return stats
+
+class JWKSCache:
+    """
+    Signing keys by key id, refreshed every `ttl_seconds`
+
+    An unknown key id (key rotation) triggers an immediate refresh, at most
+    once per `min_refresh_interval` so tokens with made-up key ids cannot make
+    us hammer the JWKS endpoint. If a refresh fails, known keys keep working.
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        ttl_seconds: float = 3600,
+        min_refresh_interval: float = 30,
+        stats: Optional[AuthCacheStats] = None
+    ):
+        self.fetcher = fetcher
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_interval = min_refresh_interval
+        self.stats = stats or AuthCacheStats()
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._last_refresh = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: Optional[str]) -> jwt.PyJWK:
+        key = self._keys.get(kid)
+        if key is not None and time.monotonic() < self._expires_at:
+            self.stats.jwks_hits += 1
+            return key
+
+        self.stats.jwks_misses += 1
+        await self._refresh()
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return key
+
+    async def _refresh(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            # Refreshed by a concurrent request while we waited, or very recently
+            if now - self._last_refresh < self.min_refresh_interval:
+                return
+            self._last_refresh = now
+            try:
+                jwks = await self.fetcher()
+            except Exception as e:
+                self.stats.jwks_refresh_failures += 1
+                logger.error(f"Failed to refresh Clerk JWKS: {e}")
+                return
+
+            keys = {}
+            for jwk_data in jwks:
+                try:
+                    keys[jwk_data.get("kid")] = jwt.PyJWK(jwk_data)
+                except jwt.PyJWKError as e:
+                    logger.warning(f"Skipping unusable JWKS key {jwk_data.get('kid')}: {e}")
+            self._keys = keys
+            self._expires_at = now + self.ttl_seconds
+            self.stats.jwks_refreshes += 1
+
+class SessionStatusCache:
+    """
+    TTL'd LRU cache of Clerk session status
+
+    Active sessions are cached for `ttl_seconds`; inactive or unknown sessions
+    are cached for `negative_ttl_seconds`, so replayed tokens of ended sessions
+    don't reach Clerk either. Concurrent misses for a session share one lookup.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Tuple[str, Optional[str]]]],
+        ttl_seconds: float = 60,
+        negative_ttl_seconds: float = 300,
+        max_entries: int = 10000,
+        stats: Optional[AuthCacheStats] = None
+    ):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.stats = stats or AuthCacheStats()
+        self._entries: "OrderedDict[str, Tuple[str, Optional[str], float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get(self, session_id: str) -> Tuple[str, Optional[str]]:
+        """(status, user_id) of a session"""
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            session_status, user_id, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(session_id)
+                if session_status == "active":
+                    self.stats.session_hits += 1
+                else:
+                    self.stats.session_negative_hits += 1
+                return session_status, user_id
+            del self._entries[session_id]
+
+        self.stats.session_misses += 1
+        future = self._inflight.get(session_id)
+        if future is None:
+            future = asyncio.ensure_future(self._load(session_id))
+            self._inflight[session_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(session_id, None))
+        return await asyncio.shield(future)
+
+    async def _load(self, session_id: str) -> Tuple[str, Optional[str]]:
+        try:
+            session_status, user_id = await self.loader(session_id)
+        except Exception:
+            self.stats.session_remote_errors += 1
+            raise
+
+        ttl = self.ttl_seconds if session_status == "active" else self.negative_ttl_seconds
+        self._entries[session_id] = (session_status, user_id, time.monotonic() + ttl)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return session_status, user_id
+
+    def invalidate(self, session_id: str) -> None:
+        self._entries.pop(session_id, None)
+
+async def _fetch_jwks() -> List[Dict[str, Any]]:
+    """Clerk's current signing keys as JWK dicts"""
+    if settings.CLERK_JWKS_URL:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(settings.CLERK_JWKS_URL)
+            response.raise_for_status()
+            return response.json().get("keys", [])
+
+    jwks = await clerk_client.jwks.get_jwks_async()
+    return [
+        key.model_dump(by_alias=True, exclude_none=True) if hasattr(key, "model_dump") else dict(key)
+        for key in (jwks.keys or [])
+    ]
+
+async def _fetch_session_status(session_id: str) -> Tuple[str, Optional[str]]:
+    """(status, user_id) of a session from the Clerk Backend API, off the event loop"""
+    sessions = clerk_client.sessions
+    try:
+        if hasattr(sessions, "get_async"):
+            session = await sessions.get_async(session_id=session_id)
+        else:
+            # Older SDKs only have a blocking client
+            session = await asyncio.to_thread(sessions.get_session, session_id)
+    except Exception as e:
+        status_code = getattr(e, "status_code", None) or getattr(getattr(e, "raw_response", None), "status_code", None)
+        if status_code == 404:
+            return "not_found", None
+        raise
+
+    session_status = getattr(session.status, "value", session.status)
+    return session_status, session.user_id
+
+auth_cache_stats = AuthCacheStats()
+jwks_cache = JWKSCache(_fetch_jwks, ttl_seconds=settings.CLERK_JWKS_TTL_SECONDS, stats=auth_cache_stats)
+session_cache = SessionStatusCache(
+    _fetch_session_status,
+    ttl_seconds=settings.CLERK_SESSION_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=settings.CLERK_SESSION_NEGATIVE_TTL_SECONDS,
+    max_entries=settings.CLERK_SESSION_CACHE_MAX_ENTRIES,
+    stats=auth_cache_stats
+)
+
+def get_auth_cache_stats() -> Dict[str, Any]:
+    """Authentication cache counters for monitoring endpoints"""
+    return auth_cache_stats.to_dict()
+
+async def verify_session_token(token: str) -> Dict[str, Any]:
+    """Verify a Clerk session token locally (signature, expiry, authorized party)"""
+    header = jwt.get_unverified_header(token)
+    signing_key = await jwks_cache.get_key(header.get("kid"))
+    claims = jwt.decode(
+        token,
+        key=signing_key.key,
+        algorithms=ALLOWED_ALGORITHMS,
+        leeway=settings.CLERK_JWT_LEEWAY_SECONDS,
+        options={"require": ["exp", "iat", "sub"]}
+    )
+
+    authorized_parties = [p.strip() for p in settings.CLERK_AUTHORIZED_PARTIES.split(",") if p.strip()]
+    if authorized_parties and claims.get("azp") not in authorized_parties:
+        raise jwt.InvalidTokenError(f"Unauthorized party: {claims.get('azp')}")
+    return claims
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> ClerkUser:
     """
     FastAPI dependency to verify the Clerk JWT and return the user.
-    This function now correctly and securely verifies the token.
+    Tokens are verified locally against cached JWKS; session status comes
+    from a short-lived cache, so only cache misses reach Clerk.
     """
     token = credentials.credentials
     try:
-        # Verify the token using the Clerk client's JWKS
-        # This is the secure way to validate the token.
-        payload = clerk_client.verify_token(token)
-        
-        # Check if the session is active
-        session_id = payload.get("sid")
-        if not session_id:
-            logger.warning("Token verification failed: No session ID (sid) in token.")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: missing session information."
-            )
-            
-        session = clerk_client.sessions.get_session(session_id)
-        if session.status != "active":
-            logger.warning(f"Authentication failed for user {session.user_id}: Session status is '{session.status}'.")
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"User session is not active. Status: {session.status}"
-            )
-
-        logger.info(f"Successfully authenticated user {session.user_id} with session {session_id}.")
-        return ClerkUser(user_id=session.user_id, claims=payload)
-
+        payload = await verify_session_token(token)
     except Exception as e:
         # This will catch expired tokens, invalid signatures, etc.
         logger.error(f"Clerk token verification failed: {e}")
@@ -77,6 +276,35 @@ async def get_current_user(
             detail=f"Invalid or expired token: {e}"
         )
 
+    # Check if the session is active
+    session_id = payload.get("sid")
+    if not session_id:
+        logger.warning("Token verification failed: No session ID (sid) in token.")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: missing session information."
+        )
+
+    try:
+        session_status, user_id = await session_cache.get(session_id)
+    except Exception as e:
+        logger.error(f"Clerk session lookup failed for session {session_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unable to verify session"
+        )
+
+    if session_status != "active":
+        logger.warning(f"Authentication failed for user {user_id or payload.get('sub')}: Session status is '{session_status}'.")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"User session is not active. Status: {session_status}"
+        )
+
+    user_id = user_id or payload["sub"]
+    logger.debug(f"Successfully authenticated user {user_id} with session {session_id}.")
+    return ClerkUser(user_id=user_id, claims=payload)
+
 def require_auth(request: Request) -> ClerkUser:
     """
     Synchronous dependency to require authentication
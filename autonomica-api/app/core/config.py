@@ -57,6 +57,12 @@ class Settings(BaseSettings):
     
     # Database Configuration
     DATABASE_URL: Optional[str] = Field(default=None, env="DATABASE_URL")
+    DB_POOL_SIZE: int = Field(default=5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: int = Field(default=30, env="DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    DB_SQLITE_WAL: bool = Field(default=True, env="DB_SQLITE_WAL")
     REDIS_URL: str = Field(default="redis://localhost:6379", env="REDIS_URL")
     
     # AI/LLM Configuration
@@ -80,11 +86,33 @@ class Settings(BaseSettings):
     # Task Queue Configuration
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379/0", env="CELERY_BROKER_URL")
     CELERY_RESULT_BACKEND: str = Field(default="redis://localhost:6379/0", env="CELERY_RESULT_BACKEND")
+    # API task storage: "redis", "memory", or "auto" (Redis when reachable at REDIS_URL)
+    TASK_STORE_BACKEND: str = Field(default="auto", env="TASK_STORE_BACKEND")
+    TASK_STORE_KEY_PREFIX: str = Field(default="tasks", env="TASK_STORE_KEY_PREFIX")
+    # Live task status stream (SSE)
+    TASK_EVENTS_HEARTBEAT_SECONDS: float = Field(default=15.0, env="TASK_EVENTS_HEARTBEAT_SECONDS")
+    TASK_EVENTS_REPLAY_SIZE: int = Field(default=256, env="TASK_EVENTS_REPLAY_SIZE")  # per user
+    TASK_EVENTS_QUEUE_SIZE: int = Field(default=100, env="TASK_EVENTS_QUEUE_SIZE")  # per open stream
+    TASK_EVENTS_IDLE_TTL_SECONDS: float = Field(default=3600.0, env="TASK_EVENTS_IDLE_TTL_SECONDS")  # drop idle users' history
+    # Chat history kept per session in Redis (REDIS_URL)
+    CONVERSATION_HISTORY_WINDOW: int = Field(default=20, env="CONVERSATION_HISTORY_WINDOW")  # messages returned per turn
+    CONVERSATION_HISTORY_MAX_MESSAGES: int = Field(default=100, env="CONVERSATION_HISTORY_MAX_MESSAGES")
+    CONVERSATION_HISTORY_TTL_SECONDS: int = Field(default=7 * 24 * 3600, env="CONVERSATION_HISTORY_TTL_SECONDS")
+    CONVERSATION_HISTORY_SUMMARIZE: bool = Field(default=False, env="CONVERSATION_HISTORY_SUMMARIZE")  # fold old turns into a summary
     
     # Security Configuration
     SECRET_KEY: str = Field(default="your-secret-key-change-in-production", env="SECRET_KEY")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     CLERK_SECRET_KEY: Optional[str] = Field(default=None, env="CLERK_SECRET_KEY")
+    # Session tokens are verified locally against Clerk's JWKS. Leave the URL
+    # unset to fetch keys through the Clerk Backend API.
+    CLERK_JWKS_URL: Optional[str] = Field(default=None, env="CLERK_JWKS_URL")
+    CLERK_JWKS_TTL_SECONDS: int = Field(default=3600, env="CLERK_JWKS_TTL_SECONDS")
+    CLERK_AUTHORIZED_PARTIES: str = Field(default="", env="CLERK_AUTHORIZED_PARTIES")  # comma-separated azp values
+    CLERK_JWT_LEEWAY_SECONDS: int = Field(default=5, env="CLERK_JWT_LEEWAY_SECONDS")
+    CLERK_SESSION_CACHE_TTL_SECONDS: int = Field(default=60, env="CLERK_SESSION_CACHE_TTL_SECONDS")
+    CLERK_SESSION_NEGATIVE_TTL_SECONDS: int = Field(default=300, env="CLERK_SESSION_NEGATIVE_TTL_SECONDS")
+    CLERK_SESSION_CACHE_MAX_ENTRIES: int = Field(default=10000, env="CLERK_SESSION_CACHE_MAX_ENTRIES")
     
     # Monitoring Configuration
     ENABLE_METRICS: bool = Field(default=True, env="ENABLE_METRICS")
@@ -93,6 +121,11 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = Field(default=60, env="RATE_LIMIT_PER_MINUTE")
     
+    # Analytics Configuration
+    # Read KPI period metrics from the kpi_rollups table instead of raw rows.
+    # Enable after running: python -m app.services.kpi_rollups backfill
+    KPI_ROLLUPS_ENABLED: bool = Field(default=False, env="KPI_ROLLUPS_ENABLED")
+    
     # Development Configuration
     RELOAD: bool = Field(default=True, env="RELOAD")
     LOG_LEVEL: str = Field(default="info", env="LOG_LEVEL")
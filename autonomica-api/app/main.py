@@ -4,8 +4,8 @@ OWL (Optimized Workflow Language) powered multi-agent marketing system
 """
 
 import os
-import asyncio
 import json
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -19,13 +19,15 @@ from pydantic import BaseModel
 from fastapi.responses import HTMLResponse
 
 from app.core.config import settings, validate_settings
-from app.auth.clerk_middleware import get_current_user, ClerkUser
+from app.auth.clerk_middleware import get_current_user, get_auth_cache_stats, ClerkUser
 from app.owl.workforce import Workforce
+from app.ai.token_stream import TokenStreamRelay
 from loguru import logger
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints import analytics_router, auth_router
 from app.database import engine
+from app.services.task_events import task_event_hub
 from app.models import schema
 
 # Create database tables
@@ -91,6 +93,10 @@ async def lifespan(app: FastAPI):
     )
     await workforce.initialize()
     
+    # Push task/workflow status changes to /api/tasks/events subscribers
+    task_event_hub.attach_monitor(workforce.task_monitor)
+    task_event_hub.attach_monitor(workforce.orchestrator.task_monitor)
+    
     # Store workforce in app state
     app.state.workforce = workforce
     
@@ -388,28 +394,55 @@ async def chat_endpoint(chat_req: ChatRequest, fastapi_request: Request, current
         raise HTTPException(status_code=400, detail="No messages provided")
 
     try:
+        started_at = time.perf_counter()
         chat_history = [msg.dict() for msg in chat_req.messages]
-        orchestration = await workforce.run_agents(
+        agent, token_stream = await workforce.stream_agents(
             chat_history, 
             user_id=current_user.user_id
         )
         
-        agent = orchestration.get("agent")
-        response_text = orchestration.get("response", "No response generated.")
+        agent_name = agent.name if agent else "unified-owl-agent"
+        relay = TokenStreamRelay(token_stream, started_at=started_at)
 
         async def stream_response():
-            words = response_text.split()
-            for i, word in enumerate(words):
+            message_id = f"msg_{datetime.now().timestamp()}"
+            parts = []
+            async for text in relay.stream():
+                parts.append(text)
                 chunk = {
-                    "id": f"msg_{datetime.now().timestamp()}",
+                    "id": message_id,
                     "role": "assistant",
-                    "content": word + (" " if i < len(words) - 1 else ""),
+                    "content": text,
                     "timestamp": datetime.now().isoformat(),
-                    "agent": agent.name if agent else "unified-owl-agent",
+                    "agent": agent_name,
                 }
                 yield f"data: {json.dumps(chunk)}\n\n"
-                await asyncio.sleep(0.05)
 
+            metrics = relay.metrics.to_dict()
+            logger.info(
+                f"Chat stream for user {current_user.user_id}: "
+                f"ttft={metrics['time_to_first_token_ms']}ms tokens={metrics['tokens']} "
+                f"chunks={metrics['chunks']} duration={metrics['duration_ms']}ms"
+            )
+            # Keep the reply in conversation memory so the next turn has it as context
+            reply = "".join(parts)
+            if reply:
+                await workforce.record_reply(chat_history, {
+                    "id": message_id,
+                    "role": "assistant",
+                    "content": reply,
+                    "timestamp": datetime.now().isoformat(),
+                }, user_id=current_user.user_id)
+            final = {
+                "id": message_id,
+                "role": "assistant",
+                "content": "",
+                "timestamp": datetime.now().isoformat(),
+                "agent": agent_name,
+                "done": True,
+                "metrics": metrics,
+            }
+            yield f"data: {json.dumps(final)}\n\n"
             yield f"data: [DONE]\n\n"
 
         return StreamingResponse(
@@ -418,7 +451,9 @@ async def chat_endpoint(chat_req: ChatRequest, fastapi_request: Request, current
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
-                "X-Content-Type-Options": "nosniff"
+                "X-Content-Type-Options": "nosniff",
+                # Don't let proxies buffer the token stream
+                "X-Accel-Buffering": "no"
             }
         )
 
@@ -426,6 +461,40 @@ async def chat_endpoint(chat_req: ChatRequest, fastapi_request: Request, current
         logger.error(f"Chat processing error for user {current_user.user_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Chat processing error: {str(e)}")
 
+@app.get("/api/auth/cache/stats")
+async def get_auth_cache_statistics(current_user: ClerkUser = Depends(get_current_user)):
+    """Hit/miss counters of the JWKS and session-status caches"""
+    return {
+        "success": True,
+        "stats": get_auth_cache_stats()
+    }
+
+@app.get("/api/tasks/events")
+async def stream_task_events(
+    request: Request,
+    last_event_id: Optional[int] = Query(None, description="Resume after this event id (alternative to the Last-Event-ID header)"),
+    current_user: ClerkUser = Depends(get_current_user)
+):
+    """Server-sent stream of the user's task and workflow status changes"""
+    header_id = request.headers.get("last-event-id")
+    if last_event_id is None and header_id:
+        try:
+            last_event_id = int(header_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID header")
+    
+    logger.info(f"User {current_user.user_id} subscribed to task events (resume after {last_event_id}).")
+    
+    return StreamingResponse(
+        task_event_hub.stream(current_user.user_id, last_event_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 @app.get("/api/ai/ollama/performance/summary")
 async def get_ollama_performance_summary(request: Request, current_user: ClerkUser = Depends(get_current_user)):
     """Get comprehensive Ollama performance summary"""
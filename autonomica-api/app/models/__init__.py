@@ -1,4 +1,4 @@
-from .schema import Base, Task, Agent, ContentPiece, SocialPost, AgentContext, User
+from .schema import Base, Task, Agent, ContentPiece, SocialPost, AgentContext, User, KPIRollup
 
 __all__ = [
     "Base",
@@ -8,4 +8,5 @@ __all__ = [
     "SocialPost",
     "AgentContext",
     "User",
+    "KPIRollup",
 ]
@@ -8,7 +8,9 @@ from sqlalchemy import (
     ForeignKey,
     Text,
     Enum as PyEnum,
-    Boolean
+    Boolean,
+    Index,
+    UniqueConstraint
 )
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
@@ -84,7 +86,7 @@ class User(Base):
     # Relationships
     tasks = relationship("Task", back_populates="user")
     agents = relationship("Agent", back_populates="user")
-    user_permissions = relationship("UserPermission", back_populates="user")
+    user_permissions = relationship("UserPermission", back_populates="user", foreign_keys="UserPermission.user_id")
     social_accounts = relationship("SocialAccount", back_populates="user")
     content_pieces = relationship("ContentPiece", back_populates="user")
     social_posts = relationship("SocialPost", back_populates="user")
@@ -194,4 +196,20 @@ class SocialPost(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     content_piece = relationship("ContentPiece", back_populates="social_posts")
-    user = relationship("User", back_populates="social_posts") 
\ No newline at end of file
+    user = relationship("User", back_populates="social_posts") 
+
+class KPIRollup(Base):
+    """Pre-aggregated KPI metric for one user and time bucket (see app/services/kpi_rollups.py)"""
+    __tablename__ = "kpi_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "granularity", "bucket_start", "metric", name="uq_kpi_rollups_bucket"),
+        Index("ix_kpi_rollups_lookup", "user_id", "granularity", "metric", "bucket_start"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False, default=0) # 0 for rows without a user
+    granularity = Column(String, nullable=False) # 'hour' or 'day'
+    bucket_start = Column(DateTime, nullable=False)
+    metric = Column(String, nullable=False) # e.g., 'posts', 'impressions', 'content_count'
+    value = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 import uuid
 import json
-from typing import List, Dict, Any, Optional
+import logging
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Set, Tuple, FrozenSet
 from pydantic import BaseModel, Field
 from datetime import datetime
 from .communication import (
@@ -13,6 +15,8 @@ from .communication import (
 from .tasks import Task, SubTask, TaskStatus
 from .negotiation import NegotiationManager
 
+logger = logging.getLogger(__name__)
+
 class Feedback(BaseModel):
     """Represents a piece of feedback received on a task."""
     task_id: str
@@ -305,38 +309,207 @@ class Agent(BaseModel):
 
 # --- TEMPORARY WORKFORCE LOGIC - TO BE MOVED TO workforce.py ---
 
+@dataclass(frozen=True)
+class AgentProfile:
+    """Precomputed matching data for one agent (rebuilt when the agent changes)."""
+    agent_id: str
+    system_prompt: str
+    model: str
+    tools: Tuple[str, ...]
+    keywords: FrozenSet[str]
+    model_bonus: float
+
+
+def _agent_fields(agent: Any) -> Tuple[str, str, Tuple[str, ...]]:
+    """(system_prompt, model, tools) for full agents and the workforce's simple agents."""
+    brain = getattr(agent, "brain", None)
+    system_prompt = brain.system_prompt if brain else getattr(agent, "system_prompt", "") or ""
+    model = brain.model if brain else getattr(agent, "model", "") or ""
+    tool_manager = getattr(agent, "tool_manager", None)
+    tools = tuple(tool_manager.available_tools) if tool_manager else ()
+    return system_prompt, model, tools
+
+
 class TaskAllocationSystem:
-    """Holds the logic for the task allocation system."""
+    """
+    Holds the logic for the task allocation system.
+
+    Agents are indexed when first seen (or via register_agent/update_agent):
+    system prompt keywords and tools go into inverted indexes, so allocating a
+    task tokenises only the task, prunes candidates to agents that have the
+    required tools, and scores keyword overlap from the index postings.
+    Scores are penalised by each agent's live queue depth.
+    """
+
+    CAPABILITY_WEIGHT = 1.5
+    ALL_TOOLS_BONUS = 10.0
+    TOOL_WEIGHT = 2.0
+    BUSY_PENALTY = 5.0
+    QUEUE_DEPTH_PENALTY = 2.0
+
+    def __init__(self):
+        self._profiles: Dict[str, AgentProfile] = {}
+        self._keyword_index: Dict[str, Set[str]] = {}
+        self._tool_index: Dict[str, Set[str]] = {}
+        self._queue_depth: Dict[str, int] = {}
+        self._assignments: Dict[str, str] = {}  # task_id -> agent_id
+
+    # --- Index maintenance ---
+
+    @staticmethod
+    def _model_bonus(model: str) -> float:
+        model = model.lower()
+        if "gpt-4" in model:
+            return 3.0
+        if "claude-3" in model:
+            return 3.5
+        return 0.0
+
+    def register_agent(self, agent: Any) -> AgentProfile:
+        """Index an agent's capabilities and tools (re-indexes if it changed)."""
+        system_prompt, model, tools = _agent_fields(agent)
+        current = self._profiles.get(agent.id)
+        if current and current.system_prompt == system_prompt and current.model == model and current.tools == tools:
+            return current
+
+        self.unregister_agent(agent.id, keep_load=True)
+        profile = AgentProfile(
+            agent_id=agent.id,
+            system_prompt=system_prompt,
+            model=model,
+            tools=tools,
+            keywords=frozenset(system_prompt.lower().split()),
+            model_bonus=self._model_bonus(model),
+        )
+        self._profiles[agent.id] = profile
+        for keyword in profile.keywords:
+            self._keyword_index.setdefault(keyword, set()).add(agent.id)
+        for tool in set(tools):
+            self._tool_index.setdefault(tool, set()).add(agent.id)
+        return profile
+
+    # Agents changed in place (new prompt, tools or model) are re-indexed the same way
+    update_agent = register_agent
+
+    def unregister_agent(self, agent_id: str, keep_load: bool = False) -> None:
+        """Remove an agent from the indexes."""
+        profile = self._profiles.pop(agent_id, None)
+        if profile is None:
+            return
+        for index, keys in ((self._keyword_index, profile.keywords), (self._tool_index, set(profile.tools))):
+            for key in keys:
+                postings = index.get(key)
+                if postings is not None:
+                    postings.discard(agent_id)
+                    if not postings:
+                        del index[key]
+        if not keep_load:
+            self._queue_depth.pop(agent_id, None)
+
+    def sync(self, agents: Dict[str, Any]) -> None:
+        """Bring the indexes in line with an agent registry (cheap when nothing changed)."""
+        for agent_id in [agent_id for agent_id in self._profiles if agent_id not in agents]:
+            self.unregister_agent(agent_id)
+        for agent in agents.values():
+            profile = self._profiles.get(agent.id)
+            if profile is None:
+                self.register_agent(agent)
+                continue
+            brain = getattr(agent, "brain", None)
+            system_prompt = brain.system_prompt if brain else getattr(agent, "system_prompt", "")
+            model = brain.model if brain else getattr(agent, "model", "")
+            tool_manager = getattr(agent, "tool_manager", None)
+            tools = tool_manager.available_tools if tool_manager else ()
+            # Identity check first: prompts are rarely edited in place
+            if (system_prompt is not profile.system_prompt and system_prompt != profile.system_prompt) \
+                    or (model or "") != profile.model \
+                    or len(tools) != len(profile.tools) or tuple(tools) != profile.tools:
+                self.register_agent(agent)
+
+    # --- Live load ---
+
+    def queue_depth(self, agent_id: str) -> int:
+        return self._queue_depth.get(agent_id, 0)
+
+    def record_assignment(self, task_id: str, agent_id: str) -> None:
+        """Count a task against an agent's queue until it is released."""
+        previous = self._assignments.get(task_id)
+        if previous == agent_id:
+            return
+        if previous:
+            self.release_assignment(task_id)
+        self._assignments[task_id] = agent_id
+        self._queue_depth[agent_id] = self._queue_depth.get(agent_id, 0) + 1
+
+    def release_assignment(self, task_id: str) -> None:
+        agent_id = self._assignments.pop(task_id, None)
+        if agent_id and self._queue_depth.get(agent_id, 0) > 0:
+            self._queue_depth[agent_id] -= 1
+
+    def on_status_change(self, kind: str, entity: Any, previous_status: Any) -> None:
+        """TaskMonitor listener: finished tasks no longer count towards queue depth."""
+        if kind == "task" and entity.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+            self.release_assignment(entity.id)
+
+    # --- Scoring ---
+
+    def _candidates(self, agents: Dict[str, Any], required_tools: Set[str]) -> List[Any]:
+        """Online agents with all required tools; falls back to any required tool, then to everyone."""
+        online = [agent for agent in agents.values() if agent.status != "offline"]
+        if not required_tools:
+            return online
+
+        postings = sorted((self._tool_index.get(tool, set()) for tool in required_tools), key=len)
+        with_all = [agent for agent in online if all(agent.id in posting for posting in postings)]
+        if with_all:
+            return with_all
+        with_any = [agent for agent in online if any(agent.id in posting for posting in postings)]
+        if with_any:
+            return with_any
+        return online
+
+    def _score(self, agent: Any, profile: AgentProfile, keyword_matches: int, required_tools: Set[str]) -> float:
+        score = keyword_matches * self.CAPABILITY_WEIGHT
+
+        if required_tools:
+            matched = len(required_tools.intersection(profile.tools))
+            if matched == len(required_tools):
+                score += self.ALL_TOOLS_BONUS
+            score += matched * self.TOOL_WEIGHT
+
+        if agent.status == "busy":
+            score -= self.BUSY_PENALTY
+        score -= self.queue_depth(agent.id) * self.QUEUE_DEPTH_PENALTY
+
+        return score + profile.model_bonus
 
     def _score_agent_for_task(self, agent: Agent, task: Task) -> float:
         """Calculates a suitability score for an agent to handle a specific task."""
-        score = 0.0
-
-        # 1. Capability Match
+        profile = self._profiles.get(agent.id) or self.register_agent(agent)
         task_keywords = set(task.title.lower().split() + task.description.lower().split())
-        agent_capabilities = set(agent.brain.system_prompt.lower().split())
-        capability_match = len(task_keywords.intersection(agent_capabilities))
-        score += capability_match * 1.5
-
-        # 2. Tool Match
-        if task.required_tools:
-            required = set(task.required_tools)
-            available = set(agent.tool_manager.available_tools)
-            if required.issubset(available):
-                score += 10.0
-            score += len(required.intersection(available)) * 2.0
-
-        # 3. Workload Penalty
-        if agent.status == "busy":
-            score -= 5.0
-            
-        # 4. Model Quality Bonus
-        if "gpt-4" in agent.brain.model.lower():
-            score += 3.0
-        elif "claude-3" in agent.brain.model.lower():
-            score += 3.5
+        return self._score(agent, profile, len(task_keywords & profile.keywords), set(task.required_tools))
+
+    def select_agent(self, agents: Dict[str, Any], task: Task) -> Tuple[Optional[Any], float]:
+        """Best agent for a task and its score (agents must already be synced)."""
+        required_tools = set(task.required_tools)
+        candidates = self._candidates(agents, required_tools)
+        if not candidates:
+            return None, 0.0
 
-        return score
+        # Keyword overlap per agent from the inverted index postings
+        keyword_matches: Dict[str, int] = {}
+        for keyword in set(task.title.lower().split() + task.description.lower().split()):
+            for agent_id in self._keyword_index.get(keyword, ()):
+                keyword_matches[agent_id] = keyword_matches.get(agent_id, 0) + 1
+
+        best_agent = None
+        highest_score = -float("inf")
+        for agent in candidates:
+            score = self._score(agent, self._profiles[agent.id], keyword_matches.get(agent.id, 0), required_tools)
+            if score > highest_score:
+                highest_score = score
+                best_agent = agent
+        return best_agent, highest_score
 
     async def allocate_task(self, agents: Dict[str, Agent], task: Task) -> Optional[Agent]:
         """Finds the best agent for a task and returns it."""
@@ -344,18 +517,11 @@ class TaskAllocationSystem:
             print("Warning: No agents available to allocate task.")
             return None
 
-        best_agent = None
-        highest_score = -1.0
+        self.sync(agents)
+        best_agent, highest_score = self.select_agent(agents, task)
 
-        for agent in agents.values():
-            if agent.status != "offline":
-                score = self._score_agent_for_task(agent, task)
-                if score > highest_score:
-                    highest_score = score
-                    best_agent = agent
-        
         if best_agent:
-            print(f"Best agent for task '{task.title}' is '{best_agent.name}' with score {highest_score:.2f}")
+            logger.debug(f"Best agent for task '{task.title}' is '{best_agent.name}' with score {highest_score:.2f}")
         else:
             print(f"Warning: Could not find a suitable agent for task '{task.title}'")
 
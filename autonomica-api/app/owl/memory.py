@@ -0,0 +1,169 @@
+"""Conversation memory.
+Stores chat turns per user session in Redis through a process-wide connection
+pool. Each turn appends only the messages Redis has not seen yet and reads back
+a bounded window, so the per-turn Redis traffic and prompt size stay constant.
+Older turns are trimmed or, when a summarizer is configured, folded into a
+running summary that is returned ahead of the window.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# summarizer(older_messages, previous_summary) -> new summary
+Summarizer = Callable[[List[Dict[str, Any]], Optional[str]], Awaitable[str]]
+
+_pools: Dict[str, Any] = {}
+
+
+def get_connection_pool(redis_url: str):
+    """Shared connection pool for a Redis URL (created on first use)."""
+    pool = _pools.get(redis_url)
+    if pool is None:
+        import redis.asyncio as redis
+        pool = redis.ConnectionPool.from_url(redis_url, decode_responses=True)
+        _pools[redis_url] = pool
+    return pool
+
+
+async def close_connection_pools() -> None:
+    """Disconnect every shared pool (application shutdown)."""
+    for redis_url, pool in list(_pools.items()):
+        try:
+            await pool.disconnect()
+        except Exception as e:
+            logger.error(f"Failed to close Redis pool for conversation memory: {e}")
+        _pools.pop(redis_url, None)
+
+
+def new_messages(messages: List[Dict[str, Any]], stored_count: int, tail: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The part of a client's message list that has not been stored yet.
+
+    Clients resend the whole conversation each turn; when it still lines up
+    with what was stored, only the messages past the stored count are new.
+    Otherwise resume after the last occurrence of the stored tail, and with no
+    overlap at all treat only the latest message as new.
+    """
+    if not messages:
+        return []
+    if len(messages) >= stored_count and (stored_count == 0 or messages[stored_count - 1] == tail):
+        return messages[stored_count:]
+    if tail is not None:
+        for index in range(len(messages) - 1, -1, -1):
+            if messages[index] == tail:
+                return messages[index + 1:]
+    return messages[-1:]
+
+
+class ConversationMemory:
+    """Append-only, windowed chat history per (user, session)."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        window: int = 20,
+        max_messages: int = 100,
+        ttl_seconds: Optional[int] = None,
+        summarizer: Optional[Summarizer] = None,
+        retry_after_seconds: float = 30.0,
+        client: Any = None,
+    ):
+        self.redis_url = redis_url
+        self.window = max(window, 1)
+        self.max_messages = max(max_messages, self.window)
+        self.ttl_seconds = ttl_seconds
+        self.summarizer = summarizer
+        self.retry_after_seconds = retry_after_seconds
+        self._client = client
+        self._unavailable_until = 0.0
+        self.stats = {"appended": 0, "compactions": 0, "fallbacks": 0}
+
+    @property
+    def client(self):
+        if self._client is None and self.redis_url:
+            import redis.asyncio as redis
+            self._client = redis.Redis(connection_pool=get_connection_pool(self.redis_url))
+        return self._client
+
+    @staticmethod
+    def key(user_id: str, session_id: str) -> str:
+        return f"chat:{user_id}:{session_id}"
+
+    def _local_history(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return messages[-self.window:]
+
+    def _with_summary(self, summary: Optional[str], window: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not summary:
+            return window
+        return [{"role": "system", "content": f"Summary of the earlier conversation: {summary}"}] + window
+
+    async def record(self, messages: List[Dict[str, Any]], user_id: Optional[str], session_id: str) -> List[Dict[str, Any]]:
+        """Store the new messages of a turn and return the history window to use as context."""
+        if not user_id or self.client is None or time.monotonic() < self._unavailable_until:
+            return self._local_history(messages)
+
+        key = self.key(user_id, session_id)
+        meta_key = f"{key}:meta"
+        try:
+            # Round trip 1: how much of this conversation is already stored
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hget(meta_key, "count")
+            pipe.lindex(key, -1)
+            stored_count, tail = await pipe.execute()
+            fresh = new_messages(messages, int(stored_count or 0), json.loads(tail) if tail else None)
+
+            # Round trip 2: append the new messages, bound the list, read the window back
+            pipe = self.client.pipeline(transaction=True)
+            if fresh:
+                pipe.rpush(key, *[json.dumps(message) for message in fresh])
+                pipe.hincrby(meta_key, "count", len(fresh))
+            else:
+                pipe.llen(key)
+            if self.summarizer is None:
+                pipe.ltrim(key, -self.max_messages, -1)
+            if self.ttl_seconds:
+                pipe.expire(key, self.ttl_seconds)
+                pipe.expire(meta_key, self.ttl_seconds)
+            pipe.lrange(key, -self.window, -1)
+            pipe.hget(meta_key, "summary")
+            results = await pipe.execute()
+            length, window_json, summary = int(results[0]), results[-2], results[-1]
+            window = [json.loads(item) for item in window_json]
+            self.stats["appended"] += len(fresh)
+
+            if self.summarizer is not None and length > self.max_messages:
+                summary = await self._compact(key, meta_key, length, summary)
+            return self._with_summary(summary, window)
+        except Exception as e:
+            logger.warning(f"Redis unavailable ({e}), falling back to local history.")
+            self._unavailable_until = time.monotonic() + self.retry_after_seconds
+            self.stats["fallbacks"] += 1
+            return self._local_history(messages)
+
+    async def _compact(self, key: str, meta_key: str, length: int, summary: Optional[str]) -> Optional[str]:
+        """Fold everything older than the window into the running summary."""
+        overflow = length - self.window
+        older = [json.loads(item) for item in await self.client.lrange(key, 0, overflow - 1)]
+        try:
+            summary = await self.summarizer(older, summary)
+        except Exception as e:
+            logger.error(f"Conversation summarization failed for {key}: {e}")
+            await self.client.ltrim(key, -self.max_messages, -1)
+            return summary
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(meta_key, "summary", summary)
+        pipe.ltrim(key, overflow, -1)
+        await pipe.execute()
+        self.stats["compactions"] += 1
+        return summary
+
+    async def clear(self, user_id: str, session_id: str) -> None:
+        key = self.key(user_id, session_id)
+        if self.client is not None:
+            await self.client.delete(key, f"{key}:meta")
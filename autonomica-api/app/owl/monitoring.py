@@ -1,12 +1,31 @@
 from __future__ import annotations
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, Callable, List
 from .tasks import Task, TaskStatus
 
+logger = logging.getLogger(__name__)
+
+# listener(kind, entity, previous_status) where kind is "task" or "workflow"
+StatusListener = Callable[[str, Any, Any], None]
+
 class TaskMonitor:
     """Holds the logic for monitoring task execution across the workforce."""
     
     def __init__(self):
         self.task_registry: Dict[str, Task] = {}
+        self.listeners: List[StatusListener] = []
+
+    def add_listener(self, listener: StatusListener):
+        """Registers a callback invoked after every task or workflow status change."""
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def _notify(self, kind: str, entity: Any, previous_status: Any):
+        for listener in self.listeners:
+            try:
+                listener(kind, entity, previous_status)
+            except Exception as e:
+                logger.error(f"Status listener failed for {kind} {entity.id}: {e}")
 
     def register_task(self, task: Task):
         """Adds a new task to the registry for monitoring."""
@@ -23,7 +42,7 @@ class TaskMonitor:
             task = self.task_registry[task_id]
             try:
                 new_status = TaskStatus(payload.get("status"))
-                task.update_status(new_status)
+                self.update_task_status(task_id, new_status)
                 print(f"Updated task {task.id} to status {new_status.value}. Details: {payload.get('details')}")
                 
                 # In a real system, this could trigger other workflows
@@ -43,6 +62,16 @@ class TaskMonitor:
         """Update a task's status directly."""
         if task_id in self.task_registry:
             task = self.task_registry[task_id]
+            previous_status = task.status
             task.update_status(status)
+            if previous_status != status:
+                self._notify("task", task, previous_status)
         else:
-            print(f"Warning: Tried to update status for unknown task {task_id}") 
\ No newline at end of file
+            print(f"Warning: Tried to update status for unknown task {task_id}")
+
+    def update_workflow_status(self, workflow: Any, status: TaskStatus):
+        """Update a workflow's status and notify listeners."""
+        previous_status = workflow.status
+        workflow.status = status
+        if previous_status != status:
+            self._notify("workflow", workflow, previous_status)
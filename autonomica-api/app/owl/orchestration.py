@@ -14,6 +14,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from collections import deque
 from enum import Enum
 from typing import Dict, List, Optional, Any, Set
 from dataclasses import dataclass, field
@@ -67,6 +69,47 @@ class SystemResource:
         return self.allocated / self.capacity if self.capacity > 0 else 0.0
 
 
+class WorkflowCycleError(ValueError):
+    """Raised when a workflow's task dependencies contain a cycle."""
+
+    def __init__(self, task_ids: List[str]):
+        self.task_ids = task_ids
+        super().__init__(f"Dependency cycle between tasks: {', '.join(task_ids)}")
+
+
+@dataclass
+class TaskTiming:
+    """Timing of one task in a DAG workflow run (seconds since the run started)."""
+    task_id: str
+    ready_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Longest chain of task durations ending with this task
+    critical_path_time: float = 0.0
+    critical_predecessor: Optional[str] = None
+
+    @property
+    def queue_time(self) -> float:
+        return (self.started_at - self.ready_at) if self.started_at is not None else 0.0
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ready_at": round(self.ready_at, 4),
+            "started_at": round(self.started_at, 4) if self.started_at is not None else None,
+            "finished_at": round(self.finished_at, 4) if self.finished_at is not None else None,
+            "queue_time": round(self.queue_time, 4),
+            "duration": round(self.duration, 4),
+            "critical_path_time": round(self.critical_path_time, 4),
+            "critical_predecessor": self.critical_predecessor,
+        }
+
+
 @dataclass
 class WorkflowExecution:
     """Tracks the execution of a multi-agent workflow."""
@@ -80,6 +123,7 @@ class WorkflowExecution:
     completed_at: Optional[datetime] = None
     total_cost: float = 0.0
     participating_agents: Set[str] = field(default_factory=set)
+    user_id: Optional[str] = None
 
 
 class WorkforceOrchestrator:
@@ -99,6 +143,7 @@ class WorkforceOrchestrator:
         self.agents: Dict[str, Agent] = {}
         self.task_allocator = TaskAllocationSystem()
         self.task_monitor = TaskMonitor()
+        self.task_monitor.add_listener(self.task_allocator.on_status_change)
         self.negotiation_manager = NegotiationManager()
         
         # Orchestration state
@@ -106,6 +151,10 @@ class WorkforceOrchestrator:
         self.task_dependency_graph: Dict[str, Set[str]] = {}
         self.agent_workloads: Dict[str, List[str]] = {}  # agent_id -> task_ids
         
+        # Concurrency slots for DAG execution (global and per agent)
+        self._task_slots: Optional[asyncio.Semaphore] = None
+        self._agent_slots: Dict[str, asyncio.Semaphore] = {}
+        
         # Resource management
         self.system_resources: Dict[str, SystemResource] = {
             "token_budget": SystemResource(
@@ -130,7 +179,8 @@ class WorkforceOrchestrator:
         
         # Configuration
         self.default_model = default_model
-        self.max_concurrent_tasks = 10
+        self.max_concurrent_tasks = 10  # across all workflows
+        self.max_tasks_per_agent = 1
         self.token_budget_threshold = 0.8  # Alert when 80% of budget used
         self.orchestration_tick_interval = 2.0  # seconds
         
@@ -144,6 +194,7 @@ class WorkforceOrchestrator:
         """Register an agent with the orchestration system."""
         self.agents[agent.id] = agent
         self.agent_workloads[agent.id] = []
+        self.task_allocator.register_agent(agent)
         
         # Register agent as a computational resource
         self.system_resources[f"agent_{agent.id}"] = SystemResource(
@@ -188,13 +239,20 @@ class WorkforceOrchestrator:
     # ================================
 
     def create_workflow(self, name: str, tasks: List[Task], 
-                       mode: OrchestrationMode = OrchestrationMode.ADAPTIVE) -> WorkflowExecution:
+                       mode: OrchestrationMode = OrchestrationMode.ADAPTIVE,
+                       user_id: Optional[str] = None) -> WorkflowExecution:
         """Create a new multi-task workflow with orchestration strategy."""
-        workflow = WorkflowExecution(name=name, tasks=tasks, mode=mode)
+        # Reject dependency cycles before registering anything
+        self._topological_sort(tasks)
+        
+        workflow = WorkflowExecution(name=name, tasks=tasks, mode=mode, user_id=user_id)
         self.active_workflows[workflow.id] = workflow
         
         # Build dependency graph for this workflow
         for task in tasks:
+            task.metadata.setdefault("workflow_id", workflow.id)
+            if user_id:
+                task.metadata.setdefault("user_id", user_id)
             self.task_dependency_graph[task.id] = set(task.dependencies)
             self.task_monitor.register_task(task)
         
@@ -207,7 +265,7 @@ class WorkforceOrchestrator:
             raise ValueError(f"Workflow {workflow_id} not found")
         
         workflow = self.active_workflows[workflow_id]
-        workflow.status = TaskStatus.IN_PROGRESS
+        self.task_monitor.update_workflow_status(workflow, TaskStatus.IN_PROGRESS)
         workflow.started_at = datetime.utcnow()
         
         logger.info(f"Starting workflow execution: {workflow.name}")
@@ -220,15 +278,15 @@ class WorkforceOrchestrator:
             else:  # ADAPTIVE
                 result = await self._execute_adaptive_workflow(workflow)
             
-            workflow.status = TaskStatus.COMPLETED
             workflow.completed_at = datetime.utcnow()
+            self.task_monitor.update_workflow_status(workflow, TaskStatus.COMPLETED)
             self.total_tasks_processed += len(workflow.tasks)
             
             logger.info(f"Workflow '{workflow.name}' completed successfully")
             return result
             
         except Exception as e:
-            workflow.status = TaskStatus.FAILED
+            self.task_monitor.update_workflow_status(workflow, TaskStatus.FAILED)
             logger.error(f"Workflow '{workflow.name}' failed: {str(e)}")
             await self._handle_workflow_failure(workflow, e)
             raise
@@ -262,29 +320,132 @@ class WorkforceOrchestrator:
 
     async def _execute_parallel_workflow(self, workflow: WorkflowExecution) -> Dict[str, Any]:
         """Execute independent tasks in parallel for maximum efficiency."""
-        # Group tasks by dependency level
-        task_levels = self._group_tasks_by_dependency_level(workflow.tasks)
-        results = {}
+        return await self._execute_dag_workflow(workflow)
+
+    def _agent_slot(self, agent_id: str) -> asyncio.Semaphore:
+        if agent_id not in self._agent_slots:
+            self._agent_slots[agent_id] = asyncio.Semaphore(self.max_tasks_per_agent)
+        return self._agent_slots[agent_id]
+
+    async def _execute_dag_workflow(self, workflow: WorkflowExecution) -> Dict[str, Any]:
+        """
+        Run a workflow as a DAG: each task starts as soon as its own dependencies
+        complete, bounded by max_concurrent_tasks overall and max_tasks_per_agent.
+        Dependents of failed (or unassignable) tasks are skipped.
+        """
+        if self._task_slots is None:
+            self._task_slots = asyncio.Semaphore(self.max_concurrent_tasks)
         
-        for level, tasks in task_levels.items():
-            logger.info(f"Executing dependency level {level} with {len(tasks)} tasks")
-            
-            # Execute all tasks at this level in parallel
-            level_tasks = []
-            for task in tasks:
-                agent = await self._allocate_agent_for_task(task)
-                if agent:
-                    level_tasks.append(self._execute_single_task(task, agent, workflow))
-                    workflow.participating_agents.add(agent.id)
-            
-            # Wait for all tasks at this level to complete
-            if level_tasks:
-                level_results = await asyncio.gather(*level_tasks, return_exceptions=True)
-                for i, result in enumerate(level_results):
-                    if not isinstance(result, Exception):
-                        results[tasks[i].id] = result
+        ordered_tasks = self._topological_sort(workflow.tasks)
+        task_map = {task.id: task for task in ordered_tasks}
+        dependents: Dict[str, List[str]] = {task.id: [] for task in ordered_tasks}
+        remaining: Dict[str, int] = {}
+        for task in ordered_tasks:
+            internal_deps = [dep for dep in task.dependencies if dep in task_map]
+            remaining[task.id] = len(internal_deps)
+            for dep in internal_deps:
+                dependents[dep].append(task.id)
+        
+        results: Dict[str, Any] = {}
+        failed: Dict[str, str] = {}
+        skipped: Dict[str, str] = {}
+        timings: Dict[str, TaskTiming] = {}
+        running: Set[asyncio.Task] = set()
+        run_start = time.perf_counter()
+        
+        def elapsed() -> float:
+            return time.perf_counter() - run_start
+        
+        async def run(task: Task) -> None:
+            timing = timings[task.id]
+            agent = await self._allocate_agent_for_task(task)
+            if not agent:
+                raise LookupError(f"No suitable agent found for task {task.title}")
+            async with self._agent_slot(agent.id), self._task_slots:
+                timing.started_at = elapsed()
+                workflow.participating_agents.add(agent.id)
+                try:
+                    results[task.id] = await self._execute_single_task(task, agent, workflow)
+                finally:
+                    timing.finished_at = elapsed()
+        
+        def launch(task_id: str) -> None:
+            timings[task_id] = TaskTiming(task_id=task_id, ready_at=elapsed())
+            job = asyncio.create_task(run(task_map[task_id]), name=task_id)
+            running.add(job)
+        
+        def skip_dependents(task_id: str, reason: str) -> None:
+            pending = deque(dependents[task_id])
+            while pending:
+                dependent_id = pending.popleft()
+                if dependent_id not in skipped:
+                    skipped[dependent_id] = reason
+                    pending.extend(dependents[dependent_id])
         
-        return {"workflow_id": workflow.id, "results": results}
+        for task in ordered_tasks:
+            if remaining[task.id] == 0:
+                launch(task.id)
+        
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for job in done:
+                    running.discard(job)
+                    task_id = job.get_name()
+                    error = job.exception()
+                    if error is not None:
+                        logger.warning(f"Task {task_id} did not complete: {error}")
+                        failed[task_id] = str(error)
+                        skip_dependents(task_id, f"dependency {task_id} did not complete")
+                        continue
+                    
+                    # Longest duration chain ending here: own duration + slowest finished dependency
+                    timing = timings[task_id]
+                    predecessors = [dep for dep in task_map[task_id].dependencies if dep in timings]
+                    if predecessors:
+                        slowest = max(predecessors, key=lambda dep: timings[dep].critical_path_time)
+                        timing.critical_predecessor = slowest
+                        timing.critical_path_time = timings[slowest].critical_path_time
+                    timing.critical_path_time += timing.duration
+                    
+                    for dependent_id in dependents[task_id]:
+                        remaining[dependent_id] -= 1
+                        if remaining[dependent_id] == 0 and dependent_id not in skipped:
+                            launch(dependent_id)
+        finally:
+            for job in running:
+                job.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        
+        return {
+            "workflow_id": workflow.id,
+            "results": results,
+            "failed": failed,
+            "skipped": skipped,
+            **self._critical_path_report(timings, elapsed()),
+        }
+
+    @staticmethod
+    def _critical_path_report(timings: Dict[str, TaskTiming], makespan: float) -> Dict[str, Any]:
+        """Per-task timings plus the chain of tasks that bounded the run time."""
+        path: List[str] = []
+        finished = [timing for timing in timings.values() if timing.finished_at is not None]
+        if finished:
+            current: Optional[str] = max(finished, key=lambda timing: timing.critical_path_time).task_id
+            while current:
+                path.append(current)
+                current = timings[current].critical_predecessor
+            path.reverse()
+        
+        return {
+            "timing": {
+                "makespan": round(makespan, 4),
+                "critical_path": path,
+                "critical_path_time": round(timings[path[-1]].critical_path_time, 4) if path else 0.0,
+                "tasks": {task_id: timing.to_dict() for task_id, timing in timings.items()},
+            }
+        }
 
     async def _execute_adaptive_workflow(self, workflow: WorkflowExecution) -> Dict[str, Any]:
         """Intelligently choose between sequential and parallel based on system state."""
@@ -320,8 +481,8 @@ class WorkforceOrchestrator:
             agent.mailbox.add_incoming(message)
             
             # Monitor task execution
-            task.status = TaskStatus.IN_PROGRESS
             task.assigned_to = agent.id
+            self._set_task_status(task, TaskStatus.IN_PROGRESS)
             
             # Simulate task execution (in real implementation, this would be actual agent processing)
             await self._monitor_task_execution(task, agent)
@@ -338,7 +499,7 @@ class WorkforceOrchestrator:
             # Release resources
             await self._release_resources_for_task(task, agent)
             
-            task.status = TaskStatus.COMPLETED
+            self._set_task_status(task, TaskStatus.COMPLETED)
             task.completed_at = end_time
             
             return {
@@ -350,10 +511,17 @@ class WorkforceOrchestrator:
             }
             
         except Exception as e:
-            task.status = TaskStatus.FAILED
+            self._set_task_status(task, TaskStatus.FAILED)
             await self._handle_task_failure(task, agent, e)
             raise
 
+    def _set_task_status(self, task: Task, status: TaskStatus) -> None:
+        """Change a task's status through the monitor so status listeners are notified."""
+        if task.id in self.task_monitor.task_registry:
+            self.task_monitor.update_task_status(task.id, status)
+        else:
+            task.status = status
+
     # ================================
     # Resource Management
     # ================================
@@ -365,6 +533,7 @@ class WorkforceOrchestrator:
         if agent_resource and agent_resource.available > 0:
             agent_resource.allocated += 1
             agent_resource.reserved_by.add(task.id)
+        self.task_allocator.record_assignment(task.id, agent.id)
         
         # Reserve token budget based on task complexity
         estimated_tokens = self._estimate_token_usage(task)
@@ -382,6 +551,7 @@ class WorkforceOrchestrator:
         if agent_resource:
             agent_resource.allocated = max(0, agent_resource.allocated - 1)
             agent_resource.reserved_by.discard(task.id)
+        self.task_allocator.release_assignment(task.id)
         
         # Release tokens (actual usage may be different from estimate)
         token_resource = self.system_resources["token_budget"]
@@ -471,63 +641,47 @@ class WorkforceOrchestrator:
     # ================================
 
     def _topological_sort(self, tasks: List[Task]) -> List[Task]:
-        """Sort tasks by dependencies using topological sort algorithm."""
-        # Create a map of task IDs to task objects
+        """
+        Sort tasks so each comes after its dependencies (Kahn's algorithm, O(V + E)).
+
+        Dependencies on tasks outside the list are ignored here; a cycle raises
+        WorkflowCycleError.
+        """
         task_map = {task.id: task for task in tasks}
-        
-        # Build adjacency list and in-degree count
-        graph = {}
-        in_degree = {}
+        dependents: Dict[str, List[str]] = {task.id: [] for task in tasks}
+        in_degree: Dict[str, int] = {}
         
         for task in tasks:
-            graph[task.id] = task.dependencies.copy()
-            in_degree[task.id] = len(task.dependencies)
+            internal_deps = set(dep for dep in task.dependencies if dep in task_map)
+            in_degree[task.id] = len(internal_deps)
+            for dep in internal_deps:
+                dependents[dep].append(task.id)
         
-        # Find tasks with no dependencies
-        queue = [task_id for task_id, degree in in_degree.items() if degree == 0]
+        queue = deque(task.id for task in tasks if in_degree[task.id] == 0)
         sorted_tasks = []
         
         while queue:
-            current_id = queue.pop(0)
+            current_id = queue.popleft()
             sorted_tasks.append(task_map[current_id])
-            
-            # Update in-degrees of dependent tasks
-            for task_id, deps in graph.items():
-                if current_id in deps:
-                    deps.remove(current_id)
-                    in_degree[task_id] -= 1
-                    if in_degree[task_id] == 0:
-                        queue.append(task_id)
+            for dependent_id in dependents[current_id]:
+                in_degree[dependent_id] -= 1
+                if in_degree[dependent_id] == 0:
+                    queue.append(dependent_id)
+        
+        if len(sorted_tasks) < len(task_map):
+            raise WorkflowCycleError([task_id for task_id, degree in in_degree.items() if degree > 0])
         
         return sorted_tasks
 
     def _group_tasks_by_dependency_level(self, tasks: List[Task]) -> Dict[int, List[Task]]:
-        """Group tasks by their dependency level for parallel execution."""
-        levels = {}
-        task_map = {task.id: task for task in tasks}
+        """Group tasks by their dependency level (longest dependency chain below them)."""
+        levels: Dict[int, List[Task]] = {}
+        task_levels: Dict[str, int] = {}
         
-        def get_level(task_id: str, visited: Set[str] = None) -> int:
-            if visited is None:
-                visited = set()
-            
-            if task_id in visited:
-                return 0  # Circular dependency, treat as level 0
-            
-            visited.add(task_id)
-            task = task_map.get(task_id)
-            
-            if not task or not task.dependencies:
-                return 0
-            
-            max_dep_level = max(get_level(dep_id, visited.copy()) 
-                              for dep_id in task.dependencies)
-            return max_dep_level + 1
-        
-        for task in tasks:
-            level = get_level(task.id)
-            if level not in levels:
-                levels[level] = []
-            levels[level].append(task)
+        for task in self._topological_sort(tasks):
+            level = max((task_levels[dep] + 1 for dep in task.dependencies if dep in task_levels), default=0)
+            task_levels[task.id] = level
+            levels.setdefault(level, []).append(task)
         
         return levels
 
@@ -590,7 +744,7 @@ class WorkforceOrchestrator:
         alternative_agent = await self._allocate_agent_for_task(task)
         if alternative_agent and alternative_agent.id != agent.id:
             logger.info(f"Reassigning failed task {task.id} to agent {alternative_agent.id}")
-            task.status = TaskStatus.PENDING
+            self._set_task_status(task, TaskStatus.PENDING)
             # Could implement retry logic here
 
     async def _handle_workflow_failure(self, workflow: WorkflowExecution, error: Exception) -> None:
@@ -600,7 +754,7 @@ class WorkforceOrchestrator:
         # Clean up any pending tasks
         for task in workflow.tasks:
             if task.status == TaskStatus.IN_PROGRESS:
-                task.status = TaskStatus.FAILED
+                self._set_task_status(task, TaskStatus.FAILED)
                 # Release any reserved resources
                 for agent_id in workflow.participating_agents:
                     agent = self.agents.get(agent_id)
@@ -7,7 +7,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
 from .agent import TaskAllocationSystem, Agent as FullAgent
@@ -17,11 +17,13 @@ from .communication import (
     MessageType,
     TaskAssignmentPayload,
 )
+from .memory import ConversationMemory, close_connection_pools
 from .monitoring import TaskMonitor
 from .negotiation import NegotiationManager
 from .tasks import Task, TaskStatus
 from .orchestration import WorkforceOrchestrator, OrchestrationMode, WorkflowExecution
 from ..ai.ai_manager import ai_manager
+from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +48,13 @@ class Workforce:
         self.orchestrator = WorkforceOrchestrator(default_model)
         self.default_model = default_model
         self.redis_url = redis_url
+        self.conversation_memory = ConversationMemory(
+            redis_url,
+            window=settings.CONVERSATION_HISTORY_WINDOW,
+            max_messages=settings.CONVERSATION_HISTORY_MAX_MESSAGES,
+            ttl_seconds=settings.CONVERSATION_HISTORY_TTL_SECONDS,
+            summarizer=self._summarize_conversation if settings.CONVERSATION_HISTORY_SUMMARIZE else None,
+        )
         self.agents: Dict[str, Agent] = {}
         self._create_simple_agents()
         self._create_full_agents_from_simple()
@@ -53,6 +62,7 @@ class Workforce:
         self.task_queue: List[Task] = []
         self.task_allocator = TaskAllocationSystem()
         self.task_monitor = TaskMonitor()
+        self.task_monitor.add_listener(self.task_allocator.on_status_change)
         self.negotiation_manager = NegotiationManager()
         self._running: bool = False
         logger.info("Workforce initialized with advanced orchestration capabilities")
@@ -137,6 +147,7 @@ class Workforce:
     async def shutdown(self):
         """Shuts down asynchronous resources."""
         self.stop()
+        await close_connection_pools()
         logger.info("Workforce shutdown.")
 
     def add_agent(self, agent: Agent) -> None:
@@ -171,8 +182,8 @@ class Workforce:
             if hasattr(agent, 'mailbox'):
                 agent.mailbox.add_incoming(CamelMessage(header=header, payload=payload))
 
-            task.status = TaskStatus.IN_PROGRESS
             task.assigned_to = agent.id
+            self.task_allocator.record_assignment(task.id, agent.id)
             self.task_monitor.update_task_status(task.id, TaskStatus.IN_PROGRESS)
             logger.info("Task %s assigned to agent %s", task.id, agent.name)
 
@@ -232,7 +243,8 @@ class Workforce:
         workflow = self.orchestrator.create_workflow(
             name=f"Chat Request - {session_id}",
             tasks=[task],
-            mode=OrchestrationMode.ADAPTIVE
+            mode=OrchestrationMode.ADAPTIVE,
+            user_id=user_id
         )
         
         workflow_result = await self.orchestrator.execute_workflow(workflow.id)
@@ -267,6 +279,39 @@ class Workforce:
             }
         }
     
+    async def stream_agents(
+        self,
+        messages: List[Dict[str, Any]],
+        user_id: str | None = None,
+        session_id: str = "default"
+    ) -> Tuple[Optional[Agent], AsyncIterator[Dict[str, Any]]]:
+        """Select an agent for the chat and return it with its live token stream.
+
+        Unlike run_agents, nothing waits for the full reply: the returned
+        iterator yields model chunks as they are generated.
+        """
+        if not messages:
+            raise ValueError("Cannot run agents with an empty message list.")
+
+        agent = next(iter(self.select_agents(messages)), None)
+        await self._manage_conversation_history(messages, user_id, session_id)
+
+        tokens = self.generate_streaming_response(
+            prompt=messages[-1]['content'],
+            agent_context=agent.system_prompt if agent else None
+        )
+        return agent, tokens
+
+    async def record_reply(
+        self,
+        messages: List[Dict[str, Any]],
+        reply: Dict[str, Any],
+        user_id: str | None = None,
+        session_id: str = "default"
+    ) -> None:
+        """Store a finished streamed reply after the turn's messages."""
+        await self._manage_conversation_history(messages + [reply], user_id, session_id)
+
     async def generate_ai_response(
         self,
         prompt: str,
@@ -374,30 +419,19 @@ class Workforce:
         return tools
 
     async def _manage_conversation_history(self, messages: List[Dict[str, Any]], user_id: str | None, session_id: str) -> List[Dict[str, Any]]:
-        """Store and retrieve conversation history from Redis if available."""
-        import json
-        
-        history: List[Dict[str, Any]]
-
-        if self.redis_url and user_id:
-            try:
-                import redis.asyncio as redis
-                redis_client = redis.Redis.from_url(self.redis_url, decode_responses=True)
-                key = f"chat:{user_id}:{session_id}"
-
-                # Use a pipeline for efficiency
-                pipe = redis_client.pipeline()
-                for m in messages:
-                    pipe.rpush(key, json.dumps(m))
-                pipe.ltrim(key, -100, -1)
-                await pipe.execute()
-
-                history_json = await redis_client.lrange(key, 0, -1)
-                history = [json.loads(item) for item in history_json]
-            except Exception as e:
-                logger.warning(f"Redis unavailable ({e}), falling back to local history.")
-                history = messages
-        else:
-            history = messages
-            
-        return history
+        """Store the turn's new messages and return the bounded history window."""
+        return await self.conversation_memory.record(messages, user_id, session_id)
+
+    async def _summarize_conversation(self, messages: List[Dict[str, Any]], previous_summary: Optional[str]) -> str:
+        """Condense older chat turns (and the previous summary) for conversation memory."""
+        transcript = "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+        prompt = (
+            "Summarize this conversation so it can replace the original messages as context. "
+            "Keep facts, decisions and open questions.\n\n"
+        )
+        if previous_summary:
+            prompt += f"Summary so far: {previous_summary}\n\n"
+        response = await self.generate_ai_response(prompt + transcript, task_type="summarization", temperature=0.2)
+        if response.get("error"):
+            raise RuntimeError(response["error"])
+        return response["content"]
@@ -857,24 +857,24 @@ class AnalyticsDataProcessor:
     async def get_insights_summary(self, content_id: int) -> Dict[str, Any]:
         """Get a summary of insights for content"""
         try:
-            # Get cached insights if available
             cache_key = f"insights_summary:{content_id}"
-            cached_summary = await self.cache_service.get(cache_key)
             
-            if cached_summary:
-                return json.loads(cached_summary)
-            
-            # Generate fresh summary
-            summary = await self.process_content_analytics(
-                content_id, 
-                analysis_period="7d",
-                include_insights=True,
-                include_recommendations=True
+            # Concurrent requests for the same content share one computation;
+            # only successful summaries are cached
+            summary = await self.cache_service.get_or_compute(
+                cache_key,
+                lambda: self.process_content_analytics(
+                    content_id,
+                    analysis_period="7d",
+                    include_insights=True,
+                    include_recommendations=True
+                ),
+                ttl=1800,  # 30 minutes TTL
+                stale_ttl=300,
+                cache_if=lambda result: result.get("success", False)
             )
             
             if summary["success"]:
-                # Cache the summary
-                await self.cache_service.set(cache_key, json.dumps(summary), 1800)  # 30 minutes TTL
                 return summary
             else:
                 return {"error": summary.get("error", "Failed to generate insights")}
@@ -3,13 +3,23 @@ Cache Service
 Handles caching operations for performance optimization
 """
 
-import json
+import sys
+import math
+import time
+import heapq
+import random
+import inspect
 import logging
-from typing import Any, Optional, Dict, List
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional, Dict, List, Tuple, Iterator, Callable, Awaitable, Set
 from datetime import datetime, timedelta
 import asyncio
 from enum import Enum
 
+from app.services.payload_codec import PayloadCodec, PayloadCodecError
+
 logger = logging.getLogger(__name__)
 
 class CacheLevel(str, Enum):
@@ -39,7 +49,8 @@ class CacheConfig:
         fallback_to_memory: bool = True,
         cache_strategy: CacheStrategy = CacheStrategy.TTL,
         lru_max_size: int = 1000,
-        cleanup_interval: int = 300
+        cleanup_interval: int = 300,
+        compression_threshold: int = 1024
     ):
         self.default_ttl = default_ttl
         self.max_memory_mb = max_memory_mb
@@ -53,6 +64,279 @@ class CacheConfig:
         self.cache_strategy = cache_strategy
         self.lru_max_size = lru_max_size
         self.cleanup_interval = cleanup_interval
+        self.compression_threshold = compression_threshold
+
+@dataclass
+class CacheEntry:
+    """Entry stored in the in-memory cache tier"""
+    key: str
+    value: Any
+    created_at: datetime
+    expires_at: Optional[datetime]
+    access_count: int = 0
+    last_accessed: Optional[datetime] = None
+    size_bytes: int = 0
+    compression_ratio: float = 1.0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    
+    def __post_init__(self):
+        if self.last_accessed is None:
+            self.last_accessed = self.created_at
+
+@dataclass
+class CacheStats:
+    """Snapshot of cache statistics"""
+    total_requests: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    total_size_bytes: int = 0
+    entries_count: int = 0
+    compression_savings_bytes: int = 0
+    eviction_count: int = 0
+    last_cleanup: Optional[datetime] = None
+    lru_evictions: int = 0
+    size_evictions: int = 0
+    expired_removals: int = 0
+    max_entries: int = 0
+    max_size_bytes: int = 0
+    serialized_bytes: int = 0
+    codec: str = "json"
+    compression_ratio: float = 1.0
+    
+    @property
+    def hit_rate(self) -> float:
+        """Hit rate as a percentage"""
+        if self.total_requests == 0:
+            return 0.0
+        return self.cache_hits / self.total_requests * 100
+    
+    @property
+    def compression_savings_percent(self) -> float:
+        """Compression savings as a percentage of serialized (pre-compression) bytes"""
+        baseline = self.serialized_bytes or self.total_size_bytes
+        if baseline == 0:
+            return 0.0
+        return self.compression_savings_bytes / baseline * 100
+    
+    @property
+    def occupancy_percent(self) -> float:
+        """Occupancy of the tightest memory-tier limit as a percentage"""
+        ratios = []
+        if self.max_entries > 0:
+            ratios.append(self.entries_count / self.max_entries)
+        if self.max_size_bytes > 0:
+            ratios.append(self.total_size_bytes / self.max_size_bytes)
+        return max(ratios) * 100 if ratios else 0.0
+
+class MemoryCacheTier:
+    """
+    Bounded in-memory cache tier
+    
+    Entries are kept in recency order and evicted least-recently-used first once
+    ``lru_max_size`` entries or the ``max_memory_mb`` byte budget (approximate,
+    based on the serialized size of each value) is exceeded. With the TTL
+    strategy reads do not refresh recency, so eviction follows insertion order.
+    Expiry times are tracked in a min-heap so removing expired entries costs
+    time proportional to the number of entries that actually expired.
+    """
+    
+    def __init__(self, config: CacheConfig):
+        self.config = config
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self.total_bytes = 0
+        self.lru_evictions = 0
+        self.size_evictions = 0
+        self.expired_removals = 0
+    
+    @property
+    def max_entries(self) -> int:
+        return max(int(self.config.lru_max_size or 0), 0)
+    
+    @property
+    def max_bytes(self) -> int:
+        return max(int((self.config.max_memory_mb or 0) * 1024 * 1024), 0)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+    
+    def keys(self) -> List[str]:
+        return list(self._entries.keys())
+    
+    def values(self) -> List[CacheEntry]:
+        return list(self._entries.values())
+    
+    def items(self) -> Iterator[Tuple[str, CacheEntry]]:
+        return iter(list(self._entries.items()))
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return a live entry and record the access, dropping it if expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        now = datetime.utcnow()
+        if entry.expires_at is not None and now > entry.expires_at:
+            self._remove(key)
+            self.expired_removals += 1
+            return None
+        
+        entry.access_count += 1
+        entry.last_accessed = now
+        if self.config.cache_strategy != CacheStrategy.TTL:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return an entry without touching recency or expiry"""
+        return self._entries.get(key)
+    
+    def put(
+        self,
+        key: str,
+        value: Any,
+        expires_at: Optional[datetime],
+        metadata: Optional[Dict[str, Any]] = None,
+        size_bytes: Optional[int] = None
+    ) -> CacheEntry:
+        """
+        Insert or replace an entry and evict until within limits
+        
+        Callers that already hold the serialized form pass its length as
+        size_bytes instead of having it estimated.
+        """
+        if key in self._entries:
+            self._remove(key)
+        
+        entry = CacheEntry(
+            key=key,
+            value=value,
+            created_at=datetime.utcnow(),
+            expires_at=expires_at,
+            size_bytes=size_bytes if size_bytes is not None else self._estimate_size(key, value),
+            metadata=metadata or {}
+        )
+        self._entries[key] = entry
+        self.total_bytes += entry.size_bytes
+        
+        if expires_at is not None:
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            self._compact_expiry_heap()
+        
+        self.enforce_limits(protect=key)
+        return entry
+    
+    def delete(self, key: str) -> bool:
+        """Remove an entry; expiry heap items are discarded lazily"""
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+    
+    def clear(self):
+        self._entries.clear()
+        self._expiry_heap.clear()
+        self.total_bytes = 0
+    
+    def pop_expired(self, now: Optional[datetime] = None) -> int:
+        """Remove every expired entry, touching only heap items that are due"""
+        now = now or datetime.utcnow()
+        removed = 0
+        
+        while self._expiry_heap and self._expiry_heap[0][0] < now:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(key)
+            # Skip heap items left behind by overwritten or deleted keys
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                removed += 1
+        
+        self.expired_removals += removed
+        return removed
+    
+    def enforce_limits(self, protect: Optional[str] = None):
+        """Evict least-recently-used entries until both limits are respected"""
+        max_entries = self.max_entries
+        max_bytes = self.max_bytes
+        
+        while self._entries:
+            over_count = max_entries > 0 and len(self._entries) > max_entries
+            over_size = max_bytes > 0 and self.total_bytes > max_bytes
+            if not over_count and not over_size:
+                break
+            
+            oldest_key = next(iter(self._entries))
+            if oldest_key == protect:
+                # The entry just written is never evicted by its own insertion
+                break
+            
+            self._remove(oldest_key)
+            if over_count:
+                self.lru_evictions += 1
+            else:
+                self.size_evictions += 1
+    
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size_bytes
+    
+    def _compact_expiry_heap(self):
+        """Rebuild the heap when stale items dominate it"""
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [
+                (entry.expires_at, key)
+                for key, entry in self._entries.items()
+                if entry.expires_at is not None
+            ]
+            heapq.heapify(self._expiry_heap)
+    
+    @staticmethod
+    def _estimate_size(key: str, value: Any) -> int:
+        """Approximate memory footprint of an entry, counting one level of containers"""
+        if isinstance(value, (str, bytes, bytearray)):
+            value_size = len(value)
+        elif isinstance(value, dict):
+            value_size = sys.getsizeof(value) + sum(
+                sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items()
+            )
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            value_size = sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+        else:
+            value_size = sys.getsizeof(value)
+        return len(key) + value_size
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single execution
+    
+    The first caller starts the computation as a task; callers arriving while it
+    runs await the same task. Waiters are shielded, so a cancelled caller does
+    not abort the computation for everyone else.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+    
+    async def do(self, key: str, coroutine_factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coroutine_factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
 
 async def create_cache_service(config: Optional[CacheConfig] = None) -> 'CacheService':
     """Create a new cache service instance"""
@@ -70,9 +354,16 @@ class CacheService:
         """Initialize cache service"""
         self.redis_service = redis_service
         self.config = config or CacheConfig()
-        self.memory_cache = {}
-        self.cache_locks = {}
+        self.memory_cache = MemoryCacheTier(self.config)
         self.default_ttl = self.config.default_ttl
+        self.codec = PayloadCodec(
+            compression_enabled=self.config.compression_enabled,
+            compression_threshold=self.config.compression_threshold
+        )
+        
+        # Request coalescing for get_or_compute
+        self._single_flight = SingleFlight()
+        self._background_refreshes: Set[asyncio.Future] = set()
         
         # Initialize cache statistics
         self.stats = {
@@ -80,70 +371,109 @@ class CacheService:
             "cache_hits": 0,
             "cache_misses": 0,
             "eviction_count": 0,
+            "coalesced_requests": 0,
+            "stale_served": 0,
+            "background_refreshes": 0,
             "last_cleanup": None
         }
         
-        # Start cleanup task
-        asyncio.create_task(self._cleanup_task())
+        # Periodic expiry sweep; started by start() or lazily on the first memory write
+        self._cleanup_handle: Optional[asyncio.Task] = None
+    
+    @property
+    def redis_connected(self) -> bool:
+        """Whether a Redis tier is configured"""
+        return self.redis_service is not None
     
-    async def _cleanup_task(self):
-        """Background task to clean up expired entries"""
+    def start(self) -> bool:
+        """Start the periodic expiry sweep; a no-op without a running loop or if already started"""
+        if self._cleanup_handle is not None and not self._cleanup_handle.done():
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._cleanup_handle = loop.create_task(self._cleanup_task(weakref.ref(self)))
+        return True
+    
+    async def stop(self):
+        """Cancel the periodic expiry sweep"""
+        handle, self._cleanup_handle = self._cleanup_handle, None
+        if handle is not None and not handle.done():
+            handle.cancel()
+            try:
+                await handle
+            except asyncio.CancelledError:
+                pass
+    
+    @staticmethod
+    async def _cleanup_task(service_ref: "weakref.ref[CacheService]"):
+        """Background task to clean up expired entries
+        
+        Holds only a weak reference between sweeps so that short-lived service
+        instances are not kept alive by their own cleanup loop.
+        """
         while True:
+            service = service_ref()
+            if service is None:
+                return
+            interval = service.config.cleanup_interval
             try:
-                await self._cleanup_expired()
-                self.stats["last_cleanup"] = datetime.utcnow().isoformat()
-                await asyncio.sleep(self.config.cleanup_interval)
+                await service._cleanup_expired()
+                service.stats["last_cleanup"] = datetime.utcnow().isoformat()
             except Exception as e:
                 logger.error(f"Cleanup task error: {e}")
-                await asyncio.sleep(60)  # Wait 1 minute on error
+                interval = 60  # Wait 1 minute on error
+            del service
+            await asyncio.sleep(interval)
     
-    async def _cleanup_expired(self):
+    async def _cleanup_expired(self) -> int:
         """Remove expired entries from memory cache"""
-        current_time = datetime.utcnow()
-        expired_keys = []
+        removed = self.memory_cache.pop_expired()
         
-        for key, entry in self.memory_cache.items():
-            if self._is_expired(entry):
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.memory_cache[key]
-            self.stats["eviction_count"] += 1
-        
-        if expired_keys:
-            logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+        if removed:
+            logger.info(f"Cleaned up {removed} expired cache entries")
+        return removed
+    
+    def _eviction_count(self) -> int:
+        """Entries removed by capacity limits or expiry"""
+        tier = self.memory_cache
+        return tier.lru_evictions + tier.size_evictions + tier.expired_removals
     
     async def get(self, key: str, use_memory: bool = True) -> Optional[Any]:
         """Get value from cache"""
+        entry = await self._get_entry(key, use_memory)
+        return entry[0] if entry is not None else None
+    
+    async def _get_entry(self, key: str, use_memory: bool = True) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """Get (value, metadata) from cache"""
         try:
             self.stats["total_requests"] += 1
             
             # Try memory cache first if enabled
-            if use_memory and key in self.memory_cache:
-                cache_entry = self.memory_cache[key]
-                if not self._is_expired(cache_entry):
+            if use_memory:
+                cache_entry = self.memory_cache.get(key)
+                if cache_entry is not None:
                     self.stats["cache_hits"] += 1
-                    return cache_entry["value"]
-                else:
-                    # Remove expired entry
-                    del self.memory_cache[key]
+                    return cache_entry.value, cache_entry.metadata
             
             # Try Redis cache if available
             if self.redis_service:
                 cached_value = await self.redis_service.get(f"cache:{key}")
                 if cached_value:
                     try:
-                        data = json.loads(cached_value)
+                        data = self.codec.decode(cached_value)
+                        metadata = data.get("metadata") or {}
                         # Also store in memory cache for faster access
                         if use_memory:
-                            self.memory_cache[key] = {
-                                "value": data["value"],
-                                "expires_at": data["expires_at"]
-                            }
+                            self.memory_cache.put(
+                                key, data["value"], datetime.fromisoformat(data["expires_at"]), metadata,
+                                size_bytes=len(key) + len(cached_value)
+                            )
                         self.stats["cache_hits"] += 1
-                        return data["value"]
-                    except json.JSONDecodeError:
-                        logger.warning(f"Invalid JSON in cache for key {key}")
+                        return data["value"], metadata
+                    except (ValueError, PayloadCodecError) as e:
+                        logger.warning(f"Invalid cached payload for key {key}: {e}")
             
             self.stats["cache_misses"] += 1
             return None
@@ -154,16 +484,25 @@ class CacheService:
     
     async def set(self, key: str, value: Any, ttl: int = None, use_memory: bool = True) -> bool:
         """Set value in cache"""
+        return await self._set_entry(key, value, ttl, use_memory)
+    
+    async def _set_entry(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = None,
+        use_memory: bool = True,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Set value in cache with optional entry metadata"""
         try:
             ttl = ttl or self.default_ttl
             expires_at = datetime.utcnow() + timedelta(seconds=ttl)
             
             # Store in memory cache if enabled
             if use_memory:
-                self.memory_cache[key] = {
-                    "value": value,
-                    "expires_at": expires_at
-                }
+                self.memory_cache.put(key, value, expires_at, metadata)
+                self.start()
             
             # Store in Redis cache if available
             if self.redis_service:
@@ -171,8 +510,11 @@ class CacheService:
                     "value": value,
                     "expires_at": expires_at.isoformat()
                 }
-                json_data = json.dumps(cache_data, default=str)
-                return await self.redis_service.set(f"cache:{key}", json_data, ex=ttl)
+                if metadata:
+                    cache_data["metadata"] = metadata
+                # compression_enabled can be toggled at runtime via the config API
+                payload = self.codec.encode(cache_data, compress=self.config.compression_enabled)
+                return await self.redis_service.set(f"cache:{key}", payload, ex=ttl)
             
             return True
             
@@ -184,8 +526,7 @@ class CacheService:
         """Delete value from cache"""
         try:
             # Remove from memory cache
-            if key in self.memory_cache:
-                del self.memory_cache[key]
+            self.memory_cache.delete(key)
             
             # Remove from Redis cache if available
             if self.redis_service:
@@ -202,7 +543,7 @@ class CacheService:
         try:
             # Check memory cache
             if key in self.memory_cache:
-                return not self._is_expired(self.memory_cache[key])
+                return not self._is_expired(self.memory_cache.peek(key))
             
             # Check Redis cache if available
             if self.redis_service:
@@ -216,40 +557,128 @@ class CacheService:
     
     async def get_or_set(self, key: str, default_func, ttl: int = None, use_memory: bool = True) -> Any:
         """Get value from cache or set default if not exists"""
+        return await self.get_or_compute(key, default_func, ttl, use_memory=use_memory)
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        coroutine_factory: Callable[[], Any],
+        ttl: int = None,
+        use_memory: bool = True,
+        stale_ttl: int = 0,
+        early_refresh_beta: float = 0.0,
+        cache_if: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Get a value from cache, computing it once for all concurrent misses
+        
+        Args:
+            key: Cache key
+            coroutine_factory: Callable returning the value (or an awaitable of it)
+            ttl: Seconds the value is considered fresh
+            use_memory: Whether to use the memory tier
+            stale_ttl: Extra seconds a stale value may be served while it is
+                refreshed in the background (stale-while-revalidate)
+            early_refresh_beta: Enables probabilistic early refresh before expiry
+                when > 0; higher values refresh earlier (1.0 is a good default)
+            cache_if: Predicate deciding whether a computed value is cached
+            
+        Returns:
+            Cached or freshly computed value
+        """
+        ttl = ttl or self.default_ttl
+        
         try:
-            # Try to get from cache
-            cached_value = await self.get(key, use_memory)
-            if cached_value is not None:
-                return cached_value
-            
-            # Get lock to prevent multiple executions of default_func
-            lock_key = f"lock:{key}"
-            if lock_key not in self.cache_locks:
-                self.cache_locks[lock_key] = asyncio.Lock()
-            
-            async with self.cache_locks[lock_key]:
-                # Double-check cache after acquiring lock
-                cached_value = await self.get(key, use_memory)
-                if cached_value is not None:
-                    return cached_value
-                
-                # Execute default function
-                if asyncio.iscoroutinefunction(default_func):
-                    value = await default_func()
-                else:
-                    value = default_func()
-                
-                # Store in cache
-                await self.set(key, value, ttl, use_memory)
-                return value
-                
+            entry = await self._get_entry(key, use_memory)
         except Exception as e:
-            logger.error(f"Failed to get or set cache for key {key}: {e}")
-            # Execute default function on error
-            if asyncio.iscoroutinefunction(default_func):
-                return await default_func()
-            else:
-                return default_func()
+            logger.error(f"Failed to read cache for key {key}: {e}")
+            entry = None
+        
+        if entry is not None:
+            value, metadata = entry
+            fresh_until = metadata.get("fresh_until")
+            if fresh_until is None:
+                return value
+            
+            now = time.time()
+            if now >= fresh_until:
+                # Stale but within the grace window: serve it and revalidate
+                self.stats["stale_served"] += 1
+                self._refresh_in_background(
+                    key, coroutine_factory, ttl, use_memory, stale_ttl, cache_if
+                )
+            elif early_refresh_beta > 0 and self._should_refresh_early(
+                now, fresh_until, metadata.get("delta", 0.0), early_refresh_beta
+            ):
+                self._refresh_in_background(
+                    key, coroutine_factory, ttl, use_memory, stale_ttl, cache_if
+                )
+            return value
+        
+        if self._single_flight.in_flight(key):
+            self.stats["coalesced_requests"] += 1
+        
+        return await self._single_flight.do(
+            key,
+            lambda: self._compute_and_store(
+                key, coroutine_factory, ttl, use_memory, stale_ttl, cache_if
+            )
+        )
+    
+    async def _compute_and_store(
+        self,
+        key: str,
+        coroutine_factory: Callable[[], Any],
+        ttl: int,
+        use_memory: bool,
+        stale_ttl: int,
+        cache_if: Optional[Callable[[Any], bool]]
+    ) -> Any:
+        """Run the computation and cache the result with freshness metadata"""
+        started = time.monotonic()
+        value = coroutine_factory()
+        if inspect.isawaitable(value):
+            value = await value
+        delta = time.monotonic() - started
+        
+        if value is not None and (cache_if is None or cache_if(value)):
+            metadata = {"fresh_until": time.time() + ttl, "delta": round(delta, 6)}
+            await self._set_entry(key, value, ttl + max(stale_ttl, 0), use_memory, metadata)
+        
+        return value
+    
+    def _refresh_in_background(
+        self,
+        key: str,
+        coroutine_factory: Callable[[], Any],
+        ttl: int,
+        use_memory: bool,
+        stale_ttl: int,
+        cache_if: Optional[Callable[[Any], bool]]
+    ):
+        """Recompute a value without blocking the caller (at most one refresh per key)"""
+        if self._single_flight.in_flight(key):
+            return
+        
+        self.stats["background_refreshes"] += 1
+        refresh = asyncio.ensure_future(self._single_flight.do(
+            key,
+            lambda: self._compute_and_store(
+                key, coroutine_factory, ttl, use_memory, stale_ttl, cache_if
+            )
+        ))
+        self._background_refreshes.add(refresh)
+        refresh.add_done_callback(self._on_background_refresh_done)
+    
+    def _on_background_refresh_done(self, refresh: asyncio.Future):
+        self._background_refreshes.discard(refresh)
+        if not refresh.cancelled() and refresh.exception() is not None:
+            logger.warning(f"Background cache refresh failed: {refresh.exception()}")
+    
+    @staticmethod
+    def _should_refresh_early(now: float, fresh_until: float, delta: float, beta: float) -> bool:
+        """Probabilistic early expiration (XFetch): likelier as expiry nears and for slow computations"""
+        return now - delta * beta * math.log(1.0 - random.random()) >= fresh_until
     
     async def invalidate_pattern(self, pattern: str) -> int:
         """Invalidate all cache keys matching a pattern"""
@@ -259,7 +688,7 @@ class CacheService:
             # Invalidate memory cache keys
             keys_to_remove = [key for key in self.memory_cache.keys() if pattern in key]
             for key in keys_to_remove:
-                del self.memory_cache[key]
+                self.memory_cache.delete(key)
                 count += 1
             
             # Invalidate Redis cache keys if available
@@ -293,14 +722,12 @@ class CacheService:
             logger.error(f"Failed to clear all cache: {e}")
             return False
     
-    def _is_expired(self, cache_entry: Dict[str, Any]) -> bool:
+    def _is_expired(self, cache_entry: CacheEntry) -> bool:
         """Check if cache entry is expired"""
         try:
-            expires_at = cache_entry.get("expires_at")
-            if isinstance(expires_at, str):
-                expires_at = datetime.fromisoformat(expires_at)
-            
-            return datetime.utcnow() > expires_at
+            if cache_entry.expires_at is None:
+                return False
+            return datetime.utcnow() > cache_entry.expires_at
         except Exception:
             return True
     
@@ -309,6 +736,9 @@ class CacheService:
         try:
             stats = {
                 "memory_cache_size": len(self.memory_cache),
+                "memory_cache_bytes": self.memory_cache.total_bytes,
+                "memory_cache_max_entries": self.memory_cache.max_entries,
+                "memory_cache_max_bytes": self.memory_cache.max_bytes,
                 "memory_cache_keys": list(self.memory_cache.keys()),
                 "default_ttl": self.default_ttl
             }
@@ -326,16 +756,7 @@ class CacheService:
     async def cleanup_expired(self) -> int:
         """Clean up expired cache entries"""
         try:
-            count = 0
-            keys_to_remove = []
-            
-            for key, entry in self.memory_cache.items():
-                if self._is_expired(entry):
-                    keys_to_remove.append(key)
-                    count += 1
-            
-            for key in keys_to_remove:
-                del self.memory_cache[key]
+            count = self.memory_cache.pop_expired()
             
             logger.info(f"Cleaned up {count} expired cache entries")
             return count
@@ -405,18 +826,11 @@ class CacheService:
             memory_size = len(self.memory_cache)
             total_entries = memory_size
             
-            # Calculate total size in bytes (rough estimate)
-            total_size_bytes = 0
-            for entry in self.memory_cache.values():
-                try:
-                    total_size_bytes += len(str(entry.get("value", "")))
-                except:
-                    pass
-            
             return {
                 "status": "healthy",
                 "redis_connected": self.redis_service is not None,
                 "memory_cache_size": memory_size,
+                "memory_cache_bytes": self.memory_cache.total_bytes,
                 "total_entries": total_entries,
                 "last_cleanup": self.stats.get("last_cleanup"),
                 "timestamp": datetime.utcnow().isoformat()
@@ -440,22 +854,60 @@ class CacheService:
             if self.stats["total_requests"] > 0:
                 hit_rate = self.stats["cache_hits"] / self.stats["total_requests"]
             
+            stats = await self.get_stats()
+            
             return {
                 "total_requests": self.stats["total_requests"],
                 "cache_hits": self.stats["cache_hits"],
                 "cache_misses": self.stats["cache_misses"],
                 "hit_rate": round(hit_rate, 4),
-                "total_size_bytes": len(str(self.memory_cache)),
-                "entries_count": len(self.memory_cache),
-                "compression_savings_bytes": 0,  # Not implemented yet
-                "compression_savings_percent": 0.0,  # Not implemented yet
-                "eviction_count": self.stats["eviction_count"],
+                "total_size_bytes": stats.total_size_bytes,
+                "entries_count": stats.entries_count,
+                "compression_savings_bytes": stats.compression_savings_bytes,
+                "compression_savings_percent": round(stats.compression_savings_percent, 2),
+                "codec": stats.codec,
+                "compression_ratio": round(stats.compression_ratio, 3),
+                "payloads_compressed": self.codec.stats.payloads_compressed,
+                "eviction_count": stats.eviction_count,
+                "coalesced_requests": self.stats["coalesced_requests"],
+                "stale_served": self.stats["stale_served"],
+                "background_refreshes": self.stats["background_refreshes"],
+                "lru_evictions": stats.lru_evictions,
+                "size_evictions": stats.size_evictions,
+                "expired_removals": stats.expired_removals,
+                "max_entries": stats.max_entries,
+                "max_size_bytes": stats.max_size_bytes,
+                "occupancy_percent": round(stats.occupancy_percent, 2),
                 "last_cleanup": self.stats.get("last_cleanup")
             }
         except Exception as e:
             logger.error(f"Failed to get detailed stats: {e}")
             return {"error": str(e)}
     
+    async def get_stats(self) -> CacheStats:
+        """Get a snapshot of hit/miss, occupancy and eviction statistics"""
+        last_cleanup = self.stats.get("last_cleanup")
+        self.stats["eviction_count"] = self._eviction_count()
+        
+        return CacheStats(
+            total_requests=self.stats["total_requests"],
+            cache_hits=self.stats["cache_hits"],
+            cache_misses=self.stats["cache_misses"],
+            total_size_bytes=self.memory_cache.total_bytes,
+            entries_count=len(self.memory_cache),
+            eviction_count=self.stats["eviction_count"],
+            last_cleanup=datetime.fromisoformat(last_cleanup) if last_cleanup else None,
+            lru_evictions=self.memory_cache.lru_evictions,
+            size_evictions=self.memory_cache.size_evictions,
+            expired_removals=self.memory_cache.expired_removals,
+            max_entries=self.memory_cache.max_entries,
+            max_size_bytes=self.memory_cache.max_bytes,
+            compression_savings_bytes=self.codec.stats.savings_bytes,
+            serialized_bytes=self.codec.stats.raw_bytes,
+            codec=self.codec.name if self.config.compression_enabled else "json",
+            compression_ratio=self.codec.stats.compression_ratio
+        )
+    
     async def clear_by_level(self, level: str = None, pattern: str = None) -> Dict[str, Any]:
         """Clear cache by level or pattern for API endpoints"""
         try:
@@ -466,7 +918,7 @@ class CacheService:
                     # Clear by pattern
                     keys_to_remove = [key for key in self.memory_cache.keys() if pattern in key]
                     for key in keys_to_remove:
-                        del self.memory_cache[key]
+                        self.memory_cache.delete(key)
                         cleared_entries += 1
                 else:
                     # Clear all memory cache
@@ -495,15 +947,19 @@ class CacheService:
         try:
             updated_fields = []
             
-            for field, value in config_updates.items():
-                if hasattr(self.config, field):
-                    setattr(self.config, field, value)
-                    updated_fields.append(field)
+            for name, value in config_updates.items():
+                if hasattr(self.config, name):
+                    setattr(self.config, name, value)
+                    updated_fields.append(name)
             
             # Update instance variables that depend on config
             if "default_ttl" in config_updates:
                 self.default_ttl = self.config.default_ttl
             
+            # Apply shrunk memory limits immediately
+            if "lru_max_size" in config_updates or "max_memory_mb" in config_updates:
+                self.memory_cache.enforce_limits()
+            
             return {
                 "success": True,
                 "updated_fields": updated_fields,
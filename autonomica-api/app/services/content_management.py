@@ -18,6 +18,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from app.models.schema import ContentPiece, ContentStatus, SocialPost
+from app.services.db_offload import run_db
 from app.services.social_scheduler import ContentType, PlatformType, SocialMediaScheduler
 
 logger = logging.getLogger(__name__)
@@ -423,42 +424,47 @@ class ContentManagementService:
             Dict containing paginated content list
         """
         try:
-            query = self.db.query(ContentPiece)
-            
-            # Apply filters
-            if user_id:
-                query = query.filter(ContentPiece.user_id == user_id)
-            
-            if status:
-                query = query.filter(ContentPiece.status == status)
-            
-            if content_type:
-                query = query.filter(ContentPiece.type == content_type.value)
-            
-            if category:
-                query = query.filter(
-                    ContentPiece.metadata.contains({"category": category.value})
-                )
-            
-            # Get total count
-            total_count = query.count()
-            
-            # Apply pagination
-            offset = (page - 1) * per_page
-            content_list = query.offset(offset).limit(per_page).all()
-            
-            # Format results
-            results = []
-            for content in content_list:
-                results.append({
-                    "id": content.id,
-                    "title": content.title,
-                    "type": content.type,
-                    "status": content.status.value,
-                    "category": content.metadata.get("category") if content.metadata else None,
-                    "created_at": content.created_at.isoformat(),
-                    "updated_at": content.updated_at.isoformat() if content.updated_at else None
-                })
+            def load(session: Session):
+                query = session.query(ContentPiece)
+                
+                # Apply filters
+                if user_id:
+                    query = query.filter(ContentPiece.user_id == user_id)
+                
+                if status:
+                    query = query.filter(ContentPiece.status == status)
+                
+                if content_type:
+                    query = query.filter(ContentPiece.type == content_type.value)
+                
+                if category:
+                    query = query.filter(
+                        ContentPiece.metadata.contains({"category": category.value})
+                    )
+                
+                # Get total count
+                total_count = query.count()
+                
+                # Apply pagination
+                offset = (page - 1) * per_page
+                content_list = query.offset(offset).limit(per_page).all()
+                
+                # Format results
+                results = []
+                for content in content_list:
+                    results.append({
+                        "id": content.id,
+                        "title": content.title,
+                        "type": content.type,
+                        "status": content.status.value,
+                        "category": content.metadata.get("category") if content.metadata else None,
+                        "created_at": content.created_at.isoformat(),
+                        "updated_at": content.updated_at.isoformat() if content.updated_at else None
+                    })
+                return total_count, results
+            
+            # Query and format off the event loop
+            total_count, results = await run_db(self.db, load)
             
             return {
                 "success": True,
@@ -1,14 +1,62 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker, Session, selectinload
+from app.core.config import settings
 from app.models import Base, Task, Agent, ContentPiece, SocialPost, AgentContext, User
+from app.services.kpi_rollups import register_rollup_listeners
 import os
-from typing import Type
+from typing import Any, Dict, Type
 
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./autonomica.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def is_sqlite_url(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def is_memory_sqlite_url(url: str) -> bool:
+    database = make_url(url).database
+    return is_sqlite_url(url) and (not database or database == ":memory:")
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """create_engine keyword arguments (pool sizing, SQLite threading) for a URL"""
+    if is_sqlite_url(url):
+        options: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+        if is_memory_sqlite_url(url):
+            # One shared connection, so DB work offloaded to threads sees the same database
+            options["poolclass"] = StaticPool
+        else:
+            options["pool_size"] = settings.DB_POOL_SIZE
+            options["max_overflow"] = settings.DB_MAX_OVERFLOW
+            options["pool_timeout"] = settings.DB_POOL_TIMEOUT
+        return options
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def enable_sqlite_wal(engine) -> None:
+    """Use WAL journaling on file SQLite databases so readers don't block the writer"""
+    if not settings.DB_SQLITE_WAL or not is_sqlite_url(str(engine.url)) or is_memory_sqlite_url(str(engine.url)):
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+enable_sqlite_wal(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Social posts and content pieces update the KPI rollups in the same transaction
+register_rollup_listeners(SessionLocal)
+
 task_cache = {}
 agent_cache = {}
 
@@ -0,0 +1,48 @@
+"""
+Database Thread Offload
+Runs blocking SQLAlchemy ORM work from async services on a bounded thread
+pool so queries never block the event loop.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Blocking session work runs here; sized like the connection pool so threads
+# never wait on each other for a connection
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    thread_name_prefix="db"
+)
+
+
+def _session_lock(db: Session) -> asyncio.Lock:
+    """Per-session lock: a session must never be used by two operations at once"""
+    lock = db.info.get("run_db_lock")
+    if not isinstance(lock, asyncio.Lock):
+        lock = db.info["run_db_lock"] = asyncio.Lock()
+    return lock
+
+
+async def run_db(db: Session, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking ORM work `fn(db, *args, **kwargs)` on the DB thread pool
+
+    Calls on the same session are serialized, as the session itself is not
+    concurrency-safe.
+    """
+    async with _session_lock(db):
+        return await asyncio.get_running_loop().run_in_executor(
+            db_executor, functools.partial(fn, db, *args, **kwargs)
+        )
+
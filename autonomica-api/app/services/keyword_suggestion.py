@@ -15,6 +15,7 @@ from pathlib import Path
 from app.services.keyword_clustering import KeywordClusterer
 from app.services.keyword_analysis import KeywordAnalyzer, KeywordMetrics, KeywordIntent, KeywordType
 from app.services.seo_service import SEOService
+from app.services.cache_service import SingleFlight
 from app.config.seo_config import seo_settings
 
 logger = logging.getLogger(__name__)
@@ -115,6 +116,7 @@ class KeywordSuggestionService:
         self.cache_ttl = 3600  # 1 hour
         self.max_cache_size = 1000
         self.enable_caching = True
+        self._single_flight = SingleFlight()
 
     async def initialize(self):
         """Initialize all required services"""
@@ -145,6 +147,19 @@ class KeywordSuggestionService:
                 self.logger.info(f"Returning cached suggestions for request {request_id}")
                 return cached_response
 
+        # Identical requests already being generated share the in-flight result
+        return await self._single_flight.do(
+            request_id,
+            lambda: self._generate_uncached_suggestions(request, request_id, start_time)
+        )
+
+    async def _generate_uncached_suggestions(
+        self,
+        request: SuggestionRequest,
+        request_id: str,
+        start_time: datetime
+    ) -> SuggestionResponse:
+        """Run every suggestion source for a request that missed the cache"""
         try:
             self.logger.info(f"Generating suggestions for {len(request.seed_keywords)} seed keywords")
             
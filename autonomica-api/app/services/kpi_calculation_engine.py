@@ -6,23 +6,40 @@ growth metrics, target achievement, and performance benchmarks.
 
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Union, Tuple
+from dataclasses import dataclass, asdict, field
 from enum import Enum
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 import json
-import statistics
 from collections import defaultdict
 import math
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from sqlalchemy import and_, desc, func, case, true, text
 
+from app.core.config import settings
 from app.models.schema import SocialPost, ContentPiece, ContentStatus
 from app.services.redis_service import RedisService
 from app.services.cache_service import CacheService
+from app.services.kpi_rollups import KPIRollupStore, SOCIAL_METRIC_FIELDS
+from app.services.db_offload import run_db
+from app.services import kpi_timeseries
+from app.services.kpi_timeseries import SeriesStatistics, analyze_series
 
 logger = logging.getLogger(__name__)
 
+# (start, end) of a metrics period; None bounds are open-ended
+Window = Tuple[Optional[datetime], Optional[datetime]]
+
+# KPI -> period metric counting the rows it is computed from
+KPI_DATA_SOURCES = {
+    "impressions_growth": "posts",
+    "engagement_rate": "posts",
+    "conversion_rate": "content_count",
+    "content_quality": "content_count"
+}
+
 class KPIType(Enum):
     """Types of KPIs that can be calculated"""
     GROWTH = "growth"
@@ -120,6 +137,16 @@ class AdvancedKPIMetrics:
     calculated_at: datetime
     metadata: Dict[str, Any] = None
 
+@dataclass
+class PeriodMetricsScope:
+    """Per-request state shared by KPI calculations (see period_metrics_scope)"""
+    now: datetime
+    metrics: Dict[Tuple[Window, Optional[str]], Dict[str, float]] = field(default_factory=dict)
+
+_period_metrics_scope: ContextVar[Optional[PeriodMetricsScope]] = ContextVar(
+    "kpi_period_metrics_scope", default=None
+)
+
 class KPICalculationEngine:
     """
     Enhanced KPI calculation engine for analytics data
@@ -136,11 +163,22 @@ class KPICalculationEngine:
     - Time savings optimization
     """
     
-    def __init__(self, db: Session, redis_service: RedisService, cache_service: CacheService):
+    def __init__(
+        self,
+        db: Session,
+        redis_service: RedisService,
+        cache_service: CacheService,
+        rollup_store: Optional[KPIRollupStore] = None
+    ):
         self.db = db
         self.redis_service = redis_service
         self.cache_service = cache_service
         
+        # Pre-aggregated hourly/daily buckets; raw tables are queried without them
+        if rollup_store is None and settings.KPI_ROLLUPS_ENABLED:
+            rollup_store = KPIRollupStore(db)
+        self.rollup_store = rollup_store
+        
         # Enhanced KPI targets from PRD requirements
         self.kpi_targets = {
             "impressions_growth": {
@@ -228,16 +266,15 @@ class KPICalculationEngine:
             GrowthMetrics object with calculated growth data
         """
         try:
-            period_config = self.calculation_periods.get(period, self.calculation_periods["monthly"])
-            end_date = datetime.utcnow()
-            start_date = end_date - timedelta(days=period_config["days"])
-            comparison_start = end_date - timedelta(days=period_config["comparison_days"])
+            current_window, comparison_window = self._period_windows(period)
+            start_date, end_date = current_window
             
-            # Get current period metrics
-            current_metrics = await self._get_period_metrics(start_date, end_date, user_id)
-            
-            # Get comparison period metrics
-            comparison_metrics = await self._get_period_metrics(comparison_start, start_date, user_id)
+            # Get current and comparison period metrics in one pass
+            metrics_by_window = await self._get_period_metrics_batch(
+                [current_window, comparison_window], user_id
+            )
+            current_metrics = metrics_by_window[current_window]
+            comparison_metrics = metrics_by_window[comparison_window]
             
             # Calculate growth percentages
             impressions_growth = self._calculate_growth_percentage(
@@ -310,50 +347,55 @@ class KPICalculationEngine:
                 raise ValueError(f"Unknown KPI: {kpi_name}")
             
             target_config = self.kpi_targets[kpi_name]
-            period_config = self.calculation_periods.get(period, self.calculation_periods["monthly"])
-            
-            end_date = datetime.utcnow()
-            start_date = end_date - timedelta(days=period_config["days"])
-            comparison_start = end_date - timedelta(days=period_config["comparison_days"])
-            
-            # Get current and previous period values
-            current_value = await self._get_kpi_value(kpi_name, start_date, end_date, user_id)
-            previous_value = await self._get_kpi_value(kpi_name, comparison_start, start_date, user_id)
-            
-            # Calculate change percentage
-            change_percentage = self._calculate_growth_percentage(current_value, previous_value)
-            
-            # Determine trend direction
-            trend_direction = self._determine_trend_direction(change_percentage)
-            
-            # Determine status
-            status = self._determine_kpi_status(current_value, target_config["target"])
-            
-            # Calculate confidence score
-            confidence_score = await self._calculate_confidence_score(kpi_name, current_value, user_id)
-            
-            # Get data points count
-            data_points = await self._get_data_points_count(kpi_name, start_date, end_date, user_id)
-            
-            return KPICalculation(
-                kpi_id=kpi_name,
-                name=target_config["description"],
-                value=current_value,
-                previous_value=previous_value,
-                change_percentage=change_percentage,
-                trend_direction=trend_direction,
-                status=status,
-                target=target_config["target"],
-                unit=target_config["unit"],
-                calculated_at=datetime.utcnow(),
-                data_points=data_points,
-                confidence_score=confidence_score,
-                metadata={
-                    "period": period,
-                    "target_config": target_config
-                }
-            )
             
+            async with self.period_metrics_scope():
+                current_window, comparison_window = self._period_windows(period)
+                start_date, end_date = current_window
+                comparison_start = comparison_window[0]
+                
+                # Load the current, previous and all-time windows in one pass
+                await self._get_period_metrics_batch(
+                    [current_window, comparison_window, (None, None)], user_id
+                )
+                
+                # Get current and previous period values
+                current_value = await self._get_kpi_value(kpi_name, start_date, end_date, user_id)
+                previous_value = await self._get_kpi_value(kpi_name, comparison_start, start_date, user_id)
+                
+                # Calculate change percentage
+                change_percentage = self._calculate_growth_percentage(current_value, previous_value)
+                
+                # Determine trend direction
+                trend_direction = self._determine_trend_direction(change_percentage)
+                
+                # Determine status
+                status = self._determine_kpi_status(current_value, target_config["target"])
+                
+                # Calculate confidence score
+                confidence_score = await self._calculate_confidence_score(kpi_name, current_value, user_id)
+                
+                # Get data points count
+                data_points = await self._get_data_points_count(kpi_name, start_date, end_date, user_id)
+                
+                return KPICalculation(
+                    kpi_id=kpi_name,
+                    name=target_config["description"],
+                    value=current_value,
+                    previous_value=previous_value,
+                    change_percentage=change_percentage,
+                    trend_direction=trend_direction,
+                    status=status,
+                    target=target_config["target"],
+                    unit=target_config["unit"],
+                    calculated_at=datetime.utcnow(),
+                    data_points=data_points,
+                    confidence_score=confidence_score,
+                    metadata={
+                        "period": period,
+                        "target_config": target_config
+                    }
+                )
+                
         except Exception as e:
             logger.error(f"Error calculating KPI {kpi_name}: {e}")
             raise
@@ -376,13 +418,15 @@ class KPICalculationEngine:
         try:
             kpi_calculations = []
             
-            for kpi_name in self.kpi_targets.keys():
-                try:
-                    kpi_calculation = await self.calculate_kpi(kpi_name, period, user_id)
-                    kpi_calculations.append(kpi_calculation)
-                except Exception as e:
-                    logger.warning(f"Failed to calculate KPI {kpi_name}: {e}")
-                    continue
+            # Every KPI reads the same windows, loaded once for the whole loop
+            async with self.period_metrics_scope():
+                for kpi_name in self.kpi_targets.keys():
+                    try:
+                        kpi_calculation = await self.calculate_kpi(kpi_name, period, user_id)
+                        kpi_calculations.append(kpi_calculation)
+                    except Exception as e:
+                        logger.warning(f"Failed to calculate KPI {kpi_name}: {e}")
+                        continue
             
             return kpi_calculations
             
@@ -400,35 +444,40 @@ class KPICalculationEngine:
         try:
             kpi_targets = {}
             
-            for kpi_name, target_config in self.kpi_targets.items():
-                # Calculate current value
-                current_value = await self._get_kpi_value(kpi_name, None, None)
-                
-                # Calculate trend (monthly comparison)
-                end_date = datetime.utcnow()
+            async with self.period_metrics_scope():
+                # Monthly comparison windows, loaded once for every KPI
+                end_date = self._now()
                 start_date = end_date - timedelta(days=30)
                 comparison_start = end_date - timedelta(days=60)
-                
-                current_period = await self._get_kpi_value(kpi_name, start_date, end_date)
-                previous_period = await self._get_kpi_value(kpi_name, comparison_start, start_date)
-                
-                trend = self._calculate_growth_percentage(current_period, previous_period)
-                
-                # Determine status
-                status = self._determine_kpi_status(current_value, target_config["target"])
-                
-                kpi_targets[kpi_name] = KPITarget(
-                    kpi_id=kpi_name,
-                    name=target_config["description"],
-                    target_value=target_config["target"],
-                    current_value=current_value,
-                    unit=target_config["unit"],
-                    period=target_config["period"],
-                    status=status,
-                    trend=trend,
-                    last_updated=datetime.utcnow(),
-                    metadata=target_config
+                await self._get_period_metrics_batch(
+                    [(start_date, end_date), (comparison_start, start_date)]
                 )
+                
+                for kpi_name, target_config in self.kpi_targets.items():
+                    # Calculate current value
+                    current_value = await self._get_kpi_value(kpi_name, None, None)
+                    
+                    # Calculate trend (monthly comparison)
+                    current_period = await self._get_kpi_value(kpi_name, start_date, end_date)
+                    previous_period = await self._get_kpi_value(kpi_name, comparison_start, start_date)
+                    
+                    trend = self._calculate_growth_percentage(current_period, previous_period)
+                    
+                    # Determine status
+                    status = self._determine_kpi_status(current_value, target_config["target"])
+                    
+                    kpi_targets[kpi_name] = KPITarget(
+                        kpi_id=kpi_name,
+                        name=target_config["description"],
+                        target_value=target_config["target"],
+                        current_value=current_value,
+                        unit=target_config["unit"],
+                        period=target_config["period"],
+                        status=status,
+                        trend=trend,
+                        last_updated=datetime.utcnow(),
+                        metadata=target_config
+                    )
             
             return kpi_targets
             
@@ -456,78 +505,166 @@ class KPICalculationEngine:
             AdvancedKPIMetrics object with comprehensive analysis
         """
         try:
-            if kpi_name not in self.kpi_targets:
-                raise ValueError(f"Unknown KPI: {kpi_name}")
+            results = await self.calculate_advanced_kpis(
+                [kpi_name], period, [user_id], include_forecast
+            )
+            return results[(kpi_name, user_id)]
+            
+        except Exception as e:
+            logger.error(f"Error calculating advanced KPI {kpi_name}: {e}")
+            raise
+    
+    async def calculate_advanced_kpis(
+        self,
+        kpi_names: Optional[List[str]] = None,
+        period: str = "monthly",
+        user_ids: Optional[List[Optional[str]]] = None,
+        include_forecast: bool = True,
+        return_exceptions: bool = False
+    ) -> Dict[Tuple[str, Optional[str]], Union[AdvancedKPIMetrics, Exception]]:
+        """
+        Calculate advanced KPIs for many KPIs and users in one pass
+        
+        The statistical analysis of every (KPI, user) series runs as one
+        vectorized computation (see kpi_timeseries.analyze_series).
+        
+        Args:
+            kpi_names: KPIs to calculate (defaults to all targets)
+            period: Calculation period
+            user_ids: Users to calculate for (defaults to [None], all users)
+            include_forecast: Whether to include forecasting
+            return_exceptions: Return a failing (KPI, user) entry's exception
+                in place of its result instead of raising
+            
+        Returns:
+            Dict of (kpi_name, user_id) -> AdvancedKPIMetrics (or Exception)
+        """
+        try:
+            kpi_names = list(kpi_names or self.kpi_targets.keys())
+            user_ids = list(user_ids) if user_ids is not None else [None]
+            for kpi_name in kpi_names:
+                if kpi_name not in self.kpi_targets:
+                    raise ValueError(f"Unknown KPI: {kpi_name}")
             
-            target_config = self.kpi_targets[kpi_name]
             period_config = self.calculation_periods.get(period, self.calculation_periods["monthly"])
             
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=period_config["days"])
-            comparison_start = end_date - timedelta(days=period_config["comparison_days"])
             
-            # Get historical data for advanced analysis
-            historical_data = await self._get_historical_kpi_data(
-                kpi_name, start_date, end_date, user_id
-            )
+            results = {}
+            keys = []
+            series = []
             
-            if len(historical_data) < period_config["min_data_points"]:
-                logger.warning(f"Insufficient data points for {kpi_name}: {len(historical_data)} < {period_config['min_data_points']}")
-                return await self._create_basic_advanced_kpi(kpi_name, target_config, period, user_id)
-            
-            # Calculate current and previous values
-            current_value = historical_data[-1] if historical_data else 0.0
-            previous_value = historical_data[-2] if len(historical_data) > 1 else 0.0
-            
-            # Calculate advanced metrics
-            change_percentage = self._calculate_growth_percentage(current_value, previous_value)
-            trend_direction = self._determine_trend_direction(change_percentage)
-            status = self._determine_kpi_status(current_value, target_config["target"])
-            
-            # Statistical analysis
-            velocity = self._calculate_velocity(historical_data, period_config["days"])
-            momentum = self._calculate_momentum(historical_data, self.statistical_config["momentum_calculation_window"])
-            volatility = self._calculate_volatility(historical_data)
-            seasonality = self._calculate_seasonality(historical_data)
-            
-            # Forecasting
-            forecast = 0.0
-            confidence_interval = (0.0, 0.0)
-            if include_forecast and len(historical_data) >= 6:
-                forecast = self._forecast_next_period(historical_data, self.statistical_config["forecast_horizon"])
-                confidence_interval = self._calculate_confidence_interval(
-                    historical_data, self.statistical_config["confidence_level"]
-                )
+            def record_failure(key: Tuple[str, Optional[str]], error: Exception):
+                if not return_exceptions:
+                    raise error
+                logger.warning(f"Failed to calculate advanced KPI {key[0]} for user {key[1]}: {error}")
+                results[key] = error
             
-            return AdvancedKPIMetrics(
-                kpi_id=kpi_name,
-                name=target_config["description"],
-                value=current_value,
-                target=target_config["target"],
-                unit=target_config["unit"],
-                period=period,
-                status=status,
-                trend_direction=trend_direction,
-                change_percentage=change_percentage,
-                velocity=velocity,
-                momentum=momentum,
-                volatility=volatility,
-                seasonality=seasonality,
-                forecast=forecast,
-                confidence_interval=confidence_interval,
-                calculated_at=datetime.utcnow(),
-                metadata={
-                    "period": period,
-                    "target_config": target_config,
-                    "data_points": len(historical_data),
-                    "statistical_config": self.statistical_config
-                }
+            for user_id in user_ids:
+                # Get historical data for advanced analysis
+                try:
+                    historical_series = await self._get_historical_kpi_series(
+                        kpi_names, start_date, end_date, user_id
+                    )
+                except Exception as e:
+                    for kpi_name in kpi_names:
+                        record_failure((kpi_name, user_id), e)
+                    continue
+                
+                for kpi_name in kpi_names:
+                    historical_data = historical_series[kpi_name]
+                    if len(historical_data) < period_config["min_data_points"]:
+                        logger.warning(f"Insufficient data points for {kpi_name}: {len(historical_data)} < {period_config['min_data_points']}")
+                        try:
+                            results[(kpi_name, user_id)] = await self._create_basic_advanced_kpi(
+                                kpi_name, self.kpi_targets[kpi_name], period, user_id
+                            )
+                        except Exception as e:
+                            record_failure((kpi_name, user_id), e)
+                        continue
+                    keys.append((kpi_name, user_id))
+                    series.append(historical_data)
+            
+            # Statistical analysis and forecasting for every series at once
+            analysis_options = dict(
+                period_days=period_config["days"],
+                momentum_window=self.statistical_config["momentum_calculation_window"],
+                forecast_horizon=self.statistical_config["forecast_horizon"],
+                confidence_level=self.statistical_config["confidence_level"],
+                include_forecast=include_forecast
             )
+            try:
+                series_statistics = analyze_series(series, **analysis_options)
+            except Exception:
+                if not return_exceptions:
+                    raise
+                # Re-run series individually so one bad series only fails its own KPI
+                series_statistics = []
+                for key, historical_data in zip(keys, series):
+                    try:
+                        series_statistics.append(analyze_series([historical_data], **analysis_options)[0])
+                    except Exception as e:
+                        series_statistics.append(e)
+            
+            for key, historical_data, stats in zip(keys, series, series_statistics):
+                try:
+                    if isinstance(stats, Exception):
+                        raise stats
+                    results[key] = self._build_advanced_kpi(key[0], period, historical_data, stats)
+                except Exception as e:
+                    record_failure(key, e)
+            
+            return results
             
         except Exception as e:
-            logger.error(f"Error calculating advanced KPI {kpi_name}: {e}")
+            logger.error(f"Error calculating advanced KPIs: {e}")
             raise
     
+    def _build_advanced_kpi(
+        self,
+        kpi_name: str,
+        period: str,
+        historical_data: List[float],
+        stats: SeriesStatistics
+    ) -> AdvancedKPIMetrics:
+        """Assemble AdvancedKPIMetrics from a KPI series and its statistics"""
+        target_config = self.kpi_targets[kpi_name]
+        
+        # Calculate current and previous values
+        current_value = historical_data[-1] if historical_data else 0.0
+        previous_value = historical_data[-2] if len(historical_data) > 1 else 0.0
+        
+        # Calculate advanced metrics
+        change_percentage = self._calculate_growth_percentage(current_value, previous_value)
+        trend_direction = self._determine_trend_direction(change_percentage)
+        status = self._determine_kpi_status(current_value, target_config["target"])
+        
+        return AdvancedKPIMetrics(
+            kpi_id=kpi_name,
+            name=target_config["description"],
+            value=current_value,
+            target=target_config["target"],
+            unit=target_config["unit"],
+            period=period,
+            status=status,
+            trend_direction=trend_direction,
+            change_percentage=change_percentage,
+            velocity=stats.velocity,
+            momentum=stats.momentum,
+            volatility=stats.volatility,
+            seasonality=stats.seasonality,
+            forecast=stats.forecast,
+            confidence_interval=stats.confidence_interval,
+            calculated_at=datetime.utcnow(),
+            metadata={
+                "period": period,
+                "target_config": target_config,
+                "data_points": len(historical_data),
+                "statistical_config": self.statistical_config
+            }
+        )
+    
     async def calculate_roi_metrics(
         self,
         period: str = "monthly",
@@ -660,133 +797,246 @@ class KPICalculationEngine:
             logger.error(f"Error calculating competitive metrics: {e}")
             return {}
     
+    @asynccontextmanager
+    async def period_metrics_scope(self):
+        """
+        Share period metrics between every KPI computed within one request
+        
+        Inside the scope "now" is pinned, so KPIs asking for the same period
+        ask for the same window, and each window's metrics are loaded once.
+        Scopes nest: inner scopes reuse the outermost one.
+        """
+        if _period_metrics_scope.get() is not None:
+            yield
+            return
+        
+        token = _period_metrics_scope.set(PeriodMetricsScope(now=datetime.utcnow()))
+        try:
+            yield
+        finally:
+            _period_metrics_scope.reset(token)
+    
+    def _now(self) -> datetime:
+        """Current time, pinned for the duration of a period metrics scope"""
+        scope = _period_metrics_scope.get()
+        return scope.now if scope is not None else datetime.utcnow()
+    
+    def _period_windows(self, period: str) -> Tuple[Window, Window]:
+        """(current, comparison) windows for a calculation period"""
+        period_config = self.calculation_periods.get(period, self.calculation_periods["monthly"])
+        end_date = self._now()
+        start_date = end_date - timedelta(days=period_config["days"])
+        comparison_start = end_date - timedelta(days=period_config["comparison_days"])
+        return (start_date, end_date), (comparison_start, start_date)
+    
     async def _get_period_metrics(
         self,
-        start_date: datetime,
-        end_date: datetime,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
         user_id: Optional[str] = None
     ) -> Dict[str, float]:
-        """Get metrics for a specific time period"""
+        """Get metrics for a specific time period (None bounds are open-ended)"""
+        metrics_by_window = await self._get_period_metrics_batch([(start_date, end_date)], user_id)
+        return metrics_by_window[(start_date, end_date)]
+    
+    async def _get_period_metrics_batch(
+        self,
+        windows: List[Window],
+        user_id: Optional[str] = None
+    ) -> Dict[Window, Dict[str, float]]:
+        """
+        Get metrics for several time periods at once
+        
+        Windows not already memoized in the current scope are loaded with one
+        aggregated query per table, however many windows are requested.
+        """
+        scope = _period_metrics_scope.get()
+        memo = scope.metrics if scope is not None else {}
+        
+        results = {}
+        missing = []
+        for window in dict.fromkeys(windows):
+            if (window, user_id) in memo:
+                results[window] = memo[(window, user_id)]
+            else:
+                missing.append(window)
+        
+        if missing:
+            if self.rollup_store is not None:
+                social_metrics, content_metrics = await self._get_rollup_metrics(missing, user_id)
+            else:
+                social_metrics = await self._get_social_media_metrics(missing, user_id)
+                content_metrics = await self._get_content_metrics(missing, user_id)
+            seo_metrics = await self._get_seo_metrics(user_id)
+            
+            for window in missing:
+                metrics = {}
+                metrics.update(social_metrics.get(window, {}))
+                metrics.update(content_metrics.get(window, {}))
+                metrics.update(seo_metrics)
+                results[window] = metrics
+                
+                # A failed table query is retried by the next caller, not memoized
+                if window in social_metrics and window in content_metrics:
+                    memo[(window, user_id)] = metrics
+        
+        return results
+    
+    @staticmethod
+    def _window_condition(column, window: Window):
+        """SQL condition selecting rows of `column` inside a window (bounds inclusive)"""
+        start_date, end_date = window
+        conditions = []
+        if start_date is not None:
+            conditions.append(column >= start_date)
+        if end_date is not None:
+            conditions.append(column <= end_date)
+        return and_(*conditions) if conditions else true()
+    
+    @staticmethod
+    def _windows_range_filter(column, windows: List[Window]):
+        """SQL condition covering every window, so the date index bounds the scan"""
+        if any(start is None for start, _ in windows) or any(end is None for _, end in windows):
+            return None
+        return and_(
+            column >= min(start for start, _ in windows),
+            column <= max(end for _, end in windows)
+        )
+    
+    async def _get_social_media_metrics(
+        self,
+        windows: List[Window],
+        user_id: Optional[str] = None
+    ) -> Dict[Window, Dict[str, float]]:
+        """
+        Get social media metrics for several time periods
+        
+        One conditional-aggregation query: every window gets its own
+        COUNT/SUM columns over the JSON `metrics` fields, so overlapping
+        windows (e.g. a period and its comparison) are computed in one scan.
+        """
         try:
-            metrics = {}
-            
-            # Get social media metrics
-            social_metrics = await self._get_social_media_metrics(start_date, end_date, user_id)
-            metrics.update(social_metrics)
-            
-            # Get content metrics
-            content_metrics = await self._get_content_metrics(start_date, end_date, user_id)
-            metrics.update(content_metrics)
-            
-            # Get SEO metrics
-            seo_metrics = await self._get_seo_metrics(start_date, end_date, user_id)
-            metrics.update(seo_metrics)
+            columns = []
+            for index, window in enumerate(windows):
+                in_window = self._window_condition(SocialPost.created_at, window)
+                columns.append(func.count(case((in_window, 1))).label(f"w{index}_posts"))
+                for json_field, metric_name in SOCIAL_METRIC_FIELDS.items():
+                    value = SocialPost.metrics[json_field].as_float()
+                    columns.append(
+                        func.coalesce(func.sum(case((in_window, value))), 0).label(f"w{index}_{metric_name}")
+                    )
             
-            return metrics
+            def load(session: Session):
+                query = session.query(*columns)
+                range_filter = self._windows_range_filter(SocialPost.created_at, windows)
+                if range_filter is not None:
+                    query = query.filter(range_filter)
+                if user_id:
+                    query = query.filter(SocialPost.user_id == user_id)
+                return query.one()._mapping
+            
+            row = await run_db(self.db, load)
+            
+            results = {}
+            for index, window in enumerate(windows):
+                metrics = {
+                    metric_name: self._as_number(row[f"w{index}_{metric_name}"])
+                    for metric_name in SOCIAL_METRIC_FIELDS.values()
+                }
+                metrics["posts"] = row[f"w{index}_posts"]
+                results[window] = metrics
+            return results
             
         except Exception as e:
-            logger.error(f"Error getting period metrics: {e}")
+            logger.error(f"Error getting social media metrics: {e}")
             return {}
     
-    async def _get_social_media_metrics(
+    async def _get_content_metrics(
         self,
-        start_date: datetime,
-        end_date: datetime,
+        windows: List[Window],
         user_id: Optional[str] = None
-    ) -> Dict[str, float]:
-        """Get social media metrics for a time period"""
+    ) -> Dict[Window, Dict[str, float]]:
+        """Get content metrics for several time periods with one aggregated query"""
         try:
-            query = self.db.query(SocialPost).filter(
-                and_(
-                    SocialPost.created_at >= start_date,
-                    SocialPost.created_at <= end_date
-                )
-            )
-            
-            if user_id:
-                query = query.filter(SocialPost.user_id == user_id)
-            
-            posts = query.all()
-            
-            total_impressions = 0
-            total_engagement = 0
-            total_reach = 0
-            total_clicks = 0
-            
-            for post in posts:
-                if post.metrics:
-                    metrics = post.metrics
-                    total_impressions += metrics.get("impressions", 0)
-                    total_engagement += metrics.get("engagements", 0)
-                    total_reach += metrics.get("reach", 0)
-                    total_clicks += metrics.get("clicks", 0)
+            columns = [
+                func.count(case((self._window_condition(ContentPiece.created_at, window), 1))).label(f"w{index}")
+                for index, window in enumerate(windows)
+            ]
+            
+            def load(session: Session):
+                query = session.query(*columns)
+                range_filter = self._windows_range_filter(ContentPiece.created_at, windows)
+                if range_filter is not None:
+                    query = query.filter(range_filter)
+                if user_id:
+                    query = query.filter(ContentPiece.user_id == user_id)
+                return query.one()._mapping
+            
+            row = await run_db(self.db, load)
             
             return {
-                "impressions": total_impressions,
-                "engagement": total_engagement,
-                "reach": total_reach,
-                "clicks": total_clicks,
-                "posts": len(posts)
+                window: self._derive_content_metrics(row[f"w{index}"])
+                for index, window in enumerate(windows)
             }
             
         except Exception as e:
-            logger.error(f"Error getting social media metrics: {e}")
+            logger.error(f"Error getting content metrics: {e}")
             return {}
     
-    async def _get_content_metrics(
+    def _derive_content_metrics(self, content_count: int) -> Dict[str, float]:
+        """Content metrics for a period with `content_count` content pieces"""
+        # This would integrate with content analytics service
+        # For now, we'll use placeholder values per content piece
+        total_views = 100 * content_count
+        total_conversions = 5 * content_count
+        avg_quality_score = 85 if content_count > 0 else 0
+        conversion_rate = (total_conversions / total_views * 100) if total_views > 0 else 0
+        
+        return {
+            "views": total_views,
+            "conversions": total_conversions,
+            "conversion_rate": conversion_rate,
+            "quality_score": avg_quality_score,
+            "content_count": content_count
+        }
+    
+    def _split_rollup_totals(
         self,
-        start_date: datetime,
-        end_date: datetime,
+        totals: Dict[str, float]
+    ) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """(social, content) period metrics from rolled-up totals"""
+        social_metrics = {
+            metric_name: self._as_number(totals[metric_name])
+            for metric_name in list(SOCIAL_METRIC_FIELDS.values()) + ["posts"]
+        }
+        content_metrics = self._derive_content_metrics(int(totals["content_count"]))
+        return social_metrics, content_metrics
+    
+    async def _get_rollup_metrics(
+        self,
+        windows: List[Window],
         user_id: Optional[str] = None
-    ) -> Dict[str, float]:
-        """Get content metrics for a time period"""
+    ) -> Tuple[Dict[Window, Dict[str, float]], Dict[Window, Dict[str, float]]]:
+        """(social, content) metrics for several windows from the rollup buckets"""
         try:
-            query = self.db.query(ContentPiece).filter(
-                and_(
-                    ContentPiece.created_at >= start_date,
-                    ContentPiece.created_at <= end_date
-                )
+            totals = await run_db(
+                self.db, lambda session: self.rollup_store.get_period_metrics(windows, user_id)
             )
             
-            if user_id:
-                query = query.filter(ContentPiece.user_id == user_id)
-            
-            content_pieces = query.all()
-            
-            total_views = 0
-            total_conversions = 0
-            total_quality_score = 0
-            content_count = len(content_pieces)
-            
-            for content in content_pieces:
-                # This would integrate with content analytics service
-                # For now, we'll use placeholder values
-                total_views += 100  # Placeholder
-                total_conversions += 5   # Placeholder
-                total_quality_score += 85  # Placeholder
-            
-            avg_quality_score = total_quality_score / content_count if content_count > 0 else 0
-            conversion_rate = (total_conversions / total_views * 100) if total_views > 0 else 0
-            
-            return {
-                "views": total_views,
-                "conversions": total_conversions,
-                "conversion_rate": conversion_rate,
-                "quality_score": avg_quality_score,
-                "content_count": content_count
-            }
+            social_metrics, content_metrics = {}, {}
+            for window, window_totals in totals.items():
+                social_metrics[window], content_metrics[window] = self._split_rollup_totals(window_totals)
+            return social_metrics, content_metrics
             
         except Exception as e:
-            logger.error(f"Error getting content metrics: {e}")
-            return {}
+            logger.error(f"Error getting rollup metrics: {e}")
+            return {}, {}
     
     async def _get_seo_metrics(
         self,
-        start_date: datetime,
-        end_date: datetime,
         user_id: Optional[str] = None
     ) -> Dict[str, float]:
-        """Get SEO metrics for a time period"""
+        """Get SEO metrics"""
         try:
             # This would integrate with Google Search Console and SEMrush
             # For now, we'll return placeholder values
@@ -801,6 +1051,36 @@ class KPICalculationEngine:
             logger.error(f"Error getting SEO metrics: {e}")
             return {}
     
+    @staticmethod
+    def _as_number(value: Any) -> float:
+        """SQL SUMs come back as floats/Decimals; keep whole numbers as ints"""
+        value = float(value or 0)
+        return int(value) if value.is_integer() else value
+    
+    def _kpi_value_from_metrics(self, kpi_name: str, metrics: Dict[str, float]) -> float:
+        """Derive a KPI value from a period's metrics"""
+        if kpi_name == "impressions_growth":
+            return metrics.get("impressions", 0)
+        
+        elif kpi_name == "engagement_rate":
+            impressions = metrics.get("impressions", 0)
+            engagement = metrics.get("engagement", 0)
+            return (engagement / impressions * 100) if impressions > 0 else 0
+        
+        elif kpi_name == "conversion_rate":
+            return metrics.get("conversion_rate", 0)
+        
+        elif kpi_name == "content_quality":
+            return metrics.get("quality_score", 0)
+        
+        elif kpi_name == "time_savings":
+            # Calculate time savings (this would integrate with workflow analytics)
+            # For now, return a placeholder value
+            return 35.0  # Placeholder: 35% time savings
+        
+        else:
+            return 0.0
+    
     async def _get_kpi_value(
         self,
         kpi_name: str,
@@ -808,67 +1088,17 @@ class KPICalculationEngine:
         end_date: Optional[datetime] = None,
         user_id: Optional[str] = None
     ) -> float:
-        """Get the current value for a specific KPI"""
+        """Get the value for a specific KPI (defaults to the last 30 days)"""
         try:
-            if kpi_name == "impressions_growth":
-                # Calculate impressions growth
-                if start_date and end_date:
-                    current_metrics = await self._get_period_metrics(start_date, end_date, user_id)
-                    return current_metrics.get("impressions", 0)
-                else:
-                    # Get current month impressions
-                    end_date = datetime.utcnow()
-                    start_date = end_date - timedelta(days=30)
-                    current_metrics = await self._get_period_metrics(start_date, end_date, user_id)
-                    return current_metrics.get("impressions", 0)
-            
-            elif kpi_name == "engagement_rate":
-                # Calculate engagement rate
-                if start_date and end_date:
-                    current_metrics = await self._get_period_metrics(start_date, end_date, user_id)
-                    impressions = current_metrics.get("impressions", 0)
-                    engagement = current_metrics.get("engagement", 0)
-                    return (engagement / impressions * 100) if impressions > 0 else 0
-                else:
-                    # Get current month engagement rate
-                    end_date = datetime.utcnow()
-                    start_date = end_date - timedelta(days=30)
-                    current_metrics = await self._get_period_metrics(start_date, end_date, user_id)
-                    impressions = current_metrics.get("impressions", 0)
-                    engagement = current_metrics.get("engagement", 0)
-                    return (engagement / impressions * 100) if impressions > 0 else 0
-            
-            elif kpi_name == "conversion_rate":
-                # Get conversion rate from content metrics
-                if start_date and end_date:
-                    content_metrics = await self._get_content_metrics(start_date, end_date, user_id)
-                    return content_metrics.get("conversion_rate", 0)
-                else:
-                    # Get current month conversion rate
-                    end_date = datetime.utcnow()
-                    start_date = end_date - timedelta(days=30)
-                    content_metrics = await self._get_content_metrics(start_date, end_date, user_id)
-                    return content_metrics.get("conversion_rate", 0)
-            
-            elif kpi_name == "content_quality":
-                # Get content quality score
-                if start_date and end_date:
-                    content_metrics = await self._get_content_metrics(start_date, end_date, user_id)
-                    return content_metrics.get("quality_score", 0)
-                else:
-                    # Get current month quality score
-                    end_date = datetime.utcnow()
-                    start_date = end_date - timedelta(days=30)
-                    content_metrics = await self._get_content_metrics(start_date, end_date, user_id)
-                    return content_metrics.get("quality_score", 0)
-            
-            elif kpi_name == "time_savings":
-                # Calculate time savings (this would integrate with workflow analytics)
-                # For now, return a placeholder value
-                return 35.0  # Placeholder: 35% time savings
+            if kpi_name not in KPI_DATA_SOURCES:
+                return self._kpi_value_from_metrics(kpi_name, {})
             
-            else:
-                return 0.0
+            if not (start_date and end_date):
+                end_date = self._now()
+                start_date = end_date - timedelta(days=30)
+            
+            metrics = await self._get_period_metrics(start_date, end_date, user_id)
+            return self._kpi_value_from_metrics(kpi_name, metrics)
                 
         except Exception as e:
             logger.error(f"Error getting KPI value for {kpi_name}: {e}")
@@ -881,50 +1111,17 @@ class KPICalculationEngine:
         end_date: Optional[datetime] = None,
         user_id: Optional[str] = None
     ) -> int:
-        """Get the count of data points used for KPI calculation"""
+        """Get the count of data points used for KPI calculation (all time without dates)"""
         try:
-            if start_date and end_date:
-                # Count data points in the specified period
-                if kpi_name in ["impressions_growth", "engagement_rate"]:
-                    query = self.db.query(SocialPost).filter(
-                        and_(
-                            SocialPost.created_at >= start_date,
-                            SocialPost.created_at <= end_date
-                        )
-                    )
-                    if user_id:
-                        query = query.filter(SocialPost.user_id == user_id)
-                    return query.count()
-                
-                elif kpi_name in ["conversion_rate", "content_quality"]:
-                    query = self.db.query(ContentPiece).filter(
-                        and_(
-                            ContentPiece.created_at >= start_date,
-                            ContentPiece.created_at <= end_date
-                        )
-                    )
-                    if user_id:
-                        query = query.filter(ContentPiece.user_id == user_id)
-                    return query.count()
-                
-                else:
-                    return 0
-            else:
-                # Return total count for all time
-                if kpi_name in ["impressions_growth", "engagement_rate"]:
-                    query = self.db.query(SocialPost)
-                    if user_id:
-                        query = query.filter(SocialPost.user_id == user_id)
-                    return query.count()
-                
-                elif kpi_name in ["conversion_rate", "content_quality"]:
-                    query = self.db.query(ContentPiece)
-                    if user_id:
-                        query = query.filter(ContentPiece.user_id == user_id)
-                    return query.count()
-                
-                else:
-                    return 0
+            count_field = KPI_DATA_SOURCES.get(kpi_name)
+            if count_field is None:
+                return 0
+            
+            if not (start_date and end_date):
+                start_date, end_date = None, None
+            
+            metrics = await self._get_period_metrics(start_date, end_date, user_id)
+            return int(metrics.get(count_field, 0))
                     
         except Exception as e:
             logger.error(f"Error getting data points count for {kpi_name}: {e}")
@@ -1040,7 +1237,7 @@ class KPICalculationEngine:
             
             # Test database connection
             try:
-                self.db.execute("SELECT 1")
+                await run_db(self.db, lambda session: session.execute(text("SELECT 1")))
                 health_status["database_connection"] = "healthy"
             except Exception as e:
                 health_status["database_connection"] = "unhealthy"
@@ -1073,26 +1270,52 @@ class KPICalculationEngine:
         end_date: datetime,
         user_id: Optional[str] = None
     ) -> List[float]:
-        """Get historical KPI data for statistical analysis"""
+        """Get historical KPI data (one value per day) for statistical analysis"""
+        series = await self._get_historical_kpi_series([kpi_name], start_date, end_date, user_id)
+        return series[kpi_name]
+    
+    async def _get_historical_kpi_series(
+        self,
+        kpi_names: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        user_id: Optional[str] = None
+    ) -> Dict[str, List[float]]:
+        """Get daily historical data for several KPIs of one user with one read"""
         try:
-            # This would retrieve historical data from the database or cache
-            # For now, generate sample data for demonstration
+            if self.rollup_store is not None:
+                # Daily buckets: at most one row per day and metric
+                series = {kpi_name: [] for kpi_name in kpi_names}
+                daily_series = await run_db(
+                    self.db, lambda session: self.rollup_store.get_daily_series(start_date, end_date, user_id)
+                )
+                for day_totals in daily_series:
+                    social_metrics, content_metrics = self._split_rollup_totals(day_totals)
+                    day_metrics = {**social_metrics, **content_metrics}
+                    for kpi_name in kpi_names:
+                        series[kpi_name].append(float(self._kpi_value_from_metrics(kpi_name, day_metrics)))
+                return series
+            
+            # Without rollups, generate sample data for demonstration
             days_diff = (end_date - start_date).days
-            data_points = []
+            series = {}
             
-            for i in range(days_diff):
-                # Generate realistic sample data with some variation
-                base_value = 100.0  # Base value for demonstration
-                variation = math.sin(i * 0.1) * 20  # Sinusoidal variation
-                noise = (hash(f"{kpi_name}_{i}") % 100 - 50) * 0.1  # Random noise
-                value = max(0, base_value + variation + noise)
-                data_points.append(value)
+            for kpi_name in kpi_names:
+                data_points = []
+                for i in range(days_diff):
+                    # Generate realistic sample data with some variation
+                    base_value = 100.0  # Base value for demonstration
+                    variation = math.sin(i * 0.1) * 20  # Sinusoidal variation
+                    noise = (hash(f"{kpi_name}_{i}") % 100 - 50) * 0.1  # Random noise
+                    value = max(0, base_value + variation + noise)
+                    data_points.append(value)
+                series[kpi_name] = data_points
             
-            return data_points
+            return series
             
         except Exception as e:
             logger.error(f"Error getting historical KPI data: {e}")
-            return []
+            return {kpi_name: [] for kpi_name in kpi_names}
     
     async def _create_basic_advanced_kpi(
         self,
@@ -1131,103 +1354,28 @@ class KPICalculationEngine:
         )
     
     def _calculate_velocity(self, data: List[float], period_days: int) -> float:
-        """Calculate the rate of change over time"""
-        if len(data) < 2:
-            return 0.0
-        
-        # Linear regression slope as velocity
-        n = len(data)
-        x_values = list(range(n))
-        y_values = data
-        
-        # Calculate slope (velocity)
-        sum_x = sum(x_values)
-        sum_y = sum(y_values)
-        sum_xy = sum(x * y for x, y in zip(x_values, y_values))
-        sum_x2 = sum(x * x for x in x_values)
-        
-        if n * sum_x2 - sum_x * sum_x == 0:
-            return 0.0
-        
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-        return slope * (period_days / n)  # Normalize to period
+        """Calculate the rate of change over time (linear regression slope)"""
+        return float(kpi_timeseries.velocity(kpi_timeseries.as_matrix([data]), period_days)[0])
     
     def _calculate_momentum(self, data: List[float], window: int) -> float:
         """Calculate the acceleration of change (momentum)"""
-        if len(data) < window + 1:
-            return 0.0
-        
-        # Calculate velocity over two consecutive windows
-        recent_data = data[-window:]
-        previous_data = data[-2*window:-window] if len(data) >= 2*window else data[:-window]
-        
-        recent_velocity = self._calculate_velocity(recent_data, window)
-        previous_velocity = self._calculate_velocity(previous_data, window)
-        
-        return recent_velocity - previous_velocity
+        return float(kpi_timeseries.momentum(kpi_timeseries.as_matrix([data]), window)[0])
     
     def _calculate_volatility(self, data: List[float]) -> float:
         """Calculate the stability/volatility of the metric"""
-        if len(data) < 2:
-            return 0.0
-        
-        mean = statistics.mean(data)
-        variance = statistics.variance(data, mean)
-        return math.sqrt(variance) / mean if mean != 0 else 0.0
+        return float(kpi_timeseries.volatility(kpi_timeseries.as_matrix([data]))[0])
     
     def _calculate_seasonality(self, data: List[float]) -> float:
         """Calculate the strength of seasonal patterns"""
-        if len(data) < 12:  # Need at least 12 data points for seasonal analysis
-            return 0.0
-        
-        # Simple seasonal strength calculation using autocorrelation
-        seasonal_strength = 0.0
-        for lag in [1, 2, 3, 6, 12]:  # Common seasonal lags
-            if lag < len(data):
-                correlation = self._calculate_autocorrelation(data, lag)
-                seasonal_strength += abs(correlation)
-        
-        return seasonal_strength / 5  # Average of seasonal correlations
+        return float(kpi_timeseries.seasonality(kpi_timeseries.as_matrix([data]))[0])
     
     def _calculate_autocorrelation(self, data: List[float], lag: int) -> float:
         """Calculate autocorrelation at a given lag"""
-        if len(data) <= lag:
-            return 0.0
-        
-        mean = statistics.mean(data)
-        variance = statistics.variance(data, mean)
-        
-        if variance == 0:
-            return 0.0
-        
-        autocorr = 0.0
-        for i in range(len(data) - lag):
-            autocorr += (data[i] - mean) * (data[i + lag] - mean)
-        
-        return autocorr / ((len(data) - lag) * variance)
+        return float(kpi_timeseries.autocorrelation(kpi_timeseries.as_matrix([data]), [lag])[0, 0])
     
     def _forecast_next_period(self, data: List[float], horizon: int) -> float:
-        """Forecast the next period value using simple moving average with trend"""
-        if len(data) < 3:
-            return data[-1] if data else 0.0
-        
-        # Simple exponential smoothing with trend
-        alpha = 0.3  # Smoothing factor
-        beta = 0.1   # Trend factor
-        
-        # Initialize
-        s = data[0]
-        b = data[1] - data[0] if len(data) > 1 else 0
-        
-        # Apply exponential smoothing
-        for i in range(1, len(data)):
-            s_prev = s
-            s = alpha * data[i] + (1 - alpha) * (s + b)
-            b = beta * (s - s_prev) + (1 - beta) * b
-        
-        # Forecast
-        forecast = s + b * horizon
-        return max(0, forecast)  # Ensure non-negative
+        """Forecast the next period value using exponential smoothing with trend"""
+        return float(kpi_timeseries.holt_forecast(kpi_timeseries.as_matrix([data]), horizon)[0])
     
     def _calculate_confidence_interval(
         self,
@@ -1235,20 +1383,8 @@ class KPICalculationEngine:
         confidence_level: float
     ) -> tuple:
         """Calculate confidence interval for the forecast"""
-        if len(data) < 2:
-            return (0.0, 0.0)
-        
-        # Calculate standard error
-        mean = statistics.mean(data)
-        std_dev = statistics.stdev(data)
-        standard_error = std_dev / math.sqrt(len(data))
-        
-        # Z-score for confidence level (simplified)
-        z_score = 1.96 if confidence_level == 0.95 else 1.645  # 95% or 90%
-        
-        margin_of_error = z_score * standard_error
-        
-        return (mean - margin_of_error, mean + margin_of_error)
+        lower, upper = kpi_timeseries.confidence_interval(kpi_timeseries.as_matrix([data]), confidence_level)
+        return (float(lower[0]), float(upper[0]))
     
     async def _get_period_costs(
         self,
@@ -1376,77 +1512,96 @@ class KPICalculationService:
             Comprehensive KPI report
         """
         try:
-            # Check cache first
             cache_key = f"kpi_comprehensive:{user_id}:{period}"
-            cached_result = await self.cache_service.get(cache_key)
-            if cached_result:
-                return cached_result
             
-            # Calculate all KPIs
-            kpi_results = {}
-            
-            # Basic KPIs
-            basic_kpis = await self.kpi_engine.calculate_all_kpis(period, user_id)
-            kpi_results["basic"] = [asdict(kpi) for kpi in basic_kpis]
-            
-            # Advanced KPIs
-            if include_advanced:
-                advanced_kpis = {}
-                for kpi_name in self.kpi_engine.kpi_targets.keys():
-                    try:
-                        advanced_kpi = await self.kpi_engine.calculate_advanced_kpi(
-                            kpi_name, period, user_id, include_forecasts
-                        )
-                        advanced_kpis[kpi_name] = asdict(advanced_kpi)
-                    except Exception as e:
-                        logger.warning(f"Failed to calculate advanced KPI {kpi_name}: {e}")
-                        continue
-                kpi_results["advanced"] = advanced_kpis
-            
-            # Business metrics
-            roi_metrics = await self.kpi_engine.calculate_roi_metrics(period, user_id)
-            time_savings_metrics = await self.kpi_engine.calculate_time_savings_metrics(period, user_id)
-            competitive_metrics = await self.kpi_engine.calculate_competitive_metrics(period, user_id)
-            
-            kpi_results["business"] = {
-                "roi": roi_metrics,
-                "time_savings": time_savings_metrics,
-                "competitive": competitive_metrics
-            }
-            
-            # Business intelligence insights
-            bi_insights = await self._generate_business_intelligence(kpi_results, user_id)
-            kpi_results["insights"] = bi_insights
-            
-            # Performance summary
-            performance_summary = await self._calculate_performance_summary(kpi_results)
-            kpi_results["performance_summary"] = performance_summary
-            
-            # Store in Vercel KV if available
-            if self.vercel_kv_service:
-                await self.vercel_kv_service.store_analytics_data(
-                    user_id=user_id,
-                    data_type="kpi_comprehensive",
-                    source_id=f"comprehensive_{period}",
-                    metric_name="comprehensive_kpis",
-                    metric_value=json.dumps(kpi_results),
-                    metadata={
-                        "period": period,
-                        "include_advanced": include_advanced,
-                        "include_forecasts": include_forecasts,
-                        "calculated_at": datetime.utcnow().isoformat()
-                    }
-                )
-            
-            # Cache the result
-            await self.cache_service.set(cache_key, kpi_results, ttl=3600)  # 1 hour cache
+            async def compute() -> Dict[str, Any]:
+                # One period metrics scope, so every KPI below shares the loaded windows
+                async with self.kpi_engine.period_metrics_scope():
+                    return await self._compute_comprehensive_kpis(
+                        user_id, period, include_advanced, include_forecasts
+                    )
             
-            return kpi_results
+            # Concurrent misses for the same dashboard share one computation; a
+            # stale report is served briefly while it is refreshed in the background
+            return await self.cache_service.get_or_compute(
+                cache_key,
+                compute,
+                ttl=3600,  # 1 hour cache
+                stale_ttl=300,
+                early_refresh_beta=1.0
+            )
             
         except Exception as e:
             logger.error(f"Error calculating comprehensive KPIs: {e}")
             raise
     
+    async def _compute_comprehensive_kpis(
+        self,
+        user_id: str,
+        period: str,
+        include_advanced: bool,
+        include_forecasts: bool
+    ) -> Dict[str, Any]:
+        """Compute the comprehensive KPI report (uncached)"""
+        # Calculate all KPIs
+        kpi_results = {}
+        
+        # Basic KPIs
+        basic_kpis = await self.kpi_engine.calculate_all_kpis(period, user_id)
+        kpi_results["basic"] = [asdict(kpi) for kpi in basic_kpis]
+        
+        # Advanced KPIs
+        if include_advanced:
+            advanced_kpis = {}
+            try:
+                # Failures are isolated per KPI: a failing KPI is left out, the rest are kept
+                results = await self.kpi_engine.calculate_advanced_kpis(
+                    None, period, [user_id], include_forecasts, return_exceptions=True
+                )
+                for (kpi_name, _), advanced_kpi in results.items():
+                    if not isinstance(advanced_kpi, Exception):
+                        advanced_kpis[kpi_name] = asdict(advanced_kpi)
+            except Exception as e:
+                logger.warning(f"Failed to calculate advanced KPIs: {e}")
+            kpi_results["advanced"] = advanced_kpis
+        
+        # Business metrics
+        roi_metrics = await self.kpi_engine.calculate_roi_metrics(period, user_id)
+        time_savings_metrics = await self.kpi_engine.calculate_time_savings_metrics(period, user_id)
+        competitive_metrics = await self.kpi_engine.calculate_competitive_metrics(period, user_id)
+        
+        kpi_results["business"] = {
+            "roi": roi_metrics,
+            "time_savings": time_savings_metrics,
+            "competitive": competitive_metrics
+        }
+        
+        # Business intelligence insights
+        bi_insights = await self._generate_business_intelligence(kpi_results, user_id)
+        kpi_results["insights"] = bi_insights
+        
+        # Performance summary
+        performance_summary = await self._calculate_performance_summary(kpi_results)
+        kpi_results["performance_summary"] = performance_summary
+        
+        # Store in Vercel KV if available
+        if self.vercel_kv_service:
+            await self.vercel_kv_service.store_analytics_data(
+                user_id=user_id,
+                data_type="kpi_comprehensive",
+                source_id=f"comprehensive_{period}",
+                metric_name="comprehensive_kpis",
+                metric_value=json.dumps(kpi_results),
+                metadata={
+                    "period": period,
+                    "include_advanced": include_advanced,
+                    "include_forecasts": include_forecasts,
+                    "calculated_at": datetime.utcnow().isoformat()
+                }
+            )
+        
+        return kpi_results
+    
     async def _generate_business_intelligence(
         self,
         kpi_results: Dict[str, Any],
@@ -0,0 +1,561 @@
+"""
+KPI Rollup Store
+Incrementally maintained hourly and daily aggregates of the raw metrics the
+KPI engine reads, so KPI calculations touch a few hundred bucket rows instead
+of months of SocialPost/ContentPiece history.
+
+Rollups are kept up to date by session flush listeners (see
+`register_rollup_listeners`), so every ORM write path - create_social_post,
+the analytics collector, the publisher - updates them in the same transaction.
+
+Backfill and consistency checks:
+    python -m app.services.kpi_rollups backfill [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+    python -m app.services.kpi_rollups check [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--repair]
+"""
+
+import argparse
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, inspect, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.schema import ContentPiece, KPIRollup, SocialPost
+
+logger = logging.getLogger(__name__)
+
+HOUR = "hour"
+DAY = "day"
+GRANULARITIES = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+# Rollup rows for records without a user; the unique constraint can't match NULLs
+NO_USER = 0
+
+# SocialPost.metrics JSON field -> rolled-up metric name (matches the KPI engine)
+SOCIAL_METRIC_FIELDS = {
+    "impressions": "impressions",
+    "engagements": "engagement",
+    "reach": "reach",
+    "clicks": "clicks"
+}
+
+SOCIAL_ROLLUP_METRICS = ["posts"] + list(SOCIAL_METRIC_FIELDS.values())
+CONTENT_ROLLUP_METRICS = ["content_count"]
+
+Window = Tuple[Optional[datetime], Optional[datetime]]
+BucketKey = Tuple[int, str, datetime, str]  # (user_id, granularity, bucket_start, metric)
+
+
+def floor_bucket(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the bucket containing a timestamp"""
+    if granularity == DAY:
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_bucket(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the first bucket at or after a timestamp"""
+    floored = floor_bucket(timestamp, granularity)
+    return floored if floored == timestamp else floored + GRANULARITIES[granularity]
+
+
+def _metric_number(value: Any) -> float:
+    """Numeric value of a JSON metric field; anything non-numeric counts as 0"""
+    if isinstance(value, bool):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def social_post_contribution(metrics: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """Metrics one SocialPost adds to its bucket"""
+    contribution = {"posts": 1.0}
+    metrics = metrics or {}
+    for json_field, metric_name in SOCIAL_METRIC_FIELDS.items():
+        contribution[metric_name] = _metric_number(metrics.get(json_field, 0))
+    return contribution
+
+
+def content_piece_contribution() -> Dict[str, float]:
+    """Metrics one ContentPiece adds to its bucket"""
+    return {"content_count": 1.0}
+
+
+class KPIRollupStore:
+    """
+    Read/write access to the kpi_rollups table
+
+    Every record contributes to one hourly and one daily bucket keyed by its
+    created_at. Windows are read as whole days plus the hours at either edge,
+    with window bounds rounded up to the hour.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def apply_deltas(self, deltas: Dict[BucketKey, float], connection=None):
+        """Add deltas to bucket values, creating buckets as needed"""
+        deltas = {key: value for key, value in deltas.items() if value}
+        if not deltas:
+            return
+
+        connection = connection or self.db.connection()
+        dialect = connection.dialect.name
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "granularity": granularity,
+                "bucket_start": bucket_start,
+                "metric": metric,
+                "value": value,
+                "updated_at": now
+            }
+            for (user_id, granularity, bucket_start, metric), value in deltas.items()
+        ]
+
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = insert(KPIRollup.__table__)
+            statement = statement.on_conflict_do_update(
+                index_elements=["user_id", "granularity", "bucket_start", "metric"],
+                set_={
+                    "value": KPIRollup.__table__.c.value + statement.excluded.value,
+                    "updated_at": statement.excluded.updated_at
+                }
+            )
+            connection.execute(statement, rows)
+            return
+
+        # Portable fallback: update existing buckets, insert the rest
+        table = KPIRollup.__table__
+        for row in rows:
+            result = connection.execute(
+                table.update()
+                .where(and_(
+                    table.c.user_id == row["user_id"],
+                    table.c.granularity == row["granularity"],
+                    table.c.bucket_start == row["bucket_start"],
+                    table.c.metric == row["metric"]
+                ))
+                .values(value=table.c.value + row["value"], updated_at=now)
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(**row))
+
+    @staticmethod
+    def contribution_deltas(
+        user_id: Optional[int],
+        created_at: Optional[datetime],
+        contribution: Dict[str, float],
+        sign: float = 1.0
+    ) -> Dict[BucketKey, float]:
+        """Bucket deltas for adding (sign=1) or removing (sign=-1) a contribution"""
+        if created_at is None:
+            return {}
+        deltas = {}
+        for granularity in GRANULARITIES:
+            bucket_start = floor_bucket(created_at, granularity)
+            for metric, value in contribution.items():
+                key = (user_id if user_id is not None else NO_USER, granularity, bucket_start, metric)
+                deltas[key] = deltas.get(key, 0.0) + sign * value
+        return deltas
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _window_condition(window: Window):
+        """Buckets making up a window: whole days plus the hours at either edge"""
+        start, end = window
+        start = ceil_bucket(start, HOUR) if start is not None else None
+        end = ceil_bucket(end, HOUR) if end is not None else None
+
+        bucket = KPIRollup.bucket_start
+        is_day = KPIRollup.granularity == DAY
+        is_hour = KPIRollup.granularity == HOUR
+
+        first_day = ceil_bucket(start, DAY) if start is not None else None
+        last_day = floor_bucket(end, DAY) if end is not None else None
+
+        if first_day is not None and last_day is not None and first_day >= last_day:
+            # Shorter than a whole day: hours only
+            return and_(is_hour, bucket >= start, bucket < end)
+
+        day_conditions = [is_day]
+        if first_day is not None:
+            day_conditions.append(bucket >= first_day)
+        if last_day is not None:
+            day_conditions.append(bucket < last_day)
+        parts = [and_(*day_conditions)]
+
+        if start is not None and start < first_day:
+            parts.append(and_(is_hour, bucket >= start, bucket < first_day))
+        if end is not None and last_day < end:
+            parts.append(and_(is_hour, bucket >= last_day, bucket < end))
+        return or_(*parts)
+
+    def get_period_metrics(
+        self,
+        windows: List[Window],
+        user_id: Optional[Any] = None,
+        metrics: Optional[List[str]] = None
+    ) -> Dict[Window, Dict[str, float]]:
+        """
+        Rolled-up metric totals for several windows in one query
+
+        Returns every requested metric for every window (0 when no buckets).
+        """
+        metrics = metrics or SOCIAL_ROLLUP_METRICS + CONTENT_ROLLUP_METRICS
+        columns = [KPIRollup.metric]
+        for index, window in enumerate(windows):
+            columns.append(
+                func.coalesce(
+                    func.sum(case((self._window_condition(window), KPIRollup.value))), 0
+                ).label(f"w{index}")
+            )
+
+        query = self.db.query(*columns).filter(KPIRollup.metric.in_(metrics))
+        if user_id:
+            query = query.filter(KPIRollup.user_id == user_id)
+        range_filter = self._range_filter(windows)
+        if range_filter is not None:
+            query = query.filter(range_filter)
+
+        totals = {window: {metric: 0.0 for metric in metrics} for window in windows}
+        for row in query.group_by(KPIRollup.metric).all():
+            mapping = row._mapping
+            for index, window in enumerate(windows):
+                totals[window][mapping["metric"]] = float(mapping[f"w{index}"] or 0)
+        return totals
+
+    @staticmethod
+    def _range_filter(windows: List[Window]):
+        """Bucket range covering every window, so the lookup index bounds the scan"""
+        if any(start is None for start, _ in windows) or any(end is None for _, end in windows):
+            return None
+        return and_(
+            KPIRollup.bucket_start >= floor_bucket(min(start for start, _ in windows), DAY),
+            KPIRollup.bucket_start <= max(end for _, end in windows)
+        )
+
+    def get_daily_series(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        user_id: Optional[Any] = None,
+        metrics: Optional[List[str]] = None
+    ) -> List[Dict[str, float]]:
+        """
+        Per-day metric totals for the days in [start_date, end_date)
+
+        Days without buckets are returned with zero values.
+        """
+        metrics = metrics or SOCIAL_ROLLUP_METRICS + CONTENT_ROLLUP_METRICS
+        first_day = floor_bucket(start_date, DAY)
+        day_count = max(0, (end_date - start_date).days)
+        days = [first_day + timedelta(days=offset) for offset in range(day_count)]
+        if not days:
+            return []
+
+        query = self.db.query(
+            KPIRollup.bucket_start, KPIRollup.metric, func.sum(KPIRollup.value)
+        ).filter(
+            KPIRollup.granularity == DAY,
+            KPIRollup.metric.in_(metrics),
+            KPIRollup.bucket_start >= days[0],
+            KPIRollup.bucket_start <= days[-1]
+        )
+        if user_id:
+            query = query.filter(KPIRollup.user_id == user_id)
+
+        series = {day: {metric: 0.0 for metric in metrics} for day in days}
+        for bucket_start, metric, value in query.group_by(KPIRollup.bucket_start, KPIRollup.metric).all():
+            if bucket_start in series:
+                series[bucket_start][metric] = float(value or 0)
+        return [series[day] for day in days]
+
+    # ------------------------------------------------------------------
+    # Backfill and consistency checks
+    # ------------------------------------------------------------------
+
+    def compute_from_raw(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Dict[BucketKey, float]:
+        """Aggregate raw SocialPost/ContentPiece rows into bucket totals"""
+        totals: Dict[BucketKey, float] = defaultdict(float)
+
+        sources = [
+            (SocialPost, [SocialPost.user_id, SocialPost.created_at, SocialPost.metrics],
+             lambda row: social_post_contribution(row[2])),
+            (ContentPiece, [ContentPiece.user_id, ContentPiece.created_at],
+             lambda row: content_piece_contribution())
+        ]
+        for model, columns, contribution in sources:
+            query = self.db.query(*columns).filter(model.created_at.isnot(None))
+            if since is not None:
+                query = query.filter(model.created_at >= since)
+            if until is not None:
+                query = query.filter(model.created_at < until)
+
+            for row in query.yield_per(batch_size):
+                for key, value in self.contribution_deltas(row[0], row[1], contribution(row)).items():
+                    totals[key] += value
+
+        return totals
+
+    def backfill(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Rebuild rollups for whole days in [since, until) from raw data
+
+        Existing buckets in the range are replaced, so the backfill can be
+        re-run safely. Commits on success.
+        """
+        since = floor_bucket(since, DAY) if since is not None else None
+        until = ceil_bucket(until, DAY) if until is not None else None
+
+        try:
+            totals = self.compute_from_raw(since, until)
+
+            statement = delete(KPIRollup)
+            if since is not None:
+                statement = statement.where(KPIRollup.bucket_start >= since)
+            if until is not None:
+                statement = statement.where(KPIRollup.bucket_start < until)
+            deleted = self.db.execute(statement).rowcount
+
+            self.apply_deltas(dict(totals))
+            self.db.commit()
+
+            logger.info(f"Backfilled {len(totals)} KPI rollup buckets (replaced {deleted})")
+            return {
+                "since": since.isoformat() if since else None,
+                "until": until.isoformat() if until else None,
+                "buckets_written": len([value for value in totals.values() if value]),
+                "buckets_replaced": deleted
+            }
+        except Exception as e:
+            logger.error(f"KPI rollup backfill failed: {e}")
+            self.db.rollback()
+            raise
+
+    def check_consistency(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        tolerance: float = 1e-6,
+        repair: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Compare stored buckets for whole days in [since, until) with raw data
+
+        Args:
+            since: First day to check (default: all history)
+            until: Day after the last day to check (default: open-ended)
+            tolerance: Allowed absolute difference per bucket
+            repair: Backfill every day that has a mismatch
+
+        Returns:
+            Report with the number of checked buckets and the mismatches
+        """
+        since = floor_bucket(since, DAY) if since is not None else None
+        until = ceil_bucket(until, DAY) if until is not None else None
+
+        expected = self.compute_from_raw(since, until)
+
+        query = self.db.query(
+            KPIRollup.user_id, KPIRollup.granularity, KPIRollup.bucket_start,
+            KPIRollup.metric, KPIRollup.value
+        )
+        if since is not None:
+            query = query.filter(KPIRollup.bucket_start >= since)
+        if until is not None:
+            query = query.filter(KPIRollup.bucket_start < until)
+        stored = {(row[0], row[1], row[2], row[3]): row[4] for row in query.all()}
+
+        mismatches = []
+        for key in set(expected) | set(stored):
+            raw_value = expected.get(key, 0.0)
+            rollup_value = stored.get(key, 0.0)
+            if abs(raw_value - rollup_value) > tolerance:
+                user_id, granularity, bucket_start, metric = key
+                mismatches.append({
+                    "user_id": user_id,
+                    "granularity": granularity,
+                    "bucket_start": bucket_start.isoformat(),
+                    "metric": metric,
+                    "raw": raw_value,
+                    "rollup": rollup_value
+                })
+        mismatches.sort(key=lambda item: (item["bucket_start"], item["granularity"], item["metric"]))
+
+        repaired_days = []
+        if repair and mismatches:
+            days = sorted({floor_bucket(datetime.fromisoformat(item["bucket_start"]), DAY) for item in mismatches})
+            for day in days:
+                self.backfill(day, day + timedelta(days=1))
+            repaired_days = [day.date().isoformat() for day in days]
+
+        if mismatches:
+            logger.warning(f"KPI rollups: {len(mismatches)} bucket(s) differ from raw data")
+
+        return {
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat() if until else None,
+            "buckets_checked": len(set(expected) | set(stored)),
+            "consistent": not mismatches,
+            "mismatches": mismatches,
+            "repaired_days": repaired_days
+        }
+
+
+# ----------------------------------------------------------------------
+# Incremental maintenance
+# ----------------------------------------------------------------------
+
+_TRACKED_ATTRIBUTES = {
+    SocialPost: ("user_id", "created_at", "metrics"),
+    ContentPiece: ("user_id", "created_at")
+}
+
+
+def _previous_value(state, attribute: str):
+    """Attribute value before the pending flush"""
+    history = state.attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def _contribution(instance, values: Dict[str, Any]) -> Dict[str, float]:
+    if isinstance(instance, SocialPost):
+        return social_post_contribution(values.get("metrics"))
+    return content_piece_contribution()
+
+
+def _flush_deltas(session: Session) -> Dict[BucketKey, float]:
+    """Bucket deltas for every tracked record inserted, updated or deleted in a flush"""
+    deltas: Dict[BucketKey, float] = defaultdict(float)
+
+    def add(changes: Dict[BucketKey, float]):
+        for key, value in changes.items():
+            deltas[key] += value
+
+    for instance in session.new:
+        attributes = _TRACKED_ATTRIBUTES.get(type(instance))
+        if attributes:
+            values = {name: getattr(instance, name) for name in attributes}
+            add(KPIRollupStore.contribution_deltas(
+                values["user_id"], values["created_at"], _contribution(instance, values)
+            ))
+
+    for instance in session.dirty:
+        attributes = _TRACKED_ATTRIBUTES.get(type(instance))
+        if not attributes:
+            continue
+        state = inspect(instance)
+        if not any(state.attrs[name].history.has_changes() for name in attributes):
+            continue
+        old = {name: _previous_value(state, name) for name in attributes}
+        new = {name: getattr(instance, name) for name in attributes}
+        add(KPIRollupStore.contribution_deltas(
+            old["user_id"], old["created_at"], _contribution(instance, old), sign=-1.0
+        ))
+        add(KPIRollupStore.contribution_deltas(
+            new["user_id"], new["created_at"], _contribution(instance, new)
+        ))
+
+    for instance in session.deleted:
+        attributes = _TRACKED_ATTRIBUTES.get(type(instance))
+        if attributes:
+            state = inspect(instance)
+            old = {name: _previous_value(state, name) for name in attributes}
+            add(KPIRollupStore.contribution_deltas(
+                old["user_id"], old["created_at"], _contribution(instance, old), sign=-1.0
+            ))
+
+    return deltas
+
+
+def _after_flush(session: Session, flush_context):
+    """Apply rollup deltas for the flushed records in the same transaction"""
+    deltas = _flush_deltas(session)
+    if deltas:
+        KPIRollupStore(session).apply_deltas(deltas, connection=session.connection())
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    """No-op 'set' listener; registering it with active_history keeps the old value"""
+    return value
+
+
+def register_rollup_listeners(session_factory) -> None:
+    """
+    Keep kpi_rollups in sync with every flush of sessions from `session_factory`
+
+    Safe to call more than once.
+    """
+    if not event.contains(session_factory, "after_flush", _after_flush):
+        event.listen(session_factory, "after_flush", _after_flush)
+
+    # Make sure overwritten values are loaded so deltas can subtract them
+    for model, attributes in _TRACKED_ATTRIBUTES.items():
+        for name in attributes:
+            attribute = getattr(model, name)
+            if not event.contains(attribute, "set", _load_previous_value):
+                event.listen(attribute, "set", _load_previous_value, active_history=True, retval=True)
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """Command line entry point for backfill and consistency checks"""
+    parser = argparse.ArgumentParser(description="Maintain KPI rollups")
+    parser.add_argument("command", choices=["backfill", "check"])
+    parser.add_argument("--since", help="First day (YYYY-MM-DD), default: all history")
+    parser.add_argument("--until", help="Day after the last day (YYYY-MM-DD), default: open-ended")
+    parser.add_argument("--repair", action="store_true", help="Backfill days that fail the check")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    from app.services.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        store = KPIRollupStore(db)
+        since, until = _parse_date(args.since), _parse_date(args.until)
+        if args.command == "backfill":
+            result = store.backfill(since, until)
+        else:
+            result = store.check_consistency(since, until, repair=args.repair)
+        print(json.dumps(result, indent=2, default=str))
+        return 0 if args.command == "backfill" or result["consistent"] or result["repaired_days"] else 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
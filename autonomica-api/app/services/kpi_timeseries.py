@@ -0,0 +1,234 @@
+"""
+KPI Time-Series Analytics
+Vectorized velocity, momentum, volatility, seasonality and forecasting
+over many KPI series at once (one row per series, one column per period).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Lags averaged into the seasonal strength score
+SEASONAL_LAGS = (1, 2, 3, 6, 12)
+SEASONALITY_MIN_POINTS = 12
+FORECAST_MIN_POINTS = 6
+
+# Holt (double exponential) smoothing factors
+HOLT_ALPHA = 0.3
+HOLT_BETA = 0.1
+
+
+@dataclass
+class SeriesStatistics:
+    """Statistical summary of one KPI series"""
+    velocity: float
+    momentum: float
+    volatility: float
+    seasonality: float
+    forecast: float
+    confidence_interval: Tuple[float, float]
+
+
+def as_matrix(series: Sequence[Sequence[float]]) -> np.ndarray:
+    """Stack equal-length series into a float64 (series x time) matrix"""
+    matrix = np.asarray(series, dtype=np.float64)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2:
+        raise ValueError("Series must be a sequence of equal-length sequences")
+    return matrix
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator, 0.0 where the denominator is zero"""
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.zeros(np.broadcast(numerator, denominator).shape),
+        where=denominator != 0
+    )
+
+
+def _sample_variance(matrix: np.ndarray) -> np.ndarray:
+    """Row-wise sample variance; exactly 0.0 for constant rows"""
+    variance = matrix.var(axis=1, ddof=1)
+    # Float rounding in the mean would otherwise leave a tiny non-zero variance
+    constant = np.all(matrix == matrix[:, :1], axis=1)
+    variance[constant] = 0.0
+    return variance
+
+
+def velocity(matrix: np.ndarray, period_days: int) -> np.ndarray:
+    """Least-squares slope of each row, normalized to the period"""
+    rows, n = matrix.shape
+    if n < 2:
+        return np.zeros(rows)
+
+    x_values = np.arange(n, dtype=np.float64)
+    sum_x = x_values.sum()
+    sum_x2 = (x_values * x_values).sum()
+    sum_y = matrix.sum(axis=1)
+    sum_xy = matrix @ x_values
+
+    denominator = n * sum_x2 - sum_x * sum_x
+    if denominator == 0:
+        return np.zeros(rows)
+
+    slope = (n * sum_xy - sum_x * sum_y) / denominator
+    return slope * (period_days / n)
+
+
+def momentum(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Velocity of the latest window minus the velocity of the window before it"""
+    rows, n = matrix.shape
+    if n < window + 1:
+        return np.zeros(rows)
+
+    recent = matrix[:, -window:]
+    previous = matrix[:, -2 * window:-window] if n >= 2 * window else matrix[:, :-window]
+    return velocity(recent, window) - velocity(previous, window)
+
+
+def volatility(matrix: np.ndarray) -> np.ndarray:
+    """Coefficient of variation (sample standard deviation / mean) of each row"""
+    rows, n = matrix.shape
+    if n < 2:
+        return np.zeros(rows)
+
+    return _safe_divide(np.sqrt(_sample_variance(matrix)), matrix.mean(axis=1))
+
+
+def autocorrelation(matrix: np.ndarray, lags: Sequence[int]) -> np.ndarray:
+    """
+    Autocorrelation of each row at each lag, shape (rows, len(lags))
+
+    Mean and variance are computed once per row and shared by every lag.
+    """
+    rows, n = matrix.shape
+    result = np.zeros((rows, len(lags)))
+    if n < 2:
+        return result
+
+    centered = matrix - matrix.mean(axis=1, keepdims=True)
+    variance = _sample_variance(matrix)
+
+    for column, lag in enumerate(lags):
+        if lag >= n:
+            continue
+        lagged_sum = np.einsum("ij,ij->i", centered[:, :n - lag], centered[:, lag:])
+        result[:, column] = _safe_divide(lagged_sum, (n - lag) * variance)
+
+    return result
+
+
+def seasonality(matrix: np.ndarray) -> np.ndarray:
+    """Mean absolute autocorrelation over the common seasonal lags"""
+    rows, n = matrix.shape
+    if n < SEASONALITY_MIN_POINTS:
+        return np.zeros(rows)
+
+    correlations = autocorrelation(matrix, SEASONAL_LAGS)
+    return np.abs(correlations).sum(axis=1) / len(SEASONAL_LAGS)
+
+
+def holt_forecast(
+    matrix: np.ndarray,
+    horizon: int,
+    alpha: float = HOLT_ALPHA,
+    beta: float = HOLT_BETA
+) -> np.ndarray:
+    """Holt linear-trend forecast `horizon` periods ahead, floored at zero"""
+    rows, n = matrix.shape
+    if n < 3:
+        return matrix[:, -1].copy() if n else np.zeros(rows)
+
+    level = matrix[:, 0].copy()
+    trend = matrix[:, 1] - matrix[:, 0]
+
+    # The recursion runs over time; every step is vectorized across rows
+    for i in range(1, n):
+        previous_level = level
+        level = alpha * matrix[:, i] + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+
+    return np.maximum(0, level + trend * horizon)
+
+
+def confidence_interval(matrix: np.ndarray, confidence_level: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(lower, upper) bounds of the mean of each row"""
+    rows, n = matrix.shape
+    if n < 2:
+        return np.zeros(rows), np.zeros(rows)
+
+    mean = matrix.mean(axis=1)
+    standard_error = np.sqrt(_sample_variance(matrix)) / np.sqrt(n)
+
+    # Z-score for confidence level (simplified)
+    z_score = 1.96 if confidence_level == 0.95 else 1.645
+    margin_of_error = z_score * standard_error
+    return mean - margin_of_error, mean + margin_of_error
+
+
+def analyze_matrix(
+    matrix: np.ndarray,
+    period_days: int,
+    momentum_window: int,
+    forecast_horizon: int,
+    confidence_level: float,
+    include_forecast: bool = True
+) -> Dict[str, np.ndarray]:
+    """All series statistics for an equal-length (series x time) matrix"""
+    rows, n = matrix.shape
+    stats = {
+        "velocity": velocity(matrix, period_days),
+        "momentum": momentum(matrix, momentum_window),
+        "volatility": volatility(matrix),
+        "seasonality": seasonality(matrix),
+        "forecast": np.zeros(rows),
+        "lower": np.zeros(rows),
+        "upper": np.zeros(rows)
+    }
+
+    if include_forecast and n >= FORECAST_MIN_POINTS:
+        stats["forecast"] = holt_forecast(matrix, forecast_horizon)
+        stats["lower"], stats["upper"] = confidence_interval(matrix, confidence_level)
+
+    return stats
+
+
+def analyze_series(
+    series: Sequence[Sequence[float]],
+    period_days: int,
+    momentum_window: int,
+    forecast_horizon: int,
+    confidence_level: float,
+    include_forecast: bool = True
+) -> List[SeriesStatistics]:
+    """
+    Statistics for many series in one pass
+
+    Series may have different lengths; those of equal length are analyzed
+    together as one matrix. Results are returned in input order.
+    """
+    by_length: Dict[int, List[int]] = {}
+    for index, values in enumerate(series):
+        by_length.setdefault(len(values), []).append(index)
+
+    results: List[SeriesStatistics] = [None] * len(series)
+    for length, indexes in by_length.items():
+        matrix = np.asarray([series[i] for i in indexes], dtype=np.float64).reshape(len(indexes), length)
+        stats = analyze_matrix(
+            matrix, period_days, momentum_window, forecast_horizon, confidence_level, include_forecast
+        )
+        for row, index in enumerate(indexes):
+            results[index] = SeriesStatistics(
+                velocity=float(stats["velocity"][row]),
+                momentum=float(stats["momentum"][row]),
+                volatility=float(stats["volatility"][row]),
+                seasonality=float(stats["seasonality"][row]),
+                forecast=float(stats["forecast"][row]),
+                confidence_interval=(float(stats["lower"][row]), float(stats["upper"][row]))
+            )
+
+    return results
@@ -0,0 +1,277 @@
+"""
+Payload Codec Module
+Compact, backward-compatible serialization for values stored in Redis / Vercel KV
+"""
+import json
+import zlib
+import base64
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Encoded payloads look like "~p1:<serializer><compression>:<base64 body>".
+# Plain JSON can never start with "~", so anything without the header is read
+# as a legacy JSON payload. The body is base64 so it survives text-only
+# transports (decode_responses=True Redis clients and the Vercel KV REST API).
+CODEC_HEADER = "~p1:"
+
+SERIALIZER_JSON = "j"
+SERIALIZER_MSGPACK = "m"
+
+COMPRESSION_NONE = "n"
+COMPRESSION_ZLIB = "z"
+COMPRESSION_LZ4 = "l"
+
+SERIALIZER_NAMES = {SERIALIZER_JSON: "json", SERIALIZER_MSGPACK: "msgpack"}
+COMPRESSION_NAMES = {COMPRESSION_NONE: "none", COMPRESSION_ZLIB: "zlib", COMPRESSION_LZ4: "lz4"}
+
+
+class PayloadCodecError(ValueError):
+    """Raised when a stored payload cannot be decoded"""
+
+
+@dataclass
+class CodecStats:
+    """Running totals for encoded payloads"""
+    payloads_encoded: int = 0
+    payloads_compressed: int = 0
+    payloads_decoded: int = 0
+    legacy_payloads_decoded: int = 0
+    raw_bytes: int = 0
+    stored_bytes: int = 0
+
+    @property
+    def compression_ratio(self) -> float:
+        """Serialized size divided by stored size (> 1.0 means savings)"""
+        if self.stored_bytes == 0:
+            return 1.0
+        return self.raw_bytes / self.stored_bytes
+
+    @property
+    def savings_bytes(self) -> int:
+        return max(0, self.raw_bytes - self.stored_bytes)
+
+
+class PayloadCodec:
+    """
+    Serializes values for Redis / Vercel KV
+
+    Small payloads (or all payloads when compression is disabled) are written as
+    plain JSON, exactly like before. Payloads above `compression_threshold` bytes
+    are serialized with msgpack (when installed), compressed with lz4 or zlib and
+    written with a format header; the compressed form is only kept when it is
+    actually smaller. `decode` accepts both forms.
+    """
+
+    def __init__(
+        self,
+        compression_enabled: bool = True,
+        compression_threshold: int = 1024,
+        serializer: str = "auto",
+        compression: str = "auto",
+        zlib_level: int = 6
+    ):
+        self.compression_enabled = compression_enabled
+        self.compression_threshold = compression_threshold
+        self.zlib_level = zlib_level
+        self.serializer = self._select_serializer(serializer)
+        self.compression = self._select_compression(compression)
+        self.stats = CodecStats()
+
+    @staticmethod
+    def _select_serializer(name: str) -> str:
+        if name == "json":
+            return SERIALIZER_JSON
+        if name == "msgpack":
+            if not MSGPACK_AVAILABLE:
+                raise ValueError("msgpack serializer requested but msgpack is not installed")
+            return SERIALIZER_MSGPACK
+        if name == "auto":
+            return SERIALIZER_MSGPACK if MSGPACK_AVAILABLE else SERIALIZER_JSON
+        raise ValueError(f"Unknown serializer: {name}")
+
+    @staticmethod
+    def _select_compression(name: str) -> str:
+        if name == "none":
+            return COMPRESSION_NONE
+        if name == "zlib":
+            return COMPRESSION_ZLIB
+        if name == "lz4":
+            if not LZ4_AVAILABLE:
+                raise ValueError("lz4 compression requested but lz4 is not installed")
+            return COMPRESSION_LZ4
+        if name == "auto":
+            return COMPRESSION_LZ4 if LZ4_AVAILABLE else COMPRESSION_ZLIB
+        raise ValueError(f"Unknown compression: {name}")
+
+    @property
+    def name(self) -> str:
+        """Human-readable codec description, e.g. "msgpack+lz4" or "json" """
+        if not self.compression_enabled or self.compression == COMPRESSION_NONE:
+            return "json"
+        return f"{SERIALIZER_NAMES[self.serializer]}+{COMPRESSION_NAMES[self.compression]}"
+
+    def encode(self, value: Any, compress: Optional[bool] = None) -> str:
+        """Encode a value for storage; `compress` overrides `compression_enabled`"""
+        text = self._dumps_json(value)
+        raw_size = len(text.encode("utf-8"))
+        encoded, stored_size = text, raw_size
+
+        if compress is None:
+            compress = self.compression_enabled
+        if (
+            compress
+            and self.compression != COMPRESSION_NONE
+            and raw_size >= self.compression_threshold
+        ):
+            serializer, body = self._serialize(value, text)
+            candidate = (
+                f"{CODEC_HEADER}{serializer}{self.compression}:"
+                f"{base64.b64encode(self._compress(body)).decode('ascii')}"
+            )
+            if len(candidate) < raw_size:
+                encoded, stored_size = candidate, len(candidate)
+                self.stats.payloads_compressed += 1
+
+        self.stats.payloads_encoded += 1
+        self.stats.raw_bytes += raw_size
+        self.stats.stored_bytes += stored_size
+        return encoded
+
+    def decode(self, payload: Union[str, bytes]) -> Any:
+        """Decode a stored payload written by `encode` or by plain `json.dumps`"""
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8")
+
+        if not payload.startswith(CODEC_HEADER):
+            self.stats.legacy_payloads_decoded += 1
+            return self._loads_json(payload)
+
+        try:
+            header_end = len(CODEC_HEADER)
+            serializer = payload[header_end]
+            compression = payload[header_end + 1]
+            body = base64.b64decode(payload[header_end + 3:])
+            body = self._decompress(body, compression)
+            value = self._deserialize(body, serializer)
+        except PayloadCodecError:
+            raise
+        except Exception as e:
+            raise PayloadCodecError(f"Corrupt encoded payload: {e}") from e
+
+        self.stats.payloads_decoded += 1
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Codec choice and compression totals for stats endpoints"""
+        return {
+            "codec": self.name,
+            "compression_enabled": self.compression_enabled,
+            "compression_threshold": self.compression_threshold,
+            "payloads_encoded": self.stats.payloads_encoded,
+            "payloads_compressed": self.stats.payloads_compressed,
+            "legacy_payloads_decoded": self.stats.legacy_payloads_decoded,
+            "raw_bytes": self.stats.raw_bytes,
+            "stored_bytes": self.stats.stored_bytes,
+            "compression_savings_bytes": self.stats.savings_bytes,
+            "compression_ratio": round(self.stats.compression_ratio, 3)
+        }
+
+    @staticmethod
+    def _dumps_json(value: Any) -> str:
+        """JSON text, falling back to str() for unknown types like json.dumps(default=str)"""
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(
+                    value,
+                    default=str,
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                ).decode("utf-8")
+            except TypeError:
+                # e.g. integers beyond 64 bits; the stdlib encoder handles them
+                pass
+        return json.dumps(value, default=str)
+
+    @staticmethod
+    def _loads_json(text: str) -> Any:
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.loads(text)
+            except orjson.JSONDecodeError:
+                pass
+        return json.loads(text)
+
+    def _serialize(self, value: Any, json_text: str) -> Tuple[str, bytes]:
+        """(serializer flag, body) for a value; falls back to the JSON text"""
+        # msgpack keeps non-str keys and bytes that JSON turns into strings, so
+        # such values use the JSON body to decode the same on both sides of the threshold
+        if self.serializer == SERIALIZER_MSGPACK and self._msgpack_matches_json(value):
+            try:
+                return SERIALIZER_MSGPACK, msgpack.packb(value, default=str, use_bin_type=True)
+            except (TypeError, ValueError, OverflowError) as e:
+                logger.debug(f"msgpack could not serialize payload, using JSON: {e}")
+        return SERIALIZER_JSON, json_text.encode("utf-8")
+
+    @staticmethod
+    def _msgpack_matches_json(value: Any) -> bool:
+        """Whether a msgpack round trip yields the same shape as a JSON round trip"""
+        pending = [value]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, dict):
+                for key, child in item.items():
+                    if not isinstance(key, str):
+                        return False
+                    pending.append(child)
+            elif isinstance(item, (list, tuple)):
+                pending.extend(item)
+            elif isinstance(item, (bytes, bytearray)):
+                return False
+        return True
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.compression == COMPRESSION_LZ4:
+            return lz4.frame.compress(body)
+        return zlib.compress(body, self.zlib_level)
+
+    @staticmethod
+    def _decompress(body: bytes, compression: str) -> bytes:
+        if compression == COMPRESSION_NONE:
+            return body
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(body)
+        if compression == COMPRESSION_LZ4:
+            if not LZ4_AVAILABLE:
+                raise PayloadCodecError("Payload is lz4-compressed but lz4 is not installed")
+            return lz4.frame.decompress(body)
+        raise PayloadCodecError(f"Unknown compression flag: {compression}")
+
+    def _deserialize(self, body: bytes, serializer: str) -> Any:
+        if serializer == SERIALIZER_JSON:
+            return self._loads_json(body.decode("utf-8"))
+        if serializer == SERIALIZER_MSGPACK:
+            if not MSGPACK_AVAILABLE:
+                raise PayloadCodecError("Payload is msgpack-encoded but msgpack is not installed")
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        raise PayloadCodecError(f"Unknown serializer flag: {serializer}")
+
@@ -5,19 +5,75 @@ Handles Redis operations for caching, queues, and session management
 
 import json
 import logging
+import time
 from typing import Any, Optional, List, Dict, Union
 import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+class RedisPipeline:
+    """
+    Buffers Redis commands and sends them in a single round trip
+    
+    Commands use the redis-py client signatures and are queued synchronously;
+    they are executed when the ``async with`` block exits and the replies are
+    available afterwards in ``results`` (in queue order). If Redis is
+    unavailable the commands are dropped and ``results`` stays empty.
+    """
+    
+    def __init__(self, service: "RedisService", transaction: bool = False):
+        self._service = service
+        self._transaction = transaction
+        self._pipe = None
+        self.results: List[Any] = []
+    
+    async def __aenter__(self) -> "RedisPipeline":
+        if await self._service._ensure_connected():
+            self._pipe = self._service.redis_client.pipeline(transaction=self._transaction)
+        return self
+    
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        
+        def queue(*args, **kwargs) -> "RedisPipeline":
+            if self._pipe is not None:
+                getattr(self._pipe, name)(*args, **kwargs)
+            return self
+        
+        return queue
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._pipe is None:
+            return False
+        try:
+            if exc_type is None:
+                self.results = await self._pipe.execute(raise_on_error=False)
+        except Exception as e:
+            self._service._record_failure(e)
+            logger.error(f"Failed to execute Redis pipeline: {e}")
+        finally:
+            await self._pipe.reset()
+            self._pipe = None
+        return False
+
 class RedisService:
     """Service for Redis operations"""
     
-    def __init__(self, redis_url: str = None):
+    def __init__(self, redis_url: str = None, health_check_interval: float = 30.0):
         """Initialize Redis connection"""
         self.redis_url = redis_url or "redis://localhost:6379"
         self.redis_client = None
+        
+        # Connection health is tracked from command outcomes and re-verified with
+        # a PING at most once per interval, instead of before every command
+        self.health_check_interval = health_check_interval
+        self.reconnect_backoff = 5.0
+        self._healthy = False
+        self._last_health_check = 0.0
+        
         self._connect()
     
     def _connect(self):
@@ -36,30 +92,57 @@ class RedisService:
             self.redis_client = None
     
     async def is_connected(self) -> bool:
-        """Check if Redis is connected"""
+        """Check if Redis is connected (always issues a PING)"""
         if not self.redis_client:
             return False
         
         try:
             await self.redis_client.ping()
-            return True
+            self._healthy = True
         except Exception:
+            self._healthy = False
+        
+        self._last_health_check = time.monotonic()
+        return self._healthy
+    
+    async def _ensure_connected(self) -> bool:
+        """Cheap connection check used on the command path"""
+        if not self.redis_client:
             return False
+        
+        elapsed = time.monotonic() - self._last_health_check
+        if self._healthy and elapsed < self.health_check_interval:
+            return True
+        if not self._healthy and elapsed < self.reconnect_backoff:
+            return False
+        
+        return await self.is_connected()
+    
+    def _record_failure(self, error: Exception):
+        """Mark the connection unhealthy after a connection-level error"""
+        if isinstance(error, (RedisConnectionError, RedisTimeoutError, ConnectionError, TimeoutError)):
+            self._healthy = False
+            self._last_health_check = time.monotonic()
+    
+    def pipeline(self, transaction: bool = False) -> RedisPipeline:
+        """Create a pipeline for sending many commands in one round trip"""
+        return RedisPipeline(self, transaction=transaction)
     
     async def get(self, key: str) -> Optional[str]:
         """Get value by key"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return None
             return await self.redis_client.get(key)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to get key {key}: {e}")
             return None
     
     async def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
         """Set key-value pair with optional expiration"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return False
             
             if ex:
@@ -67,111 +150,187 @@ class RedisService:
             else:
                 return await self.redis_client.set(key, value)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to set key {key}: {e}")
             return False
     
     async def delete(self, key: str) -> bool:
         """Delete key"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return False
             result = await self.redis_client.delete(key)
             return result > 0
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to delete key {key}: {e}")
             return False
     
     async def exists(self, key: str) -> bool:
         """Check if key exists"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return False
             result = await self.redis_client.exists(key)
             return result > 0
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to check existence of key {key}: {e}")
             return False
     
     async def expire(self, key: str, seconds: int) -> bool:
         """Set expiration for key"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return False
             return await self.redis_client.expire(key, seconds)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to set expiration for key {key}: {e}")
             return False
     
     async def ttl(self, key: str) -> int:
         """Get time to live for key"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return -2
             return await self.redis_client.ttl(key)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to get TTL for key {key}: {e}")
             return -2
     
+    async def scan_keys(self, pattern: str, count: int = 1000) -> List[str]:
+        """Incrementally collect keys matching a pattern using SCAN (never KEYS)"""
+        try:
+            if not await self._ensure_connected():
+                return []
+            return [key async for key in self.redis_client.scan_iter(match=pattern, count=count)]
+        except Exception as e:
+            self._record_failure(e)
+            logger.error(f"Failed to scan keys for pattern {pattern}: {e}")
+            return []
+    
+    # Batch operations
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Get many keys in one round trip (None for missing keys)"""
+        try:
+            if not keys:
+                return []
+            if not await self._ensure_connected():
+                return [None] * len(keys)
+            return await self.redis_client.mget(keys)
+        except Exception as e:
+            self._record_failure(e)
+            logger.error(f"Failed to mget {len(keys)} keys: {e}")
+            return [None] * len(keys)
+    
+    async def mset_with_ttl(self, mapping: Dict[str, str], ex: Optional[int] = None) -> bool:
+        """Set many key-value pairs with a shared optional expiration in one round trip"""
+        if not mapping:
+            return True
+        
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex or None)
+        
+        return len(pipe.results) == len(mapping) and all(
+            result is True for result in pipe.results
+        )
+    
+    async def zadd_multi(self, key: str, mapping: Dict[str, float]) -> int:
+        """Add many members to a sorted set in one command"""
+        try:
+            if not mapping:
+                return 0
+            if not await self._ensure_connected():
+                return 0
+            return await self.redis_client.zadd(key, mapping)
+        except Exception as e:
+            self._record_failure(e)
+            logger.error(f"Failed to zadd {len(mapping)} members to {key}: {e}")
+            return 0
+    
+    async def hset_multi(self, key: str, mapping: Dict[str, str]) -> bool:
+        """Set many hash fields in one command"""
+        try:
+            if not mapping:
+                return True
+            if not await self._ensure_connected():
+                return False
+            result = await self.redis_client.hset(key, mapping=mapping)
+            return result >= 0
+        except Exception as e:
+            self._record_failure(e)
+            logger.error(f"Failed to hset {len(mapping)} fields in {key}: {e}")
+            return False
+    
     # List operations
     async def lpush(self, key: str, value: str) -> bool:
         """Push value to left of list"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return False
             result = await self.redis_client.lpush(key, value)
             return result > 0
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to lpush to {key}: {e}")
             return False
     
     async def rpush(self, key: str, value: str) -> bool:
         """Push value to right of list"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return False
             result = await self.redis_client.rpush(key, value)
             return result > 0
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to rpush to {key}: {e}")
             return False
     
     async def lpop(self, key: str) -> Optional[str]:
         """Pop value from left of list"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return None
             return await self.redis_client.lpop(key)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to lpop from {key}: {e}")
             return None
     
     async def rpop(self, key: str) -> Optional[str]:
         """Pop value from right of list"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return None
             return await self.redis_client.rpop(key)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to rpop from {key}: {e}")
             return None
     
     async def lrange(self, key: str, start: int, stop: int) -> List[str]:
         """Get range of values from list"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return []
             return await self.redis_client.lrange(key, start, stop)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to lrange from {key}: {e}")
             return []
     
     async def llen(self, key: str) -> int:
         """Get length of list"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return 0
             return await self.redis_client.llen(key)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to get length of list {key}: {e}")
             return 0
     
@@ -179,52 +338,90 @@ class RedisService:
     async def zadd(self, key: str, score: float, member: str) -> bool:
         """Add member to sorted set with score"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return False
             result = await self.redis_client.zadd(key, {member: score})
             return result > 0
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to zadd to {key}: {e}")
             return False
     
-    async def zrem(self, key: str, member: str) -> bool:
-        """Remove member from sorted set"""
+    async def zrem(self, key: str, *members: str) -> bool:
+        """Remove one or more members from sorted set"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
+                return False
+            if not members:
                 return False
-            result = await self.redis_client.zrem(key, member)
+            result = await self.redis_client.zrem(key, *members)
             return result > 0
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to zrem from {key}: {e}")
             return False
     
     async def zrange(self, key: str, start: int, stop: int, withscores: bool = False) -> Union[List[str], List[tuple]]:
         """Get range of members from sorted set"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return []
             return await self.redis_client.zrange(key, start, stop, withscores=withscores)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to zrange from {key}: {e}")
             return []
     
-    async def zrangebyscore(self, key: str, min_score: float, max_score: float) -> List[str]:
-        """Get members with scores in range"""
+    async def zrangebyscore(
+        self,
+        key: str,
+        min_score: Union[float, str],
+        max_score: Union[float, str],
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+        withscores: bool = False
+    ) -> Union[List[str], List[tuple]]:
+        """Get members with scores in range (ascending), optionally paginated"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return []
-            return await self.redis_client.zrangebyscore(key, min_score, max_score)
+            return await self.redis_client.zrangebyscore(
+                key, min_score, max_score, start=start, num=num, withscores=withscores
+            )
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to zrangebyscore from {key}: {e}")
             return []
     
+    async def zrevrangebyscore(
+        self,
+        key: str,
+        max_score: Union[float, str],
+        min_score: Union[float, str],
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+        withscores: bool = False
+    ) -> Union[List[str], List[tuple]]:
+        """Get members with scores in range (descending), optionally paginated"""
+        try:
+            if not await self._ensure_connected():
+                return []
+            return await self.redis_client.zrevrangebyscore(
+                key, max_score, min_score, start=start, num=num, withscores=withscores
+            )
+        except Exception as e:
+            self._record_failure(e)
+            logger.error(f"Failed to zrevrangebyscore from {key}: {e}")
+            return []
+    
     async def zcard(self, key: str) -> int:
         """Get cardinality of sorted set"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return 0
             return await self.redis_client.zcard(key)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to get cardinality of sorted set {key}: {e}")
             return 0
     
@@ -232,42 +429,46 @@ class RedisService:
     async def hset(self, key: str, field: str, value: str) -> bool:
         """Set field in hash"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return False
             result = await self.redis_client.hset(key, field, value)
             return result >= 0
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to hset {field} in {key}: {e}")
             return False
     
     async def hget(self, key: str, field: str) -> Optional[str]:
         """Get field from hash"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return None
             return await self.redis_client.hget(key, field)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to hget {field} from {key}: {e}")
             return None
     
     async def hgetall(self, key: str) -> Dict[str, str]:
         """Get all fields from hash"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return {}
             return await self.redis_client.hgetall(key)
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to hgetall from {key}: {e}")
             return {}
     
     async def hdel(self, key: str, field: str) -> bool:
         """Delete field from hash"""
         try:
-            if not await self.is_connected():
+            if not await self._ensure_connected():
                 return False
             result = await self.redis_client.hdel(key, field)
             return result > 0
         except Exception as e:
+            self._record_failure(e)
             logger.error(f"Failed to hdel {field} from {key}: {e}")
             return False
     
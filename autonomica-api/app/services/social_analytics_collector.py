@@ -759,30 +759,43 @@ class SocialAnalyticsCollector:
     async def _store_collected_metrics(self, collection_job: AnalyticsCollectionJob):
         """Store collected metrics in the database"""
         try:
-            for platform, platform_metrics in collection_job.results.items():
-                if platform_metrics.error_message:
+            collected = {
+                platform: platform_metrics
+                for platform, platform_metrics in collection_job.results.items()
+                if not platform_metrics.error_message
+            }
+            if not collected:
+                return
+            
+            collected_at = datetime.utcnow().isoformat()
+            
+            # Load the posts for every collected platform in one query
+            social_posts = self.db.query(SocialPost).filter(
+                SocialPost.content_id == collection_job.content_id,
+                SocialPost.platform.in_(list(collected.keys()))
+            ).all()
+            
+            updated_platforms = set()
+            for social_post in social_posts:
+                if social_post.platform in updated_platforms:
                     continue
+                updated_platforms.add(social_post.platform)
+                platform_metrics = collected[social_post.platform]
                 
-                # Update social post metrics
-                social_post = self.db.query(SocialPost).filter(
-                    SocialPost.content_id == collection_job.content_id,
-                    SocialPost.platform == platform
-                ).first()
+                # Merge new metrics with existing ones
+                existing_metrics = dict(social_post.metrics or {})
+                existing_metrics.update({
+                    "last_collected": collected_at,
+                    "collection_job_id": collection_job.job_id,
+                    "metrics": platform_metrics.metrics,
+                    "raw_data": platform_metrics.raw_data
+                })
+                social_post.metrics = existing_metrics
                 
-                if social_post:
-                    # Merge new metrics with existing ones
-                    existing_metrics = social_post.metrics or {}
-                    existing_metrics.update({
-                        "last_collected": datetime.utcnow().isoformat(),
-                        "collection_job_id": collection_job.job_id,
-                        "metrics": platform_metrics.metrics,
-                        "raw_data": platform_metrics.raw_data
-                    })
-                    
-                    social_post.metrics = existing_metrics
-                    self.db.commit()
-                    
-                    logger.info(f"Updated metrics for {platform} post {social_post.id}")
+                logger.info(f"Updated metrics for {social_post.platform} post {social_post.id}")
+            
+            if updated_platforms:
+                self.db.commit()
             
         except Exception as e:
             logger.error(f"Failed to store collected metrics: {e}")
@@ -17,6 +17,7 @@ from celery import Celery
 
 from app.models.schema import SocialPost, ContentPiece, ContentStatus
 from app.services.redis_service import RedisService
+from app.services.db_offload import run_db
 from app.services.cache_service import CacheService
 from app.services.social_scheduler import ContentType, PlatformType, SocialMediaScheduler
 
@@ -664,23 +665,29 @@ class SocialMediaPublisher:
             if not client:
                 raise ValueError(f"No client available for platform {platform}")
             
-            # Get content
-            content = self.db.query(ContentPiece).filter(
-                ContentPiece.id == content_id
-            ).first()
-            
-            if not content:
-                raise ValueError(f"Content {content_id} not found")
-            
-            # Update status to publishing
-            social_post = self.db.query(SocialPost).filter(
-                SocialPost.content_id == content_id,
-                SocialPost.platform == platform.value
-            ).first()
+            def mark_publishing(session: Session) -> ContentPiece:
+                # Get content
+                content = session.query(ContentPiece).filter(
+                    ContentPiece.id == content_id
+                ).first()
+                
+                if not content:
+                    raise ValueError(f"Content {content_id} not found")
+                
+                # Update status to publishing
+                social_post = session.query(SocialPost).filter(
+                    SocialPost.content_id == content_id,
+                    SocialPost.platform == platform.value
+                ).first()
+                
+                if social_post:
+                    social_post.status = ContentStatus.IN_REVIEW  # Using existing enum
+                    session.commit()
+                    # Reload now so the platform client never lazy-loads on the event loop
+                    session.refresh(content)
+                return content
             
-            if social_post:
-                social_post.status = ContentStatus.IN_REVIEW  # Using existing enum
-                self.db.commit()
+            content = await run_db(self.db, mark_publishing)
             
             # Publish to platform
             result = await client.publish_content(content, schedule_data)
@@ -699,15 +706,18 @@ class SocialMediaPublisher:
         """Handle successful publishing"""
         try:
             # Update database
-            social_post = self.db.query(SocialPost).filter(
-                SocialPost.content_id == schedule_data["content_id"],
-                SocialPost.platform == schedule_data["platform"]
-            ).first()
+            def mark_published(session: Session):
+                social_post = session.query(SocialPost).filter(
+                    SocialPost.content_id == schedule_data["content_id"],
+                    SocialPost.platform == schedule_data["platform"]
+                ).first()
+                
+                if social_post:
+                    social_post.status = ContentStatus.PUBLISHED
+                    social_post.metrics = result.get("metrics", {})
+                    session.commit()
             
-            if social_post:
-                social_post.status = ContentStatus.PUBLISHED
-                social_post.metrics = result.get("metrics", {})
-                self.db.commit()
+            await run_db(self.db, mark_published)
             
             # Add to analytics queue for metrics collection
             await self._add_to_analytics_queue(schedule_data, result)
@@ -742,14 +752,17 @@ class SocialMediaPublisher:
                 
             else:
                 # Max retries exceeded, mark as failed
-                social_post = self.db.query(SocialPost).filter(
-                    SocialPost.content_id == schedule_data["content_id"],
-                    SocialPost.platform == schedule_data["platform"]
-                ).first()
+                def mark_failed(session: Session):
+                    social_post = session.query(SocialPost).filter(
+                        SocialPost.content_id == schedule_data["content_id"],
+                        SocialPost.platform == schedule_data["platform"]
+                    ).first()
+                    
+                    if social_post:
+                        social_post.status = ContentStatus.REJECTED  # Using existing enum
+                        session.commit()
                 
-                if social_post:
-                    social_post.status = ContentStatus.REJECTED  # Using existing enum
-                    self.db.commit()
+                await run_db(self.db, mark_failed)
                 
                 logger.error(f"Post {schedule_data['content_id']} failed after {max_retries} retries")
                 
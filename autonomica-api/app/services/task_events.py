@@ -0,0 +1,232 @@
+"""
+Task Event Hub
+Per-user fan-out of task and workflow status changes for server-sent events
+
+Producers (TaskMonitor listeners, the tasks router) publish small deltas; the
+hub stamps each with a monotonically increasing id, keeps the most recent
+events per user for replay, and pushes them to every open stream of that user.
+A client reconnecting with Last-Event-ID gets the events it missed, or a
+"reset" event when they are no longer available (it should then refetch a
+snapshot, e.g. /tasks/status/live). Idle streams receive heartbeat comments
+so proxies keep the connection open. A user's history is dropped once they
+have had no open stream and no new event for idle_ttl_seconds.
+
+The hub is in-process: each API replica streams the changes it observes.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TaskEvent:
+    """A single status delta delivered to a user's streams"""
+    id: int
+    user_id: str
+    type: str
+    data: Dict[str, Any]
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    def to_sse(self) -> str:
+        payload = json.dumps({**self.data, "type": self.type, "timestamp": self.created_at}, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+@dataclass(eq=False)
+class _Subscription:
+    queue: "asyncio.Queue[TaskEvent]"
+    overflowed: bool = False
+
+
+@dataclass
+class _UserChannel:
+    history: Deque[TaskEvent]
+    subscribers: Set[_Subscription] = field(default_factory=set)
+    evicted_through: int = 0  # id of the newest event dropped from history
+    last_active: float = field(default_factory=time.monotonic)
+
+
+class TaskEventHub:
+    """Fan task status deltas out to each user's open event streams"""
+
+    def __init__(
+        self,
+        replay_size: int = 256,
+        queue_size: int = 100,
+        heartbeat_seconds: float = 15.0,
+        idle_ttl_seconds: float = 3600.0,
+    ):
+        self.replay_size = replay_size
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._channels: Dict[str, _UserChannel] = {}
+        # Newest event id of any channel dropped for being idle; channels created
+        # later treat older resume points as expired
+        self._idle_evicted_through = 0
+        self._last_idle_sweep = time.monotonic()
+        # Ids continue from the wall clock so they keep increasing across restarts
+        self.first_event_id = int(time.time() * 1000)
+        self._last_event_id = self.first_event_id - 1
+        self.stats = {"published": 0, "delivered": 0, "overflows": 0, "resets": 0, "idle_evictions": 0}
+
+    def _channel(self, user_id: str) -> _UserChannel:
+        channel = self._channels.get(user_id)
+        if channel is None:
+            self._evict_idle_channels()
+            channel = _UserChannel(history=deque(), evicted_through=self._idle_evicted_through)
+            self._channels[user_id] = channel
+        channel.last_active = time.monotonic()
+        return channel
+
+    def _evict_idle_channels(self, force: bool = False) -> int:
+        """Drop channels without subscribers that saw no activity for idle_ttl_seconds"""
+        now = time.monotonic()
+        if not force and now - self._last_idle_sweep < self.idle_ttl_seconds / 4:
+            return 0
+        self._last_idle_sweep = now
+        cutoff = now - self.idle_ttl_seconds
+        idle = [
+            user_id for user_id, channel in self._channels.items()
+            if not channel.subscribers and channel.last_active < cutoff
+        ]
+        for user_id in idle:
+            channel = self._channels.pop(user_id)
+            if channel.history:
+                self._idle_evicted_through = max(self._idle_evicted_through, channel.history[-1].id)
+        self.stats["idle_evictions"] += len(idle)
+        return len(idle)
+
+    def subscriber_count(self, user_id: Optional[str] = None) -> int:
+        if user_id is not None:
+            channel = self._channels.get(user_id)
+            return len(channel.subscribers) if channel else 0
+        return sum(len(channel.subscribers) for channel in self._channels.values())
+
+    def publish(self, user_id: Optional[str], event_type: str, data: Dict[str, Any]) -> Optional[TaskEvent]:
+        """Record an event for a user and push it to their streams (must run on the event loop thread)"""
+        if not user_id:
+            return None
+
+        self._last_event_id += 1
+        event = TaskEvent(id=self._last_event_id, user_id=user_id, type=event_type, data=data)
+        channel = self._channel(user_id)
+
+        channel.history.append(event)
+        if len(channel.history) > self.replay_size:
+            channel.evicted_through = channel.history.popleft().id
+
+        for subscription in channel.subscribers:
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+                self.stats["delivered"] += 1
+            except asyncio.QueueFull:
+                # Slow client: stop queueing and tell it to resync instead of blocking producers
+                subscription.overflowed = True
+                self.stats["overflows"] += 1
+
+        self.stats["published"] += 1
+        return event
+
+    def replay(self, user_id: str, last_event_id: int) -> Optional[list]:
+        """Events after last_event_id, or None when some of them are no longer available"""
+        channel = self._channels.get(user_id)
+        evicted_through = channel.evicted_through if channel else self._idle_evicted_through
+        if last_event_id < self.first_event_id - 1 or last_event_id < evicted_through:
+            return None
+        return [event for event in channel.history if event.id > last_event_id] if channel else []
+
+    def _reset_event(self, reason: str) -> str:
+        self.stats["resets"] += 1
+        payload = json.dumps({"type": "reset", "reason": reason})
+        return f"id: {self._last_event_id}\nevent: reset\ndata: {payload}\n\n"
+
+    async def stream(self, user_id: str, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+        """Yield SSE frames for a user until the consumer stops iterating"""
+        subscription = _Subscription(queue=asyncio.Queue(maxsize=self.queue_size))
+        channel = self._channel(user_id)
+        channel.subscribers.add(subscription)
+        try:
+            yield f"retry: {int(self.heartbeat_seconds * 1000)}\n\n"
+
+            # Events published after subscribing but before the replay are in both;
+            # queued events at or below this id were already sent by the replay
+            replayed_through = 0
+            if last_event_id is not None:
+                missed = self.replay(user_id, last_event_id)
+                if missed is None:
+                    yield self._reset_event("events_expired")
+                else:
+                    replayed_through = last_event_id
+                    for event in missed:
+                        replayed_through = event.id
+                        yield event.to_sse()
+            else:
+                yield f"id: {self._last_event_id}\nevent: ready\ndata: {{}}\n\n"
+
+            while True:
+                if subscription.overflowed:
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    subscription.overflowed = False
+                    yield self._reset_event("client_too_slow")
+                    continue
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event.id <= replayed_through:
+                    continue
+                yield event.to_sse()
+        finally:
+            channel.subscribers.discard(subscription)
+            channel.last_active = time.monotonic()
+            if not channel.subscribers and not channel.history:
+                self._channels.pop(user_id, None)
+
+    def attach_monitor(self, monitor) -> None:
+        """Publish status changes seen by a TaskMonitor"""
+        monitor.add_listener(self._on_monitor_change)
+
+    def _on_monitor_change(self, kind: str, entity: Any, previous_status: Any) -> None:
+        status = getattr(entity.status, "value", entity.status)
+        previous = getattr(previous_status, "value", previous_status)
+        if kind == "workflow":
+            self.publish(entity.user_id, "workflow.status", {
+                "workflow_id": entity.id,
+                "name": entity.name,
+                "status": status,
+                "previous_status": previous,
+                "total_cost": entity.total_cost,
+            })
+        else:
+            self.publish(entity.metadata.get("user_id"), "task.status", {
+                "task_id": entity.id,
+                "workflow_id": entity.metadata.get("workflow_id"),
+                "title": entity.title,
+                "status": status,
+                "previous_status": previous,
+                "assigned_to": entity.assigned_to,
+                "updated_at": entity.updated_at,
+            })
+
+
+task_event_hub = TaskEventHub(
+    replay_size=settings.TASK_EVENTS_REPLAY_SIZE,
+    queue_size=settings.TASK_EVENTS_QUEUE_SIZE,
+    heartbeat_seconds=settings.TASK_EVENTS_HEARTBEAT_SECONDS,
+    idle_ttl_seconds=settings.TASK_EVENTS_IDLE_TTL_SECONDS,
+)
@@ -0,0 +1,478 @@
+"""
+Task Repository
+Persistent storage for API tasks with secondary indexes and per-user counters
+
+Every task is indexed by user, by (user, status) and by (user, agent), ordered
+by creation time, so listing a user's or an agent's tasks never scans other
+users' data. Per-user counters (total, by status, priority, agent type and
+agent/status) are adjusted on every write from the difference between the old
+and new task, which keeps stats and summaries O(1) per request.
+
+Two backends share that logic: Redis (shared across API replicas and restarts)
+and an in-process store used when Redis is not configured or reachable.
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+from abc import ABC, abstractmethod
+from bisect import bisect_right, insort
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "in_progress")
+MAX_PAGE_SIZE = 500
+
+# (creation score, task id) of the last task a page returned
+CursorPosition = Tuple[float, str]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(position: CursorPosition) -> str:
+    """Encode a list position as an opaque URL-safe cursor"""
+    score, task_id = position
+    raw = f"{score!r}|{task_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> CursorPosition:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, task_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return float(score), task_id
+    except (ValueError, binascii.Error, UnicodeDecodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def task_score(task: Dict[str, Any]) -> float:
+    """Sort score of a task: its creation time as a POSIX timestamp"""
+    created_at = datetime.fromisoformat(task["created_at"])
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.timestamp()
+
+
+def task_indexes(task: Dict[str, Any]) -> List[str]:
+    """Names of the secondary indexes a task belongs to"""
+    user_id = task["user_id"]
+    indexes = [f"user:{user_id}", f"user:{user_id}:status:{task['status']}"]
+    if task.get("agent_id"):
+        indexes.append(f"user:{user_id}:agent:{task['agent_id']}")
+    return indexes
+
+
+def task_counter_fields(task: Dict[str, Any]) -> List[str]:
+    """Per-user counter fields a task contributes 1 to"""
+    fields = [
+        "total",
+        f"status:{task['status']}",
+        f"priority:{task['priority']}",
+        f"agent_type:{task.get('agent_type') or 'unassigned'}",
+    ]
+    if task.get("agent_id"):
+        fields.append(f"agent:{task['agent_id']}:{task['status']}")
+    return fields
+
+
+def index_changes(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """Indexes to remove the task from and to add it to when it changes from old to new"""
+    old_indexes = task_indexes(old) if old else []
+    new_indexes = task_indexes(new) if new else []
+    removed = [index for index in old_indexes if index not in new_indexes]
+    added = [index for index in new_indexes if index not in old_indexes]
+    return removed, added
+
+
+def counter_changes(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Counter increments (and decrements) for a task changing from old to new"""
+    changes: Counter = Counter()
+    for field in task_counter_fields(old) if old else []:
+        changes[field] -= 1
+    for field in task_counter_fields(new) if new else []:
+        changes[field] += 1
+    return {field: delta for field, delta in changes.items() if delta}
+
+
+def summarize_counters(counters: Dict[str, int]) -> Dict[str, Any]:
+    """Turn raw counter fields into the stats structure used by the API"""
+    summary: Dict[str, Any] = {
+        "total_tasks": counters.get("total", 0),
+        "by_status": {},
+        "by_priority": {},
+        "by_agent_type": {},
+        "by_agent": {},
+    }
+    groups = {"status": "by_status", "priority": "by_priority", "agent_type": "by_agent_type"}
+    for field, count in counters.items():
+        if count <= 0 or field == "total":
+            continue
+        kind, _, rest = field.partition(":")
+        if kind == "agent":
+            agent_id, _, status = rest.rpartition(":")
+            summary["by_agent"].setdefault(agent_id, {})[status] = count
+        elif kind in groups:
+            summary[groups[kind]][rest] = count
+    return summary
+
+
+class TaskRepository(ABC):
+    """
+    Base class for task storage backends
+
+    Subclasses provide storage primitives (load, save with index/counter
+    changes, index range reads); listing, pagination and stats are shared.
+    """
+
+    backend = "base"
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        tasks = await self.get_many([task_id])
+        return tasks[0] if tasks else None
+
+    @abstractmethod
+    async def get_many(self, task_ids: List[str]) -> List[Dict[str, Any]]:
+        """Load tasks by id, skipping ids that don't exist (order preserved)"""
+
+    @abstractmethod
+    async def create(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a new task and register it in its indexes and counters"""
+
+    @abstractmethod
+    async def update(self, task_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply changes to a task, keeping indexes and counters in sync; None if missing"""
+
+    @abstractmethod
+    async def delete(self, task_id: str) -> bool:
+        """Remove a task with its index entries and counters; False if missing"""
+
+    @abstractmethod
+    async def get_counters(self, user_id: str) -> Dict[str, int]:
+        """Raw per-user counter fields (see task_counter_fields)"""
+
+    @abstractmethod
+    async def _range_after(
+        self, index: str, after: Optional[CursorPosition], count: int
+    ) -> List[CursorPosition]:
+        """Up to count (score, task_id) index entries strictly after a position"""
+
+    async def get_stats(self, user_id: str) -> Dict[str, Any]:
+        return summarize_counters(await self.get_counters(user_id))
+
+    async def list_tasks(
+        self,
+        user_id: str,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        agent_type: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of a user's tasks in creation order
+
+        The narrowest index (agent, status or user) is walked from the cursor;
+        agent_type and priority are checked on the loaded tasks. Returns the
+        page and the cursor of the next page (None when there are no more).
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if agent_id:
+            index = f"user:{user_id}:agent:{agent_id}"
+        elif status:
+            index = f"user:{user_id}:status:{status}"
+        else:
+            index = f"user:{user_id}"
+
+        def matches(task: Dict[str, Any]) -> bool:
+            return (
+                (status is None or task["status"] == status)
+                and (agent_type is None or task.get("agent_type") == agent_type)
+                and (priority is None or task["priority"] == priority)
+            )
+
+        position = decode_cursor(cursor) if cursor else None
+        page: List[Dict[str, Any]] = []
+        while True:
+            entries = await self._range_after(index, position, limit)
+            if not entries:
+                return page, None
+            tasks = {task["id"]: task for task in await self.get_many([task_id for _, task_id in entries])}
+            for entry in entries:
+                task = tasks.get(entry[1])
+                if task and matches(task):
+                    page.append(task)
+                    if len(page) == limit:
+                        return page, encode_cursor(entry)
+            if len(entries) < limit:
+                return page, None
+            position = entries[-1]
+
+    async def count_tasks(
+        self,
+        user_id: str,
+        status: Optional[str] = None,
+        agent_type: Optional[str] = None,
+        priority: Optional[str] = None,
+    ) -> int:
+        """Number of a user's tasks matching the filters, from counters where possible"""
+        filters = [
+            f"{kind}:{value}"
+            for kind, value in (("status", status), ("agent_type", agent_type), ("priority", priority))
+            if value is not None
+        ]
+        if len(filters) <= 1:
+            counters = await self.get_counters(user_id)
+            return counters.get(filters[0] if filters else "total", 0)
+
+        # Combined filters have no precomputed counter; walk the status index (or the user's tasks)
+        count = 0
+        cursor = None
+        while True:
+            page, cursor = await self.list_tasks(
+                user_id, status=status, agent_type=agent_type, priority=priority,
+                limit=MAX_PAGE_SIZE, cursor=cursor
+            )
+            count += len(page)
+            if cursor is None:
+                return count
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryTaskRepository(TaskRepository):
+    """Process-local task store (single replica, lost on restart)"""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._indexes: Dict[str, List[CursorPosition]] = {}
+        self._counters: Dict[str, Counter] = {}
+
+    def _save(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        task = new or old
+        removed, added = index_changes(old, new)
+        for index in removed:
+            position = (task_score(old), old["id"])
+            entries = self._indexes.get(index, [])
+            i = bisect_right(entries, position) - 1
+            if i >= 0 and entries[i] == position:
+                del entries[i]
+            if not entries:
+                self._indexes.pop(index, None)
+        for index in added:
+            insort(self._indexes.setdefault(index, []), (task_score(new), new["id"]))
+
+        counters = self._counters.setdefault(task["user_id"], Counter())
+        counters.update(counter_changes(old, new))
+
+        if new:
+            self._tasks[new["id"]] = new
+        else:
+            self._tasks.pop(old["id"], None)
+
+    async def get_many(self, task_ids: List[str]) -> List[Dict[str, Any]]:
+        return [dict(self._tasks[task_id]) for task_id in task_ids if task_id in self._tasks]
+
+    async def create(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        self._save(self._tasks.get(task["id"]), dict(task))
+        return dict(task)
+
+    async def update(self, task_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        old = self._tasks.get(task_id)
+        if old is None:
+            return None
+        new = {**old, **changes}
+        self._save(old, new)
+        return dict(new)
+
+    async def delete(self, task_id: str) -> bool:
+        old = self._tasks.get(task_id)
+        if old is None:
+            return False
+        self._save(old, None)
+        return True
+
+    async def get_counters(self, user_id: str) -> Dict[str, int]:
+        return {field: count for field, count in self._counters.get(user_id, {}).items() if count}
+
+    async def _range_after(
+        self, index: str, after: Optional[CursorPosition], count: int
+    ) -> List[CursorPosition]:
+        entries = self._indexes.get(index, [])
+        start = bisect_right(entries, after) if after else 0
+        return entries[start:start + count]
+
+
+class RedisTaskRepository(TaskRepository):
+    """
+    Redis-backed task store shared by all API replicas
+
+    Keys (under the configured prefix):
+      task:{id}        JSON task document
+      idx:{index}      sorted set of task ids scored by creation time
+      counts:{user}    hash of counter fields
+    Updates run in WATCH/MULTI transactions so concurrent transitions of the
+    same task never double-count.
+    """
+
+    backend = "redis"
+
+    def __init__(self, client, prefix: str = "tasks", max_retries: int = 10):
+        self.client = client
+        self.prefix = prefix
+        self.max_retries = max_retries
+
+    def _task_key(self, task_id: str) -> str:
+        return f"{self.prefix}:task:{task_id}"
+
+    def _index_key(self, index: str) -> str:
+        return f"{self.prefix}:idx:{index}"
+
+    def _counters_key(self, user_id: str) -> str:
+        return f"{self.prefix}:counts:{user_id}"
+
+    def _queue_changes(self, pipe, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        """Queue the document, index and counter writes for a task change"""
+        task = new or old
+        score = task_score(task)
+        if new:
+            pipe.set(self._task_key(new["id"]), json.dumps(new))
+        else:
+            pipe.delete(self._task_key(old["id"]))
+
+        removed, added = index_changes(old, new)
+        for index in removed:
+            pipe.zrem(self._index_key(index), task["id"])
+        for index in added:
+            pipe.zadd(self._index_key(index), {task["id"]: score})
+
+        counters_key = self._counters_key(task["user_id"])
+        for field, delta in counter_changes(old, new).items():
+            pipe.hincrby(counters_key, field, delta)
+
+    async def _transition(self, task_id: str, apply) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Read-modify-write a task under WATCH; apply(old) returns the new task or None to delete"""
+        from redis.exceptions import WatchError
+
+        key = self._task_key(task_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            for _ in range(self.max_retries):
+                try:
+                    await pipe.watch(key)
+                    raw = await pipe.get(key)
+                    if raw is None:
+                        await pipe.unwatch()
+                        return False, None
+                    old = json.loads(raw)
+                    new = apply(old)
+                    pipe.multi()
+                    self._queue_changes(pipe, old, new)
+                    await pipe.execute()
+                    return True, new
+                except WatchError:
+                    continue
+        raise RuntimeError(f"Task {task_id} changed concurrently too often; giving up")
+
+    async def get_many(self, task_ids: List[str]) -> List[Dict[str, Any]]:
+        if not task_ids:
+            return []
+        values = await self.client.mget([self._task_key(task_id) for task_id in task_ids])
+        return [json.loads(value) for value in values if value]
+
+    async def create(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        async with self.client.pipeline(transaction=True) as pipe:
+            self._queue_changes(pipe, None, task)
+            await pipe.execute()
+        return dict(task)
+
+    async def update(self, task_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        _, new = await self._transition(task_id, lambda old: {**old, **changes})
+        return new
+
+    async def delete(self, task_id: str) -> bool:
+        found, _ = await self._transition(task_id, lambda old: None)
+        return found
+
+    async def get_counters(self, user_id: str) -> Dict[str, int]:
+        raw = await self.client.hgetall(self._counters_key(user_id))
+        counters = {field: int(count) for field, count in raw.items()}
+        return {field: count for field, count in counters.items() if count}
+
+    async def _range_after(
+        self, index: str, after: Optional[CursorPosition], count: int
+    ) -> List[CursorPosition]:
+        key = self._index_key(index)
+        if after is None:
+            entries = await self.client.zrangebyscore(key, "-inf", "+inf", start=0, num=count, withscores=True)
+            return [(score, task_id) for task_id, score in entries]
+
+        # Members sharing the cursor's score are ordered by id; the rest are strictly later
+        score, last_id = after
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zrangebyscore(key, score, score, withscores=True)
+            pipe.zrangebyscore(key, f"({score!r}", "+inf", start=0, num=count, withscores=True)
+            ties, later = await pipe.execute()
+        entries = [(s, task_id) for task_id, s in ties if task_id > last_id]
+        entries.extend((s, task_id) for task_id, s in later)
+        return entries[:count]
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+_task_repository: Optional[TaskRepository] = None
+_task_repository_lock = asyncio.Lock()
+
+
+async def create_task_repository(backend: Optional[str] = None) -> TaskRepository:
+    """
+    Build the configured repository
+
+    backend is "redis", "memory" or "auto" (Redis when it answers a PING,
+    otherwise the in-process store).
+    """
+    backend = (backend or settings.TASK_STORE_BACKEND).lower()
+    if backend == "memory":
+        return InMemoryTaskRepository()
+
+    try:
+        import redis.asyncio as redis
+
+        client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        await client.ping()
+        return RedisTaskRepository(client, prefix=settings.TASK_STORE_KEY_PREFIX)
+    except Exception as e:
+        if backend == "redis":
+            raise
+        logger.warning(f"Redis unavailable for task storage ({e}), using in-memory task store")
+        return InMemoryTaskRepository()
+
+
+async def get_task_repository() -> TaskRepository:
+    """Shared repository instance (usable as a FastAPI dependency)"""
+    global _task_repository
+    if _task_repository is None:
+        async with _task_repository_lock:
+            if _task_repository is None:
+                _task_repository = await create_task_repository()
+    return _task_repository
+
+
+async def close_task_repository() -> None:
+    global _task_repository
+    if _task_repository is not None:
+        await _task_repository.close()
+        _task_repository = None
@@ -7,9 +7,9 @@ with user-scoped namespacing and multi-tenant security.
 import logging
 import json
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Union, Tuple
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import uuid
 
@@ -21,9 +21,14 @@ except ImportError:
     logging.warning("Vercel KV not available, falling back to Redis")
 
 from app.services.redis_service import RedisService
+from app.services.payload_codec import PayloadCodec
 
 logger = logging.getLogger(__name__)
 
+# Global sorted set of (record key + index keys) scored by expiry time, so that
+# cleanup only touches records that are actually due instead of scanning the keyspace
+EXPIRY_INDEX_KEY = "idx:analytics:expiry"
+
 class AnalyticsDataType(Enum):
     """Types of analytics data for storage"""
     SOCIAL_MEDIA = "social_media"
@@ -60,6 +65,12 @@ class AnalyticsDataRecord:
     platform: Optional[str] = None
     retention_policy: DataRetentionPolicy = DataRetentionPolicy.DAILY
 
+@dataclass
+class AnalyticsDataPage:
+    """A page of analytics records read from the time-ordered index"""
+    records: List[AnalyticsDataRecord] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
 @dataclass
 class StorageStats:
     """Storage statistics for analytics data"""
@@ -84,10 +95,17 @@ class VercelKVService:
     - Fallback to Redis when Vercel KV unavailable
     """
     
+    # Records fetched per MGET when computing storage stats
+    STATS_BATCH_SIZE = 500
+    
     def __init__(self, redis_service: RedisService):
         self.redis_service = redis_service
         self.use_vercel_kv = VERCEL_KV_AVAILABLE
         
+        # Records above the codec threshold are stored compressed; plain JSON
+        # records written before the codec existed are still readable
+        self.codec = PayloadCodec()
+        
         # Storage configuration
         self.default_retention_policies = {
             AnalyticsDataType.SOCIAL_MEDIA: DataRetentionPolicy.REAL_TIME,
@@ -186,15 +204,14 @@ class VercelKVService:
             # Generate storage key
             storage_key = self._generate_storage_key(record)
             
-            # Store data
+            # Store data and register it in the time-ordered indexes
             if self.use_vercel_kv:
                 await self._store_in_vercel_kv(storage_key, record, retention_policy)
+                await self._store_record_index(record)
             else:
+                # Record and index entries go out in a single pipelined round trip
                 await self._store_in_redis(storage_key, record, retention_policy)
             
-            # Store record metadata for indexing
-            await self._store_record_index(record)
-            
             logger.debug(f"Stored analytics data: {storage_key}")
             return record_id
             
@@ -211,7 +228,8 @@ class VercelKVService:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         platform: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[AnalyticsDataRecord]:
         """
         Retrieve analytics data with filtering
@@ -225,44 +243,107 @@ class VercelKVService:
             end_date: End date for time range filtering
             platform: Filter by platform (for social media data)
             limit: Maximum number of records to return
+            cursor: Opaque cursor returned by retrieve_analytics_page
             
         Returns:
-            List of analytics data records
+            List of analytics data records (newest first)
+        """
+        page = await self.retrieve_analytics_page(
+            user_id, data_type, source_id=source_id, metric_name=metric_name,
+            start_date=start_date, end_date=end_date, platform=platform,
+            limit=limit, cursor=cursor
+        )
+        return page.records
+    
+    async def retrieve_analytics_page(
+        self,
+        user_id: str,
+        data_type: AnalyticsDataType,
+        source_id: Optional[str] = None,
+        metric_name: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        platform: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> AnalyticsDataPage:
+        """
+        Retrieve one page of analytics data from the per-user time index
+        
+        The range query and limit are applied to the sorted-set index before any
+        record is fetched, so cost scales with the page size, not the keyspace.
+        
+        Args:
+            user_id: User ID for multi-tenant isolation
+            data_type: Type of analytics data to retrieve
+            source_id: Filter by source ID
+            metric_name: Filter by metric name
+            start_date: Start date for time range filtering
+            end_date: End date for time range filtering
+            platform: Filter by platform (for social media data)
+            limit: Maximum number of records to return
+            cursor: Cursor from a previous page (None for the first page)
+            
+        Returns:
+            Page of records (newest first) and the cursor for the next page
         """
         try:
-            # Build search pattern
-            search_pattern = self._build_search_pattern(
+            index_key, residual_filters = self._select_index(
                 user_id, data_type, source_id, metric_name, platform
             )
             
-            # Get matching keys
-            matching_keys = await self._get_matching_keys(search_pattern)
+            min_score: Union[float, str] = self._to_score(start_date) if start_date else "-inf"
+            max_score: Union[float, str] = self._to_score(end_date) if end_date else "+inf"
+            offset = 0
             
-            # Filter by date range if specified
-            if start_date or end_date:
-                matching_keys = await self._filter_keys_by_date(
-                    matching_keys, start_date, end_date
-                )
+            if cursor:
+                cursor_score, offset = self._decode_cursor(cursor)
+                if max_score == "+inf" or cursor_score < max_score:
+                    max_score = cursor_score
+                else:
+                    offset = 0
             
-            # Limit results
-            matching_keys = matching_keys[:limit]
+            records: List[AnalyticsDataRecord] = []
+            exhausted = False
             
-            # Retrieve data records
-            records = []
-            for key in matching_keys:
-                try:
-                    record = await self._retrieve_record(key)
-                    if record:
-                        records.append(record)
-                except Exception as e:
-                    logger.warning(f"Error retrieving record from {key}: {e}")
-                    continue
+            while len(records) < limit:
+                batch_size = limit - len(records)
+                entries = await self._zrevrangebyscore(
+                    index_key, max_score, min_score, offset, batch_size
+                )
+                if not entries:
+                    exhausted = True
+                    break
+                
+                fetched = await self._retrieve_records([key for key, _ in entries])
+                
+                for (key, score), record in zip(entries, fetched):
+                    # Advance the (score, offset) position past this entry
+                    if score == max_score:
+                        offset += 1
+                    else:
+                        max_score, offset = score, 1
+                    
+                    if record is None:
+                        # Record expired; its index entry is removed by cleanup_expired_data
+                        continue
+                    if not self._matches_filters(record, residual_filters):
+                        continue
+                    
+                    records.append(record)
+                    if len(records) >= limit:
+                        break
+                
+                if len(entries) < batch_size:
+                    exhausted = True
+                    break
             
-            # Sort by timestamp (newest first)
-            records.sort(key=lambda x: x.timestamp, reverse=True)
+            next_cursor = None
+            if not exhausted and max_score not in ("+inf", "-inf"):
+                next_cursor = self._encode_cursor(max_score, offset)
             
             logger.debug(f"Retrieved {len(records)} analytics records for user {user_id}")
-            return records
+            return AnalyticsDataPage(records=records, next_cursor=next_cursor)
             
         except Exception as e:
             logger.error(f"Error retrieving analytics data: {e}")
@@ -333,33 +414,46 @@ class VercelKVService:
             Number of records deleted
         """
         try:
-            # Build search pattern
-            search_pattern = self._build_search_pattern(user_id, data_type, source_id)
+            index_key = self._index_key(
+                user_id, data_type, "source" if source_id else None, source_id
+            )
+            max_score = self._to_score(before_date) if before_date else "+inf"
             
-            # Get matching keys
-            matching_keys = await self._get_matching_keys(search_pattern)
+            deleted_count = 0
+            batch_size = 500
+            previous_keys: List[str] = []
             
-            # Filter by date if specified
-            if before_date:
-                matching_keys = await self._filter_keys_by_date(
-                    matching_keys, end_date=before_date
+            while True:
+                # Always read from the head: processed entries are removed from the index
+                entries = await self._zrevrangebyscore(
+                    index_key, max_score, "-inf", 0, batch_size
                 )
-            
-            # Delete records
-            deleted_count = 0
-            for key in matching_keys:
-                try:
-                    if self.use_vercel_kv:
-                        await kv.delete(key)
+                keys = [key for key, _ in entries]
+                if not keys or keys == previous_keys:
+                    break
+                previous_keys = keys
+                
+                records = await self._retrieve_records(keys)
+                index_removals: Dict[str, List[str]] = {}
+                
+                for key, record in zip(keys, records):
+                    if record is not None:
+                        index_keys = self._record_index_keys(record)
+                        index_removals.setdefault(EXPIRY_INDEX_KEY, []).append(
+                            self._expiry_member(key, index_keys)
+                        )
+                        deleted_count += 1
                     else:
-                        await self.redis_service.delete(key)
-                    deleted_count += 1
-                except Exception as e:
-                    logger.warning(f"Error deleting record {key}: {e}")
-                    continue
-            
-            # Clean up index entries
-            await self._cleanup_record_indexes(user_id, data_type, source_id)
+                        # Already expired; drop what we know of its index entries
+                        index_keys = [self._index_key(user_id, data_type), index_key]
+                    
+                    for record_index_key in set(index_keys):
+                        index_removals.setdefault(record_index_key, []).append(key)
+                
+                await self._delete_records(keys, index_removals)
+                
+                if len(entries) < batch_size:
+                    break
             
             logger.info(f"Deleted {deleted_count} analytics records for user {user_id}")
             return deleted_count
@@ -379,15 +473,12 @@ class VercelKVService:
             Storage statistics
         """
         try:
-            if user_id:
-                # Get user-specific stats
-                pattern = f"user:{user_id}:*"
-            else:
-                # Get global stats
-                pattern = "*"
-            
-            # Get all keys matching pattern
-            all_keys = await self._get_matching_keys(pattern)
+            # Only match analytics record keys, never other user:* keys such as task queues
+            all_keys = []
+            for segment in self._storage_key_segments():
+                all_keys.extend(
+                    await self._get_matching_keys(f"user:{user_id or '*'}:{segment}:*")
+                )
             
             # Calculate statistics
             total_records = len(all_keys)
@@ -397,36 +488,33 @@ class VercelKVService:
             timestamps = []
             
             for key in all_keys:
-                try:
-                    # Parse key to get type and user info
-                    key_parts = key.split(":")
-                    if len(key_parts) >= 2:
-                        user_id_from_key = key_parts[1]
-                        data_type = key_parts[2] if len(key_parts) > 2 else "unknown"
-                        
-                        # Count by type
-                        records_by_type[data_type] = records_by_type.get(data_type, 0) + 1
-                        
-                        # Count by user
-                        records_by_user[user_id_from_key] = records_by_user.get(user_id_from_key, 0) + 1
-                    
-                    # Get record size
-                    record = await self._retrieve_record(key)
+                # Parse key to get type and user info
+                key_parts = key.split(":")
+                user_id_from_key = key_parts[1]
+                data_type = key_parts[2]
+                
+                # Count by type and user
+                records_by_type[data_type] = records_by_type.get(data_type, 0) + 1
+                records_by_user[user_id_from_key] = records_by_user.get(user_id_from_key, 0) + 1
+            
+            # Fetch record bodies in batches of one round trip each
+            for offset in range(0, len(all_keys), self.STATS_BATCH_SIZE):
+                batch = all_keys[offset:offset + self.STATS_BATCH_SIZE]
+                for record in await self._retrieve_records(batch):
                     if record:
-                        record_size = len(json.dumps(asdict(record)).encode('utf-8'))
+                        record_size = len(json.dumps(asdict(record), default=str).encode('utf-8'))
                         total_size_bytes += record_size
                         timestamps.append(record.timestamp)
-                        
-                except Exception as e:
-                    logger.warning(f"Error processing key {key} for stats: {e}")
-                    continue
             
             # Calculate time range
             oldest_record = min(timestamps) if timestamps else None
             newest_record = max(timestamps) if timestamps else None
             
-            # Calculate storage efficiency (compression ratio estimate)
-            storage_efficiency = 0.8  # Placeholder: would calculate actual compression ratio
+            # Stored bytes per serialized byte for everything this instance has written
+            codec_stats = self.codec.stats
+            storage_efficiency = (
+                codec_stats.stored_bytes / codec_stats.raw_bytes if codec_stats.raw_bytes else 1.0
+            )
             
             return StorageStats(
                 total_records=total_records,
@@ -442,33 +530,50 @@ class VercelKVService:
             logger.error(f"Error getting storage stats: {e}")
             raise
     
-    async def cleanup_expired_data(self) -> int:
+    async def cleanup_expired_data(self, batch_size: int = 500) -> int:
         """
         Clean up expired data based on retention policies
         
+        Reads due entries from the expiry index in batches, so the cost is
+        proportional to the number of expired records rather than the keyspace.
+        
+        Args:
+            batch_size: Number of expiry entries processed per round trip
+        
         Returns:
             Number of records cleaned up
         """
         try:
             cleaned_count = 0
-            current_time = datetime.utcnow()
-            
-            # Get all keys
-            all_keys = await self._get_matching_keys("*")
+            now_score = self._to_score(datetime.utcnow())
+            previous_members: List[str] = []
             
-            for key in all_keys:
-                try:
-                    # Check if key should be expired
-                    if await self._should_expire_key(key, current_time):
-                        if self.use_vercel_kv:
-                            await kv.delete(key)
-                        else:
-                            await self.redis_service.delete(key)
-                        cleaned_count += 1
-                        
-                except Exception as e:
-                    logger.warning(f"Error checking expiration for key {key}: {e}")
-                    continue
+            while True:
+                members = await self._zrangebyscore(
+                    EXPIRY_INDEX_KEY, "-inf", now_score, 0, batch_size
+                )
+                if not members or members == previous_members:
+                    break
+                previous_members = members
+                
+                storage_keys: List[str] = []
+                index_removals: Dict[str, List[str]] = {EXPIRY_INDEX_KEY: list(members)}
+                
+                for member in members:
+                    try:
+                        storage_key, index_keys = json.loads(member)
+                    except (ValueError, TypeError) as e:
+                        logger.warning(f"Invalid expiry entry {member}: {e}")
+                        continue
+                    storage_keys.append(storage_key)
+                    for index_key in index_keys:
+                        index_removals.setdefault(index_key, []).append(storage_key)
+                
+                await self._delete_records(storage_keys, index_removals)
+                cleaned_count += len(storage_keys)
+                
+                if len(members) < batch_size:
+                    break
             
             logger.info(f"Cleaned up {cleaned_count} expired analytics records")
             return cleaned_count
@@ -509,28 +614,95 @@ class VercelKVService:
         else:
             return f"user:{record.user_id}:{record.data_type.value}:{record.source_id}:{date_str}:{record.id}"
     
-    def _build_search_pattern(
+    def _storage_key_segments(self) -> List[str]:
+        """Type segments of analytics record keys (user:{user_id}:{segment}:...)"""
+        return [pattern.split(":")[2] for pattern in self.key_patterns.values()]
+    
+    def _index_key(
+        self,
+        user_id: str,
+        data_type: AnalyticsDataType,
+        dimension: Optional[str] = None,
+        value: Optional[str] = None
+    ) -> str:
+        """Key of the per-user/per-type sorted-set index (score = timestamp)"""
+        index_key = f"idx:user:{user_id}:{data_type.value}"
+        if dimension:
+            index_key += f":{dimension}:{value}"
+        return index_key
+    
+    def _record_index_keys(self, record: AnalyticsDataRecord) -> List[str]:
+        """All index keys a record is registered in"""
+        index_keys = [
+            self._index_key(record.user_id, record.data_type),
+            self._index_key(record.user_id, record.data_type, "source", record.source_id),
+            self._index_key(record.user_id, record.data_type, "metric", record.metric_name),
+        ]
+        if record.platform:
+            index_keys.append(
+                self._index_key(record.user_id, record.data_type, "platform", record.platform)
+            )
+        return index_keys
+    
+    def _select_index(
         self,
         user_id: str,
         data_type: AnalyticsDataType,
         source_id: Optional[str] = None,
         metric_name: Optional[str] = None,
         platform: Optional[str] = None
-    ) -> str:
-        """Build search pattern for data retrieval"""
-        pattern = f"user:{user_id}:{data_type.value}"
-        
+    ) -> Tuple[str, Dict[str, str]]:
+        """Pick the most selective index for the filters; the rest are applied per record"""
+        filters = {}
         if source_id:
-            pattern += f":{source_id}"
-        
+            filters["source"] = source_id
         if metric_name:
-            pattern += f":{metric_name}"
+            filters["metric"] = metric_name
+        if platform:
+            filters["platform"] = platform
         
-        if platform and data_type == AnalyticsDataType.SOCIAL_MEDIA:
-            pattern += f":{platform}"
+        for dimension in ("source", "metric", "platform"):
+            if dimension in filters:
+                value = filters.pop(dimension)
+                return self._index_key(user_id, data_type, dimension, value), filters
         
-        pattern += ":*"
-        return pattern
+        return self._index_key(user_id, data_type), filters
+    
+    def _matches_filters(self, record: AnalyticsDataRecord, filters: Dict[str, str]) -> bool:
+        """Check a record against filters not covered by the chosen index"""
+        if "source" in filters and record.source_id != filters["source"]:
+            return False
+        if "metric" in filters and record.metric_name != filters["metric"]:
+            return False
+        if "platform" in filters and record.platform != filters["platform"]:
+            return False
+        return True
+    
+    @staticmethod
+    def _to_score(value: datetime) -> float:
+        """Convert a datetime (naive values are treated as UTC) to an index score"""
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    
+    @staticmethod
+    def _encode_cursor(score: float, offset: int) -> str:
+        """Encode an index position as an opaque cursor"""
+        return f"{score!r}:{offset}"
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[float, int]:
+        """Decode a cursor produced by _encode_cursor"""
+        try:
+            score, offset = cursor.rsplit(":", 1)
+            return float(score), int(offset)
+        except ValueError:
+            raise ValueError(f"Invalid analytics cursor: {cursor}")
+    
+    @staticmethod
+    def _expiry_member(storage_key: str, index_keys: List[str]) -> str:
+        """Expiry index member carrying everything needed to clean up a record"""
+        return json.dumps([storage_key, index_keys], separators=(",", ":"))
     
     async def _store_in_vercel_kv(
         self,
@@ -541,7 +713,7 @@ class VercelKVService:
         """Store data in Vercel KV"""
         try:
             # Serialize record
-            record_data = json.dumps(asdict(record), default=str)
+            record_data = self.codec.encode(asdict(record))
             
             # Set TTL based on retention policy
             ttl = self.retention_ttl.get(retention_policy, 86400)
@@ -561,97 +733,128 @@ class VercelKVService:
         record: AnalyticsDataRecord,
         retention_policy: DataRetentionPolicy
     ):
-        """Store data in Redis (fallback)"""
+        """Store data and its index entries in Redis (fallback) in one pipeline"""
         try:
             # Serialize record
-            record_data = json.dumps(asdict(record), default=str)
+            record_data = self.codec.encode(asdict(record))
             
             # Set TTL based on retention policy
             ttl = self.retention_ttl.get(retention_policy, 86400)
             
-            await self.redis_service.set(key, record_data, ttl=ttl)
+            async with self.redis_service.pipeline() as pipe:
+                pipe.set(key, record_data, ex=ttl or None)
+                for index_key, score, member in self._index_entries(record):
+                    pipe.zadd(index_key, {member: score})
             
         except Exception as e:
             logger.error(f"Error storing in Redis: {e}")
             raise
     
     async def _store_record_index(self, record: AnalyticsDataRecord):
-        """Store record index for efficient retrieval"""
+        """Register record in the time-ordered indexes for efficient retrieval"""
         try:
-            index_key = f"index:user:{record.user_id}:{record.data_type.value}:{record.id}"
-            index_data = {
-                "key": self._generate_storage_key(record),
-                "timestamp": record.timestamp.isoformat(),
-                "source_id": record.source_id,
-                "metric_name": record.metric_name
-            }
-            
-            if self.use_vercel_kv:
-                await kv.set(index_key, json.dumps(index_data), ex=86400)  # 24 hour TTL
-            else:
-                await self.redis_service.set(index_key, json.dumps(index_data), ttl=86400)
+            for index_key, score, member in self._index_entries(record):
+                await self._zadd(index_key, score, member)
                 
         except Exception as e:
             logger.warning(f"Error storing record index: {e}")
     
+    def _index_entries(self, record: AnalyticsDataRecord) -> List[Tuple[str, float, str]]:
+        """Sorted-set entries (key, score, member) that index a record"""
+        storage_key = self._generate_storage_key(record)
+        score = self._to_score(record.timestamp)
+        index_keys = self._record_index_keys(record)
+        
+        entries = [(index_key, score, storage_key) for index_key in index_keys]
+        
+        ttl = self.retention_ttl.get(record.retention_policy, 86400)
+        if ttl > 0:
+            entries.append(
+                (EXPIRY_INDEX_KEY, score + ttl, self._expiry_member(storage_key, index_keys))
+            )
+        
+        return entries
+    
+    async def _delete_records(self, keys: List[str], index_removals: Dict[str, List[str]]):
+        """Delete records and remove index members, pipelined when using Redis"""
+        if self.use_vercel_kv:
+            for key in keys:
+                await kv.delete(key)
+            for index_key, members in index_removals.items():
+                await self._zrem(index_key, *members)
+            return
+        
+        async with self.redis_service.pipeline() as pipe:
+            if keys:
+                pipe.delete(*keys)
+            for index_key, members in index_removals.items():
+                if members:
+                    pipe.zrem(index_key, *members)
+    
+    async def _zadd(self, key: str, score: float, member: str):
+        """Add a member to a sorted set"""
+        if self.use_vercel_kv:
+            await kv.zadd(key, {member: score})
+        else:
+            await self.redis_service.zadd(key, score, member)
+    
+    async def _zrem(self, key: str, *members: str):
+        """Remove members from a sorted set"""
+        if not members:
+            return
+        if self.use_vercel_kv:
+            await kv.zrem(key, *members)
+        else:
+            await self.redis_service.zrem(key, *members)
+    
+    async def _zrangebyscore(
+        self,
+        key: str,
+        min_score: Union[float, str],
+        max_score: Union[float, str],
+        start: int,
+        num: int
+    ) -> List[str]:
+        """Ascending range query on a sorted set"""
+        if self.use_vercel_kv:
+            return await kv.zrangebyscore(key, min_score, max_score, start=start, num=num) or []
+        return await self.redis_service.zrangebyscore(
+            key, min_score, max_score, start=start, num=num
+        )
+    
+    async def _zrevrangebyscore(
+        self,
+        key: str,
+        max_score: Union[float, str],
+        min_score: Union[float, str],
+        start: int,
+        num: int
+    ) -> List[Tuple[str, float]]:
+        """Descending range query on a sorted set, returning (member, score) pairs"""
+        if self.use_vercel_kv:
+            entries = await kv.zrevrangebyscore(
+                key, max_score, min_score, start=start, num=num, withscores=True
+            ) or []
+        else:
+            entries = await self.redis_service.zrevrangebyscore(
+                key, max_score, min_score, start=start, num=num, withscores=True
+            )
+        return [(member, float(score)) for member, score in entries]
+    
     async def _get_matching_keys(self, pattern: str) -> List[str]:
-        """Get keys matching a pattern"""
+        """Get keys matching a pattern (incremental SCAN; used for storage stats only)"""
         try:
             if self.use_vercel_kv:
                 # Vercel KV doesn't support pattern matching like Redis
-                # We'll need to implement a different approach
-                # For now, return empty list and log warning
                 logger.warning("Pattern matching not supported in Vercel KV, returning empty list")
                 return []
             else:
-                # Use Redis pattern matching
-                return await self.redis_service.keys(pattern)
+                return await self.redis_service.scan_keys(pattern)
                 
         except Exception as e:
             logger.error(f"Error getting matching keys: {e}")
             return []
     
-    async def _filter_keys_by_date(
-        self,
-        keys: List[str],
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> List[str]:
-        """Filter keys by date range"""
-        try:
-            filtered_keys = []
-            
-            for key in keys:
-                try:
-                    # Extract date from key (assuming format includes date)
-                    if ":" in key:
-                        date_part = key.split(":")[-2]  # Second to last part
-                        if len(date_part) == 8:  # YYYYMMDD format
-                            key_date = datetime.strptime(date_part, "%Y%m%d")
-                            
-                            # Apply date filters
-                            if start_date and key_date < start_date:
-                                continue
-                            if end_date and key_date > end_date:
-                                continue
-                            
-                            filtered_keys.append(key)
-                        else:
-                            # If no date in key, include it
-                            filtered_keys.append(key)
-                    else:
-                        filtered_keys.append(key)
-                        
-                except Exception as e:
-                    logger.warning(f"Error parsing date from key {key}: {e}")
-                    filtered_keys.append(key)
-            
-            return filtered_keys
-            
-        except Exception as e:
-            logger.error(f"Error filtering keys by date: {e}")
-            return keys
-    
     async def _retrieve_record(self, key: str) -> Optional[AnalyticsDataRecord]:
         """Retrieve a single record"""
         try:
@@ -660,84 +863,57 @@ class VercelKVService:
             else:
                 record_data = await self.redis_service.get(key)
             
-            if record_data:
-                record_dict = json.loads(record_data)
-                # Convert timestamp string back to datetime
-                record_dict["timestamp"] = datetime.fromisoformat(record_dict["timestamp"])
-                return AnalyticsDataRecord(**record_dict)
-            
-            return None
+            return self._parse_record(record_data) if record_data else None
             
         except Exception as e:
             logger.warning(f"Error retrieving record from {key}: {e}")
             return None
     
-    async def _should_expire_key(self, key: str, current_time: datetime) -> bool:
-        """Check if a key should be expired based on retention policy"""
+    async def _retrieve_records(self, keys: List[str]) -> List[Optional[AnalyticsDataRecord]]:
+        """Retrieve several records in one round trip, preserving order (None for missing keys)"""
+        if not keys:
+            return []
+        
         try:
-            # Extract data type from key
-            key_parts = key.split(":")
-            if len(key_parts) < 3:
-                return False
-            
-            data_type_str = key_parts[2]
-            data_type = None
-            
-            for dt in AnalyticsDataType:
-                if dt.value == data_type_str:
-                    data_type = dt
-                    break
-            
-            if not data_type:
-                return False
-            
-            # Get retention policy
-            retention_policy = self.default_retention_policies.get(data_type, DataRetentionPolicy.DAILY)
-            ttl_seconds = self.retention_ttl.get(retention_policy, 86400)
-            
-            if ttl_seconds == 0:  # Permanent
-                return False
-            
-            # Extract date from key
-            if ":" in key:
-                date_part = key.split(":")[-2]
-                if len(date_part) == 8:  # YYYYMMDD format
-                    key_date = datetime.strptime(date_part, "%Y%m%d")
-                    age_seconds = (current_time - key_date).total_seconds()
-                    return age_seconds > ttl_seconds
-            
-            return False
-            
+            if self.use_vercel_kv:
+                values = await kv.mget(*keys)
+            else:
+                values = await self.redis_service.mget(keys)
         except Exception as e:
-            logger.warning(f"Error checking expiration for key {key}: {e}")
-            return False
+            logger.warning(f"Error retrieving {len(keys)} records: {e}")
+            return [None] * len(keys)
+        
+        records = []
+        for key, record_data in zip(keys, values):
+            try:
+                records.append(self._parse_record(record_data) if record_data else None)
+            except Exception as e:
+                logger.warning(f"Error parsing record from {key}: {e}")
+                records.append(None)
+        return records
     
-    async def _cleanup_record_indexes(
-        self,
-        user_id: str,
-        data_type: AnalyticsDataType,
-        source_id: Optional[str] = None
-    ):
-        """Clean up record indexes"""
-        try:
-            pattern = f"index:user:{user_id}:{data_type.value}"
-            if source_id:
-                pattern += f":{source_id}"
-            pattern += ":*"
-            
-            index_keys = await self._get_matching_keys(pattern)
-            
-            for index_key in index_keys:
-                try:
-                    if self.use_vercel_kv:
-                        await kv.delete(index_key)
-                    else:
-                        await self.redis_service.delete(index_key)
-                except Exception as e:
-                    logger.warning(f"Error deleting index key {index_key}: {e}")
-                    
-        except Exception as e:
-            logger.warning(f"Error cleaning up record indexes: {e}")
+    def _parse_record(self, record_data: str) -> AnalyticsDataRecord:
+        """Deserialize a stored analytics record"""
+        record_dict = self.codec.decode(record_data)
+        # Convert timestamp string back to datetime
+        record_dict["timestamp"] = datetime.fromisoformat(record_dict["timestamp"])
+        # Enums are serialized via str(), e.g. "AnalyticsDataType.SEO"
+        record_dict["data_type"] = self._parse_enum(
+            AnalyticsDataType, record_dict["data_type"]
+        )
+        record_dict["retention_policy"] = self._parse_enum(
+            DataRetentionPolicy, record_dict["retention_policy"]
+        )
+        return AnalyticsDataRecord(**record_dict)
+    
+    @staticmethod
+    def _parse_enum(enum_cls, value):
+        """Parse an enum from its value or its str() form"""
+        if isinstance(value, enum_cls):
+            return value
+        if isinstance(value, str) and value.startswith(f"{enum_cls.__name__}."):
+            return enum_cls[value.split(".", 1)[1]]
+        return enum_cls(value)
     
     def _calculate_summary_statistics(
         self,
@@ -819,7 +995,8 @@ class VercelKVService:
                 "timestamp": datetime.utcnow().isoformat(),
                 "service": "vercel_kv" if self.use_vercel_kv else "redis_fallback",
                 "vercel_kv_available": VERCEL_KV_AVAILABLE,
-                "storage_connection": "healthy"
+                "storage_connection": "healthy",
+                "codec": self.codec.get_stats()
             }
             
             # Test storage connection
@@ -832,7 +1009,7 @@ class VercelKVService:
                     retrieved_data = await kv.get(test_key)
                     await kv.delete(test_key)
                 else:
-                    await self.redis_service.set(test_key, json.dumps(test_data), ttl=60)
+                    await self.redis_service.set(test_key, json.dumps(test_data), ex=60)
                     retrieved_data = await self.redis_service.get(test_key)
                     await self.redis_service.delete(test_key)
                 
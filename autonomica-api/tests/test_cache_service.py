@@ -18,7 +18,9 @@ from app.services.cache_service import (
     CacheLevel,
     CacheStrategy,
     CacheEntry,
-    CacheStats
+    CacheStats,
+    MemoryCacheTier,
+    SingleFlight
 )
 
 
@@ -399,6 +401,215 @@ class TestCacheService:
         assert len(memory_only_cache_service.access_order) == 0
 
 
+class TestMemoryCacheTier:
+    """Test the bounded in-memory cache tier"""
+    
+    def test_lru_eviction_honours_max_size(self):
+        """Least recently used entries are evicted beyond lru_max_size"""
+        tier = MemoryCacheTier(CacheConfig(lru_max_size=2, cache_strategy=CacheStrategy.LRU))
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        
+        tier.put("a", 1, expires_at)
+        tier.put("b", 2, expires_at)
+        tier.get("a")  # "b" becomes least recently used
+        tier.put("c", 3, expires_at)
+        
+        assert set(tier.keys()) == {"a", "c"}
+        assert tier.lru_evictions == 1
+    
+    def test_ttl_strategy_evicts_in_insertion_order(self):
+        """With the TTL strategy reads do not refresh recency"""
+        tier = MemoryCacheTier(CacheConfig(lru_max_size=2, cache_strategy=CacheStrategy.TTL))
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        
+        tier.put("a", 1, expires_at)
+        tier.put("b", 2, expires_at)
+        tier.get("a")
+        tier.put("c", 3, expires_at)
+        
+        assert set(tier.keys()) == {"b", "c"}
+    
+    def test_byte_budget_eviction(self):
+        """Entries are evicted once the approximate byte budget is exceeded"""
+        config = CacheConfig(lru_max_size=0, max_memory_mb=1)
+        tier = MemoryCacheTier(config)
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        
+        for i in range(5):
+            tier.put(f"key{i}", "x" * 300_000, expires_at)
+        
+        assert tier.total_bytes <= tier.max_bytes
+        assert len(tier) == 3
+        assert tier.size_evictions == 2
+    
+    def test_size_estimate_does_not_serialize(self):
+        """Strings are sized by length and non-JSON values are still sized"""
+        tier = MemoryCacheTier(CacheConfig())
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        
+        assert tier.put("k", "x" * 1000, expires_at).size_bytes == 1001
+        assert tier.put("obj", {"when": object()}, expires_at).size_bytes > 0
+        assert tier.put("given", "x" * 1000, expires_at, size_bytes=42).size_bytes == 42
+    
+    def test_pop_expired_only_removes_due_entries(self):
+        """Expired entries are removed via the expiry heap; overwritten keys are not"""
+        tier = MemoryCacheTier(CacheConfig())
+        now = datetime.utcnow()
+        
+        tier.put("old", 1, now - timedelta(seconds=1))
+        tier.put("fresh", 2, now + timedelta(hours=1))
+        tier.put("rewritten", 3, now - timedelta(seconds=1))
+        tier.put("rewritten", 4, now + timedelta(hours=1))
+        
+        assert tier.pop_expired(now) == 1
+        assert set(tier.keys()) == {"fresh", "rewritten"}
+        assert tier.expired_removals == 1
+    
+    def test_stats_expose_occupancy(self):
+        """CacheStats reports occupancy against the tightest limit"""
+        stats = CacheStats(entries_count=50, max_entries=100, total_size_bytes=10, max_size_bytes=1000)
+        assert stats.occupancy_percent == 50.0
+
+
+class TestExpirySweep:
+    """Test the periodic background sweep of expired memory entries"""
+    
+    @pytest.mark.asyncio
+    async def test_expired_entries_swept_without_access(self):
+        """The sweep removes expired entries that are never read again"""
+        service = CacheService(config=CacheConfig(cleanup_interval=0.01))
+        await service.set("stale", "value", ttl=60)
+        assert service._cleanup_handle is not None
+        
+        # Backdate the entry instead of waiting out its TTL
+        service.memory_cache.put("stale", "value", datetime.utcnow() - timedelta(seconds=1))
+        await asyncio.sleep(0.05)
+        
+        assert "stale" not in service.memory_cache
+        assert service.memory_cache.expired_removals == 1
+        assert service.stats["last_cleanup"] is not None
+        await service.stop()
+        assert service._cleanup_handle is None
+    
+    def test_start_without_running_loop_is_noop(self):
+        """Constructing and starting outside an event loop does not fail"""
+        service = CacheService(config=CacheConfig())
+        assert service.start() is False
+        assert service._cleanup_handle is None
+
+
+class TestGetOrCompute:
+    """Test request coalescing and stale-while-revalidate in get_or_compute"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self):
+        """Concurrent misses for one key share a single computation"""
+        cache_service = CacheService()
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+        
+        results = await asyncio.gather(*[
+            cache_service.get_or_compute("hot_key", compute, ttl=60) for _ in range(20)
+        ])
+        
+        assert calls == 1
+        assert all(result == {"value": 42} for result in results)
+        assert cache_service.stats["coalesced_requests"] == 19
+    
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self):
+        """An expired value inside the stale window is returned and refreshed in the background"""
+        cache_service = CacheService()
+        values = iter(["old", "new"])
+        
+        async def compute():
+            return next(values)
+        
+        assert await cache_service.get_or_compute("key", compute, ttl=60, stale_ttl=60) == "old"
+        
+        # Age the entry past its fresh window
+        entry = cache_service.memory_cache.peek("key")
+        entry.metadata["fresh_until"] = 0
+        
+        assert await cache_service.get_or_compute("key", compute, ttl=60, stale_ttl=60) == "old"
+        await asyncio.gather(*cache_service._background_refreshes)
+        assert await cache_service.get("key") == "new"
+        assert cache_service.stats["stale_served"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_single_flight_propagates_errors(self):
+        """A failed computation raises for every waiter and is not remembered"""
+        single_flight = SingleFlight()
+        
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+        
+        results = await asyncio.gather(
+            single_flight.do("key", fail), single_flight.do("key", fail),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(result, ValueError) for result in results)
+        assert not single_flight.in_flight("key")
+
+
+class TestRedisTierCodec:
+    """Test that Redis-tier payloads go through the payload codec"""
+    
+    @pytest.mark.asyncio
+    async def test_compressed_round_trip_and_stats(self):
+        """compression_enabled compresses large Redis payloads and reports the ratio"""
+        store = {}
+        redis_service = AsyncMock()
+        redis_service.set.side_effect = lambda key, value, ex=None: store.__setitem__(key, value) or True
+        redis_service.get.side_effect = lambda key: store.get(key)
+        
+        cache_service = CacheService(
+            redis_service, CacheConfig(compression_enabled=True, compression_threshold=128)
+        )
+        value = {"rows": [{"metric": "clicks", "value": i} for i in range(100)]}
+        
+        assert await cache_service.set("report", value) is True
+        assert store["cache:report"].startswith("~p1:")
+        assert await cache_service.get("report", use_memory=False) == value
+        
+        stats = await cache_service.get_stats()
+        assert stats.codec != "json"
+        assert stats.compression_ratio > 1.0
+        assert stats.compression_savings_bytes > 0
+    
+    @pytest.mark.asyncio
+    async def test_compression_disabled_writes_plain_json(self):
+        """Without compression_enabled the Redis payload stays plain JSON"""
+        store = {}
+        redis_service = AsyncMock()
+        redis_service.set.side_effect = lambda key, value, ex=None: store.__setitem__(key, value) or True
+        
+        cache_service = CacheService(redis_service, CacheConfig(compression_threshold=16))
+        await cache_service.set("key", {"value": "x" * 100})
+        
+        assert json.loads(store["cache:key"])["value"] == {"value": "x" * 100}
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_sizes_memory_entry_from_payload(self):
+        """Promoting a Redis hit into memory reuses the payload length as its size"""
+        store = {}
+        redis_service = AsyncMock()
+        redis_service.set.side_effect = lambda key, value, ex=None: store.__setitem__(key, value) or True
+        redis_service.get.side_effect = lambda key: store.get(key)
+        
+        cache_service = CacheService(redis_service, CacheConfig())
+        await cache_service.set("key", {"value": "x" * 100}, use_memory=False)
+        
+        assert await cache_service.get("key") == {"value": "x" * 100}
+        assert cache_service.memory_cache.peek("key").size_bytes == len("key") + len(store["cache:key"])
+
 class TestFactoryFunction:
     """Test the factory function"""
     
@@ -0,0 +1,144 @@
+"""
+Tests for Chat Token Streaming
+Tests the token stream relay (coalescing, backpressure, cancellation) and /api/chat
+"""
+import asyncio
+import json
+import httpx
+import pytest
+
+from app.ai.token_stream import TokenStreamRelay
+from app.auth.clerk_middleware import ClerkUser, get_current_user
+from app.main import app
+from app.owl.workforce import Workforce
+
+
+async def token_source(tokens, delay=0.0, closed=None):
+    try:
+        for token in tokens:
+            if delay:
+                await asyncio.sleep(delay)
+            yield {"content": token, "model": "test-model", "done": False}
+        yield {"content": "", "model": "test-model", "done": True}
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+class TestTokenStreamRelay:
+    """Test TokenStreamRelay"""
+
+    @pytest.mark.asyncio
+    async def test_relays_all_tokens_with_ttft(self):
+        """Every token reaches the consumer in order and TTFT is measured"""
+        tokens = [f"word{i} " for i in range(20)]
+        relay = TokenStreamRelay(token_source(tokens, delay=0.001))
+
+        chunks = [chunk async for chunk in relay.stream()]
+
+        assert "".join(chunks) == "".join(tokens)
+        metrics = relay.metrics
+        assert metrics.tokens == 20
+        assert metrics.model == "test-model"
+        assert metrics.time_to_first_token_ms is not None
+        assert metrics.time_to_first_chunk_ms >= metrics.time_to_first_token_ms
+        assert metrics.duration_ms >= metrics.time_to_first_chunk_ms
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_gets_coalesced_chunks(self):
+        """A slow client receives fewer, larger chunks and pauses the model when the buffer fills"""
+        tokens = ["abcd"] * 50
+        relay = TokenStreamRelay(token_source(tokens), max_buffered_chars=16)
+
+        chunks = []
+        async for chunk in relay.stream():
+            chunks.append(chunk)
+            await asyncio.sleep(0.005)
+
+        assert "".join(chunks) == "abcd" * 50
+        assert len(chunks) < len(tokens)
+        assert max(len(chunk) for chunk in chunks) <= 16 + 4
+        assert relay.metrics.producer_pauses > 0
+
+    @pytest.mark.asyncio
+    async def test_client_disconnect_stops_model_stream(self):
+        """Closing the relay early cancels the producer and closes the model stream"""
+        closed = []
+        relay = TokenStreamRelay(token_source(["x"] * 1000, delay=0.001, closed=closed))
+
+        stream = relay.stream()
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert closed == [True]
+        assert relay.metrics.finished_at is not None
+
+    @pytest.mark.asyncio
+    async def test_idle_timeout_and_errors(self):
+        """A stalled model ends the stream; error chunks are recorded"""
+        async def stalled():
+            yield {"content": "hi", "done": False}
+            await asyncio.sleep(10)
+
+        relay = TokenStreamRelay(stalled(), idle_timeout=0.05)
+        assert [chunk async for chunk in relay.stream()] == ["hi"]
+        assert "No tokens received" in relay.metrics.error
+
+        async def failing():
+            yield {"content": "sorry", "done": True, "error": "model down"}
+
+        relay = TokenStreamRelay(failing())
+        assert [chunk async for chunk in relay.stream()] == ["sorry"]
+        assert relay.metrics.error == "model down"
+
+
+class TestChatEndpoint:
+    """Test /api/chat streams model tokens"""
+
+    @pytest.mark.asyncio
+    async def test_chat_streams_real_tokens(self, monkeypatch):
+        """Chunks carry model tokens as generated, followed by a metrics event"""
+        workforce = Workforce(default_model="test-model")
+        prompts = []
+
+        async def fake_stream(prompt, task_type="general", agent_context=None, **kwargs):
+            prompts.append((prompt, agent_context))
+            for token in ["Hello", ", ", "world"]:
+                yield {"content": token, "model": "test-model", "done": False}
+
+        recorded = []
+
+        async def fake_record(messages, user_id, session_id):
+            recorded.append([message["content"] for message in messages])
+            return messages
+
+        monkeypatch.setattr(workforce, "generate_streaming_response", fake_stream)
+        monkeypatch.setattr(workforce.conversation_memory, "record", fake_record)
+        app.state.workforce = workforce
+        app.dependency_overrides[get_current_user] = lambda: ClerkUser(user_id="user_1", claims={})
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/chat", json={"messages": [{
+                        "id": "m1", "role": "user", "content": "write a blog post",
+                        "timestamp": "2024-01-01T00:00:00"
+                    }]}
+                )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        events = [line[len("data: "):] for line in response.text.split("\n\n") if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(event) for event in events[:-1]]
+
+        assert "".join(chunk["content"] for chunk in chunks) == "Hello, world"
+        assert chunks[0]["agent"] == "Content Creator"
+        assert chunks[-1]["done"] is True
+        assert chunks[-1]["metrics"]["tokens"] == 3
+        assert chunks[-1]["metrics"]["time_to_first_token_ms"] is not None
+        assert prompts[0][0] == "write a blog post"
+        assert "content marketer" in prompts[0][1]
+        # The user turn is stored before streaming, the full reply once the stream ends
+        assert recorded == [["write a blog post"], ["write a blog post", "Hello, world"]]
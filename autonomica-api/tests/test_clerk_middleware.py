@@ -0,0 +1,178 @@
+"""
+Tests for Clerk Authentication Middleware
+Tests local JWT verification, JWKS rotation and the session status cache
+"""
+import asyncio
+import time
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.auth import clerk_middleware
+from app.auth.clerk_middleware import (
+    AuthCacheStats,
+    JWKSCache,
+    SessionStatusCache,
+    get_current_user
+)
+
+
+def make_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk_data = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk_data.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, jwk_data
+
+
+def make_token(private_key, kid, sid="sess_1", sub="user_1", expires_in=60):
+    now = int(time.time())
+    claims = {"sub": sub, "sid": sid, "iat": now, "exp": now + expires_in}
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def credentials(token):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.fixture
+def keys():
+    return {"k1": make_key("k1"), "k2": make_key("k2")}
+
+
+@pytest.fixture
+def auth(monkeypatch, keys):
+    """Fresh caches wired to fake JWKS and session endpoints"""
+    state = {"jwks": [keys["k1"][1]], "jwks_fetches": 0, "sessions": {"sess_1": "active"}, "session_fetches": 0}
+
+    async def fetch_jwks():
+        state["jwks_fetches"] += 1
+        return state["jwks"]
+
+    async def fetch_session(session_id):
+        state["session_fetches"] += 1
+        await asyncio.sleep(0.01)
+        return state["sessions"].get(session_id, "not_found"), "user_1"
+
+    stats = AuthCacheStats()
+    monkeypatch.setattr(clerk_middleware, "auth_cache_stats", stats)
+    monkeypatch.setattr(clerk_middleware, "jwks_cache", JWKSCache(fetch_jwks, stats=stats))
+    monkeypatch.setattr(clerk_middleware, "session_cache", SessionStatusCache(fetch_session, stats=stats))
+    state["stats"] = stats
+    return state
+
+
+class TestGetCurrentUser:
+    """Test the authentication fast path"""
+
+    @pytest.mark.asyncio
+    async def test_valid_token_is_served_from_cache(self, auth, keys):
+        """Only the first request reaches Clerk; later ones are cache hits"""
+        token = make_token(keys["k1"][0], "k1")
+
+        for _ in range(5):
+            user = await get_current_user(credentials(token))
+            assert user.user_id == "user_1"
+
+        assert auth["jwks_fetches"] == 1
+        assert auth["session_fetches"] == 1
+        stats = clerk_middleware.get_auth_cache_stats()
+        assert stats["jwks_hits"] == 4
+        assert stats["session_hits"] == 4
+        assert stats["session_misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_key_rotation(self, auth, keys):
+        """A token signed with a new key id triggers one JWKS refresh"""
+        await get_current_user(credentials(make_token(keys["k1"][0], "k1")))
+
+        auth["jwks"] = [keys["k2"][1]]
+        clerk_middleware.jwks_cache.min_refresh_interval = 0
+        user = await get_current_user(credentials(make_token(keys["k2"][0], "k2")))
+
+        assert user.user_id == "user_1"
+        assert auth["jwks_fetches"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_key_ids_are_rate_limited(self, auth, keys):
+        """Tokens with made-up key ids don't cause a JWKS fetch each"""
+        for i in range(5):
+            with pytest.raises(HTTPException) as exc:
+                await get_current_user(credentials(make_token(keys["k2"][0], f"bogus{i}")))
+            assert exc.value.status_code == 401
+
+        assert auth["jwks_fetches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_tokens_rejected(self, auth, keys):
+        """Expired, tampered and wrong-key tokens get 401"""
+        expired = make_token(keys["k1"][0], "k1", expires_in=-60)
+        wrong_key = make_token(keys["k2"][0], "k1")
+        hs256 = jwt.encode({"sub": "user_1", "sid": "sess_1"}, "secret", algorithm="HS256", headers={"kid": "k1"})
+
+        for token in [expired, wrong_key, hs256, "not-a-jwt"]:
+            with pytest.raises(HTTPException) as exc:
+                await get_current_user(credentials(token))
+            assert exc.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_inactive_session_is_negatively_cached(self, auth, keys):
+        """Ended sessions get 403 and are not looked up again within the negative TTL"""
+        auth["sessions"]["sess_2"] = "revoked"
+        token = make_token(keys["k1"][0], "k1", sid="sess_2")
+
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc:
+                await get_current_user(credentials(token))
+            assert exc.value.status_code == 403
+
+        assert auth["session_fetches"] == 1
+        assert auth["stats"].session_negative_hits == 2
+
+
+class TestSessionStatusCache:
+    """Test SessionStatusCache"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_lookup(self):
+        """Simultaneous requests for an uncached session make one remote call"""
+        calls = []
+
+        async def loader(session_id):
+            calls.append(session_id)
+            await asyncio.sleep(0.02)
+            return "active", "user_1"
+
+        cache = SessionStatusCache(loader)
+        results = await asyncio.gather(*(cache.get("sess_1") for _ in range(10)))
+
+        assert calls == ["sess_1"]
+        assert all(result == ("active", "user_1") for result in results)
+
+    @pytest.mark.asyncio
+    async def test_expiry_eviction_and_errors(self):
+        """Entries expire, the cache is bounded and failed lookups are not cached"""
+        calls = []
+
+        async def loader(session_id):
+            calls.append(session_id)
+            if session_id == "broken":
+                raise RuntimeError("Clerk unavailable")
+            return "active", None
+
+        cache = SessionStatusCache(loader, ttl_seconds=0.05, max_entries=2)
+        await cache.get("a")
+        await cache.get("b")
+        await cache.get("c")
+        assert list(cache._entries) == ["b", "c"]
+
+        await asyncio.sleep(0.06)
+        await cache.get("c")
+        assert calls.count("c") == 2
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.get("broken")
+        assert calls.count("broken") == 2
+        assert cache.stats.session_remote_errors == 2
@@ -0,0 +1,196 @@
+"""
+Tests for Conversation Memory
+Tests append-only writes, windowed reads, compaction and pool reuse
+"""
+import pytest
+
+from app.owl import memory
+from app.owl.memory import ConversationMemory, new_messages
+
+
+class FakeRedisPipeline:
+    """Queues commands and runs them against FakeRedis on execute()"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.queued = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.queued.append((name, args))
+        return queue
+
+    async def execute(self):
+        self.backend.round_trips += 1
+        return [getattr(self.backend, f"_{name}")(*args) for name, args in self.queued]
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the list and hash commands conversation memory uses"""
+
+    def __init__(self):
+        self.lists = {}
+        self.hashes = {}
+        self.expiries = {}
+        self.round_trips = 0
+        self.pushed = 0
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+    @staticmethod
+    def _slice(items, start, stop):
+        length = len(items)
+        start = max(start + length if start < 0 else start, 0)
+        stop = stop + length if stop < 0 else stop
+        return items[start:stop + 1]
+
+    def _rpush(self, key, *values):
+        self.pushed += len(values)
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    def _llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def _lindex(self, key, index):
+        items = self.lists.get(key, [])
+        return items[index] if -len(items) <= index < len(items) else None
+
+    def _lrange(self, key, start, stop):
+        return self._slice(self.lists.get(key, []), start, stop)
+
+    def _ltrim(self, key, start, stop):
+        self.lists[key] = self._slice(self.lists.get(key, []), start, stop)
+        return True
+
+    def _hget(self, key, field):
+        value = self.hashes.get(key, {}).get(field)
+        return None if value is None else str(value)
+
+    def _hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+        return 1
+
+    def _hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = int(fields.get(field, 0)) + amount
+        return fields[field]
+
+    def _expire(self, key, seconds):
+        self.expiries[key] = seconds
+        return True
+
+    async def lrange(self, key, start, stop):
+        self.round_trips += 1
+        return self._lrange(key, start, stop)
+
+    async def ltrim(self, key, start, stop):
+        self.round_trips += 1
+        return self._ltrim(key, start, stop)
+
+
+def turn(number):
+    return [{"role": "user", "content": f"question {number}"}, {"role": "assistant", "content": f"answer {number}"}]
+
+
+def conversation(turns):
+    messages = []
+    for number in range(1, turns + 1):
+        messages.extend(turn(number))
+    return messages + [{"role": "user", "content": f"question {turns + 1}"}]
+
+
+class TestNewMessages:
+    """Test detection of messages not stored yet"""
+
+    def test_full_resend_appends_only_the_tail(self):
+        messages = conversation(2)
+        assert new_messages(messages, 0, None) == messages
+        assert new_messages(messages, 4, messages[3]) == messages[4:]
+        assert new_messages(messages, 5, messages[4]) == []
+
+    def test_windowed_resend_resumes_after_stored_tail(self):
+        """Clients sending only recent messages still append just the unseen ones"""
+        messages = conversation(5)
+        assert new_messages(messages[-5:], 9, messages[-3]) == messages[-2:]
+        assert new_messages([{"role": "user", "content": "new topic"}], 9, messages[-3]) == [{"role": "user", "content": "new topic"}]
+
+
+class TestConversationMemory:
+    """Test ConversationMemory against an in-memory Redis"""
+
+    @pytest.mark.asyncio
+    async def test_turns_append_only_new_messages_and_read_a_window(self):
+        """Redis traffic per turn stays constant while the conversation grows"""
+        redis = FakeRedis()
+        store = ConversationMemory(window=4, max_messages=10, ttl_seconds=60, client=redis)
+
+        for turns in range(12):
+            redis.round_trips, redis.pushed = 0, 0
+            messages = conversation(turns)
+            history = await store.record(messages, "user_1", "s1")
+
+            assert history == messages[-4:]
+            assert redis.round_trips == 2
+            # after the first turn only the previous answer and the new question are written
+            assert redis.pushed == (len(messages) if turns == 0 else 2)
+
+        assert len(redis.lists["chat:user_1:s1"]) == 10
+        assert redis.hashes["chat:user_1:s1:meta"]["count"] == 23
+        assert redis.expiries["chat:user_1:s1"] == 60
+
+        redis.pushed = 0
+        await store.record(conversation(11), "user_1", "s1")  # retried request
+        assert redis.pushed == 0
+
+    @pytest.mark.asyncio
+    async def test_older_turns_are_compacted_into_a_summary(self):
+        """With a summarizer the list is folded down to the window and the summary leads the history"""
+        redis = FakeRedis()
+        calls = []
+
+        async def summarizer(messages, previous):
+            calls.append((len(messages), previous))
+            return f"{previous or ''}+{len(messages)}"
+
+        store = ConversationMemory(window=4, max_messages=8, summarizer=summarizer, client=redis)
+        for turns in range(8):
+            history = await store.record(conversation(turns), "user_1", "s1")
+
+        assert calls == [(5, None), (6, "+5")]
+        assert len(redis.lists["chat:user_1:s1"]) <= 8
+        assert history[0] == {"role": "system", "content": "Summary of the earlier conversation: +5+6"}
+        assert history[1:] == conversation(7)[-4:]
+
+    @pytest.mark.asyncio
+    async def test_unavailable_redis_falls_back_to_a_local_window(self):
+        """Errors back off to the client's own messages instead of retrying Redis every turn"""
+
+        class BrokenRedis(FakeRedis):
+            def pipeline(self, transaction=True):
+                self.round_trips += 1
+                raise ConnectionError("down")
+
+        redis = BrokenRedis()
+        store = ConversationMemory(window=3, client=redis)
+        messages = conversation(3)
+
+        assert await store.record(messages, "user_1", "s1") == messages[-3:]
+        assert await store.record(messages, "user_1", "s1") == messages[-3:]
+        assert redis.round_trips == 1
+        assert store.stats["fallbacks"] == 1
+        assert await store.record(messages, None, "s1") == messages[-3:]
+
+    @pytest.mark.asyncio
+    async def test_clients_share_one_pool_per_url(self, monkeypatch):
+        """Every memory built for the same URL reuses the process-wide pool"""
+        monkeypatch.setattr(memory, "_pools", {})
+        first = ConversationMemory("redis://localhost:6379/0").client
+        second = ConversationMemory("redis://localhost:6379/0").client
+
+        assert first.connection_pool is second.connection_pool
+        assert ConversationMemory("redis://localhost:6379/1").client.connection_pool is not first.connection_pool
+
+        await memory.close_connection_pools()
+        assert memory._pools == {}
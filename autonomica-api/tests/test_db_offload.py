@@ -0,0 +1,102 @@
+"""
+Tests for Database Thread Offload Module
+Tests pool configuration, SQLite WAL and offloading ORM work off the event loop
+"""
+import asyncio
+import threading
+import time
+import pytest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.schema import Base, ContentPiece
+from app.services.database import engine_options, enable_sqlite_wal
+from app.services.db_offload import run_db
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://", **engine_options("sqlite://"))
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(ContentPiece(title="Post", content="Body"))
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestEngineConfiguration:
+    """Test engine pool options"""
+
+    def test_engine_options(self):
+        """Pool settings apply to server databases and file SQLite"""
+        postgres = engine_options("postgresql://user@db/app")
+        assert postgres["pool_pre_ping"] is True
+        assert postgres["pool_size"] > 0
+
+        assert "pool_size" in engine_options("sqlite:///./autonomica.db")
+        assert engine_options("sqlite://")["poolclass"] is StaticPool
+
+    def test_file_sqlite_uses_wal(self, tmp_path):
+        """File SQLite databases are switched to WAL journaling"""
+        url = f"sqlite:///{tmp_path / 'wal.db'}"
+        engine = create_engine(url, **engine_options(url))
+        enable_sqlite_wal(engine)
+
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        engine.dispose()
+
+
+class TestRunDb:
+    """Test running ORM work without blocking the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_sync_session_work_runs_off_loop(self, db_session):
+        """Work on a plain Session runs on the DB thread pool"""
+        def load(session):
+            return threading.current_thread().name, session.query(ContentPiece).count()
+
+        thread_name, count = await run_db(db_session, load)
+
+        assert thread_name.startswith("db")
+        assert count == 1
+
+    @pytest.mark.asyncio
+    async def test_loop_stays_responsive(self, db_session):
+        """Other coroutines keep running while a slow query is in flight"""
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        def slow_query(session):
+            time.sleep(0.2)
+            return session.query(ContentPiece).count()
+
+        count, _ = await asyncio.gather(run_db(db_session, slow_query), ticker())
+
+        assert count == 1
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.2
+
+    @pytest.mark.asyncio
+    async def test_calls_on_one_session_are_serialized(self, db_session):
+        """Concurrent run_db calls never use the same session at once"""
+        active = []
+        overlaps = []
+
+        def work(session):
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(True)
+            time.sleep(0.02)
+            active.pop()
+
+        await asyncio.gather(*(run_db(db_session, work) for _ in range(5)))
+
+        assert overlaps == []
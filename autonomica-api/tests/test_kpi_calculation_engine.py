@@ -0,0 +1,117 @@
+"""
+Tests for KPI Calculation Engine Module
+Tests batched period metrics aggregation against an in-memory SQLite database
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.schema import Base, SocialPost, ContentPiece, ContentStatus
+from app.services.database import engine_options
+from app.services.kpi_calculation_engine import KPICalculationEngine
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://", **engine_options("sqlite://"))
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    now = datetime.utcnow()
+    for days_ago, impressions, engagements in [(1, 1000, 50), (10, 500, 40), (45, 800, 20), (200, 300, 3)]:
+        content = ContentPiece(
+            title="Post", content="Body", user_id=1,
+            status=ContentStatus.PUBLISHED, created_at=now - timedelta(days=days_ago)
+        )
+        session.add(content)
+        session.flush()
+        session.add(SocialPost(
+            platform="twitter", content_id=content.id, user_id=1,
+            metrics={"impressions": impressions, "engagements": engagements, "reach": 10, "clicks": 2},
+            created_at=now - timedelta(days=days_ago)
+        ))
+    # Another user's post must not be counted
+    session.add(SocialPost(
+        platform="twitter", user_id=2, metrics={"impressions": 99999},
+        created_at=now - timedelta(days=1)
+    ))
+    # Posts without metrics still count as data points
+    session.add(SocialPost(platform="linkedin", user_id=1, metrics=None, created_at=now - timedelta(days=2)))
+    session.commit()
+
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def kpi_engine(db_session):
+    return KPICalculationEngine(db_session, Mock(), Mock())
+
+
+@pytest.fixture
+def query_counter(db_session):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(engine, "before_cursor_execute", count)
+
+
+class TestPeriodMetricsAggregation:
+    """Test the single-pass period metrics aggregation"""
+
+    @pytest.mark.asyncio
+    async def test_overlapping_windows_in_one_query_per_table(self, kpi_engine, query_counter):
+        """Several windows are aggregated with one query per table"""
+        now = datetime.utcnow()
+        month = (now - timedelta(days=30), now)
+        quarter = (now - timedelta(days=90), now)
+
+        metrics = await kpi_engine._get_period_metrics_batch([month, quarter, (None, None)], user_id=1)
+
+        assert len(query_counter) == 2
+        assert metrics[month]["impressions"] == 1500
+        assert metrics[month]["engagement"] == 90
+        assert metrics[month]["posts"] == 3
+        assert metrics[quarter]["impressions"] == 2300
+        assert metrics[(None, None)]["posts"] == 5
+        assert metrics[(None, None)]["content_count"] == 4
+        assert metrics[month]["conversion_rate"] == 5.0
+
+    @pytest.mark.asyncio
+    async def test_calculate_all_kpis_scans_each_table_once(self, kpi_engine, query_counter):
+        """A full dashboard refresh issues one aggregated query per table"""
+        kpis = await kpi_engine.calculate_all_kpis("monthly", user_id=1)
+
+        assert len(kpis) == len(kpi_engine.kpi_targets)
+        assert len(query_counter) == 2
+
+        by_name = {kpi.kpi_id: kpi for kpi in kpis}
+        assert by_name["impressions_growth"].value == 1500
+        assert by_name["impressions_growth"].previous_value == 800
+        assert by_name["engagement_rate"].value == pytest.approx(6.0)
+        assert by_name["engagement_rate"].data_points == 3
+        assert by_name["conversion_rate"].data_points == 2
+
+    @pytest.mark.asyncio
+    async def test_scope_memoizes_across_calls(self, kpi_engine, query_counter):
+        """Within one scope, repeated KPI and growth calls reuse loaded windows"""
+        async with kpi_engine.period_metrics_scope():
+            await kpi_engine.calculate_kpi("engagement_rate", "monthly", user_id=1)
+            await kpi_engine.calculate_kpi("impressions_growth", "monthly", user_id=1)
+            growth = await kpi_engine.calculate_growth_metrics("monthly", user_id=1)
+
+        assert len(query_counter) == 2
+        assert growth.impressions_growth == pytest.approx((1500 - 800) / 800 * 100)
+
+        # Outside the scope nothing is memoized
+        await kpi_engine.calculate_growth_metrics("monthly", user_id=1)
+        assert len(query_counter) == 4
@@ -0,0 +1,197 @@
+"""
+Tests for KPI Time-Series Analytics Module
+Checks the vectorized statistics against the original pure-Python implementation
+"""
+import math
+import random
+import statistics
+import pytest
+from unittest.mock import Mock
+
+from app.services import kpi_timeseries
+from app.services.kpi_timeseries import analyze_series, as_matrix
+from app.services.kpi_calculation_engine import KPICalculationEngine
+
+
+# Reference implementation (the previous per-series loops)
+
+def ref_velocity(data, period_days):
+    if len(data) < 2:
+        return 0.0
+    n = len(data)
+    x_values = list(range(n))
+    sum_x = sum(x_values)
+    sum_y = sum(data)
+    sum_xy = sum(x * y for x, y in zip(x_values, data))
+    sum_x2 = sum(x * x for x in x_values)
+    if n * sum_x2 - sum_x * sum_x == 0:
+        return 0.0
+    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
+    return slope * (period_days / n)
+
+
+def ref_momentum(data, window):
+    if len(data) < window + 1:
+        return 0.0
+    recent_data = data[-window:]
+    previous_data = data[-2*window:-window] if len(data) >= 2*window else data[:-window]
+    return ref_velocity(recent_data, window) - ref_velocity(previous_data, window)
+
+
+def ref_volatility(data):
+    if len(data) < 2:
+        return 0.0
+    mean = statistics.mean(data)
+    variance = statistics.variance(data, mean)
+    return math.sqrt(variance) / mean if mean != 0 else 0.0
+
+
+def ref_autocorrelation(data, lag):
+    if len(data) <= lag:
+        return 0.0
+    mean = statistics.mean(data)
+    variance = statistics.variance(data, mean)
+    if variance == 0:
+        return 0.0
+    autocorr = sum((data[i] - mean) * (data[i + lag] - mean) for i in range(len(data) - lag))
+    return autocorr / ((len(data) - lag) * variance)
+
+
+def ref_seasonality(data):
+    if len(data) < 12:
+        return 0.0
+    return sum(abs(ref_autocorrelation(data, lag)) for lag in [1, 2, 3, 6, 12] if lag < len(data)) / 5
+
+
+def ref_forecast(data, horizon):
+    if len(data) < 3:
+        return data[-1] if data else 0.0
+    alpha, beta = 0.3, 0.1
+    s = data[0]
+    b = data[1] - data[0]
+    for i in range(1, len(data)):
+        s_prev = s
+        s = alpha * data[i] + (1 - alpha) * (s + b)
+        b = beta * (s - s_prev) + (1 - beta) * b
+    return max(0, s + b * horizon)
+
+
+def ref_confidence_interval(data, confidence_level):
+    if len(data) < 2:
+        return (0.0, 0.0)
+    mean = statistics.mean(data)
+    standard_error = statistics.stdev(data) / math.sqrt(len(data))
+    z_score = 1.96 if confidence_level == 0.95 else 1.645
+    return (mean - z_score * standard_error, mean + z_score * standard_error)
+
+
+@pytest.fixture
+def series():
+    rng = random.Random(42)
+    generated = []
+    for length in [0, 1, 2, 3, 5, 6, 11, 12, 13, 30, 30, 30, 90]:
+        generated.append([max(0.0, 100 + 20 * math.sin(i * 0.1) + rng.uniform(-5, 5)) for i in range(length)])
+    generated.append([0.1] * 20)            # constant series
+    generated.append([1.0, -1.0] * 10)      # zero mean
+    generated.append([0.0] * 8 + [50.0])    # spike
+    return generated
+
+
+class TestVectorizedStatistics:
+    """Test the vectorized statistics match the reference loops"""
+
+    def test_analyze_series_matches_reference(self, series):
+        """Every statistic matches the original implementation, series by series"""
+        results = analyze_series(
+            series, period_days=30, momentum_window=5, forecast_horizon=3, confidence_level=0.95
+        )
+
+        assert len(results) == len(series)
+        for data, stats in zip(series, results):
+            assert stats.velocity == pytest.approx(ref_velocity(data, 30), rel=1e-9, abs=1e-9)
+            assert stats.momentum == pytest.approx(ref_momentum(data, 5), rel=1e-9, abs=1e-9)
+            assert stats.volatility == pytest.approx(ref_volatility(data), rel=1e-9, abs=1e-9)
+            assert stats.seasonality == pytest.approx(ref_seasonality(data), rel=1e-9, abs=1e-9)
+            if len(data) >= 6:
+                assert stats.forecast == pytest.approx(ref_forecast(data, 3), rel=1e-9, abs=1e-9)
+                assert stats.confidence_interval == pytest.approx(
+                    ref_confidence_interval(data, 0.95), rel=1e-9, abs=1e-9
+                )
+            else:
+                assert stats.forecast == 0.0
+                assert stats.confidence_interval == (0.0, 0.0)
+
+    def test_autocorrelation_all_lags_in_one_call(self, series):
+        """Batched autocorrelation returns one column per lag"""
+        matrix = as_matrix([data for data in series if len(data) == 30])
+        lags = [1, 2, 3, 6, 12, 40]
+        correlations = kpi_timeseries.autocorrelation(matrix, lags)
+
+        assert correlations.shape == (3, len(lags))
+        for row, data in enumerate(matrix.tolist()):
+            for column, lag in enumerate(lags):
+                assert correlations[row, column] == pytest.approx(ref_autocorrelation(data, lag), abs=1e-9)
+
+    def test_short_series_forecast(self):
+        """Series too short for smoothing forecast their last value"""
+        assert kpi_timeseries.holt_forecast(as_matrix([[4.0, 7.0]]), 3).tolist() == [7.0]
+        assert kpi_timeseries.holt_forecast(as_matrix([[]]), 3).tolist() == [0.0]
+
+    def test_engine_helpers_delegate(self, series):
+        """The engine's single-series helpers keep their previous results"""
+        engine = KPICalculationEngine(Mock(), Mock(), Mock())
+        data = series[9]
+
+        assert engine._calculate_velocity(data, 30) == pytest.approx(ref_velocity(data, 30))
+        assert engine._calculate_autocorrelation(data, 6) == pytest.approx(ref_autocorrelation(data, 6))
+        assert engine._forecast_next_period(data, 3) == pytest.approx(ref_forecast(data, 3))
+        assert engine._calculate_confidence_interval(data, 0.9) == pytest.approx(ref_confidence_interval(data, 0.9))
+
+
+class TestBatchAdvancedKPIs:
+    """Test calculate_advanced_kpis over many users"""
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_calls(self):
+        """Batch results equal per-KPI calculate_advanced_kpi results"""
+        engine = KPICalculationEngine(Mock(), Mock(), Mock())
+        user_ids = [f"user_{i}" for i in range(20)]
+
+        batch = await engine.calculate_advanced_kpis(None, "monthly", user_ids)
+
+        assert len(batch) == len(user_ids) * len(engine.kpi_targets)
+        single = await engine.calculate_advanced_kpi("engagement_rate", "monthly", "user_3")
+        batched = batch[("engagement_rate", "user_3")]
+        for field_name in ["value", "velocity", "momentum", "volatility", "seasonality", "forecast"]:
+            assert getattr(batched, field_name) == pytest.approx(getattr(single, field_name))
+        assert batched.confidence_interval == pytest.approx(single.confidence_interval)
+
+    @pytest.mark.asyncio
+    async def test_unknown_kpi_raises(self):
+        """Unknown KPI names are rejected"""
+        engine = KPICalculationEngine(Mock(), Mock(), Mock())
+
+        with pytest.raises(ValueError):
+            await engine.calculate_advanced_kpi("not_a_kpi")
+
+    @pytest.mark.asyncio
+    async def test_failing_kpi_is_isolated(self):
+        """With return_exceptions one failing KPI does not drop the others"""
+        engine = KPICalculationEngine(Mock(), Mock(), Mock())
+        build = engine._build_advanced_kpi
+
+        def failing_build(kpi_name, *args):
+            if kpi_name == "engagement_rate":
+                raise ZeroDivisionError("bad series")
+            return build(kpi_name, *args)
+
+        engine._build_advanced_kpi = failing_build
+
+        results = await engine.calculate_advanced_kpis(None, "monthly", ["user_1"], return_exceptions=True)
+
+        assert isinstance(results[("engagement_rate", "user_1")], ZeroDivisionError)
+        others = [value for (name, _), value in results.items() if name != "engagement_rate"]
+        assert others and not any(isinstance(value, Exception) for value in others)
+
+        with pytest.raises(ZeroDivisionError):
+            await engine.calculate_advanced_kpis(None, "monthly", ["user_1"])
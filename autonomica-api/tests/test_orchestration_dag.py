@@ -0,0 +1,166 @@
+"""
+Tests for WorkforceOrchestrator DAG execution
+Tests topological sorting, ready-queue scheduling, concurrency limits and critical-path timing
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+from app.owl.orchestration import WorkforceOrchestrator, WorkflowCycleError, OrchestrationMode
+from app.owl.tasks import Task, TaskStatus
+
+
+def make_tasks(spec):
+    """spec: {name: (duration, [dependency names], agent name)}"""
+    tasks = {name: Task(id=name, title=name, description=name) for name in spec}
+    for name, (duration, deps, agent) in spec.items():
+        tasks[name].dependencies = list(deps)
+        tasks[name].metadata.update({"duration": duration, "agent": agent})
+    return list(tasks.values())
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    """Orchestrator whose tasks sleep for their duration instead of calling agents"""
+    orchestrator = WorkforceOrchestrator()
+    orchestrator.active = 0
+    orchestrator.peak = 0
+    orchestrator.active_per_agent = {}
+    orchestrator.peak_per_agent = {}
+
+    async def allocate(task):
+        name = task.metadata["agent"]
+        return SimpleNamespace(id=name) if name else None
+
+    async def execute(task, agent, workflow):
+        orchestrator.active += 1
+        orchestrator.peak = max(orchestrator.peak, orchestrator.active)
+        per_agent = orchestrator.active_per_agent.get(agent.id, 0) + 1
+        orchestrator.active_per_agent[agent.id] = per_agent
+        orchestrator.peak_per_agent[agent.id] = max(orchestrator.peak_per_agent.get(agent.id, 0), per_agent)
+        try:
+            await asyncio.sleep(task.metadata["duration"])
+            if task.metadata.get("fail"):
+                raise RuntimeError("boom")
+            orchestrator._set_task_status(task, TaskStatus.COMPLETED)
+            return {"task_id": task.id, "status": "completed", "agent_id": agent.id}
+        finally:
+            orchestrator.active -= 1
+            orchestrator.active_per_agent[agent.id] -= 1
+
+    monkeypatch.setattr(orchestrator, "_allocate_agent_for_task", allocate)
+    monkeypatch.setattr(orchestrator, "_execute_single_task", execute)
+    return orchestrator
+
+
+class TestTopologicalSort:
+    """Test dependency ordering"""
+
+    def test_order_levels_and_cycles(self):
+        """Dependencies come first, levels follow the longest chain, cycles are rejected"""
+        orchestrator = WorkforceOrchestrator()
+        tasks = make_tasks({
+            "d": (0, ["b", "c"], "x"),
+            "b": (0, ["a"], "x"),
+            "c": (0, ["a", "external"], "x"),
+            "a": (0, [], "x"),
+        })
+
+        order = [task.id for task in orchestrator._topological_sort(tasks)]
+        assert order.index("a") < order.index("b") < order.index("d")
+        assert order.index("c") < order.index("d")
+
+        levels = orchestrator._group_tasks_by_dependency_level(tasks)
+        assert {level: sorted(t.id for t in group) for level, group in levels.items()} == {
+            0: ["a"], 1: ["b", "c"], 2: ["d"]
+        }
+
+        cyclic = make_tasks({"a": (0, ["c"], "x"), "b": (0, ["a"], "x"), "c": (0, ["b"], "x"), "d": (0, [], "x")})
+        with pytest.raises(WorkflowCycleError) as exc:
+            orchestrator._topological_sort(cyclic)
+        assert sorted(exc.value.task_ids) == ["a", "b", "c"]
+        with pytest.raises(WorkflowCycleError):
+            orchestrator.create_workflow("cyclic", cyclic)
+        assert orchestrator.active_workflows == {}
+        assert orchestrator.task_dependency_graph == {}
+
+    def test_large_chain_is_linear(self):
+        """A long chain sorts without quadratic scans"""
+        orchestrator = WorkforceOrchestrator()
+        spec = {f"t{i}": (0, [f"t{i - 1}"] if i else [], "x") for i in range(5000)}
+        order = orchestrator._topological_sort(list(reversed(make_tasks(spec))))
+        assert [task.id for task in order[:3]] == ["t0", "t1", "t2"]
+
+
+class TestDagExecution:
+    """Test the ready-queue executor"""
+
+    @pytest.mark.asyncio
+    async def test_tasks_start_when_their_own_dependencies_finish(self, orchestrator):
+        """A slow task does not hold back unrelated tasks at the next level"""
+        tasks = make_tasks({
+            "slow": (0.2, [], "a1"),
+            "fast": (0.01, [], "a2"),
+            "after_fast": (0.01, ["fast"], "a3"),
+            "after_slow": (0.01, ["slow"], "a4"),
+        })
+        workflow = orchestrator.create_workflow("wf", tasks, mode=OrchestrationMode.PARALLEL)
+
+        result = await orchestrator.execute_workflow(workflow.id)
+
+        timing = result["timing"]["tasks"]
+        assert set(result["results"]) == {"slow", "fast", "after_fast", "after_slow"}
+        assert timing["after_fast"]["finished_at"] < timing["slow"]["finished_at"]
+        assert timing["after_slow"]["started_at"] >= timing["slow"]["finished_at"]
+        assert workflow.status == TaskStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_global_and_per_agent_limits(self, orchestrator):
+        """Concurrency is capped overall and per agent"""
+        orchestrator.max_concurrent_tasks = 2
+        spec = {f"t{i}": (0.02, [], f"agent{i}") for i in range(5)}
+        spec.update({f"s{i}": (0.02, [], "shared") for i in range(3)})
+        workflow = orchestrator.create_workflow("wf", make_tasks(spec), mode=OrchestrationMode.PARALLEL)
+
+        result = await orchestrator.execute_workflow(workflow.id)
+
+        assert len(result["results"]) == 8
+        assert orchestrator.peak == 2
+        assert orchestrator.peak_per_agent["shared"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_skip_dependents_only(self, orchestrator):
+        """Dependents of a failed or unassignable task are skipped; other branches finish"""
+        tasks = make_tasks({
+            "a": (0.01, [], "x"),
+            "b": (0.01, ["a"], "y"),
+            "c": (0.01, ["b"], "z"),
+            "no_agent": (0.01, [], None),
+            "after_no_agent": (0.01, ["no_agent"], "x"),
+            "ok": (0.01, [], "w"),
+        })
+        tasks[1].metadata["fail"] = True
+        workflow = orchestrator.create_workflow("wf", tasks, mode=OrchestrationMode.PARALLEL)
+
+        result = await orchestrator.execute_workflow(workflow.id)
+
+        assert set(result["results"]) == {"a", "ok"}
+        assert set(result["failed"]) == {"b", "no_agent"}
+        assert set(result["skipped"]) == {"c", "after_no_agent"}
+
+    @pytest.mark.asyncio
+    async def test_critical_path(self, orchestrator):
+        """The report names the chain that bounded the run"""
+        tasks = make_tasks({
+            "research": (0.05, [], "a"),
+            "draft": (0.1, ["research"], "b"),
+            "images": (0.02, ["research"], "c"),
+            "publish": (0.01, ["draft", "images"], "d"),
+        })
+        workflow = orchestrator.create_workflow("wf", tasks, mode=OrchestrationMode.PARALLEL)
+
+        timing = (await orchestrator.execute_workflow(workflow.id))["timing"]
+
+        assert timing["critical_path"] == ["research", "draft", "publish"]
+        assert 0.15 <= timing["critical_path_time"] <= timing["makespan"]
+        assert timing["tasks"]["publish"]["critical_predecessor"] == "draft"
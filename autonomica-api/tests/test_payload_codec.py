@@ -0,0 +1,106 @@
+"""
+Tests for Payload Codec Module
+Tests compressed encoding, legacy JSON reads and codec statistics
+"""
+import json
+import pytest
+from datetime import datetime
+
+from app.services.payload_codec import (
+    PayloadCodec,
+    PayloadCodecError,
+    CODEC_HEADER
+)
+
+
+@pytest.fixture
+def large_payload():
+    return {
+        "records": [
+            {"metric_name": "clicks", "metric_value": i, "source_id": f"source_{i % 3}"}
+            for i in range(200)
+        ]
+    }
+
+
+class TestPayloadCodec:
+    """Test PayloadCodec encode/decode"""
+
+    def test_small_payload_stays_plain_json(self):
+        """Payloads under the threshold are written exactly as JSON"""
+        codec = PayloadCodec(compression_threshold=1024)
+        encoded = codec.encode({"a": 1})
+
+        assert json.loads(encoded) == {"a": 1}
+        assert codec.stats.payloads_compressed == 0
+
+    def test_large_payload_round_trip(self, large_payload):
+        """Large payloads are compressed behind a header and decode to the same value"""
+        codec = PayloadCodec(compression_threshold=256)
+        encoded = codec.encode(large_payload)
+
+        assert encoded.startswith(CODEC_HEADER)
+        assert len(encoded) < len(json.dumps(large_payload))
+        assert codec.decode(encoded) == large_payload
+        assert codec.stats.compression_ratio > 1.0
+
+    def test_zlib_json_round_trip(self, large_payload):
+        """The stdlib-only configuration is always available"""
+        codec = PayloadCodec(compression_threshold=256, serializer="json", compression="zlib")
+        encoded = codec.encode(large_payload)
+
+        assert encoded.startswith(f"{CODEC_HEADER}jz:")
+        assert codec.decode(encoded) == large_payload
+        assert codec.name == "json+zlib"
+
+    def test_compression_disabled(self, large_payload):
+        """compression_enabled=False (or compress=False) keeps plain JSON"""
+        codec = PayloadCodec(compression_enabled=False, compression_threshold=256)
+
+        assert not codec.encode(large_payload).startswith(CODEC_HEADER)
+        assert codec.encode(large_payload, compress=True).startswith(CODEC_HEADER)
+        assert codec.name == "json"
+
+    def test_reads_legacy_json(self):
+        """Values written with json.dumps(default=str) are still readable"""
+        codec = PayloadCodec()
+        legacy = json.dumps({"timestamp": datetime(2024, 1, 1)}, default=str)
+
+        assert codec.decode(legacy) == {"timestamp": "2024-01-01 00:00:00"}
+        assert codec.decode(legacy.encode("utf-8"))["timestamp"] == "2024-01-01 00:00:00"
+        assert codec.stats.legacy_payloads_decoded == 2
+
+    def test_unknown_types_fall_back_to_str(self):
+        """Datetimes and other unknown types serialize like json.dumps(default=str)"""
+        codec = PayloadCodec()
+        value = {"when": datetime(2024, 1, 1, 12, 30)}
+
+        assert codec.decode(codec.encode(value)) == {"when": "2024-01-01 12:30:00"}
+
+    @pytest.mark.parametrize("threshold", [1 << 20, 256])
+    def test_non_str_keys_decode_like_json(self, threshold):
+        """Int keys come back as strings whether or not the payload was compressed"""
+        codec = PayloadCodec(compression_threshold=threshold)
+        value = {"by_hour": {hour: f"clicks for hour {hour}" for hour in range(24)}, 7: b"raw"}
+        encoded = codec.encode(value)
+
+        assert encoded.startswith(CODEC_HEADER) == (threshold == 256)
+        assert codec.decode(encoded) == json.loads(json.dumps(value, default=str))
+
+    def test_corrupt_payload_raises(self):
+        """A damaged compressed payload raises PayloadCodecError"""
+        codec = PayloadCodec()
+
+        with pytest.raises(PayloadCodecError):
+            codec.decode(f"{CODEC_HEADER}jz:not-base64-zlib")
+
+    def test_stats_report_codec_and_ratio(self, large_payload):
+        """get_stats exposes the codec choice and compression totals"""
+        codec = PayloadCodec(compression_threshold=256)
+        codec.encode(large_payload)
+        stats = codec.get_stats()
+
+        assert stats["codec"] == codec.name
+        assert stats["payloads_compressed"] == 1
+        assert stats["compression_savings_bytes"] == stats["raw_bytes"] - stats["stored_bytes"]
+        assert stats["compression_ratio"] > 1.0
@@ -0,0 +1,224 @@
+"""
+Tests for Task Allocation System
+Tests the capability/tool indexes, tool pruning, load-aware scoring and equivalence with a full scan
+"""
+import random
+import pytest
+
+from app.owl.agent import Agent, AgentBrain, ToolManager, TaskAllocationSystem
+from app.owl.monitoring import TaskMonitor
+from app.owl.tasks import Task, TaskStatus
+from app.owl.workforce import Agent as SimpleAgent
+
+
+def make_agent(agent_id, prompt, tools=(), model="gpt-3.5-turbo", status="idle"):
+    return Agent(
+        id=agent_id,
+        name=agent_id,
+        type="specialist",
+        brain=AgentBrain(model=model, system_prompt=prompt),
+        tool_manager=ToolManager(available_tools=list(tools)),
+        status=status,
+    )
+
+
+def legacy_score(agent, task):
+    """The scoring used before the indexes were introduced"""
+    score = 0.0
+    task_keywords = set(task.title.lower().split() + task.description.lower().split())
+    score += len(task_keywords & set(agent.brain.system_prompt.lower().split())) * 1.5
+    if task.required_tools:
+        required = set(task.required_tools)
+        available = set(agent.tool_manager.available_tools)
+        if required.issubset(available):
+            score += 10.0
+        score += len(required & available) * 2.0
+    if agent.status == "busy":
+        score -= 5.0
+    if "gpt-4" in agent.brain.model.lower():
+        score += 3.0
+    elif "claude-3" in agent.brain.model.lower():
+        score += 3.5
+    return score
+
+
+def legacy_allocate(agents, task, pruned=False):
+    """The previous full scan; pruned=True first narrows to agents holding all (then any) required tools"""
+    if pruned and task.required_tools:
+        required = set(task.required_tools)
+        online = {agent_id: agent for agent_id, agent in agents.items() if agent.status != "offline"}
+        for holds in (required.issubset, required.intersection):
+            candidates = {agent_id: agent for agent_id, agent in online.items() if holds(agent.tool_manager.available_tools)}
+            if candidates:
+                return legacy_allocate(candidates, task)
+    best_agent, highest_score = None, -1.0
+    for agent in agents.values():
+        if agent.status != "offline":
+            score = legacy_score(agent, task)
+            if score > highest_score:
+                highest_score, best_agent = score, agent
+    return best_agent
+
+
+VOCABULARY = [f"skill{i}" for i in range(400)]
+TOOLS = [f"tool{i}" for i in range(40)]
+
+
+def make_fleet(size, seed=7):
+    rng = random.Random(seed)
+    agents = {}
+    for i in range(size):
+        prompt = " ".join(rng.sample(VOCABULARY, 120))
+        agent = make_agent(f"agent-{i:04d}", prompt, rng.sample(TOOLS, 3), model=rng.choice(["gpt-4", "claude-3-opus", "llama3"]))
+        agents[agent.id] = agent
+    return agents
+
+
+def make_tasks(count, seed=11, with_tools=False):
+    rng = random.Random(seed)
+    return [
+        Task(
+            title=" ".join(rng.sample(VOCABULARY, 4)),
+            description=" ".join(rng.sample(VOCABULARY, 12)),
+            required_tools=rng.sample(TOOLS, 2) if with_tools else [],
+        )
+        for _ in range(count)
+    ]
+
+
+class TestAgentIndexes:
+    """Test index maintenance"""
+
+    @pytest.mark.asyncio
+    async def test_matches_legacy_scores_without_load(self):
+        """With no queued work scores equal the previous allocator's, over the tool-pruned candidates"""
+        allocator = TaskAllocationSystem()
+        agents = make_fleet(50)
+        for task in make_tasks(20) + make_tasks(20, seed=12, with_tools=True):
+            allocator.sync(agents)
+            _, score = allocator.select_agent(agents, task)
+            for agent in agents.values():
+                assert allocator._score_agent_for_task(agent, task) == legacy_score(agent, task)
+            assert score == legacy_score(legacy_allocate(agents, task, pruned=True), task)
+
+    @pytest.mark.asyncio
+    async def test_agent_changes_are_reindexed(self):
+        """Prompt and tool changes, removals and simple workforce agents are picked up"""
+        allocator = TaskAllocationSystem()
+        writer = make_agent("writer", "blog writing copy")
+        agents = {"writer": writer}
+        task = Task(title="Scrape", description="scrape competitor pages", required_tools=["browser"])
+
+        allocator.sync(agents)
+        assert allocator.select_agent(agents, task)[1] == 0.0
+
+        writer.tool_manager.available_tools.append("browser")
+        writer.brain.system_prompt = "scrape pages"
+        allocator.sync(agents)
+        assert allocator.select_agent(agents, task)[1] == 2 * 1.5 + 10.0 + 2.0
+
+        simple = SimpleAgent(id="seo-001", name="SEO", type="SEO", model="claude-3-sonnet", system_prompt="competitor seo")
+        agents = {"seo-001": simple}
+        allocator.sync(agents)
+        assert allocator._profiles.keys() == {"seo-001"}
+        assert "writer" not in allocator._tool_index.get("browser", set())
+        assert allocator.select_agent(agents, task)[0] is simple
+
+
+    @pytest.mark.asyncio
+    async def test_model_change_is_reindexed(self):
+        """Switching an agent's model in place changes its model bonus and the allocation"""
+        allocator = TaskAllocationSystem()
+        agents = {agent_id: make_agent(agent_id, "blog writing copy", model="gpt-3.5") for agent_id in ("a", "b")}
+        task = Task(title="Blog", description="blog writing")
+
+        allocator.sync(agents)
+        assert allocator.select_agent(agents, task)[0].id == "a"
+
+        agents["b"].brain.model = "gpt-4"
+        allocator.sync(agents)
+        assert allocator._profiles["b"].model == "gpt-4"
+        assert allocator.select_agent(agents, task)[0].id == "b"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_sync_does_not_reindex(self, monkeypatch):
+        """Syncing an unchanged registry keeps every profile without re-indexing"""
+        allocator = TaskAllocationSystem()
+        agents = make_fleet(50)
+        agents["simple"] = SimpleAgent(id="simple", name="SEO", type="SEO", model="claude-3-sonnet", system_prompt="seo")
+        allocator.sync(agents)
+        profiles = dict(allocator._profiles)
+
+        reindexed = []
+        monkeypatch.setattr(allocator, "register_agent", reindexed.append)
+        allocator.sync(agents)
+
+        assert reindexed == []
+        assert all(allocator._profiles[agent_id] is profile for agent_id, profile in profiles.items())
+
+class TestAllocation:
+    """Test candidate pruning and load-aware selection"""
+
+    @pytest.mark.asyncio
+    async def test_prunes_to_agents_with_required_tools(self):
+        """Only agents holding every required tool are scored when any exist"""
+        allocator = TaskAllocationSystem()
+        agents = {
+            "wordy": make_agent("wordy", "scrape analyse competitor pages report weekly", ["browser"], model="claude-3-opus"),
+            "tooled": make_agent("tooled", "generalist", ["browser", "sheets"]),
+            "offline": make_agent("offline", "generalist", ["browser", "sheets"], status="offline"),
+        }
+        task = Task(title="Scrape", description="scrape competitor pages weekly", required_tools=["browser", "sheets"])
+
+        assert (await allocator.allocate_task(agents, task)).id == "tooled"
+
+        del agents["tooled"]
+        assert (await allocator.allocate_task(agents, task)).id == "wordy"
+        assert await allocator.allocate_task({}, task) is None
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_spreads_work(self):
+        """Queued tasks lower an agent's score until the monitor reports them finished"""
+        allocator = TaskAllocationSystem()
+        monitor = TaskMonitor()
+        monitor.add_listener(allocator.on_status_change)
+        agents = {
+            "a": make_agent("a", "write blog posts"),
+            "b": make_agent("b", "write blog posts"),
+        }
+        tasks = [Task(title="Write", description=f"blog posts {i}") for i in range(4)]
+
+        chosen = []
+        for task in tasks:
+            monitor.register_task(task)
+            agent = await allocator.allocate_task(agents, task)
+            allocator.record_assignment(task.id, agent.id)
+            chosen.append(agent.id)
+
+        assert sorted(chosen) == ["a", "a", "b", "b"]
+        assert allocator.queue_depth("a") == 2
+
+        for task, agent_id in zip(tasks, chosen):
+            if agent_id == "a":
+                monitor.update_task_status(task.id, TaskStatus.COMPLETED)
+        assert allocator.queue_depth("a") == 0
+        assert allocator.queue_depth("b") == 2
+        assert (await allocator.allocate_task(agents, Task(title="Write", description="blog posts"))).id == "a"
+
+
+class TestFullScanEquivalence:
+    """Check the indexed allocator against a full rescan of every agent"""
+
+    @pytest.mark.asyncio
+    async def test_indexed_allocation_matches_pruned_full_scan(self):
+        """Same choices as a pruned full scan of every agent on a large fleet"""
+        agents = make_fleet(300)
+        tasks = make_tasks(200) + make_tasks(100, seed=13, with_tools=True)
+        allocator = TaskAllocationSystem()
+        allocator.sync(agents)
+
+        indexed = [await allocator.allocate_task(agents, task) for task in tasks]
+
+        expected = [legacy_allocate(agents, task, pruned=True) for task in tasks]
+        assert [legacy_score(agent, task) for agent, task in zip(indexed, tasks)] == \
+            [legacy_score(agent, task) for agent, task in zip(expected, tasks)]
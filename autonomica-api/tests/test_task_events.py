@@ -0,0 +1,221 @@
+"""
+Tests for Task Event Hub
+Tests per-user fan-out, resume from Last-Event-ID, heartbeats and monitor-driven events
+"""
+import asyncio
+import json
+import pytest
+from starlette.requests import Request
+
+from app.auth.clerk_middleware import ClerkUser
+from app.main import stream_task_events
+from app.owl.orchestration import WorkforceOrchestrator
+from app.owl.workforce import Workforce
+from app.owl.tasks import Task, TaskStatus
+from app.services.task_events import TaskEventHub
+
+
+async def next_frame(stream, timeout=1.0):
+    return await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+
+
+def parse_frame(frame):
+    fields = {}
+    for line in frame.strip().split("\n"):
+        name, _, value = line.partition(": ")
+        fields[name] = value
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+async def open_stream(hub, user_id, last_event_id=None):
+    """Open a stream and consume its preamble (retry + ready/replay)"""
+    stream = hub.stream(user_id, last_event_id)
+    assert (await next_frame(stream)).startswith("retry:")
+    if last_event_id is None:
+        assert parse_frame(await next_frame(stream))["event"] == "ready"
+    return stream
+
+
+class TestTaskEventHub:
+    """Test TaskEventHub"""
+
+    @pytest.mark.asyncio
+    async def test_events_fan_out_to_the_users_streams_only(self):
+        """Every open stream of a user receives the event; other users don't"""
+        hub = TaskEventHub(heartbeat_seconds=0.05)
+        first = await open_stream(hub, "user_1")
+        second = await open_stream(hub, "user_1")
+        other = await open_stream(hub, "user_2")
+
+        event = hub.publish("user_1", "task.status", {"task_id": "t1", "status": "queued"})
+
+        for stream in (first, second):
+            frame = parse_frame(await next_frame(stream))
+            assert frame["id"] == str(event.id)
+            assert frame["event"] == "task.status"
+            assert frame["data"]["status"] == "queued"
+        assert await next_frame(other) == ": heartbeat\n\n"
+
+        await first.aclose()
+        assert hub.subscriber_count("user_1") == 1
+        for stream in (second, other):
+            await stream.aclose()
+        assert hub.subscriber_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_resume_replays_missed_events(self):
+        """Reconnecting with the last seen id replays only newer events"""
+        hub = TaskEventHub()
+        seen = hub.publish("user_1", "task.status", {"task_id": "t1", "status": "queued"})
+        hub.publish("user_1", "task.status", {"task_id": "t1", "status": "in_progress"})
+        hub.publish("user_1", "task.status", {"task_id": "t1", "status": "completed"})
+
+        stream = await open_stream(hub, "user_1", last_event_id=seen.id)
+        replayed = [parse_frame(await next_frame(stream))["data"]["status"] for _ in range(2)]
+        await stream.aclose()
+
+        assert replayed == ["in_progress", "completed"]
+
+    @pytest.mark.asyncio
+    async def test_event_published_during_resume_is_sent_once(self):
+        """An event both replayed and queued on subscribe is only delivered by the replay"""
+        hub = TaskEventHub(heartbeat_seconds=0.05)
+        seen = hub.publish("user_1", "task.status", {"task_id": "t1", "status": "queued"})
+
+        stream = await open_stream(hub, "user_1", last_event_id=seen.id)
+        hub.publish("user_1", "task.status", {"task_id": "t1", "status": "in_progress"})
+
+        assert parse_frame(await next_frame(stream))["data"]["status"] == "in_progress"
+        assert await next_frame(stream) == ": heartbeat\n\n"
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_expired_resume_point_gets_reset(self):
+        """Ids older than the replay window (or this process) produce a reset event"""
+        hub = TaskEventHub(replay_size=2)
+        first = hub.publish("user_1", "task.status", {"task_id": "t1", "status": "queued"})
+        for status in ["in_progress", "completed", "failed"]:
+            hub.publish("user_1", "task.status", {"task_id": "t1", "status": status})
+
+        for last_event_id in (first.id, hub.first_event_id - 100):
+            stream = await open_stream(hub, "user_1", last_event_id=last_event_id)
+            frame = parse_frame(await next_frame(stream))
+            await stream.aclose()
+            assert frame["event"] == "reset"
+            assert frame["data"]["reason"] == "events_expired"
+
+    @pytest.mark.asyncio
+    async def test_slow_client_is_told_to_resync(self):
+        """A full stream queue never blocks publishers; the backlog is replaced by a reset, then live events follow"""
+        hub = TaskEventHub(queue_size=2)
+        stream = await open_stream(hub, "user_1")
+
+        for i in range(5):
+            hub.publish("user_1", "task.status", {"task_id": f"t{i}", "status": "queued"})
+
+        frame = parse_frame(await next_frame(stream))
+        assert frame["event"] == "reset"
+        assert frame["data"]["reason"] == "client_too_slow"
+
+        hub.publish("user_1", "task.status", {"task_id": "t5", "status": "queued"})
+        assert parse_frame(await next_frame(stream))["data"]["task_id"] == "t5"
+        await stream.aclose()
+        assert hub.stats["overflows"] == 1
+
+
+    @pytest.mark.asyncio
+    async def test_idle_channels_are_evicted(self):
+        """Users with no open stream and no recent event are dropped; their old resume points reset"""
+        hub = TaskEventHub(idle_ttl_seconds=0.01)
+        seen = hub.publish("user_1", "task.status", {"task_id": "t1", "status": "queued"})
+        hub.publish("user_1", "task.status", {"task_id": "t1", "status": "completed"})
+        connected = await open_stream(hub, "user_2")
+        await asyncio.sleep(0.02)
+
+        hub.publish("user_3", "task.status", {"task_id": "t3", "status": "queued"})
+
+        assert set(hub._channels) == {"user_2", "user_3"}
+        assert hub.stats["idle_evictions"] == 1
+        stream = await open_stream(hub, "user_1", last_event_id=seen.id)
+        frame = parse_frame(await next_frame(stream))
+        assert frame["event"] == "reset"
+        for open_one in (stream, connected):
+            await open_one.aclose()
+
+class TestMonitorEvents:
+    """Test events driven by TaskMonitor and orchestration"""
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_status_changes_are_published(self):
+        """Task and workflow transitions reach the owning user's stream"""
+        hub = TaskEventHub()
+        orchestrator = WorkforceOrchestrator()
+        hub.attach_monitor(orchestrator.task_monitor)
+        stream = await open_stream(hub, "user_1")
+
+        task = Task(title="Write post", description="Blog post")
+        workflow = orchestrator.create_workflow("Campaign", [task], user_id="user_1")
+        orchestrator.task_monitor.update_workflow_status(workflow, TaskStatus.IN_PROGRESS)
+        orchestrator._set_task_status(task, TaskStatus.IN_PROGRESS)
+        orchestrator._set_task_status(task, TaskStatus.IN_PROGRESS)  # unchanged: no event
+        orchestrator._set_task_status(task, TaskStatus.COMPLETED)
+
+        frames = [parse_frame(await next_frame(stream)) for _ in range(3)]
+        await stream.aclose()
+
+        assert [frame["event"] for frame in frames] == ["workflow.status", "task.status", "task.status"]
+        assert frames[0]["data"]["workflow_id"] == workflow.id
+        assert frames[2]["data"] == {
+            **frames[2]["data"],
+            "task_id": task.id,
+            "workflow_id": workflow.id,
+            "status": "COMPLETED",
+            "previous_status": "IN_PROGRESS",
+        }
+        assert hub.stats["published"] == 3
+
+    @pytest.mark.asyncio
+    async def test_workforce_allocation_is_published(self):
+        """Assigning a pending task publishes its pending -> in_progress transition"""
+        hub = TaskEventHub()
+        workforce = Workforce(default_model="test-model")
+        hub.attach_monitor(workforce.task_monitor)
+        stream = await open_stream(hub, "user_1")
+
+        task = Task(title="Write post", description="Blog post", metadata={"user_id": "user_1"})
+        workforce.add_task(task)
+        await workforce._allocate_tasks()
+
+        frame = parse_frame(await next_frame(stream))
+        await stream.aclose()
+
+        assert task.status == TaskStatus.IN_PROGRESS
+        assert frame["data"]["task_id"] == task.id
+        assert frame["data"]["status"] == "IN_PROGRESS"
+        assert frame["data"]["previous_status"] == "PENDING"
+
+
+class TestTaskEventsEndpoint:
+    """Test /api/tasks/events"""
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_last_event_id_header(self, monkeypatch):
+        """The Last-Event-ID header selects the replay point"""
+        hub = TaskEventHub()
+        monkeypatch.setattr("app.main.task_event_hub", hub)
+        seen = hub.publish("user_1", "task.status", {"task_id": "t1", "status": "queued"})
+        hub.publish("user_1", "task.status", {"task_id": "t1", "status": "completed"})
+
+        request = Request({
+            "type": "http", "method": "GET", "path": "/api/tasks/events", "query_string": b"",
+            "headers": [(b"last-event-id", str(seen.id).encode())]
+        })
+        response = await stream_task_events(request, None, ClerkUser(user_id="user_1", claims={}))
+
+        assert response.media_type == "text/event-stream"
+        frames = response.body_iterator
+        await next_frame(frames)
+        assert parse_frame(await next_frame(frames))["data"]["status"] == "completed"
+        await frames.aclose()
@@ -0,0 +1,300 @@
+"""
+Tests for Task Repository Module
+Tests secondary indexes, per-user counters and cursor pagination on both backends
+"""
+import pytest
+from datetime import datetime, timedelta
+from redis.exceptions import WatchError
+
+from app.services.task_repository import (
+    TaskRepository,
+    InMemoryTaskRepository,
+    RedisTaskRepository,
+    InvalidCursorError,
+    create_task_repository
+)
+
+
+def parse_bound(bound):
+    if bound in ("-inf", "+inf"):
+        return float(bound), False
+    if isinstance(bound, str) and bound.startswith("("):
+        return float(bound[1:]), True
+    return float(bound), False
+
+
+class FakeRedisPipeline:
+    """Runs commands immediately until multi(), then queues them until execute()"""
+
+    def __init__(self, backend, transaction=True):
+        self.backend = backend
+        self.queued = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    async def watch(self, key):
+        self.backend.watched[key] = self.backend.versions.get(key, 0)
+
+    async def unwatch(self):
+        self.backend.watched.clear()
+
+    async def get(self, key):
+        return await self.backend.get(key)
+
+    def multi(self):
+        self.queued = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            if self.queued is None:
+                self.queued = []
+            self.queued.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        if self.backend.before_execute:
+            self.backend.before_execute()
+        stale = any(self.backend.versions.get(key, 0) != version for key, version in self.backend.watched.items())
+        self.backend.watched.clear()
+        queued, self.queued = self.queued or [], None
+        if stale:
+            raise WatchError("watched key changed")
+        return [getattr(self.backend, f"_{name}")(*args, **kwargs) for name, args, kwargs in queued]
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio commands the repository uses"""
+
+    def __init__(self):
+        self.values = {}
+        self.sorted_sets = {}
+        self.hashes = {}
+        self.versions = {}
+        self.watched = {}
+        self.before_execute = None
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self, transaction)
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _set(self, key, value):
+        self.values[key] = value
+        self._touch(key)
+        return True
+
+    def _delete(self, key):
+        self._touch(key)
+        return int(self.values.pop(key, None) is not None)
+
+    def _zadd(self, key, mapping):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    def _zrem(self, key, *members):
+        for member in members:
+            self.sorted_sets.get(key, {}).pop(member, None)
+        return len(members)
+
+    def _hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+        return fields[field]
+
+    def _zrangebyscore(self, key, low, high, start=None, num=None, withscores=False):
+        (low, low_open), (high, high_open) = parse_bound(low), parse_bound(high)
+        members = sorted((score, member) for member, score in self.sorted_sets.get(key, {}).items())
+        members = [
+            (member, score) for score, member in members
+            if (score > low if low_open else score >= low) and (score < high if high_open else score <= high)
+        ]
+        if num is not None:
+            members = members[start:start + num]
+        return members if withscores else [member for member, _ in members]
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def hgetall(self, key):
+        return {field: str(count) for field, count in self.hashes.get(key, {}).items()}
+
+    async def zrangebyscore(self, *args, **kwargs):
+        return self._zrangebyscore(*args, **kwargs)
+
+    async def aclose(self):
+        pass
+
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def make_task(number, user_id="user_1", status="pending", agent_id=None, priority="medium", agent_type=None, created_second=None):
+    created_at = BASE_TIME + timedelta(seconds=number if created_second is None else created_second)
+    return {
+        "id": f"task-{number:03d}",
+        "title": f"Task {number}",
+        "description": "Test task",
+        "status": status,
+        "agent_id": agent_id,
+        "agent_type": agent_type,
+        "priority": priority,
+        "created_at": created_at.isoformat(),
+        "updated_at": created_at.isoformat(),
+        "user_id": user_id,
+        "metadata": {}
+    }
+
+
+@pytest.fixture(params=["memory", "redis"])
+def repository(request):
+    if request.param == "memory":
+        return InMemoryTaskRepository()
+    return RedisTaskRepository(FakeRedis())
+
+
+async def list_all(repository, user_id, limit=3, **filters):
+    tasks, cursor, pages = [], None, 0
+    while True:
+        page, cursor = await repository.list_tasks(user_id, limit=limit, cursor=cursor, **filters)
+        tasks.extend(page)
+        pages += 1
+        if cursor is None:
+            return tasks, pages
+
+
+class TestIndexesAndCounters:
+    """Test index and counter maintenance on writes"""
+
+    @pytest.mark.asyncio
+    async def test_counters_follow_state_transitions(self, repository):
+        """Counters and status indexes are adjusted on create, update and delete"""
+        await repository.create(make_task(1, agent_id="agent_a", agent_type="seo"))
+        await repository.create(make_task(2, agent_id="agent_a", agent_type="seo", priority="high"))
+        await repository.create(make_task(3))
+        await repository.create(make_task(4, user_id="user_2"))
+
+        await repository.update("task-001", {"status": "in_progress"})
+        await repository.update("task-001", {"status": "completed"})
+        await repository.update("task-002", {"status": "queued"})
+        await repository.delete("task-003")
+
+        stats = await repository.get_stats("user_1")
+        assert stats["total_tasks"] == 2
+        assert stats["by_status"] == {"completed": 1, "queued": 1}
+        assert stats["by_priority"] == {"medium": 1, "high": 1}
+        assert stats["by_agent_type"] == {"seo": 2}
+        assert stats["by_agent"] == {"agent_a": {"completed": 1, "queued": 1}}
+
+        completed, _ = await repository.list_tasks("user_1", status="completed")
+        assert [task["id"] for task in completed] == ["task-001"]
+        pending, _ = await repository.list_tasks("user_1", status="pending")
+        assert pending == []
+        assert (await repository.get_stats("user_2"))["total_tasks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_tasks(self, repository):
+        """Updating or deleting an unknown task is a no-op"""
+        assert await repository.update("nope", {"status": "completed"}) is None
+        assert await repository.delete("nope") is False
+        assert await repository.get("nope") is None
+        assert await repository.get_counters("user_1") == {}
+
+
+class TestRepositoryInterface:
+    """Test the abstract backend interface"""
+
+    def test_incomplete_backend_fails_on_instantiation(self):
+        """A backend missing a storage primitive cannot be created"""
+        class PartialRepository(TaskRepository):
+            async def get_many(self, task_ids):
+                return []
+
+        with pytest.raises(TypeError):
+            PartialRepository()
+
+
+class TestListTasks:
+    """Test cursor pagination and filtering"""
+
+    @pytest.mark.asyncio
+    async def test_cursor_pagination_visits_each_task_once(self, repository):
+        """Pages follow creation order, including tasks created at the same instant"""
+        for number in range(1, 8):
+            await repository.create(make_task(number, created_second=3 if number in (3, 4, 5) else number))
+
+        tasks, pages = await list_all(repository, "user_1", limit=2)
+
+        assert [task["id"] for task in tasks] == [f"task-{n:03d}" for n in range(1, 8)]
+        assert pages == 4
+
+    @pytest.mark.asyncio
+    async def test_filters_and_counts(self, repository):
+        """Filtered pages skip non-matching tasks; counts use counters where possible"""
+        for number in range(1, 11):
+            await repository.create(make_task(
+                number,
+                agent_id="agent_a" if number % 2 else None,
+                priority="high" if number % 3 == 0 else "low",
+                agent_type="seo" if number % 2 else None
+            ))
+
+        high, _ = await list_all(repository, "user_1", priority="high")
+        assert [task["id"] for task in high] == ["task-003", "task-006", "task-009"]
+
+        agent_tasks, _ = await list_all(repository, "user_1", agent_id="agent_a")
+        assert [task["id"] for task in agent_tasks] == ["task-001", "task-003", "task-005", "task-007", "task-009"]
+
+        assert await repository.count_tasks("user_1") == 10
+        assert await repository.count_tasks("user_1", priority="high") == 3
+        assert await repository.count_tasks("user_1", status="pending", agent_type="seo", priority="high") == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, repository):
+        """Garbage cursors are rejected"""
+        with pytest.raises(InvalidCursorError):
+            await repository.list_tasks("user_1", cursor="not-a-cursor")
+
+
+class TestRedisTaskRepository:
+    """Test Redis-specific behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_change_is_retried(self):
+        """A transition that loses a WATCH race is re-applied to the latest task"""
+        redis = FakeRedis()
+        repository = RedisTaskRepository(redis)
+        await repository.create(make_task(1))
+
+        def concurrent_update():
+            redis.before_execute = None
+            redis._set("tasks:task:task-001", redis.values["tasks:task:task-001"].replace('"pending"', '"queued"'))
+            redis._zrem("tasks:idx:user:user_1:status:pending", "task-001")
+            redis._zadd("tasks:idx:user:user_1:status:queued", {"task-001": 0})
+            redis._hincrby("tasks:counts:user_1", "status:pending", -1)
+            redis._hincrby("tasks:counts:user_1", "status:queued", 1)
+
+        redis.before_execute = concurrent_update
+        task = await repository.update("task-001", {"status": "completed"})
+
+        assert task["status"] == "completed"
+        assert (await repository.get_stats("user_1"))["by_status"] == {"completed": 1}
+
+    @pytest.mark.asyncio
+    async def test_auto_backend_falls_back_to_memory(self, monkeypatch):
+        """Without a reachable Redis the in-process store is used"""
+        from app.services import task_repository
+
+        monkeypatch.setattr(task_repository.settings, "REDIS_URL", "redis://127.0.0.1:1")
+        repository = await create_task_repository("auto")
+        assert repository.backend == "memory"
+
+        with pytest.raises(Exception):
+            await create_task_repository("redis")
@@ -0,0 +1,264 @@
+"""
+Tests for Vercel KV Service Module
+Tests the time-ordered index used for analytics retrieval, deletion and cleanup
+"""
+import json
+import pytest
+from fnmatch import fnmatchcase
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.services import vercel_kv_service
+from app.services.vercel_kv_service import (
+    VercelKVService,
+    AnalyticsDataType,
+    DataRetentionPolicy,
+    EXPIRY_INDEX_KEY
+)
+from app.services.payload_codec import CODEC_HEADER
+
+
+class InMemoryPipeline:
+    """Applies redis-py style pipeline commands to an InMemoryRedis"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.results = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.backend.round_trips += 1
+        return False
+
+    def set(self, key, value, ex=None):
+        self.backend.values[key] = value
+        self.results.append(True)
+
+    def delete(self, *keys):
+        self.results.append(sum(self.backend.values.pop(key, None) is not None for key in keys))
+
+    def zadd(self, key, mapping):
+        self.backend.sorted_sets.setdefault(key, {}).update(mapping)
+        self.results.append(len(mapping))
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.backend.sorted_sets.get(key, {}).pop(member, None)
+        self.results.append(len(members))
+
+
+class InMemoryRedis:
+    """Minimal in-memory stand-in for RedisService key and sorted-set operations"""
+
+    def __init__(self):
+        self.values = {}
+        self.sorted_sets = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=False):
+        return InMemoryPipeline(self)
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.values.get(key)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.values.get(key) for key in keys]
+
+    async def scan_keys(self, pattern, count=1000):
+        return [key for key in self.values if fnmatchcase(key, pattern)]
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.values.pop(key, None) is not None
+
+    async def zadd(self, key, score, member):
+        self.sorted_sets.setdefault(key, {})[member] = score
+        return True
+
+    async def zrem(self, key, *members):
+        for member in members:
+            self.sorted_sets.get(key, {}).pop(member, None)
+        return True
+
+    def _range(self, key, min_score, max_score):
+        low, high = float(min_score), float(max_score)
+        items = [
+            (member, score) for member, score in self.sorted_sets.get(key, {}).items()
+            if low <= score <= high
+        ]
+        return sorted(items, key=lambda item: (item[1], item[0]))
+
+    async def zrangebyscore(self, key, min_score, max_score, start=None, num=None, withscores=False):
+        items = self._range(key, min_score, max_score)
+        if start is not None:
+            items = items[start:start + num]
+        return items if withscores else [member for member, _ in items]
+
+    async def zrevrangebyscore(self, key, max_score, min_score, start=None, num=None, withscores=False):
+        items = list(reversed(self._range(key, min_score, max_score)))
+        if start is not None:
+            items = items[start:start + num]
+        return items if withscores else [member for member, _ in items]
+
+
+@pytest.fixture
+def redis_backend():
+    return InMemoryRedis()
+
+
+@pytest.fixture
+def kv_service(redis_backend):
+    service = VercelKVService(redis_backend)
+    service.use_vercel_kv = False
+    return service
+
+
+async def _store_many(service, count, timestamp, **kwargs):
+    with patch.object(vercel_kv_service, "datetime") as mock_datetime:
+        mock_datetime.utcnow.return_value = timestamp
+        for i in range(count):
+            await service.store_analytics_data(
+                "user_1", AnalyticsDataType.SEO, f"source_{i % 2}", "clicks", i, **kwargs
+            )
+
+
+class TestTimeOrderedIndex:
+    """Test the per-user/per-type sorted-set index"""
+
+    @pytest.mark.asyncio
+    async def test_cursor_pagination_returns_every_record_once(self, kv_service):
+        """Pages walk the index without gaps or duplicates, even on equal timestamps"""
+        await _store_many(kv_service, 25, datetime.utcnow())
+
+        seen, cursor = [], None
+        while True:
+            page = await kv_service.retrieve_analytics_page(
+                "user_1", AnalyticsDataType.SEO, limit=7, cursor=cursor
+            )
+            seen.extend(record.metric_value for record in page.records)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+        assert sorted(seen) == list(range(25))
+
+    @pytest.mark.asyncio
+    async def test_date_range_and_source_filter(self, kv_service):
+        """Range bounds and filters are resolved from the index"""
+        now = datetime.utcnow()
+        await _store_many(kv_service, 4, now - timedelta(days=10))
+        await _store_many(kv_service, 4, now)
+
+        records = await kv_service.retrieve_analytics_data(
+            "user_1", AnalyticsDataType.SEO, source_id="source_1",
+            start_date=now - timedelta(days=1)
+        )
+
+        assert len(records) == 2
+        assert all(record.source_id == "source_1" for record in records)
+        assert all(record.data_type == AnalyticsDataType.SEO for record in records)
+
+    @pytest.mark.asyncio
+    async def test_limit_bounds_record_fetches(self, kv_service, redis_backend):
+        """Only `limit` records are fetched regardless of index size"""
+        await _store_many(kv_service, 50, datetime.utcnow())
+
+        with patch.object(redis_backend, "mget", wraps=redis_backend.mget) as fetch:
+            records = await kv_service.retrieve_analytics_data(
+                "user_1", AnalyticsDataType.SEO, limit=5
+            )
+
+        assert len(records) == 5
+        assert fetch.call_count == 1
+        assert len(fetch.call_args.args[0]) == 5
+
+    @pytest.mark.asyncio
+    async def test_store_and_page_fetch_are_batched(self, kv_service, redis_backend):
+        """Each store is one pipeline and a page of records is one MGET"""
+        await _store_many(kv_service, 20, datetime.utcnow())
+        assert redis_backend.round_trips == 20
+
+        redis_backend.round_trips = 0
+        records = await kv_service.retrieve_analytics_data(
+            "user_1", AnalyticsDataType.SEO, limit=20
+        )
+
+        assert len(records) == 20
+        assert redis_backend.round_trips == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_records_and_index_entries(self, kv_service, redis_backend):
+        """Deleting by source clears the records and every index they were in"""
+        await _store_many(kv_service, 6, datetime.utcnow())
+
+        deleted = await kv_service.delete_analytics_data(
+            "user_1", AnalyticsDataType.SEO, source_id="source_0"
+        )
+
+        assert deleted == 3
+        remaining = await kv_service.retrieve_analytics_data("user_1", AnalyticsDataType.SEO)
+        assert {record.source_id for record in remaining} == {"source_1"}
+        assert redis_backend.sorted_sets["idx:user:user_1:seo:source:source_0"] == {}
+
+    @pytest.mark.asyncio
+    async def test_cleanup_only_touches_due_entries(self, kv_service, redis_backend):
+        """Cleanup reads the expiry index instead of scanning the keyspace"""
+        now = datetime.utcnow()
+        await _store_many(kv_service, 3, now - timedelta(days=2))
+        await _store_many(
+            kv_service, 2, now, retention_policy=DataRetentionPolicy.WEEKLY
+        )
+
+        cleaned = await kv_service.cleanup_expired_data()
+
+        assert cleaned == 3
+        assert len(redis_backend.sorted_sets[EXPIRY_INDEX_KEY]) == 2
+        remaining = await kv_service.retrieve_analytics_data("user_1", AnalyticsDataType.SEO)
+        assert len(remaining) == 2
+
+    @pytest.mark.asyncio
+    async def test_storage_stats_skip_non_analytics_keys(self, kv_service, redis_backend):
+        """Stats only count analytics records and fetch them with batched MGETs"""
+        await _store_many(kv_service, 5, datetime.utcnow())
+        redis_backend.values["user:user_1:tasks"] = "[]"
+        kv_service.STATS_BATCH_SIZE = 2
+
+        redis_backend.round_trips = 0
+        stats = await kv_service.get_storage_stats("user_1")
+
+        assert stats.total_records == 5
+        assert stats.records_by_type == {"seo": 5}
+        assert stats.records_by_user == {"user_1": 5}
+        assert stats.total_size_bytes > 0
+        assert redis_backend.round_trips == 3
+    
+    @pytest.mark.asyncio
+    async def test_records_round_trip_through_codec(self, kv_service, redis_backend):
+        """Large records are stored compressed and plain JSON records still parse"""
+        kv_service.codec.compression_threshold = 64
+        await kv_service.store_analytics_data(
+            "user_1", AnalyticsDataType.SEO, "source_0", "clicks", 1,
+            metadata={"keywords": ["analytics"] * 50}
+        )
+        stored = next(iter(redis_backend.values.values()))
+        assert stored.startswith(CODEC_HEADER)
+        
+        # A record written before the codec existed
+        legacy_key = "user:user_1:seo:legacy:clicks:2024-01-01"
+        record = kv_service._parse_record(stored)
+        record.source_id = "legacy"
+        redis_backend.values[legacy_key] = json.dumps(asdict(record), default=str)
+        
+        records = await kv_service._retrieve_records(list(redis_backend.values))
+        
+        assert [r.source_id for r in records] == ["source_0", "legacy"]
+        assert records[0].metadata["keywords"] == ["analytics"] * 50
+        assert records[1].data_type == AnalyticsDataType.SEO
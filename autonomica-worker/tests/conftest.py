@@ -0,0 +1,131 @@
+"""
+Shared fixtures for worker unit tests
+"""
+import os
+import sys
+import fnmatch
+
+import pytest
+
+# worker.py is a top-level module; never reach for a real Redis on import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+
+
+class FakePipeline:
+    """Queues commands and runs them against FakeRedis on execute()"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self.backend, f"_{name}")
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        self.backend.round_trips += 1
+        commands, self.commands = self.commands, []
+        return [method(*args, **kwargs) for method, args, kwargs in commands]
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio commands the dispatcher uses"""
+
+    def __init__(self):
+        self.lists = {}
+        self.sets = {}
+        self.zsets = {}
+        self.hashes = {}
+        self.ttls = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def __getattr__(self, name):
+        method = getattr(self, f"_{name}")
+
+        async def command(*args, **kwargs):
+            self.round_trips += 1
+            return method(*args, **kwargs)
+        return command
+
+    async def blpop(self, keys, timeout=0):
+        for key in keys:
+            if self.lists.get(key):
+                return key, self.lists[key].pop(0)
+        return None
+
+    async def scan_iter(self, match=None, count=100):
+        for key in list(self.lists):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+
+    def _delete(self, *keys):
+        removed = 0
+        for key in keys:
+            for store in (self.lists, self.sets, self.zsets, self.hashes):
+                removed += store.pop(key, None) is not None
+        return removed
+
+    def _expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+    def _rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    def _lpop(self, key, count=None):
+        items = self.lists.get(key, [])
+        if count is None:
+            return items.pop(0) if items else None
+        popped, self.lists[key] = items[:count], items[count:]
+        return popped or None
+
+    def _llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def _sadd(self, key, *members):
+        before = len(self.sets.setdefault(key, set()))
+        self.sets[key].update(members)
+        return len(self.sets[key]) - before
+
+    def _srem(self, key, *members):
+        before = len(self.sets.get(key, set()))
+        self.sets.get(key, set()).difference_update(members)
+        return before - len(self.sets.get(key, set()))
+
+    def _smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def _hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def _zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    def _zrem(self, key, *members):
+        return sum(self.zsets.get(key, {}).pop(member, None) is not None for member in members)
+
+    def _zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def _zremrangebyscore(self, key, min_score, max_score):
+        low, high = float(min_score), float(max_score)
+        members = self.zsets.get(key, {})
+        expired = [member for member, score in members.items() if low <= score <= high]
+        for member in expired:
+            del members[member]
+        return len(expired)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
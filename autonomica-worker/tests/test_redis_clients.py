@@ -0,0 +1,67 @@
+"""
+Tests for the worker's Redis clients
+Tests the Vercel KV HTTP pool lifecycle and the non-blocking health check
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import worker
+from worker import VercelKVClient, health_check
+
+
+class TestVercelKVClient:
+    """Test VercelKVClient connection pooling"""
+
+    def test_pool_is_replaced_and_closed_on_loop_change(self):
+        """A client reused from a new event loop closes the pool of the old one"""
+        kv = VercelKVClient("https://kv.example.com", "token")
+
+        first = asyncio.run(kv._http())
+        second = asyncio.run(kv._http())
+
+        assert second is not first
+        assert first.is_closed
+        assert not second.is_closed
+        asyncio.run(kv.aclose())
+        assert second.is_closed
+
+    @pytest.mark.asyncio
+    async def test_pool_is_shared_within_a_loop(self):
+        kv = VercelKVClient("https://kv.example.com", "token")
+
+        assert await kv._http() is await kv._http()
+        await kv.aclose()
+
+
+class TestHealthCheck:
+    """Test /health"""
+
+    @pytest.mark.asyncio
+    async def test_pings_through_the_async_client(self, monkeypatch):
+        """The sync client is never used on the event loop"""
+
+        class SyncClient(worker.redis.Redis):
+            def __init__(self):
+                pass
+
+            def ping(self, **kwargs):
+                raise AssertionError("blocking ping on the event loop")
+
+        class AsyncClient:
+            async def ping(self):
+                return True
+
+        monkeypatch.setattr(worker, "redis_client", SyncClient())
+        monkeypatch.setattr(worker, "_async_redis_client", AsyncClient())
+        monkeypatch.setattr(
+            worker.celery_app.control, "inspect",
+            lambda: SimpleNamespace(active=lambda: {"worker@host": [{}, {}]})
+        )
+
+        response = await health_check()
+
+        assert response.redis_connected is True
+        assert response.status == "healthy"
+        assert response.active_tasks == 2
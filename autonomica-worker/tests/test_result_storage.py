@@ -0,0 +1,158 @@
+"""
+Tests for task result storage and routing
+Tests the blob store, large-value offloading, the msgpack-zlib serializer and the routing self-check
+"""
+import hashlib
+import os
+import time
+
+import pytest
+from celery import Celery
+from kombu import Queue
+from kombu.serialization import dumps, loads
+
+import worker
+from worker import (
+    BlobStore,
+    QUEUE_TOPOLOGY,
+    RESULT_SERIALIZER,
+    check_task_routes,
+    is_blob_ref,
+    iter_blob_refs,
+    offload_large_values,
+    resolve_blob_refs,
+)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A blob store in a temp dir with a 1 KiB inline limit"""
+    store = BlobStore(str(tmp_path))
+    monkeypatch.setattr(worker, "blob_store", store)
+    monkeypatch.setattr(worker.config, "BLOB_INLINE_MAX_BYTES", 1024)
+    return store
+
+
+class TestBlobStore:
+    """Test BlobStore"""
+
+    def test_put_is_content_addressed(self, store):
+        data = b"x" * 2048
+        ref = store.put(data, "application/octet-stream")
+
+        digest = hashlib.sha256(data).hexdigest()
+        assert ref == {"$blob": f"sha256:{digest}", "size": 2048, "content_type": "application/octet-stream"}
+        assert store.path_for(digest) == store.root / digest[:2] / digest
+        assert store.read(ref) == data
+
+    def test_put_deduplicates_and_refreshes_expiry(self, store):
+        ref = store.put(b"same", "text/plain")
+        path = store.path_for(ref["$blob"])
+        os.utime(path, (0, 0))
+
+        assert store.put(b"same", "text/plain") == ref
+        assert path.stat().st_mtime > 0
+        assert list(store.root.glob("*/*")) == [path]
+
+    @pytest.mark.parametrize("digest", [
+        "",
+        "abc",
+        "A" * 64,
+        "g" * 64,
+        "../" + "a" * 61,
+        "a" * 65,
+    ])
+    def test_path_for_rejects_invalid_digest(self, store, digest):
+        with pytest.raises(ValueError):
+            store.path_for(digest)
+
+    def test_path_for_accepts_prefixed_digest(self, store):
+        assert store.path_for("sha256:" + "a" * 64) == store.path_for("a" * 64)
+
+    def test_sweep_removes_only_stale_blobs(self, store):
+        stale = store.path_for(store.put(b"old", "text/plain")["$blob"])
+        fresh = store.path_for(store.put(b"new", "text/plain")["$blob"])
+        old = time.time() - 3600
+        os.utime(stale, (old, old))
+
+        assert store.sweep(60) == 1
+        assert not stale.exists()
+        assert fresh.exists()
+
+
+class TestOffload:
+    """Test offload_large_values and resolve_blob_refs"""
+
+    def test_round_trip(self, store):
+        html = "<p>" + "a" * 2000 + "</p>"
+        screenshot = b"\x89PNG" + b"\x00" * 2000
+        result = {
+            "url": "https://example.com",
+            "content": html,
+            "screenshots": [screenshot],
+            "meta": {"title": "short"},
+        }
+
+        compact = offload_large_values(result, {"screenshots": "image/png"})
+
+        assert compact["url"] == "https://example.com"
+        assert compact["meta"] == {"title": "short"}
+        assert is_blob_ref(compact["content"])
+        assert compact["content"]["content_type"] == "text/plain; charset=utf-8"
+        assert compact["screenshots"][0]["content_type"] == "image/png"
+        assert len(list(iter_blob_refs(compact))) == 2
+        assert resolve_blob_refs(compact) == result
+
+    def test_small_values_stay_inline(self, store):
+        result = {"content": "a" * 1024, "data": b"b" * 100}
+
+        assert offload_large_values(result) == result
+        assert list(iter_blob_refs(result)) == []
+        assert list(store.root.iterdir()) == []
+
+
+class TestResultSerializer:
+    """Test the msgpack-zlib result serializer"""
+
+    def test_round_trip(self):
+        result = {"status": "completed", "count": 3, "items": ["a", "b"], "raw": b"\x00\x01", "score": 0.5}
+
+        content_type, encoding, data = dumps(result, serializer=RESULT_SERIALIZER)
+
+        assert content_type == "application/x-msgpack-zlib"
+        assert encoding == "binary"
+        assert loads(data, content_type, encoding, accept=[content_type]) == result
+
+    def test_is_the_configured_result_serializer(self):
+        assert worker.celery_app.conf.result_serializer == RESULT_SERIALIZER
+        assert RESULT_SERIALIZER in worker.celery_app.conf.result_accept_content
+
+
+class TestTaskRoutes:
+    """Test check_task_routes"""
+
+    @staticmethod
+    def make_app(queues, routes):
+        # The worker's tasks are shared, so they register on this app as well
+        app = Celery("routes-test", set_as_current=False)
+        app.conf.task_queues = [Queue(queue) for queue in queues]
+        app.conf.task_routes = routes
+        return app
+
+    def test_worker_routes_are_clean(self):
+        assert check_task_routes() == []
+
+    def test_reports_unrouted_task(self):
+        routes = dict(worker.celery_app.conf.task_routes)
+        del routes["worker.analyze_data"]
+        app = self.make_app(QUEUE_TOPOLOGY, routes)
+
+        assert check_task_routes(app) == ["Task worker.analyze_data has no route"]
+
+    def test_reports_undeclared_queue(self):
+        queues = [queue for queue in QUEUE_TOPOLOGY if queue != "social_media"]
+        app = self.make_app(queues, worker.celery_app.conf.task_routes)
+
+        assert check_task_routes(app) == [
+            "Task worker.publish_social_media routes to undeclared queue social_media"
+        ]
@@ -0,0 +1,145 @@
+"""
+Tests for the per-user task dispatcher
+Tests round-robin fairness, per-user concurrency caps and slot leases against a fake Redis
+"""
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import worker
+from worker import (
+    TaskQueueProcessor,
+    enqueue_user_task,
+    user_inflight_key,
+    user_queue_key,
+    release_user_task_slot,
+    ACTIVE_USERS_KEY,
+    WAKEUP_KEY,
+)
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Record Celery submissions instead of sending them to a broker"""
+    calls = []
+
+    def apply_async(args, task_id, priority):
+        calls.append({"user_id": args[1], "payload": args[0], "task_id": task_id, "priority": priority})
+
+    monkeypatch.setattr(worker, "scrape_website_task", SimpleNamespace(apply_async=apply_async))
+    return calls
+
+
+async def enqueue(redis, user_id, count):
+    for i in range(count):
+        await enqueue_user_task(redis, user_id, {"task_type": "web_scraping", "payload": {"n": i}})
+
+
+class TestDispatcher:
+    """Test TaskQueueProcessor rounds"""
+
+    @pytest.mark.asyncio
+    async def test_users_are_capped_and_served_fairly(self, fake_redis, submitted):
+        """A user with a deep queue does not hold back others and never exceeds the cap"""
+        await enqueue(fake_redis, "heavy", 10)
+        await enqueue(fake_redis, "light", 1)
+        processor = TaskQueueProcessor(fake_redis, user_concurrency=2, batch_size=4)
+
+        assert await processor._process_user_tasks() == 3
+        assert sorted(call["user_id"] for call in submitted) == ["heavy", "heavy", "light"]
+        assert len(fake_redis.lists[user_queue_key("heavy")]) == 8
+
+        # heavy is at its cap and light has nothing left, so nothing runs until a slot frees up
+        assert await processor._process_user_tasks() == 0
+        assert processor.stats["capped"] >= 1
+        assert fake_redis.sets[ACTIVE_USERS_KEY] == {"heavy"}
+
+    @pytest.mark.asyncio
+    async def test_finished_task_frees_its_slot(self, fake_redis, submitted, monkeypatch):
+        """task_postrun releases the slot and wakes the dispatcher"""
+        await enqueue(fake_redis, "user_1", 3)
+        processor = TaskQueueProcessor(fake_redis, user_concurrency=1)
+        assert await processor._process_user_tasks() == 1
+
+        released = []
+
+        class SyncClient(worker.redis.Redis):
+            def __init__(self):
+                pass
+
+            def zrem(self, key, *members):
+                released.append(members)
+                return fake_redis._zrem(key, *members)
+
+            def rpush(self, key, *values):
+                return fake_redis._rpush(key, *values)
+
+        monkeypatch.setattr(worker, "redis_client", SyncClient())
+        release_user_task_slot(task_id=submitted[0]["task_id"], args=[{}, "user_1"], state="SUCCESS")
+
+        assert released == [(submitted[0]["task_id"],)]
+        assert "user_1" in fake_redis.lists[WAKEUP_KEY]
+        assert await processor._process_user_tasks() == 1
+
+    @pytest.mark.asyncio
+    async def test_lost_slots_are_reaped_after_their_lease(self, fake_redis, submitted):
+        """Slots of tasks that never report completion lapse instead of blocking the user forever"""
+        await enqueue(fake_redis, "user_1", 4)
+        processor = TaskQueueProcessor(fake_redis, user_concurrency=2)
+        assert await processor._process_user_tasks() == 2
+
+        slots = fake_redis.zsets[user_inflight_key("user_1")]
+        assert all(deadline > time.time() for deadline in slots.values())
+        assert fake_redis.ttls[user_inflight_key("user_1")] == worker.task_slot_lease_seconds()
+        assert await processor._process_user_tasks() == 0
+
+        # The worker running both tasks was killed: let their leases lapse
+        for task_id in slots:
+            slots[task_id] = time.time() - 1
+
+        assert await processor._process_user_tasks() == 2
+        assert processor.stats["reaped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_task_type_is_dropped_without_a_slot(self, fake_redis, submitted):
+        """Tasks nobody can run neither dispatch nor occupy a slot"""
+        await enqueue_user_task(fake_redis, "user_1", {"task_type": "nope", "payload": {}})
+        processor = TaskQueueProcessor(fake_redis)
+
+        assert await processor._process_user_tasks() == 0
+        assert processor.stats["dropped"] == 1
+        assert fake_redis.zsets.get(user_inflight_key("user_1"), {}) == {}
+        assert submitted == []
+
+    @pytest.mark.asyncio
+    async def test_slot_lease_covers_the_retry_budget(self, fake_redis, submitted):
+        """A task retried up to max_retries keeps its slot for every attempt"""
+        await enqueue(fake_redis, "user_1", 1)
+        processor = TaskQueueProcessor(fake_redis)
+        assert await processor._process_user_tasks() == 1
+
+        time_limit = worker.celery_app.conf.task_time_limit
+        budget = (worker.config.TASK_MAX_RETRIES + 1) * time_limit \
+            + worker.config.TASK_MAX_RETRIES * worker.config.TASK_RETRY_COUNTDOWN
+        deadline, = fake_redis.zsets[user_inflight_key("user_1")].values()
+        assert deadline - time.time() > budget
+
+    @pytest.mark.asyncio
+    async def test_bare_rpush_queues_are_found_by_rescan(self, fake_redis, submitted):
+        """Queues filled without enqueue_user_task are registered by the periodic scan"""
+        processor = TaskQueueProcessor(fake_redis, rescan_interval=300)
+        fake_redis._rpush(user_queue_key("user_1"), json.dumps({"task_type": "web_scraping", "payload": {}}))
+
+        await processor._rescan_if_due()
+        assert await processor._process_user_tasks() == 1
+
+        fake_redis._rpush(user_queue_key("user_2"), json.dumps({"task_type": "web_scraping", "payload": {}}))
+        await processor._rescan_if_due()
+        assert await processor._process_user_tasks() == 0
+
+        processor._next_rescan = 0
+        await processor._rescan_if_due()
+        assert await processor._process_user_tasks() == 1
+        assert [call["user_id"] for call in submitted] == ["user_1", "user_2"]
@@ -9,14 +9,24 @@ import sys
 import asyncio
 import signal
 import logging
+import threading
+import contextlib
+from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 import json
 import time
+import uuid
+import random
+import hashlib
+import zlib
+from pathlib import Path
 
 # Core imports
 import redis
+import redis.asyncio as aioredis
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 import uvicorn
 from loguru import logger
@@ -24,10 +34,14 @@ from loguru import logger
 # Background task processing
 from celery import Celery
 from celery.result import AsyncResult
+from celery.signals import task_postrun, worker_init, worker_process_shutdown
+from kombu import Queue
+from kombu.serialization import register as register_serializer
+import msgpack
 
 # Web scraping
 from playwright.async_api import async_playwright
-import requests
+import httpx
 from bs4 import BeautifulSoup
 
 # Environment and config
@@ -44,11 +58,35 @@ class WorkerConfig:
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     KV_REST_API_URL = os.getenv("KV_REST_API_URL")  # Vercel KV
     KV_REST_API_TOKEN = os.getenv("KV_REST_API_TOKEN")  # Vercel KV
+    KV_TIMEOUT_SECONDS = float(os.getenv("KV_TIMEOUT_SECONDS", "5"))
+    KV_MAX_RETRIES = int(os.getenv("KV_MAX_RETRIES", "3"))
     
     # Worker Configuration
     WORKER_NAME = os.getenv("WORKER_NAME", "autonomica-worker")
     WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
     
+    # Queue dispatch
+    USER_TASK_CONCURRENCY = int(os.getenv("USER_TASK_CONCURRENCY", "2"))  # running tasks per user
+    TASK_DISPATCH_BATCH_SIZE = int(os.getenv("TASK_DISPATCH_BATCH_SIZE", "4"))  # tasks per user per round (x weight)
+    TASK_DISPATCH_IDLE_TIMEOUT = int(os.getenv("TASK_DISPATCH_IDLE_TIMEOUT", "5"))  # seconds to block when idle
+    TASK_SLOT_GRACE_SECONDS = int(os.getenv("TASK_SLOT_GRACE_SECONDS", "600"))  # queue wait allowed on top of the retry budget
+    TASK_QUEUE_RESCAN_SECONDS = int(os.getenv("TASK_QUEUE_RESCAN_SECONDS", "300"))  # find queues filled without enqueue_user_task
+    TASK_MAX_RETRIES = int(os.getenv("TASK_MAX_RETRIES", "3"))
+    TASK_RETRY_COUNTDOWN = int(os.getenv("TASK_RETRY_COUNTDOWN", "60"))  # seconds between attempts
+    
+    # Web scraping
+    SCRAPE_MAX_BROWSERS = int(os.getenv("SCRAPE_MAX_BROWSERS", "1"))  # browsers per worker process
+    SCRAPE_MAX_PAGES_PER_BROWSER = int(os.getenv("SCRAPE_MAX_PAGES_PER_BROWSER", "100"))  # recycle after this many pages
+    SCRAPE_BLOCKED_RESOURCES = os.getenv("SCRAPE_BLOCKED_RESOURCES", "image,font,media")  # empty to load everything
+    SCRAPE_WAIT_UNTIL = os.getenv("SCRAPE_WAIT_UNTIL", "domcontentloaded")
+    SCRAPE_NAVIGATION_TIMEOUT_MS = int(os.getenv("SCRAPE_NAVIGATION_TIMEOUT_MS", "30000"))
+    SCRAPE_BATCH_CONCURRENCY = int(os.getenv("SCRAPE_BATCH_CONCURRENCY", "4"))  # pages in flight per batch task
+    
+    # Task results
+    BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", "tmp/blobs")  # shared by API and Celery containers
+    BLOB_INLINE_MAX_BYTES = int(os.getenv("BLOB_INLINE_MAX_BYTES", str(64 * 1024)))  # larger outputs become blobs
+    BLOB_SWEEP_INTERVAL = int(os.getenv("BLOB_SWEEP_INTERVAL", "3600"))  # seconds
+    
     # AI API Keys
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
@@ -86,11 +124,45 @@ celery_app = Celery(
     include=['worker']
 )
 
+# Queue topology: one queue per task type, each served by its own worker pool.
+# Pools, limits and result lifetimes can be overridden per queue with
+# CELERY_<QUEUE>_POOL, _CONCURRENCY, _PREFETCH and _RESULT_TTL.
+def _queue_settings(queue: str, pool: str, concurrency: int, prefetch: int, result_ttl: int,
+                    tasks: List[str]) -> Dict[str, Any]:
+    prefix = f"CELERY_{queue.upper()}"
+    return {
+        'tasks': tasks,
+        'pool': os.getenv(f"{prefix}_POOL", pool),
+        'concurrency': int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+        'prefetch': int(os.getenv(f"{prefix}_PREFETCH", str(prefetch))),
+        'result_ttl': int(os.getenv(f"{prefix}_RESULT_TTL", str(result_ttl))),  # seconds
+    }
+
+QUEUE_TOPOLOGY = {
+    # Browser-heavy: few processes, each with its own browser pool
+    'web_scraping': _queue_settings('web_scraping', 'prefork', 2, 1, 3600, ['worker.scrape_website']),
+    # Long waits on LLM APIs: threads
+    'ai_processing': _queue_settings('ai_processing', 'threads', 8, 1, 86400, ['worker.process_ai']),
+    # CPU-bound: one process per core
+    'data_analysis': _queue_settings('data_analysis', 'prefork', os.cpu_count() or 2, 1, 86400, ['worker.analyze_data']),
+    # Short I/O-bound calls: many threads, a little prefetch
+    'social_media': _queue_settings('social_media', 'threads', 16, 4, 7 * 86400, ['worker.publish_social_media']),
+}
+RESULT_TTL_MAX = max(settings['result_ttl'] for settings in QUEUE_TOPOLOGY.values())
+
+# Priority lanes (Redis transport: lower value is served first)
+TASK_PRIORITIES = {"high": 0, "normal": 3, "low": 6}
+
+def task_priority(priority: Optional[str]) -> int:
+    return TASK_PRIORITIES.get((priority or "normal").lower(), TASK_PRIORITIES["normal"])
+
 # Celery configuration
 celery_app.conf.update(
     task_serializer='json',
     accept_content=['json'],
-    result_serializer='json',
+    result_serializer='msgpack-zlib',
+    result_accept_content=['json', 'msgpack-zlib'],
+    result_expires=RESULT_TTL_MAX,  # per task type TTLs are applied by CompactResultTask
     timezone='UTC',
     enable_utc=True,
     task_track_started=True,
@@ -98,14 +170,60 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    # Workers started without -Q consume every queue declared here
+    task_queues=[Queue(queue) for queue in QUEUE_TOPOLOGY],
     task_routes={
-        'worker.web_scraping': {'queue': 'web_scraping'},
-        'worker.ai_processing': {'queue': 'ai_processing'},
-        'worker.data_analysis': {'queue': 'data_analysis'},
-        'worker.social_media': {'queue': 'social_media'},
+        task_name: {'queue': queue}
+        for queue, settings in QUEUE_TOPOLOGY.items()
+        for task_name in settings['tasks']
+    },
+    task_default_priority=TASK_PRIORITIES["normal"],
+    broker_transport_options={
+        'priority_steps': sorted(TASK_PRIORITIES.values()),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
     }
 )
 
+def check_task_routes(app: Celery = None) -> List[str]:
+    """Problems with the routing table: registered tasks without a route to a declared queue"""
+    app = app or celery_app
+    declared = {queue.name for queue in app.conf.task_queues or []}
+    routes = app.conf.task_routes or {}
+    problems = []
+    for task_name in sorted(app.tasks):
+        if task_name.startswith('celery.'):
+            continue  # Celery's built-in tasks
+        route = routes.get(task_name)
+        if not route:
+            problems.append(f"Task {task_name} has no route")
+        elif route.get('queue') not in declared:
+            problems.append(f"Task {task_name} routes to undeclared queue {route.get('queue')}")
+    return problems
+
+@worker_init.connect
+def verify_task_routes(**kwargs):
+    """Refuse to start a Celery worker with tasks that would land on an unconsumed queue"""
+    problems = check_task_routes()
+    if problems:
+        for problem in problems:
+            logger.error(problem)
+        raise RuntimeError(f"Celery routing self-check failed: {len(problems)} problem(s)")
+    logger.info(f"Celery routing self-check passed for queues: {', '.join(QUEUE_TOPOLOGY)}")
+
+def celery_queue_worker_argv(queue: str) -> List[str]:
+    """Arguments for a worker dedicated to one queue, using that queue's pool settings"""
+    settings = QUEUE_TOPOLOGY[queue]
+    return [
+        'worker',
+        f"--queues={queue}",
+        f"--pool={settings['pool']}",
+        f"--concurrency={settings['concurrency']}",
+        f"--prefetch-multiplier={settings['prefetch']}",
+        f"--hostname={queue}@%h",
+        f"--loglevel={config.LOG_LEVEL}",
+    ]
+
 # Redis client setup
 def get_redis_client():
     """Get Redis client with connection handling"""
@@ -122,47 +240,245 @@ def get_redis_client():
         logger.error(f"Failed to connect to Redis: {e}")
         return None
 
-class VercelKVClient:
-    """Simple Vercel KV REST API client for basic operations"""
+class VercelKVError(Exception):
+    """Error reply from the Vercel KV (Upstash) REST API"""
+
+class _KVCommands(ABC):
+    """Redis-style command methods shared by the KV client and its pipelines.
+
+    Each method builds a command and hands it to ``_dispatch``; the client
+    sends it immediately, a pipeline queues it.
+    """
+    
+    @abstractmethod
+    def _dispatch(self, *command):
+        """Send or queue one command"""
+    
+    def ping(self):
+        return self._dispatch("PING")
+    
+    def get(self, name: str):
+        return self._dispatch("GET", name)
+    
+    def set(self, name: str, value, ex: Optional[int] = None):
+        return self._dispatch("SET", name, value, *(["EX", ex] if ex else []))
+    
+    def delete(self, *names: str):
+        return self._dispatch("DEL", *names)
+    
+    def expire(self, name: str, seconds: int):
+        return self._dispatch("EXPIRE", name, seconds)
+    
+    def rpush(self, name: str, *values):
+        return self._dispatch("RPUSH", name, *values)
+    
+    def lpop(self, name: str, count: Optional[int] = None):
+        return self._dispatch("LPOP", name, *([count] if count is not None else []))
+    
+    def llen(self, name: str):
+        return self._dispatch("LLEN", name)
+    
+    def lrange(self, name: str, start: int, end: int):
+        return self._dispatch("LRANGE", name, start, end)
+    
+    def sadd(self, name: str, *values):
+        return self._dispatch("SADD", name, *values)
+    
+    def srem(self, name: str, *values):
+        return self._dispatch("SREM", name, *values)
+    
+    def smembers(self, name: str):
+        return self._dispatch("SMEMBERS", name)
+    
+    def scard(self, name: str):
+        return self._dispatch("SCARD", name)
+    
+    def zadd(self, name: str, mapping: Dict[str, float]):
+        return self._dispatch("ZADD", name, *[part for member, score in mapping.items() for part in (score, member)])
+    
+    def zrem(self, name: str, *values):
+        return self._dispatch("ZREM", name, *values)
+    
+    def zcard(self, name: str):
+        return self._dispatch("ZCARD", name)
+    
+    def zremrangebyscore(self, name: str, min, max):
+        return self._dispatch("ZREMRANGEBYSCORE", name, min, max)
+    
+    def hget(self, name: str, key: str):
+        return self._dispatch("HGET", name, key)
+    
+    def hset(self, name: str, key: str, value):
+        return self._dispatch("HSET", name, key, value)
+    
+    def hmget(self, name: str, keys, *args):
+        return self._dispatch("HMGET", name, *(list(keys) if isinstance(keys, (list, tuple)) else [keys]), *args)
+    
+    def hincrby(self, name: str, key: str, amount: int = 1):
+        return self._dispatch("HINCRBY", name, key, amount)
+
+# Reply conversions matching what redis-py returns with decode_responses=True
+_KV_REPLY_CALLBACKS = {
+    "PING": lambda reply: reply == "PONG",
+    "SET": lambda reply: reply == "OK",
+    "SMEMBERS": lambda reply: set(reply or []),
+}
+
+def _kv_reply(command, item: dict):
+    if item.get("error"):
+        raise VercelKVError(item["error"])
+    callback = _KV_REPLY_CALLBACKS.get(command[0])
+    return callback(item.get("result")) if callback else item.get("result")
+
+class VercelKVPipeline(_KVCommands):
+    """Queues commands and sends them in one request (``/multi-exec`` when transactional)"""
+    
+    def __init__(self, client: "VercelKVClient", transaction: bool = True):
+        self.client = client
+        self.transaction = transaction
+        self.commands: List[list] = []
+    
+    def _dispatch(self, *command):
+        self.commands.append(list(command))
+        return self
+    
+    async def execute(self):
+        if not self.commands:
+            return []
+        commands, self.commands = self.commands, []
+        path = "/multi-exec" if self.transaction else "/pipeline"
+        replies = await self.client._request(path, commands)
+        if isinstance(replies, dict):
+            raise VercelKVError(replies.get("error", "transaction failed"))
+        return [_kv_reply(command, item) for command, item in zip(commands, replies)]
+
+class VercelKVClient(_KVCommands):
+    """Async Vercel KV (Upstash REST) client with the redis.asyncio interface used by the worker.
+
+    Requests go through one keep-alive HTTP pool. Multi-command work uses
+    ``pipeline()``, which maps to Upstash's ``/pipeline`` and ``/multi-exec``
+    endpoints. Requests that never reached the server, and 429/503 replies,
+    are retried with jittered exponential backoff.
+    """
+    
+    RETRY_STATUSES = {429, 503}
     
-    def __init__(self, url: str, token: str):
+    def __init__(self, url: str, token: str, timeout: float = None, max_retries: int = None,
+                 max_connections: int = 20):
         self.url = url.rstrip('/')
         self.headers = {
             'Authorization': f'Bearer {token}',
             'Content-Type': 'application/json'
         }
+        self.timeout = httpx.Timeout(timeout or config.KV_TIMEOUT_SECONDS)
+        self.max_retries = config.KV_MAX_RETRIES if max_retries is None else max_retries
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.poll_interval = 0.25  # BLPOP emulation: REST has no blocking commands
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self._sync_client: Optional[httpx.Client] = None
     
-    def get(self, key: str):
-        """Get value by key"""
-        try:
-            response = requests.get(f"{self.url}/get/{key}", headers=self.headers)
-            return response.json().get('result') if response.status_code == 200 else None
-        except Exception as e:
-            logger.error(f"KV get error: {e}")
-            return None
+    async def _http(self) -> httpx.AsyncClient:
+        """The shared pool, recreated (and the old one closed) if used from a different event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._client_loop is not loop:
+            stale, self._client = self._client, None
+            # Connections of a loop that already closed may fail to shut down cleanly
+            with contextlib.suppress(Exception):
+                await stale.aclose()
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.url, headers=self.headers,
+                                             timeout=self.timeout, limits=self.limits)
+            self._client_loop = loop
+        return self._client
     
-    def set(self, key: str, value: str, ex: Optional[int] = None):
-        """Set key-value pair"""
-        try:
-            data = {'value': value}
-            if ex:
-                data['ex'] = ex
-            response = requests.post(f"{self.url}/set/{key}", headers=self.headers, json=data)
-            return response.status_code == 200
-        except Exception as e:
-            logger.error(f"KV set error: {e}")
-            return False
+    def _backoff(self, attempt: int) -> float:
+        return min(0.1 * (2 ** attempt), 2.0) * random.uniform(0.5, 1.5)
     
-    def ping(self):
-        """Health check"""
+    async def _request(self, path: str, body):
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await (await self._http()).post(path, json=body)
+                if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                return self._decode(response)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"KV request failed ({e}), retrying")
+                await asyncio.sleep(self._backoff(attempt))
+    
+    @staticmethod
+    def _decode(response: httpx.Response):
         try:
-            response = requests.get(f"{self.url}/get/health_check", headers=self.headers)
-            return response.status_code in [200, 404]  # 404 is ok for missing key
-        except:
-            return False
+            data = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise VercelKVError(f"Unexpected KV response: {response.text[:200]}")
+        if response.status_code >= 400 and not isinstance(data, list):
+            raise VercelKVError(data.get("error", f"HTTP {response.status_code}"))
+        return data
+    
+    async def _dispatch(self, *command):
+        return _kv_reply(command, await self._request("/", list(command)))
+    
+    def pipeline(self, transaction: bool = True) -> VercelKVPipeline:
+        return VercelKVPipeline(self, transaction)
+    
+    async def blpop(self, keys, timeout: float = 0):
+        """Poll LPOP across keys until one yields or ``timeout`` seconds pass (0 waits forever)"""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            pipe = self.pipeline(transaction=False)
+            for key in keys:
+                pipe.lpop(key)
+            for key, value in zip(keys, await pipe.execute()):
+                if value is not None:
+                    return key, value
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
+    
+    async def scan_iter(self, match: Optional[str] = None, count: int = 100):
+        cursor = "0"
+        while True:
+            args = ["SCAN", cursor, *(["MATCH", match] if match else []), "COUNT", count]
+            cursor, keys = await self._dispatch(*args)
+            for key in keys:
+                yield key
+            if str(cursor) == "0":
+                break
+    
+    def execute_sync(self, *commands: list) -> list:
+        """Run commands as one pipeline from synchronous code (e.g. Celery signal handlers)"""
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(base_url=self.url, headers=self.headers,
+                                             timeout=self.timeout, limits=self.limits)
+        response = self._sync_client.post("/pipeline", json=[list(command) for command in commands])
+        return [_kv_reply(command, item) for command, item in zip(commands, self._decode(response))]
+    
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
 
 # Initialize Redis client
 redis_client = get_redis_client()
+_async_redis_client = None
+
+def get_async_redis_client():
+    """Async client for the configured backend, for code running on the event loop"""
+    global _async_redis_client
+    if isinstance(redis_client, VercelKVClient):
+        return redis_client  # already async
+    if _async_redis_client is None and isinstance(redis_client, redis.Redis):
+        _async_redis_client = aioredis.from_url(config.REDIS_URL, decode_responses=True)
+    return _async_redis_client
 
 # FastAPI app for health checks and monitoring
 app = FastAPI(
@@ -202,12 +518,68 @@ class TaskStatusResponse(BaseModel):
     error: Optional[str] = None
 
 # Background Task Queue Processing
+ACTIVE_USERS_KEY = "tasks:active_users"  # users whose queue may hold work
+WAKEUP_KEY = "tasks:wakeup"              # signalled on enqueue and on task completion
+USER_WEIGHTS_KEY = "tasks:user_weights"  # optional per-user round-robin weights
+
+def user_queue_key(user_id: str) -> str:
+    return f"user:{user_id}:tasks"
+
+def user_inflight_key(user_id: str) -> str:
+    """Sorted set of the user's dispatched task ids, scored by when their slot lapses"""
+    return f"user:{user_id}:tasks:running"
+
+def task_slot_lease_seconds() -> int:
+    """How long a dispatched task may hold a slot before it is presumed lost.
+
+    Retries keep the slot, so the lease covers every attempt running into
+    ``task_time_limit`` plus the countdowns between them.
+    """
+    attempts = config.TASK_MAX_RETRIES + 1
+    return (attempts * int(celery_app.conf.task_time_limit or 0)
+            + config.TASK_MAX_RETRIES * config.TASK_RETRY_COUNTDOWN
+            + config.TASK_SLOT_GRACE_SECONDS)
+
+def enqueue_user_task(client, user_id: str, task_data: dict):
+    """Queue a task for a user and wake the dispatcher (works with sync and async clients).
+
+    This is the producer contract: push to ``user:{id}:tasks``, add the user to
+    ``tasks:active_users`` and signal ``tasks:wakeup``. Queues filled with a bare
+    RPUSH are still found, but only by the dispatcher's periodic rescan.
+    """
+    pipe = client.pipeline(transaction=True)
+    pipe.rpush(user_queue_key(user_id), json.dumps({**task_data, 'user_id': user_id}))
+    pipe.sadd(ACTIVE_USERS_KEY, user_id)
+    pipe.rpush(WAKEUP_KEY, user_id)
+    return pipe.execute()
+
 class TaskQueueProcessor:
-    """Process tasks from the Redis queue"""
+    """Dispatch tasks from per-user Redis queues to Celery.
+
+    Users with pending work are tracked in a registry set, so no keyspace scan
+    is needed. While there is nothing to hand out the dispatcher blocks on the
+    wakeup list, which producers and finishing tasks push to. Each round visits
+    the active users in rotating order, drains up to ``weight * batch_size``
+    tasks per user in one pipelined round trip and never lets a user exceed
+    ``user_concurrency`` tasks running in Celery at once.
+    
+    Slots are leases: a task whose worker died without running ``task_postrun``
+    loses its slot once its whole retry budget plus a grace period has passed.
+    Queues that producers filled without ``enqueue_user_task`` are picked up by
+    a keyspace scan every ``rescan_interval`` seconds.
+    """
     
-    def __init__(self, redis_client):
-        self.redis_client = redis_client
+    def __init__(self, redis_client, user_concurrency: int = None, batch_size: int = None,
+                 idle_timeout: int = None, rescan_interval: int = None):
+        self.redis_client = redis_client  # redis.asyncio client or VercelKVClient
+        self.user_concurrency = max(user_concurrency or config.USER_TASK_CONCURRENCY, 1)
+        self.batch_size = max(batch_size or config.TASK_DISPATCH_BATCH_SIZE, 1)
+        self.idle_timeout = idle_timeout or config.TASK_DISPATCH_IDLE_TIMEOUT
+        self.rescan_interval = rescan_interval or config.TASK_QUEUE_RESCAN_SECONDS
         self.running = True
+        self._rotation = 0
+        self._next_rescan = 0.0
+        self.stats = {"rounds": 0, "dispatched": 0, "capped": 0, "dropped": 0, "reaped": 0}
     
     async def process_queue(self):
         """Main queue processing loop"""
@@ -215,36 +587,117 @@ class TaskQueueProcessor:
         
         while self.running:
             try:
-                # Process tasks from different user queues
-                await self._process_user_tasks()
-                await asyncio.sleep(1)  # Brief pause between cycles
+                await self._rescan_if_due()
+                dispatched = await self._process_user_tasks()
+                if not dispatched:
+                    # Nothing runnable: sleep until new work or a free slot is signalled
+                    await self.redis_client.blpop([WAKEUP_KEY], timeout=self.idle_timeout)
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Queue processing error: {e}")
                 await asyncio.sleep(5)  # Longer pause on error
     
-    async def _process_user_tasks(self):
-        """Process tasks from user-specific queues"""
-        if not self.redis_client:
-            return
-            
+    def stop(self):
+        self.running = False
+    
+    async def _rescan_if_due(self):
+        if time.monotonic() >= self._next_rescan:
+            self._next_rescan = time.monotonic() + self.rescan_interval
+            await self._register_existing_queues()
+    
+    async def _register_existing_queues(self):
+        """Scan for queues missing from the registry (filled by a bare RPUSH) so they are not stranded"""
         try:
-            # Scan for user task queues (pattern: user:*:tasks)
-            if hasattr(self.redis_client, 'scan_iter'):
-                for key in self.redis_client.scan_iter(match="user:*:tasks"):
-                    # Get next task from user queue
-                    task_data = self.redis_client.lpop(key)
-                    if task_data:
-                        await self._handle_task(json.loads(task_data))
+            users = [key[len("user:"):-len(":tasks")]
+                     async for key in self.redis_client.scan_iter(match="user:*:tasks")]
+            if users:
+                await self.redis_client.sadd(ACTIVE_USERS_KEY, *users)
+                logger.info(f"Registered {len(users)} existing user task queues")
         except Exception as e:
-            logger.error(f"Error processing user tasks: {e}")
+            logger.error(f"Error registering existing task queues: {e}")
+    
+    async def _process_user_tasks(self) -> int:
+        """Run one weighted round-robin round; returns the number of tasks dispatched"""
+        self.stats["rounds"] += 1
+        
+        # Round trip 1: active users (clearing pending wakeups atomically with the read)
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.smembers(ACTIVE_USERS_KEY)
+        pipe.delete(WAKEUP_KEY)
+        users, _ = await pipe.execute()
+        if not users:
+            return 0
+        users = sorted(users)
+        start = self._rotation % len(users)
+        users = users[start:] + users[:start]
+        self._rotation += 1
+        
+        # Round trip 2: weights and running counts, reaping slots whose lease lapsed
+        now = time.time()
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hmget(USER_WEIGHTS_KEY, users)
+        for user_id in users:
+            pipe.zremrangebyscore(user_inflight_key(user_id), "-inf", now)
+            pipe.zcard(user_inflight_key(user_id))
+        weights, *counts = await pipe.execute()
+        reaped, running = sum(int(count) for count in counts[0::2]), counts[1::2]
+        if reaped:
+            self.stats["reaped"] += reaped
+            logger.warning(f"Reaped {reaped} task slot(s) whose task never reported completion")
+        
+        quotas = {}
+        for user_id, weight, in_flight in zip(users, weights, running):
+            free = self.user_concurrency - int(in_flight)
+            if free <= 0:
+                self.stats["capped"] += 1
+                continue
+            quotas[user_id] = min(free, self._weight(weight) * self.batch_size)
+        if not quotas:
+            return 0
+        
+        # Round trip 3: drain a batch from every eligible queue
+        pipe = self.redis_client.pipeline(transaction=False)
+        for user_id, quota in quotas.items():
+            pipe.lpop(user_queue_key(user_id), quota)
+        batches = dict(zip(quotas, await pipe.execute()))
+        
+        drained = [user_id for user_id, items in batches.items() if len(items or []) < quotas[user_id]]
+        if drained:
+            await self._unregister_drained(drained)
+        
+        dispatched = 0
+        for user_id, items in batches.items():
+            for raw in items or []:
+                dispatched += await self._handle_task(user_id, raw)
+        self.stats["dispatched"] += dispatched
+        return dispatched
     
-    async def _handle_task(self, task_data: dict):
-        """Handle individual task"""
+    @staticmethod
+    def _weight(value) -> int:
         try:
+            return max(int(value), 1) if value is not None else 1
+        except (TypeError, ValueError):
+            return 1
+    
+    async def _unregister_drained(self, users: List[str]):
+        """Drop emptied queues from the registry, re-adding any that a producer refilled meanwhile"""
+        pipe = self.redis_client.pipeline(transaction=True)
+        for user_id in users:
+            pipe.srem(ACTIVE_USERS_KEY, user_id)
+            pipe.llen(user_queue_key(user_id))
+        results = await pipe.execute()
+        refilled = [user_id for user_id, length in zip(users, results[1::2]) if length]
+        if refilled:
+            await self.redis_client.sadd(ACTIVE_USERS_KEY, *refilled)
+    
+    async def _handle_task(self, user_id: str, raw: str) -> int:
+        """Hand one queued task to Celery; returns 1 if it was submitted"""
+        try:
+            task_data = json.loads(raw)
             task_type = task_data.get('task_type')
             payload = task_data.get('payload', {})
-            user_id = task_data.get('user_id')
             
             logger.info(f"Processing task: {task_type} for user: {user_id}")
             
@@ -257,15 +710,36 @@ class TaskQueueProcessor:
             }
             
             task_func = task_map.get(task_type)
-            if task_func:
-                # Submit to Celery
-                result = task_func.delay(payload, user_id)
-                logger.info(f"Submitted {task_type} to Celery with ID: {result.id}")
-            else:
+            if not task_func:
                 logger.warning(f"Unknown task type: {task_type}")
+                self.stats["dropped"] += 1
+                return 0
+            
+            # Count the task against the user's cap before Celery can finish it
+            task_id = str(uuid.uuid4())
+            inflight_key = user_inflight_key(user_id)
+            lease = task_slot_lease_seconds()
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.zadd(inflight_key, {task_id: time.time() + lease})
+            pipe.expire(inflight_key, lease)
+            await pipe.execute()
+            try:
+                await asyncio.to_thread(
+                    task_func.apply_async,
+                    args=[payload, user_id],
+                    task_id=task_id,
+                    priority=task_priority(task_data.get('priority'))
+                )
+            except Exception:
+                await self.redis_client.zrem(inflight_key, task_id)
+                raise
+            logger.info(f"Submitted {task_type} to Celery with ID: {task_id}")
+            return 1
                 
         except Exception as e:
             logger.error(f"Task handling error: {e}")
+            self.stats["dropped"] += 1
+            return 0
 
 # Health check endpoint
 @app.get("/health", response_model=HealthResponse)
@@ -275,16 +749,15 @@ async def health_check():
     active_tasks = 0
     
     try:
-        if redis_client:
-            # Test Redis connection
-            if hasattr(redis_client, 'ping'):
-                redis_client.ping()
-                redis_connected = True
+        client = get_async_redis_client()
+        if client:
+            # Test Redis connection without blocking the event loop
+            redis_connected = bool(await client.ping())
             
             # Get active task count (approximate)
             try:
                 inspect = celery_app.control.inspect()
-                active = inspect.active() or {}
+                active = await asyncio.to_thread(inspect.active) or {}
                 active_tasks = sum(len(tasks) for tasks in active.values())
             except:
                 pass
@@ -317,7 +790,10 @@ async def submit_task(task_request: TaskRequest):
             raise HTTPException(status_code=400, detail=f"Unknown task type: {task_request.task_type}")
         
         # Submit task to Celery
-        result = task_func.delay(task_request.payload, task_request.user_id)
+        result = task_func.apply_async(
+            args=[task_request.payload, task_request.user_id],
+            priority=task_priority(task_request.priority)
+        )
         
         logger.info(f"Submitted task {task_request.task_type} with ID {result.id}")
         
@@ -333,8 +809,8 @@ async def submit_task(task_request: TaskRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/tasks/{task_id}/status", response_model=TaskStatusResponse)
-async def get_task_status(task_id: str):
-    """Get the status of a submitted task"""
+async def get_task_status(task_id: str, inline: bool = False):
+    """Get the status of a submitted task (``inline=true`` resolves blob references)"""
     try:
         result = AsyncResult(task_id, app=celery_app)
         
@@ -345,74 +821,395 @@ async def get_task_status(task_id: str):
         
         if result.ready():
             if result.successful():
-                response.result = result.result
+                response.result = await asyncio.to_thread(resolve_blob_refs, result.result) if inline else result.result
             else:
                 response.error = str(result.info)
         
         return response
         
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Task output has expired")
     except Exception as e:
         logger.error(f"Error getting task status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/tasks/{task_id}/status/blobs/{digest}")
+async def get_task_blob(task_id: str, digest: str):
+    """Stream one large output referenced by a task's result"""
+    result = AsyncResult(task_id, app=celery_app)
+    if not result.ready() or not result.successful():
+        raise HTTPException(status_code=404, detail="Task has no result")
+    
+    # Only blobs referenced by this task's result can be fetched through it
+    ref = next((ref for ref in iter_blob_refs(result.result) if ref['$blob'] == f"sha256:{digest}"), None)
+    if ref is None:
+        raise HTTPException(status_code=404, detail="Blob not referenced by this task")
+    
+    path = blob_store.path_for(digest)
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Task output has expired")
+    return FileResponse(path, media_type=ref['content_type'])
+
+# =============================================================================
+# RESULT STORAGE
+# =============================================================================
+
+# Results go through the backend as zlib-compressed msgpack instead of JSON
+RESULT_SERIALIZER = 'msgpack-zlib'
+
+def _pack_result(value) -> bytes:
+    return zlib.compress(msgpack.packb(value, use_bin_type=True))
+
+def _unpack_result(data) -> Any:
+    return msgpack.unpackb(zlib.decompress(data), raw=False)
+
+register_serializer(
+    RESULT_SERIALIZER, _pack_result, _unpack_result,
+    content_type='application/x-msgpack-zlib', content_encoding='binary'
+)
+
+class BlobStore:
+    """Content-addressed storage for large task outputs on disk shared by the worker pods.
+
+    Blobs are keyed by their SHA-256, so identical outputs are stored once.
+    Results keep only a reference; blobs older than the longest result TTL
+    are removed by ``sweep()``.
+    """
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+    
+    def path_for(self, digest: str) -> Path:
+        digest = digest.split(':', 1)[-1]
+        if len(digest) != 64 or any(c not in '0123456789abcdef' for c in digest):
+            raise ValueError(f"Invalid blob digest: {digest}")
+        return self.root / digest[:2] / digest
+    
+    def put(self, data: bytes, content_type: str) -> Dict[str, Any]:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if path.exists():
+            os.utime(path)  # still referenced: restart its expiry
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        return {'$blob': f"sha256:{digest}", 'size': len(data), 'content_type': content_type}
+    
+    def read(self, ref: Dict[str, Any]) -> bytes:
+        return self.path_for(ref['$blob']).read_bytes()
+    
+    def sweep(self, max_age_seconds: int) -> int:
+        """Delete blobs not written or reused within ``max_age_seconds``"""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for path in self.root.glob('*/*'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+blob_store = BlobStore(config.BLOB_STORE_PATH)
+
+def is_blob_ref(value) -> bool:
+    return isinstance(value, dict) and '$blob' in value
+
+def offload_large_values(value, content_types: Dict[str, str] = None, key: str = None):
+    """Replace strings/bytes above BLOB_INLINE_MAX_BYTES with blob references"""
+    if isinstance(value, dict):
+        return {k: offload_large_values(v, content_types, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [offload_large_values(item, content_types, key) for item in value]
+    if isinstance(value, (str, bytes)) and len(value) > config.BLOB_INLINE_MAX_BYTES // 4:
+        data = value.encode('utf-8') if isinstance(value, str) else value
+        if len(data) > config.BLOB_INLINE_MAX_BYTES:
+            default = 'text/plain; charset=utf-8' if isinstance(value, str) else 'application/octet-stream'
+            return blob_store.put(data, (content_types or {}).get(key, default))
+    return value
+
+def iter_blob_refs(value):
+    if is_blob_ref(value):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from iter_blob_refs(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_blob_refs(item)
+
+def resolve_blob_refs(value):
+    """Inline blob references back into a result (text blobs as str)"""
+    if is_blob_ref(value):
+        data = blob_store.read(value)
+        return data.decode('utf-8') if value['content_type'].startswith('text/') else data
+    if isinstance(value, dict):
+        return {k: resolve_blob_refs(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_blob_refs(item) for item in value]
+    return value
+
+def result_ttl(task_name: str) -> int:
+    route = (celery_app.conf.task_routes or {}).get(task_name, {})
+    return QUEUE_TOPOLOGY.get(route.get('queue'), {}).get('result_ttl', RESULT_TTL_MAX)
+
+class CompactResultTask(celery_app.Task):
+    """Task base that offloads large outputs to the blob store and expires results per task type"""
+    
+    # Content types for offloaded fields, by result key
+    blob_content_types: Dict[str, str] = {}
+    
+    def __call__(self, *args, **kwargs):
+        result = super().__call__(*args, **kwargs)
+        return offload_large_values(result, self.blob_content_types)
+    
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        if status == 'RETRY' or not hasattr(self.backend, 'expire'):
+            return
+        try:
+            self.backend.expire(self.backend.get_key_for_task(task_id), result_ttl(self.name))
+        except Exception as e:
+            logger.warning(f"Could not set result TTL for task {task_id}: {e}")
+
 # =============================================================================
 # CELERY TASKS
 # =============================================================================
 
-@celery_app.task(bind=True, name='worker.scrape_website')
+class ScrapeResultTask(CompactResultTask):
+    blob_content_types = {'content': 'text/html; charset=utf-8'}
+
+@celery_app.task(bind=True, base=ScrapeResultTask, name='worker.scrape_website')
 def scrape_website_task(self, payload: Dict[str, Any], user_id: Optional[str] = None):
-    """Web scraping task using Playwright"""
+    """Web scraping task using Playwright (``url`` for one page, ``urls`` for a batch)"""
     try:
-        url = payload.get('url')
-        if not url:
+        urls = payload.get('urls') or ([payload['url']] if payload.get('url') else [])
+        if not urls:
             raise ValueError("URL is required for web scraping")
         
-        logger.info(f"Starting web scraping for URL: {url}")
+        logger.info(f"Starting web scraping for {len(urls)} URL(s)")
         
-        # Use asyncio to run the async scraping function
-        result = asyncio.run(scrape_with_playwright(url, payload))
+        # Run on the process-wide browser pool instead of launching Chromium per task
+        if 'urls' in payload:
+            result = browser_pool.run(scrape_many_with_playwright(urls, payload))
+        else:
+            result = browser_pool.run(scrape_with_playwright(urls[0], payload))
         
-        logger.info(f"Web scraping completed for URL: {url}")
+        logger.info(f"Web scraping completed for {len(urls)} URL(s)")
         return result
         
     except Exception as e:
         logger.error(f"Web scraping task failed: {e}")
-        self.retry(countdown=60, max_retries=3)
+        self.retry(countdown=config.TASK_RETRY_COUNTDOWN, max_retries=config.TASK_MAX_RETRIES)
 
-async def scrape_with_playwright(url: str, options: Dict[str, Any]) -> Dict[str, Any]:
-    """Perform web scraping using Playwright"""
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
+class _PooledBrowser:
+    """A pooled Chromium instance and its usage counters"""
+    
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages_served = 0
+        self.active = 0
+        self.retired = False
+
+class BrowserPool:
+    """Per-process pool of Chromium browsers shared by scrape tasks.
+
+    Playwright objects are bound to the event loop that created them, so the
+    pool owns one long-lived loop on a background thread and tasks submit their
+    coroutines to it with ``run()``. Every page gets a fresh browser context,
+    and a browser is retired and replaced after ``max_pages_per_browser`` pages
+    to bound memory growth. The pool is rebuilt after a fork.
+    """
+    
+    def __init__(self, max_browsers: int, max_pages_per_browser: int, blocked_resources: List[str]):
+        self.max_browsers = max(max_browsers, 1)
+        self.max_pages_per_browser = max(max_pages_per_browser, 1)
+        self.blocked_resources = set(blocked_resources)
+        self.stats = {"launches": 0, "pages": 0, "recycled": 0}
+        self._reset()
+    
+    def _reset(self):
+        self._pid = os.getpid()
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browsers: List[_PooledBrowser] = []
+        self._lock = None
+        self._thread_lock = threading.Lock()
+    
+    def _ensure_loop(self):
+        if self._pid != os.getpid():
+            self._reset()  # forked child: the parent's loop and browsers are unusable
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+                self._thread.start()
+        return self._loop
+    
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the pool's loop from synchronous (task) code"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result(timeout)
+    
+    async def _acquire(self):
+        """Pick the least busy live browser, launching one if the pool has room"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._browsers = [b for b in self._browsers if b.browser.is_connected()]
+            live = [b for b in self._browsers if not b.retired]
+            pooled = min(live, key=lambda b: b.active, default=None)
+            launch_ms = 0.0
+            if pooled is None or (pooled.active and len(live) < self.max_browsers):
+                started = time.perf_counter()
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                pooled = _PooledBrowser(await self._playwright.chromium.launch(headless=True))
+                self._browsers.append(pooled)
+                self.stats["launches"] += 1
+                launch_ms = (time.perf_counter() - started) * 1000
+            pooled.active += 1
+            pooled.pages_served += 1
+            self.stats["pages"] += 1
+            if pooled.pages_served >= self.max_pages_per_browser:
+                pooled.retired = True
+            return pooled, launch_ms
+    
+    async def _release(self, pooled: _PooledBrowser):
+        pooled.active -= 1
+        if pooled.retired and pooled.active == 0:
+            self.stats["recycled"] += 1
+            self._browsers = [b for b in self._browsers if b is not pooled]
+            try:
+                await pooled.browser.close()
+            except Exception as e:
+                logger.warning(f"Closing recycled browser failed: {e}")
+    
+    async def _block_resources(self, route):
+        if route.request.resource_type in self.blocked_resources:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    @contextlib.asynccontextmanager
+    async def page(self, block_resources: bool = True):
+        """A fresh page in its own browser context; yields (page, launch_ms)"""
+        pooled, launch_ms = await self._acquire()
+        context = None
         try:
-            # Navigate to URL
-            await page.goto(url, wait_until='networkidle')
-            
-            # Extract data based on options
-            result = {
-                'url': url,
-                'title': await page.title(),
-                'content': await page.content(),
-                'timestamp': datetime.utcnow().isoformat()
-            }
-            
-            # Custom selectors if provided
-            if 'selectors' in options:
-                for selector_name, selector in options['selectors'].items():
-                    try:
-                        element = await page.query_selector(selector)
-                        if element:
-                            result[selector_name] = await element.text_content()
-                    except Exception as e:
-                        logger.warning(f"Selector {selector_name} failed: {e}")
-            
-            return result
-            
+            context = await pooled.browser.new_context()
+            if block_resources and self.blocked_resources:
+                await context.route("**/*", self._block_resources)
+            yield await context.new_page(), launch_ms
         finally:
-            await browser.close()
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning(f"Closing browser context failed: {e}")
+            await self._release(pooled)
+    
+    async def _close(self):
+        for pooled in self._browsers:
+            try:
+                await pooled.browser.close()
+            except Exception:
+                pass
+        self._browsers = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    def shutdown(self):
+        """Close browsers and stop the loop thread"""
+        if self._loop is None or self._pid != os.getpid():
+            return
+        try:
+            self.run(self._close(), timeout=30)
+        except Exception as e:
+            logger.error(f"Browser pool shutdown error: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._reset()
+
+browser_pool = BrowserPool(
+    max_browsers=config.SCRAPE_MAX_BROWSERS,
+    max_pages_per_browser=config.SCRAPE_MAX_PAGES_PER_BROWSER,
+    blocked_resources=[r.strip() for r in config.SCRAPE_BLOCKED_RESOURCES.split(",") if r.strip()],
+)
+
+@worker_process_shutdown.connect
+def shutdown_browser_pool(**kwargs):
+    browser_pool.shutdown()
 
-@celery_app.task(bind=True, name='worker.process_ai')
+async def scrape_with_playwright(url: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Perform web scraping using a pooled Playwright browser"""
+    started = time.perf_counter()
+    async with browser_pool.page(options.get('block_resources', True)) as (page, launch_ms):
+        # Navigate to URL
+        navigation_started = time.perf_counter()
+        await page.goto(
+            url,
+            wait_until=options.get('wait_until', config.SCRAPE_WAIT_UNTIL),
+            timeout=options.get('timeout_ms', config.SCRAPE_NAVIGATION_TIMEOUT_MS)
+        )
+        navigation_ms = (time.perf_counter() - navigation_started) * 1000
+        
+        # Extract data based on options
+        extraction_started = time.perf_counter()
+        result = {
+            'url': url,
+            'title': await page.title(),
+            'content': await page.content(),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        
+        # Custom selectors if provided
+        if 'selectors' in options:
+            for selector_name, selector in options['selectors'].items():
+                try:
+                    element = await page.query_selector(selector)
+                    if element:
+                        result[selector_name] = await element.text_content()
+                except Exception as e:
+                    logger.warning(f"Selector {selector_name} failed: {e}")
+        
+        extraction_ms = (time.perf_counter() - extraction_started) * 1000
+    
+    result['timings'] = {
+        'launch_ms': round(launch_ms, 1),
+        'navigation_ms': round(navigation_ms, 1),
+        'extraction_ms': round(extraction_ms, 1),
+        'total_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+    return result
+
+async def scrape_many_with_playwright(urls: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Scrape a batch of URLs concurrently on the pool; failures are reported per URL"""
+    semaphore = asyncio.Semaphore(max(int(options.get('concurrency', config.SCRAPE_BATCH_CONCURRENCY)), 1))
+    started = time.perf_counter()
+    
+    async def scrape_one(url: str):
+        async with semaphore:
+            try:
+                return await scrape_with_playwright(url, options)
+            except Exception as e:
+                logger.warning(f"Scraping {url} failed: {e}")
+                return {'url': url, 'error': str(e)}
+    
+    results = await asyncio.gather(*(scrape_one(url) for url in urls))
+    return {
+        'results': results,
+        'succeeded': sum(1 for r in results if 'error' not in r),
+        'failed': sum(1 for r in results if 'error' in r),
+        'total_ms': round((time.perf_counter() - started) * 1000, 1),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+@celery_app.task(bind=True, base=CompactResultTask, name='worker.process_ai')
 def process_ai_task(self, payload: Dict[str, Any], user_id: Optional[str] = None):
     """AI processing task"""
     try:
@@ -433,7 +1230,7 @@ def process_ai_task(self, payload: Dict[str, Any], user_id: Optional[str] = None
         
     except Exception as e:
         logger.error(f"AI processing task failed: {e}")
-        self.retry(countdown=60, max_retries=3)
+        self.retry(countdown=config.TASK_RETRY_COUNTDOWN, max_retries=config.TASK_MAX_RETRIES)
 
 def process_ai_completion(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Process AI completion request"""
@@ -453,7 +1250,7 @@ def process_ai_analysis(payload: Dict[str, Any]) -> Dict[str, Any]:
         'timestamp': datetime.utcnow().isoformat()
     }
 
-@celery_app.task(bind=True, name='worker.analyze_data')
+@celery_app.task(bind=True, base=CompactResultTask, name='worker.analyze_data')
 def analyze_data_task(self, payload: Dict[str, Any], user_id: Optional[str] = None):
     """Data analysis task"""
     try:
@@ -472,9 +1269,9 @@ def analyze_data_task(self, payload: Dict[str, Any], user_id: Optional[str] = No
         
     except Exception as e:
         logger.error(f"Data analysis task failed: {e}")
-        self.retry(countdown=60, max_retries=3)
+        self.retry(countdown=config.TASK_RETRY_COUNTDOWN, max_retries=config.TASK_MAX_RETRIES)
 
-@celery_app.task(bind=True, name='worker.publish_social_media')
+@celery_app.task(bind=True, base=CompactResultTask, name='worker.publish_social_media')
 def publish_social_media_task(self, payload: Dict[str, Any], user_id: Optional[str] = None):
     """Social media publishing task"""
     try:
@@ -496,7 +1293,25 @@ def publish_social_media_task(self, payload: Dict[str, Any], user_id: Optional[s
         
     except Exception as e:
         logger.error(f"Social media publishing failed: {e}")
-        self.retry(countdown=60, max_retries=3)
+        self.retry(countdown=config.TASK_RETRY_COUNTDOWN, max_retries=config.TASK_MAX_RETRIES)
+
+@task_postrun.connect
+def release_user_task_slot(sender=None, task_id=None, args=None, kwargs=None, state=None, **extra):
+    """Free the user's dispatch slot once a queued task has finished (retries keep the slot)"""
+    if state == 'RETRY' or not isinstance(redis_client, (redis.Redis, VercelKVClient)):
+        return
+    user_id = args[1] if args and len(args) > 1 else (kwargs or {}).get('user_id')
+    if not user_id:
+        return
+    try:
+        if isinstance(redis_client, VercelKVClient):
+            removed, = redis_client.execute_sync(["ZREM", user_inflight_key(user_id), task_id])
+            if removed:
+                redis_client.execute_sync(["RPUSH", WAKEUP_KEY, user_id])
+        elif redis_client.zrem(user_inflight_key(user_id), task_id):
+            redis_client.rpush(WAKEUP_KEY, user_id)
+    except Exception as e:
+        logger.error(f"Failed to release task slot for user {user_id}: {e}")
 
 # =============================================================================
 # MAIN EXECUTION
@@ -515,11 +1330,26 @@ class GracefulShutdown:
         logger.info(f"Received signal {signum}, initiating graceful shutdown...")
         self.shutdown = True
 
+async def sweep_blobs():
+    """Periodically drop blobs that outlived every result referencing them"""
+    while True:
+        try:
+            removed = await asyncio.to_thread(blob_store.sweep, RESULT_TTL_MAX)
+            if removed:
+                logger.info(f"Removed {removed} expired result blobs")
+        except Exception as e:
+            logger.error(f"Blob sweep error: {e}")
+        await asyncio.sleep(config.BLOB_SWEEP_INTERVAL)
+
 # Main execution
 async def main():
     """Main worker execution function"""
     logger.info(f"🚀 Starting {config.WORKER_NAME}")
     
+    # Tasks submitted from here must land on a queue some worker consumes
+    for problem in check_task_routes():
+        logger.error(f"❌ {problem}")
+    
     # Test Redis connection
     if redis_client:
         logger.info("✅ Redis connection established")
@@ -530,13 +1360,17 @@ async def main():
     # Initialize graceful shutdown handler
     shutdown_handler = GracefulShutdown()
     
-    # Initialize task queue processor
-    if redis_client:
-        task_processor = TaskQueueProcessor(redis_client)
+    # Initialize task queue processor on an async client for the configured backend
+    if isinstance(redis_client, (redis.Redis, VercelKVClient)):
+        queue_client = get_async_redis_client()
+        task_processor = TaskQueueProcessor(queue_client)
         queue_task = asyncio.create_task(task_processor.process_queue())
     else:
+        queue_client = None
         queue_task = None
     
+    blob_sweep_task = asyncio.create_task(sweep_blobs())
+    
     # Start FastAPI health check server
     health_config = uvicorn.Config(
         app,
@@ -562,12 +1396,24 @@ async def main():
         logger.error(f"Server error: {e}")
     finally:
         if queue_task and not queue_task.done():
+            task_processor.stop()
             queue_task.cancel()
+        if queue_client:
+            await queue_client.aclose()
+        blob_sweep_task.cancel()
         logger.info("Worker pod shutting down...")
 
 if __name__ == "__main__":
     # Check if running as Celery worker
-    if len(sys.argv) > 1 and sys.argv[1] == "celery":
+    if len(sys.argv) > 2 and sys.argv[1] == "celery":
+        # Start a Celery worker for a single queue: python worker.py celery <queue>
+        queue = sys.argv[2]
+        if queue not in QUEUE_TOPOLOGY:
+            logger.error(f"Unknown queue {queue}, expected one of: {', '.join(QUEUE_TOPOLOGY)}")
+            sys.exit(2)
+        logger.info(f"Starting Celery worker for queue {queue}")
+        celery_app.worker_main(celery_queue_worker_argv(queue))
+    elif len(sys.argv) > 1 and sys.argv[1] == "celery":
         # Start Celery worker directly
         logger.info("Starting Celery worker mode")
         celery_app.start()
@@ -51,6 +51,38 @@ SAVE_RESULT = True
 test_idx = [0]
 
 
+def make_agent_kwargs(models):
+    """Agent kwargs with freshly built toolkits.
+
+    Toolkits such as BrowserToolkit and CodeExecutionToolkit keep state, so
+    concurrent societies each need their own; pass
+    ``agent_kwargs_factory=lambda: make_agent_kwargs(models)`` to
+    ``GAIABenchmark.arun``.
+    """
+    # Configure toolkits
+    tools = [
+        *BrowserToolkit(
+            headless=False,  # Set to True for headless mode (e.g., on remote servers)
+            web_agent_model=models["browsing"],
+            planning_agent_model=models["planning"],
+        ).get_tools(),
+        *VideoAnalysisToolkit(
+            model=models["video"]
+        ).get_tools(),  # This requires OpenAI Key
+        *AudioAnalysisToolkit().get_tools(),  # This requires OpenAI Key
+        *CodeExecutionToolkit(sandbox="subprocess", verbose=True).get_tools(),
+        *ImageAnalysisToolkit(model=models["image"]).get_tools(),
+        *SearchToolkit().get_tools(),
+        *ExcelToolkit().get_tools(),
+        *FileWriteToolkit(output_dir="./").get_tools(),
+    ]
+
+    # Configure agent roles and parameters
+    user_agent_kwargs = {"model": models["user"]}
+    assistant_agent_kwargs = {"model": models["assistant"], "tools": tools}
+    return user_agent_kwargs, assistant_agent_kwargs
+
+
 def main():
     """Main function to run the GAIA benchmark."""
     # Create cache directory
@@ -93,27 +125,7 @@ def main():
         ),
     }
 
-    # Configure toolkits
-    tools = [
-        *BrowserToolkit(
-            headless=False,  # Set to True for headless mode (e.g., on remote servers)
-            web_agent_model=models["browsing"],
-            planning_agent_model=models["planning"],
-        ).get_tools(),
-        *VideoAnalysisToolkit(
-            model=models["video"]
-        ).get_tools(),  # This requires OpenAI Key
-        *AudioAnalysisToolkit().get_tools(),  # This requires OpenAI Key
-        *CodeExecutionToolkit(sandbox="subprocess", verbose=True).get_tools(),
-        *ImageAnalysisToolkit(model=models["image"]).get_tools(),
-        *SearchToolkit().get_tools(),
-        *ExcelToolkit().get_tools(),
-        *FileWriteToolkit(output_dir="./").get_tools(),
-    ]
-
-    # Configure agent roles and parameters
-    user_agent_kwargs = {"model": models["user"]}
-    assistant_agent_kwargs = {"model": models["assistant"], "tools": tools}
+    user_agent_kwargs, assistant_agent_kwargs = make_agent_kwargs(models)
 
     # Initialize benchmark
     benchmark = GAIABenchmark(data_dir="data/gaia", save_to="results/result.json")
@@ -15,12 +15,14 @@ import sys
 
 sys.path.append("../")
 
+import asyncio
 import json
 import random
 import re
 import string
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional, Union, Tuple
+from typing import Any, Callable, Dict, List, Literal, Optional, Union, Tuple
 
 from tqdm import tqdm
 from camel.benchmarks import BaseBenchmark
@@ -28,11 +30,60 @@ from camel.tasks import Task
 from camel.logger import get_logger
 
 from .common import extract_pattern
-from .enhanced_role_playing import run_society, OwlGAIARolePlaying
+from .enhanced_role_playing import run_society, arun_society, OwlGAIARolePlaying
 
 logger = get_logger(__name__)
 
 
+class AsyncRateLimiter:
+    r"""Token bucket limiting how often a model may be called.
+
+    Args:
+        rate_per_minute (float): Sustained number of acquisitions per minute.
+        burst (int, optional): Acquisitions allowed back to back.
+            (default: :obj:`1`)
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.interval = 60.0 / rate_per_minute
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) / self.interval
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.interval)
+
+
+def _model_name(model: Any) -> str:
+    r"""Name used to key per-model rate limits (model type of a backend)."""
+    if model is None:
+        return "default"
+    model_type = getattr(model, "model_type", model)
+    return str(getattr(model_type, "value", model_type))
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    r"""Linearly interpolated percentile (``q`` in [0, 100])."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
 class GAIABenchmark(BaseBenchmark):
     r"""GAIA Benchmark adapted from `"GAIA: a benchmark for General AI
     Assistants"
@@ -60,6 +111,10 @@ class GAIABenchmark(BaseBenchmark):
                 parallel processing. (default: :obj:`1`)
         """
         super().__init__("gaia", data_dir, save_to, processes)
+        self._completed_ids: set = set()
+        self._run_started: Optional[float] = None
+        self._run_finished: Optional[float] = None
+        self._run_processed = 0
 
     def download(self):
         r"""Download the GAIA dataset."""
@@ -73,10 +128,48 @@ class GAIABenchmark(BaseBenchmark):
         )
 
     def _check_task_completed(self, task_id: str) -> bool:
-        for data in self._results:
-            if data["task_id"] == task_id:
-                return True
-        return False
+        return task_id in self._completed_ids
+
+    def _load_results(self):
+        r"""Load saved results for resuming.
+
+        Results are stored as JSON lines, one per finished task. A file in the
+        older single-array format is converted once; a truncated last line
+        (interrupted write) is ignored.
+        """
+        self._results = []
+        try:
+            with open(self.save_to, "r", encoding="utf-8") as f:
+                content = f.read()
+        except Exception as e:
+            logger.warning(e)
+            content = ""
+
+        if content.lstrip().startswith("["):
+            self._results = json.loads(content)
+            with open(self.save_to, "w", encoding="utf-8") as f:
+                for result in self._results:
+                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        else:
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    self._results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable result line in {self.save_to}")
+
+        self._completed_ids = {result["task_id"] for result in self._results}
+
+    def _record_result(self, result: Dict[str, Any], save_result: bool):
+        r"""Keep a finished task's result and append it to the results file."""
+        self._results.append(result)
+        self._completed_ids.add(result["task_id"])
+        self._run_processed += 1
+        if save_result:
+            Path(self.save_to).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.save_to, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
 
     def dump_tasks(self, save_path: str, datas):
         constructed_data = []
@@ -136,20 +229,15 @@ class GAIABenchmark(BaseBenchmark):
         r"""Get the training set."""
         raise NotImplementedError("GAIA does not have a training set.")
 
-    def run(
+    def _select_tasks(
         self,
-        user_role_name: str,
-        assistant_role_name: str,
-        user_agent_kwargs: dict,
-        assistant_agent_kwargs: dict,
         on: Literal["train", "valid", "test"],
         level: Union[int, List[int], Literal["all"]],
         randomize: bool = False,
         subset: Optional[int] = None,
         idx: Optional[List[int]] = None,
-        save_result: bool = False,
-    ) -> Dict[str, Any]:
-        # Validate inputs
+    ) -> List[Dict[str, Any]]:
+        r"""Validate the run arguments and pick the tasks to run."""
         if on not in ["valid", "test"]:
             raise ValueError(
                 f"Invalid value for `on`: {on}, expected 'valid' or 'test'."
@@ -180,88 +268,264 @@ class GAIABenchmark(BaseBenchmark):
                 datas = [datas[i] for i in idx]
 
         logger.info(f"Number of tasks: {len(datas)}")
+        return datas
 
+    def _start_run(self, datas: List[Dict[str, Any]], save_result: bool) -> List[Dict[str, Any]]:
+        r"""Reset run state, load saved results and drop completed tasks."""
         self._results = []
-
+        self._completed_ids = set()
         if save_result:
-            try:
-                with open(self.save_to, "r", encoding="utf-8") as f:
-                    self._results = json.load(f)
-                f.close()
-            except Exception as e:
-                logger.warning(e)
-                # raise FileNotFoundError(f"{self.save_to} does not exist.")
+            self._load_results()
         datas = [
             data for data in datas if not self._check_task_completed(data["task_id"])
         ]
         logger.info(f"Number of tasks to be processed: {len(datas)}")
+        self._run_started = time.monotonic()
+        self._run_finished = None
+        self._run_processed = 0
+        return datas
+
+    def _skipped_result(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "task_id": task["task_id"],
+            "question": task["Question"],
+            "level": task["Level"],
+            "model_answer": None,
+            "ground_truth": None,
+            "score": 0,
+            "history": None,
+        }
+
+    def _construct_society(
+        self,
+        task: Dict[str, Any],
+        user_role_name: str,
+        assistant_role_name: str,
+        user_agent_kwargs: dict,
+        assistant_agent_kwargs: dict,
+    ) -> OwlGAIARolePlaying:
+        logger.info(f"Task Question: {task['Question']}")
+        logger.info(f"Required tools: {task['Annotator Metadata']['Tools']}")
+
+        task_kwargs = {
+            "task_prompt": task["Question"],
+            "with_task_specify": False,
+        }
+
+        return OwlGAIARolePlaying(
+            **task_kwargs,
+            user_role_name=user_role_name,
+            user_agent_kwargs=user_agent_kwargs,
+            assistant_role_name=assistant_role_name,
+            assistant_agent_kwargs=assistant_agent_kwargs,
+        )
+
+    def _build_result(
+        self,
+        task: Dict[str, Any],
+        raw_answer: str,
+        chat_history: List[dict],
+        token_info: dict,
+        latency: float,
+    ) -> Dict[str, Any]:
+        try:
+            answer = extract_pattern(raw_answer, "final_answer")
+        except Exception as e:
+            logger.error(
+                f"Error in extracting final answer from text {raw_answer}: {e}"
+            )
+            answer = None
+
+        logger.info(
+            f"Model answer: {answer}, Ground truth: {task['Final answer']}"
+        )
+
+        return {
+            "task_id": task["task_id"],
+            "question": task["Question"]
+            + "Please decompose the task into several sub-tasks and find the answer step-by-step.",
+            "level": task["Level"],
+            "model_answer": answer,
+            "ground_truth": task["Final answer"],
+            "score": self.question_scorer(answer, task["Final answer"]),
+            "token_info": token_info,
+            "latency": latency,
+            "history": chat_history,
+        }
+
+    def run(
+        self,
+        user_role_name: str,
+        assistant_role_name: str,
+        user_agent_kwargs: dict,
+        assistant_agent_kwargs: dict,
+        on: Literal["train", "valid", "test"],
+        level: Union[int, List[int], Literal["all"]],
+        randomize: bool = False,
+        subset: Optional[int] = None,
+        idx: Optional[List[int]] = None,
+        save_result: bool = False,
+        prompt_price_per_1k: float = 0.0,
+        completion_price_per_1k: float = 0.0,
+    ) -> Dict[str, Any]:
+        datas = self._start_run(
+            self._select_tasks(on, level, randomize, subset, idx), save_result
+        )
+
         # Process tasks
         for task in tqdm(datas, desc="Running"):
             if_prepared_task, info = self._prepare_task(task)
             if not if_prepared_task:
-                _result_info = {
-                    "task_id": task["task_id"],
-                    "question": task["Question"],
-                    "level": task["Level"],
-                    "model_answer": None,
-                    "ground_truth": None,
-                    "score": 0,
-                    "history": None,
-                }
-                self._results.append(_result_info)
+                self._record_result(self._skipped_result(task), save_result)
                 continue
             try:
-                logger.info(f"Task Question: {task['Question']}")
-                logger.info(f"Required tools: {task['Annotator Metadata']['Tools']}")
+                society = self._construct_society(
+                    task,
+                    user_role_name,
+                    assistant_role_name,
+                    user_agent_kwargs,
+                    assistant_agent_kwargs,
+                )
+                started = time.monotonic()
+                raw_answer, chat_history, token_info = run_society(society)
+                result = self._build_result(
+                    task, raw_answer, chat_history, token_info, time.monotonic() - started
+                )
+                self._record_result(result, save_result)
 
-                task_kwargs = {
-                    "task_prompt": task["Question"],
-                    "with_task_specify": False,
-                }
+            except Exception as e:
+                logger.error(f"Error in processing task: {e}")
 
-                society = OwlGAIARolePlaying(
-                    **task_kwargs,
-                    user_role_name=user_role_name,
-                    user_agent_kwargs=user_agent_kwargs,
-                    assistant_role_name=assistant_role_name,
-                    assistant_agent_kwargs=assistant_agent_kwargs,
-                )
+        self._run_finished = time.monotonic()
+        return self._generate_summary(prompt_price_per_1k, completion_price_per_1k)
 
-                raw_answer, chat_history, token_info = run_society(society)
-                try:
-                    answer = extract_pattern(raw_answer, "final_answer")
-                except Exception as e:
-                    logger.error(
-                        f"Error in extracting final answer from text {raw_answer}: {e}"
-                    )
-                    answer = None
+    async def arun(
+        self,
+        user_role_name: str,
+        assistant_role_name: str,
+        user_agent_kwargs: Optional[dict],
+        assistant_agent_kwargs: Optional[dict],
+        on: Literal["train", "valid", "test"],
+        level: Union[int, List[int], Literal["all"]],
+        randomize: bool = False,
+        subset: Optional[int] = None,
+        idx: Optional[List[int]] = None,
+        save_result: bool = False,
+        concurrency: int = 4,
+        rate_limits: Optional[Dict[str, float]] = None,
+        round_limit: int = 15,
+        prompt_price_per_1k: float = 0.0,
+        completion_price_per_1k: float = 0.0,
+        agent_kwargs_factory: Optional[Callable[[], Tuple[dict, dict]]] = None,
+    ) -> Dict[str, Any]:
+        r"""Run the benchmark with several societies in flight at once.
+
+        Toolkits such as :obj:`BrowserToolkit` and :obj:`CodeExecutionToolkit`
+        keep state (an open page, a sandbox), so societies must not share
+        them. Pass ``agent_kwargs_factory`` to build fresh agent kwargs, and
+        toolkits, for every task. Without a factory the same
+        ``user_agent_kwargs`` and ``assistant_agent_kwargs`` are shared by all
+        societies, so when they carry tools the run falls back to one task at
+        a time.
 
-                logger.info(
-                    f"Model answer: {answer}, Ground truth: {task['Final answer']}"
+        Args:
+            concurrency (int, optional): Maximum number of tasks running at
+                the same time. (default: :obj:`4`)
+            rate_limits (Optional[Dict[str, float]], optional): Society
+                rounds per minute allowed for each model type (e.g.
+                ``{"gpt-4o": 60}``). Every round waits for the limiters of
+                both the user and the assistant model. (default: :obj:`None`)
+            round_limit (int, optional): Maximum rounds per task.
+                (default: :obj:`15`)
+            agent_kwargs_factory (Optional[Callable[[], Tuple[dict, dict]]],
+                optional): Called once per task to build
+                ``(user_agent_kwargs, assistant_agent_kwargs)``; replaces the
+                shared kwargs. (default: :obj:`None`)
+
+        Other arguments are the same as :meth:`run`. Results are appended
+        to ``save_to`` as each task finishes, so an interrupted run resumes
+        where it stopped.
+        """
+        if agent_kwargs_factory is None:
+            if user_agent_kwargs is None or assistant_agent_kwargs is None:
+                raise ValueError(
+                    "Pass user_agent_kwargs and assistant_agent_kwargs or an agent_kwargs_factory"
                 )
+            if concurrency > 1 and (
+                user_agent_kwargs.get("tools") or assistant_agent_kwargs.get("tools")
+            ):
+                logger.warning(
+                    "Shared agent kwargs carry toolkits; running one task at a time. "
+                    "Pass agent_kwargs_factory to run tasks concurrently."
+                )
+                concurrency = 1
+
+            def agent_kwargs_factory() -> Tuple[dict, dict]:
+                return user_agent_kwargs, assistant_agent_kwargs
+
+        datas = self._start_run(
+            self._select_tasks(on, level, randomize, subset, idx), save_result
+        )
+
+        limiters = {
+            model: AsyncRateLimiter(rate)
+            for model, rate in (rate_limits or {}).items()
+        }
 
-                _result_info = {
-                    "task_id": task["task_id"],
-                    "question": task["Question"]
-                    + "Please decompose the task into several sub-tasks and find the answer step-by-step.",
-                    "level": task["Level"],
-                    "model_answer": answer,
-                    "ground_truth": task["Final answer"],
-                    "score": self.question_scorer(answer, task["Final answer"]),
-                    "token_info": token_info,
-                    "history": chat_history,
+        def round_hook(user_kwargs: dict, assistant_kwargs: dict):
+            round_limiters = [
+                limiters[name]
+                for name in {
+                    _model_name(user_kwargs.get("model")),
+                    _model_name(assistant_kwargs.get("model")),
                 }
-                self._results.append(_result_info)
+                if name in limiters
+            ]
 
-            except Exception as e:
-                logger.error(f"Error in processing task: {e}")
+            async def before_round():
+                for limiter in round_limiters:
+                    await limiter.acquire()
 
-            if save_result:
-                with open(self.save_to, "w") as f:
-                    json.dump(self._results, f, indent=4, ensure_ascii=False)
-                f.close()
+            return before_round
 
-        return self._generate_summary()
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        progress = tqdm(total=len(datas), desc="Running")
+
+        async def process(task: Dict[str, Any]):
+            async with semaphore:
+                try:
+                    if_prepared_task, info = self._prepare_task(task)
+                    if not if_prepared_task:
+                        self._record_result(self._skipped_result(task), save_result)
+                        return
+                    user_kwargs, assistant_kwargs = agent_kwargs_factory()
+                    society = self._construct_society(
+                        task,
+                        user_role_name,
+                        assistant_role_name,
+                        user_kwargs,
+                        assistant_kwargs,
+                    )
+                    started = time.monotonic()
+                    raw_answer, chat_history, token_info = await arun_society(
+                        society,
+                        round_limit=round_limit,
+                        before_round=round_hook(user_kwargs, assistant_kwargs),
+                    )
+                    result = self._build_result(
+                        task, raw_answer, chat_history, token_info, time.monotonic() - started
+                    )
+                    self._record_result(result, save_result)
+                except Exception as e:
+                    logger.error(f"Error in processing task {task['task_id']}: {e}")
+                finally:
+                    progress.update(1)
+
+        await asyncio.gather(*(process(task) for task in datas))
+        progress.close()
+
+        self._run_finished = time.monotonic()
+        return self._generate_summary(prompt_price_per_1k, completion_price_per_1k)
 
     def _prepare_task(self, task: Dict[str, Any]) -> Tuple[bool, str]:
         r"""Prepare the task by validating and enriching its data."""
@@ -305,14 +569,59 @@ class GAIABenchmark(BaseBenchmark):
         """
         return Task(id=str(task["task_id"]), content=task["Question"])
 
-    def _generate_summary(self) -> Dict[str, Any]:
-        r"""Generate and return a summary of the benchmark results."""
+    def _generate_summary(
+        self,
+        prompt_price_per_1k: float = 0.0,
+        completion_price_per_1k: float = 0.0,
+    ) -> Dict[str, Any]:
+        r"""Generate and return a summary of the benchmark results.
+
+        Besides overall accuracy, reports per level the latency percentiles
+        (seconds), token usage and cost, and the throughput of this run.
+        """
         correct = sum(result["score"] for result in self._results)
+
+        levels: Dict[int, Dict[str, Any]] = {}
+        for level in sorted({result["level"] for result in self._results}):
+            results = [result for result in self._results if result["level"] == level]
+            latencies = [r["latency"] for r in results if r.get("latency") is not None]
+            prompt_tokens = sum(
+                (r.get("token_info") or {}).get("prompt_token_count", 0) for r in results
+            )
+            completion_tokens = sum(
+                (r.get("token_info") or {}).get("completion_token_count", 0)
+                for r in results
+            )
+            level_correct = sum(result["score"] for result in results)
+            levels[level] = {
+                "total": len(results),
+                "correct": level_correct,
+                "accuracy": level_correct / len(results),
+                "latency_p50": _percentile(latencies, 50),
+                "latency_p90": _percentile(latencies, 90),
+                "latency_p99": _percentile(latencies, 99),
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cost": prompt_tokens / 1000 * prompt_price_per_1k
+                + completion_tokens / 1000 * completion_price_per_1k,
+            }
+
+        wall_time = None
+        if self._run_started is not None:
+            wall_time = (self._run_finished or time.monotonic()) - self._run_started
+
         return {
             "total": len(self._results),
             "correct": correct,
             "results": self._results,
             "accuracy": correct / len(self._results) if len(self._results) > 0 else 0,
+            "levels": levels,
+            "processed": self._run_processed,
+            "wall_time": wall_time,
+            "throughput_per_minute": self._run_processed / wall_time * 60
+            if wall_time
+            else 0,
+            "total_cost": sum(level["cost"] for level in levels.values()),
         }
 
     def question_scorer(self, model_answer: str, ground_truth: str) -> bool:
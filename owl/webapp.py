@@ -23,26 +23,14 @@ from typing import Tuple, Optional, Dict, List
 import importlib
 from dotenv import load_dotenv, set_key, find_dotenv, unset_key
 import threading
-import queue
+from collections import OrderedDict, deque
 import re
 import uuid
 import hashlib
 import secrets
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
-
-# Static imports for allowed modules (RCE Prevention)
-try:
-    from examples import run
-    from examples import run_mini
-    from examples import run_gemini
-    from examples import run_claude
-    from examples import run_deepseek_zh
-    from examples import run_qwen_zh
-    from examples import run_terminal_zh
-except ImportError as e:
-    logging.warning(f"Some allowed modules could not be imported: {e}")
-    # Continue execution - modules will be checked at runtime
+from concurrent.futures import Future, ThreadPoolExecutor
 
 os.environ["PYTHONIOENCODING"] = "utf-8"
 
@@ -92,9 +80,6 @@ def setup_logging():
 
 # Global variables
 LOG_FILE = None
-LOG_QUEUE: queue.Queue = queue.Queue()  # Log queue
-STOP_LOG_THREAD = threading.Event()
-CURRENT_PROCESS = None  # Used to track the currently running process
 STOP_REQUESTED = threading.Event()  # Used to mark if stop was requested
 
 # Environment variable UI state management
@@ -3161,125 +3146,154 @@ def create_ui():
 
 
 # Log reading and updating functions
-def log_reader_thread(log_file):
-    """Background thread that continuously reads the log file and adds new lines to the queue"""
-    try:
-        with open(log_file, "r", encoding="utf-8") as f:
-            # Move to the end of file
-            f.seek(0, 2)
-
-            while not STOP_LOG_THREAD.is_set():
-                line = f.readline()
-                if line:
-                    LOG_QUEUE.put(line)  # Add to conversation record queue
-                else:
-                    # No new lines, wait for a short time
-                    time.sleep(0.1)
-    except Exception as e:
-        logging.error(f"Log reader thread error: {str(e)}")
-
+class LogTailService:
+    """Incrementally tails the log file and keeps recent conversation records
 
-def get_latest_logs(max_lines=100, queue_source=None):
-    """Get the latest log lines from the queue, or read directly from the file if the queue is empty
-
-    Args:
-        max_lines: Maximum number of lines to return
-        queue_source: Specify which queue to use, default is LOG_QUEUE
-
-    Returns:
-        str: Log content
+    Only bytes appended since the last refresh are read (the first read seeks
+    back from the end for the last few lines). Matching lines are parsed once
+    into a bounded ring buffer, so each UI refresh costs the same however large
+    the log file grows.
     """
-    logs = []
-    log_queue = queue_source if queue_source else LOG_QUEUE
-
-    # Create a temporary queue to store logs so we can process them without removing them from the original queue
-    temp_queue = queue.Queue()
-    temp_logs = []
-
-    try:
-        # Try to get all available log lines from the queue
-        while not log_queue.empty() and len(temp_logs) < max_lines:
-            log = log_queue.get_nowait()
-            temp_logs.append(log)
-            temp_queue.put(log)  # Put the log back into the temporary queue
-    except queue.Empty:
-        pass
-
-    # Process conversation records
-    logs = temp_logs
-
-    # If there are no new logs or not enough logs, try to read the last few lines directly from the file
-    if len(logs) < max_lines and LOG_FILE and os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                all_lines = f.readlines()
-                # If there are already some logs in the queue, only read the remaining needed lines
-                remaining_lines = max_lines - len(logs)
-                file_logs = (
-                    all_lines[-remaining_lines:]
-                    if len(all_lines) > remaining_lines
-                    else all_lines
-                )
 
-                # Add file logs before queue logs
-                logs = file_logs + logs
-        except Exception as e:
-            error_msg = f"Error reading log file: {str(e)}"
-            logging.error(error_msg)
-            if not logs:  # Only add error message if there are no logs
-                logs = [error_msg]
-
-    # If there are still no logs, return a prompt message
-    if not logs:
-        return "Initialization in progress..."
-
-    # Filter logs, only keep logs with 'camel.agents.chat_agent - INFO'
-    filtered_logs = []
-    for log in logs:
-        if "camel.agents.chat_agent - INFO" in log:
-            filtered_logs.append(log)
-
-    # If there are no logs after filtering, return a prompt message
-    if not filtered_logs:
-        return "No conversation records yet."
-
-    # Process log content, extract the latest user and assistant messages
-    simplified_logs = []
-
-    # Use a set to track messages that have already been processed, to avoid duplicates
-    processed_messages = set()
+    CHAT_AGENT_MARKER = "camel.agents.chat_agent - INFO"
+    MESSAGES_PATTERN = re.compile(r"Model (.*?), index (\d+), processed these messages: (\[.*\])")
+    USER_PATTERN = re.compile(r"\{'role': 'user', 'content': '(.*?)'\}")
+    ASSISTANT_PATTERN = re.compile(r"\{'role': 'assistant', 'content': '(.*?)'\}")
+
+    def __init__(
+        self,
+        log_file: Optional[str] = None,
+        max_records: int = 200,
+        prime_lines: int = 100,
+        max_read_bytes: int = 4 * 1024 * 1024,
+        max_seen_messages: int = 10000,
+    ):
+        self.log_file = log_file
+        self.max_records = max_records
+        self.prime_lines = prime_lines
+        self.max_read_bytes = max_read_bytes
+        self.max_seen_messages = max_seen_messages
+        self._lock = threading.Lock()
+        self._records: deque = deque(maxlen=max_records)
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._offset: Optional[int] = None  # None until the file has been primed
+        self._inode: Optional[int] = None
+        self._partial = b""
+        self._version = 0
+        self._rendered: Dict[int, Tuple[int, str]] = {}
+
+    def set_log_file(self, log_file: Optional[str]):
+        """Follow a different log file from its tail"""
+        with self._lock:
+            self.log_file = log_file
+            self._clear()
+            self._offset = None
+
+    def reset(self):
+        """Drop buffered records and continue from the current end of the file"""
+        with self._lock:
+            self._clear()
+            self._offset = None
+            self._prime(lines=0)
+
+    def _clear(self):
+        self._records.clear()
+        self._seen.clear()
+        self._partial = b""
+        self._version += 1
+
+    def _read_last_lines(self, f, size: int, lines: int) -> bytes:
+        """Bytes of the last `lines` complete lines, found by seeking back in blocks"""
+        if lines <= 0 or size == 0:
+            return b""
+        block = 64 * 1024
+        position = size
+        data = b""
+        while position > 0 and data.count(b"\n") <= lines:
+            step = min(block, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+        if position > 0 or data.count(b"\n") > lines:
+            data = b"\n".join(data.split(b"\n")[-(lines + 1):])
+        return data
 
-    def process_message(role, content):
-        # Create a unique identifier to track messages
-        msg_id = f"{role}:{content}"
-        if msg_id in processed_messages:
+    def _prime(self, lines: int):
+        """Start following the file: parse its last lines and remember where it ends"""
+        if not self.log_file or not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, "rb") as f:
+            stat = os.fstat(f.fileno())
+            tail = self._read_last_lines(f, stat.st_size, lines)
+            self._offset, self._inode = stat.st_size, stat.st_ino
+        self._partial = b""
+        self._ingest_bytes(tail)
+
+    def refresh(self):
+        """Read whatever was appended to the log file since the last call"""
+        with self._lock:
+            if not self.log_file or not os.path.exists(self.log_file):
+                return
+            if self._offset is None:
+                self._prime(self.prime_lines)
+                return
+            try:
+                with open(self.log_file, "rb") as f:
+                    stat = os.fstat(f.fileno())
+                    if stat.st_ino != self._inode or stat.st_size < self._offset:
+                        # Rotated or truncated: start over from the beginning of the new content
+                        self._clear()
+                        self._offset, self._inode = 0, stat.st_ino
+                    if stat.st_size == self._offset:
+                        return
+                    f.seek(self._offset)
+                    data = f.read(min(stat.st_size - self._offset, self.max_read_bytes))
+                    self._offset += len(data)
+            except OSError as e:
+                logging.error(f"Error reading log file: {str(e)}")
+                return
+            self._ingest_bytes(data)
+
+    def _ingest_bytes(self, data: bytes):
+        data = self._partial + data
+        *complete, self._partial = data.split(b"\n")
+        for raw in complete:
+            if self.CHAT_AGENT_MARKER.encode() in raw:
+                self._ingest_line(raw.decode("utf-8", errors="replace"))
+
+    def _ingest_line(self, line: str):
+        if self.CHAT_AGENT_MARKER not in line:
+            return
+        record = self._parse_line(line)
+        if record:
+            self._records.append(record)
+            self._version += 1
+
+    def _remember(self, role: str, content: str) -> Optional[str]:
+        """Format a message the first time it is seen"""
+        msg_id = hashlib.sha1(f"{role}:{content}".encode("utf-8", errors="replace")).hexdigest()
+        if msg_id in self._seen:
             return None
+        self._seen[msg_id] = None
+        if len(self._seen) > self.max_seen_messages:
+            self._seen.popitem(last=False)
 
-        processed_messages.add(msg_id)
         content = content.replace("\\n", "\n")
-        lines = [line.strip() for line in content.split("\n")]
-        content = "\n".join(lines)
-
+        content = "\n".join(line.strip() for line in content.split("\n"))
         role_emoji = "🙋" if role.lower() == "user" else "🤖"
         return f"""### {role_emoji} {role.title()} Agent
 
 {content}"""
 
-    for log in filtered_logs:
+    def _parse_line(self, line: str) -> Optional[str]:
+        """Turn one chat agent log line into a record of the messages not shown yet"""
         formatted_messages = []
-        # Try to extract message array
-        messages_match = re.search(
-            r"Model (.*?), index (\d+), processed these messages: (\[.*\])", log
-        )
-
+        messages_match = self.MESSAGES_PATTERN.search(line)
         if messages_match:
             try:
-                messages = json.loads(messages_match.group(3))
-                for msg in messages:
+                for msg in json.loads(messages_match.group(3)):
                     if msg.get("role") in ["user", "assistant"]:
-                        formatted_msg = process_message(
-                            msg.get("role"), msg.get("content", "")
-                        )
+                        formatted_msg = self._remember(msg.get("role"), msg.get("content", ""))
                         if formatted_msg:
                             formatted_messages.append(formatted_msg)
             except json.JSONDecodeError:
@@ -3287,37 +3301,263 @@ def get_latest_logs(max_lines=100, queue_source=None):
 
         # If JSON parsing fails or no message array is found, try to extract conversation content directly
         if not formatted_messages:
-            user_pattern = re.compile(r"\{'role': 'user', 'content': '(.*?)'\}")
-            assistant_pattern = re.compile(
-                r"\{'role': 'assistant', 'content': '(.*?)'\}"
+            for role, pattern in (("user", self.USER_PATTERN), ("assistant", self.ASSISTANT_PATTERN)):
+                for content in pattern.findall(line):
+                    formatted_msg = self._remember(role, content)
+                    if formatted_msg:
+                        formatted_messages.append(formatted_msg)
+
+        if not formatted_messages:
+            return None
+        record = "\n\n".join(formatted_messages).strip()
+        # Each conversation record ends with a blank separator line
+        return record if record.endswith("\n") else record + "\n\n"
+
+    def render(self, max_records: int = 100) -> str:
+        """The most recent conversation records as markdown (cached until new records arrive)"""
+        with self._lock:
+            cached = self._rendered.get(max_records)
+            if cached and cached[0] == self._version:
+                return cached[1]
+            if self._offset is None and not self._records:
+                text = "Initialization in progress..."
+            elif not self._records:
+                text = "No conversation records yet."
+            else:
+                records = list(self._records)[-max_records:]
+                text = "\n".join(records)
+            self._rendered = {max_records: (self._version, text)}
+            return text
+
+
+# Concurrent per-session runs
+class RunStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class RunContext:
+    """A single run_owl execution owned by one UI session, with its own log channel"""
+    id: str
+    session_id: str
+    question: str
+    module_name: str
+    log_file: str
+    log_tail: LogTailService
+    status: RunStatus = RunStatus.QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Tuple[str, str, str]] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    future: Optional[Future] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (RunStatus.QUEUED, RunStatus.RUNNING)
+
+
+class RunAdmissionError(Exception):
+    """Raised when a run cannot be accepted (server or session at capacity)."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+_RUN_LOCAL = threading.local()  # the RunContext executing on the current worker thread
+
+
+class RunLogRouter(logging.Handler):
+    """Root handler that copies each record to the log file of the run on the emitting thread"""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self._handlers: Dict[str, logging.Handler] = {}
+        self._handlers_lock = threading.Lock()
+
+    def open_channel(self, run: RunContext):
+        handler = logging.FileHandler(run.log_file, encoding="utf-8", mode="a")
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+        with self._handlers_lock:
+            self._handlers[run.id] = handler
+
+    def close_channel(self, run: RunContext):
+        with self._handlers_lock:
+            handler = self._handlers.pop(run.id, None)
+        if handler:
+            handler.close()
+
+    def emit(self, record):
+        run = getattr(_RUN_LOCAL, "run", None)
+        if run is None:
+            return
+        handler = self._handlers.get(run.id)
+        if handler:
+            handler.handle(record)
+
+
+class RunManager:
+    """Runs run_owl for many sessions on a bounded thread pool
+
+    Admission control caps queued + running work and active runs per session;
+    each run logs to its own file (followed by its own LogTailService, deleted
+    when the run is pruned) and can be cancelled while queued or, between
+    society rounds, while running.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queued: int = 8, max_active_per_session: int = 1, runs_dir: Optional[str] = None, max_finished_runs: int = 200):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_active_per_session = max_active_per_session
+        self.max_finished_runs = max_finished_runs
+        self.runs_dir = runs_dir or os.path.join(os.path.dirname(__file__), "logs", "runs")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="owl-run")
+        self.log_router = RunLogRouter()
+        self.runs: "OrderedDict[str, RunContext]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def attach_logging(self):
+        """Route log records of worker threads to their run's channel"""
+        root_logger = logging.getLogger()
+        if self.log_router not in root_logger.handlers:
+            root_logger.addHandler(self.log_router)
+
+    def active_runs(self, session_id: Optional[str] = None) -> List[RunContext]:
+        with self._lock:
+            return [
+                run for run in self.runs.values()
+                if run.is_active and (session_id is None or run.session_id == session_id)
+            ]
+
+    def queue_position(self, run: RunContext) -> int:
+        """1-based position among queued runs (0 when not queued)"""
+        if run.status != RunStatus.QUEUED:
+            return 0
+        with self._lock:
+            queued = [r for r in self.runs.values() if r.status == RunStatus.QUEUED]
+        return queued.index(run) + 1 if run in queued else 0
+
+    def latest_run(self, session_id: str) -> Optional[RunContext]:
+        with self._lock:
+            for run in reversed(self.runs.values()):
+                if run.session_id == session_id:
+                    return run
+        return None
+
+    def submit(self, session_id: str, question: str, module_name: str) -> RunContext:
+        """Queue a run for a session or raise RunAdmissionError"""
+        with self._lock:
+            active = [run for run in self.runs.values() if run.is_active]
+            if sum(run.session_id == session_id for run in active) >= self.max_active_per_session:
+                raise RunAdmissionError("This session already has a task running. Stop it or wait for it to finish.")
+            if len(active) >= self.max_workers + self.max_queued:
+                raise RunAdmissionError(f"Server is busy ({len(active)} tasks running or queued). Please try again shortly.")
+
+            os.makedirs(self.runs_dir, exist_ok=True)
+            run_id = uuid.uuid4().hex[:12]
+            log_file = os.path.join(self.runs_dir, f"run_{run_id}.log")
+            open(log_file, "a").close()
+            run = RunContext(
+                id=run_id,
+                session_id=session_id,
+                question=question,
+                module_name=module_name,
+                log_file=log_file,
+                log_tail=LogTailService(log_file),
             )
+            self.runs[run_id] = run
+            self._prune_finished()
+
+        self.log_router.open_channel(run)
+        run.future = self.executor.submit(self._execute, run)
+        run.future.add_done_callback(lambda future: self._on_done(run, future))
+        logging.info(f"Run {run.id} queued for session {session_id} (module: {module_name})")
+        return run
+
+    def _execute(self, run: RunContext) -> Tuple[str, str, str]:
+        if run.cancel_event.is_set():
+            return ("Run cancelled", "0", "❌ Error: Cancelled")
+        run.status = RunStatus.RUNNING
+        run.started_at = time.time()
+        _RUN_LOCAL.run = run
+        try:
+            return run_owl(run.question, run.module_name, cancel_event=run.cancel_event)
+        finally:
+            _RUN_LOCAL.run = None
+
+    def _on_done(self, run: RunContext, future: Future):
+        run.finished_at = time.time()
+        if future.cancelled():
+            run.result = ("Run cancelled", "0", "❌ Error: Cancelled")
+        else:
+            try:
+                run.result = future.result()
+            except Exception as e:
+                logging.error(f"Run {run.id} failed: {str(e)}")
+                run.result = (f"Error occurred: {str(e)}", "0", f"❌ Error: {str(e)}")
 
-            for content in user_pattern.findall(log):
-                formatted_msg = process_message("user", content)
-                if formatted_msg:
-                    formatted_messages.append(formatted_msg)
+        if run.cancel_event.is_set():
+            run.status = RunStatus.CANCELLED
+        elif "Error" in run.result[2]:
+            run.status = RunStatus.FAILED
+        else:
+            run.status = RunStatus.COMPLETED
+        self.log_router.close_channel(run)
 
-            for content in assistant_pattern.findall(log):
-                formatted_msg = process_message("assistant", content)
-                if formatted_msg:
-                    formatted_messages.append(formatted_msg)
+    def cancel(self, run_id: str) -> bool:
+        """Cancel a queued run, or ask a running one to stop after its current round"""
+        run = self.runs.get(run_id)
+        if run is None or not run.is_active:
+            return False
+        run.cancel_event.set()
+        if run.future is not None:
+            run.future.cancel()  # only succeeds while still queued
+        logging.info(f"Cancellation requested for run {run_id}")
+        return True
+
+    def cancel_session(self, session_id: str) -> int:
+        return sum(self.cancel(run.id) for run in self.active_runs(session_id))
+
+    def _prune_finished(self):
+        """Forget the oldest finished runs beyond max_finished_runs and delete their log files"""
+        finished = [run_id for run_id, run in self.runs.items() if not run.is_active]
+        for run_id in finished[:max(0, len(finished) - self.max_finished_runs)]:
+            run = self.runs.pop(run_id, None)
+            if run is None:
+                continue
+            try:
+                os.remove(run.log_file)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Failed to delete log file of run {run_id}: {str(e)}")
 
-        if formatted_messages:
-            simplified_logs.append("\n\n".join(formatted_messages))
+    def shutdown(self):
+        for run in self.active_runs():
+            self.cancel(run.id)
+        self.executor.shutdown(wait=False)
 
-    # Format log output, ensure appropriate separation between each conversation record
-    formatted_logs = []
-    for i, log in enumerate(simplified_logs):
-        # Remove excess whitespace characters from beginning and end
-        log = log.strip()
 
-        formatted_logs.append(log)
+RUN_MANAGER = RunManager(
+    max_workers=int(os.environ.get("OWL_MAX_CONCURRENT_RUNS", "2")),
+    max_queued=int(os.environ.get("OWL_MAX_QUEUED_RUNS", "8")),
+)
 
-        # Ensure each conversation record ends with a newline
-        if not log.endswith("\n"):
-            formatted_logs.append("\n")
 
-    return "\n".join(formatted_logs)
+def get_session_logs(session_id: Optional[str], max_lines: int = 100) -> str:
+    """Conversation records of the session's latest run"""
+    run = RUN_MANAGER.latest_run(session_id) if session_id else None
+    if run is None:
+        return "No conversation records yet."
+    run.log_tail.refresh()
+    return run.log_tail.render(max_lines)
 
 
 # Define allowed modules for security (RCE Prevention)
@@ -3384,6 +3624,99 @@ def log_module_access(module_name: str, access_granted: bool, user_context: str
     logging.log(log_level, log_message)
 
 
+@dataclass
+class ModuleLoadStats:
+    module_name: str
+    status: str = "not_loaded"  # not_loaded, loading, loaded or failed
+    import_seconds: Optional[float] = None
+    loaded_at: Optional[datetime.datetime] = None
+    error: Optional[str] = None
+
+
+class LazyModuleRegistry:
+    """Imports allowlisted example modules on first use and caches them (RCE Prevention)
+
+    Import paths come from a fixed allowlist mapping (examples.<name>); the
+    requested name is only used as a lookup key and never reaches importlib.
+    Each module is imported once, under a per-module lock, and the time the
+    import took is recorded.
+    """
+
+    def __init__(self, allowed_modules, package: str = "examples"):
+        self._import_paths = {name: f"{package}.{name}" for name in sorted(allowed_modules)}
+        self._modules: Dict[str, object] = {}
+        self._locks = {name: threading.Lock() for name in self._import_paths}
+        self.stats = {name: ModuleLoadStats(module_name=name) for name in self._import_paths}
+
+    def is_loaded(self, module_name: str) -> bool:
+        return module_name in self._modules
+
+    def get(self, module_name: str):
+        """Return the allowlisted module, importing it on first use"""
+        if not validate_module_name(module_name) or module_name not in self._import_paths:
+            raise UnauthorizedModuleError(module_name)
+
+        module = self._modules.get(module_name)
+        if module is not None:
+            return module
+
+        with self._locks[module_name]:
+            module = self._modules.get(module_name)
+            if module is not None:
+                return module
+
+            stats = self.stats[module_name]
+            stats.status = "loading"
+            started = time.perf_counter()
+            try:
+                module = importlib.import_module(self._import_paths[module_name])
+            except Exception as e:
+                stats.status = "failed"
+                stats.error = str(e)
+                stats.import_seconds = time.perf_counter() - started
+                logging.error(f"Failed to import module {module_name}: {str(e)}")
+                raise ImportError(f"Module {module_name} could not be imported: {str(e)}") from e
+
+            stats.status = "loaded"
+            stats.error = None
+            stats.import_seconds = time.perf_counter() - started
+            stats.loaded_at = datetime.datetime.now()
+            self._modules[module_name] = module
+            logging.info(f"Imported module {module_name} in {stats.import_seconds:.2f}s")
+            return module
+
+    def prewarm(self, module_names: Optional[List[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """Import modules ahead of first use, by default on a background thread"""
+        names = [name for name in (module_names or list(self._import_paths)) if name in self._import_paths]
+
+        def warm():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    pass  # recorded in stats; retried on first use
+
+        if not background:
+            warm()
+            return None
+        thread = threading.Thread(target=warm, name="module-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def import_report(self) -> List[Dict]:
+        """Import status and cost per module, slowest first"""
+        report = []
+        for stats in self.stats.values():
+            entry = asdict(stats)
+            if stats.loaded_at:
+                entry["loaded_at"] = stats.loaded_at.isoformat()
+            report.append(entry)
+        return sorted(report, key=lambda entry: entry["import_seconds"] or 0, reverse=True)
+
+
+MODULE_REGISTRY = LazyModuleRegistry(ALLOWED_MODULES)
+
+
 # Dictionary containing module descriptions
 MODULE_DESCRIPTIONS = {
     "run": "Default mode: Using OpenAI model's default agent collaboration mode, suitable for most tasks.",
@@ -3460,18 +3793,17 @@ def validate_input(question: str) -> bool:
 
 
 @require_authentication
-def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
+def run_owl(question: str, example_module: str, cancel_event: Optional[threading.Event] = None) -> Tuple[str, str, str]:
     """Run the OWL system and return results
 
     Args:
         question: User question
         example_module: Example module name to import (e.g., "run_terminal_zh" or "run_deep")
+        cancel_event: When set, the society stops after its current round
 
     Returns:
         Tuple[...]: Answer, token count, status
     """
-    global CURRENT_PROCESS
-
     # Validate input
     if not validate_input(question):
         logging.warning("User submitted invalid input")
@@ -3514,23 +3846,11 @@ def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
                 "❌ Error: Unsupported module",
             )
 
-        # Use static module access instead of dynamic imports (RCE Prevention)
+        # Allowlisted lazy module access (RCE Prevention)
         try:
-            logging.info(f"Accessing static module: {example_module}")
-            # Map module names to imported module objects
-            module_map = {
-                'run': run,
-                'run_mini': run_mini,
-                'run_gemini': run_gemini,
-                'run_claude': run_claude,
-                'run_deepseek_zh': run_deepseek_zh,
-                'run_qwen_zh': run_qwen_zh,
-                'run_terminal_zh': run_terminal_zh
-            }
-
-            module = module_map.get(example_module)
-            if module is None:
-                raise ImportError(f"Module {example_module} not found in static imports")
+            logging.info(f"Accessing module: {example_module}")
+            # Imported on first use, from the allowlist only
+            module = MODULE_REGISTRY.get(example_module)
 
             # Log successful module access
             log_module_access(
@@ -3579,7 +3899,10 @@ def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
         # Run society simulation
         try:
             logging.info("Running society simulation...")
-            answer, chat_history, token_info = run_society(society)
+            answer, chat_history, token_info = run_society(society, stop_event=cancel_event)
+            if cancel_event is not None and cancel_event.is_set():
+                logging.info("Society simulation cancelled")
+                return (answer or "Run cancelled", "0", "❌ Error: Cancelled")
             logging.info("Society simulation completed")
         except Exception as e:
             logging.error(f"Error occurred while running society simulation: {str(e)}")
@@ -3615,8 +3938,16 @@ def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
 
 
 def update_module_description(module_name: str) -> str:
-    """Return the description of the selected module"""
-    return MODULE_DESCRIPTIONS.get(module_name, "No description available")
+    """Return the description of the selected module and its import status"""
+    description = MODULE_DESCRIPTIONS.get(module_name, "No description available")
+    stats = MODULE_REGISTRY.stats.get(module_name)
+    if stats is None:
+        return description
+    if stats.status == "loaded":
+        return f"{description}\n(Loaded, import took {stats.import_seconds:.1f}s)"
+    if stats.status == "failed":
+        return f"{description}\n(Import failed: {stats.error})"
+    return f"{description}\n(Imported on first run)"
 
 
 # Store environment variables configured from the frontend
@@ -4351,91 +4682,68 @@ def create_login_interface():
 def create_authenticated_ui():
     """Create the main UI for authenticated users"""
 
-    def clear_log_file():
-        """Clear log file content"""
-        try:
-            if LOG_FILE and os.path.exists(LOG_FILE):
-                # Clear log file content instead of deleting the file
-                open(LOG_FILE, "w").close()
-                logging.info("Log file has been cleared")
-                # Clear log queue
-                while not LOG_QUEUE.empty():
-                    try:
-                        LOG_QUEUE.get_nowait()
-                    except queue.Empty:
-                        break
-                return ""
-            else:
-                return ""
-        except Exception as e:
-            logging.error(f"Error clearing log file: {str(e)}")
-            return ""
-
-    # Create a real-time log update function
-    def process_with_live_logs(question, module_name):
-        """Process questions and update logs in real-time"""
-        global CURRENT_PROCESS
-
-        # Clear log file
-        clear_log_file()
-
-        # Create a background thread to process the question
-        result_queue = queue.Queue()
-
-        def process_in_background():
-            try:
-                result = run_owl(question, module_name)
-                result_queue.put(result)
-            except Exception as e:
-                result_queue.put(
-                    (f"Error occurred: {str(e)}", "0", f"❌ Error: {str(e)}")
-                )
+    def clear_session_logs(request: gr.Request):
+        """Clear the conversation record shown for this session"""
+        run = RUN_MANAGER.latest_run(request.session_hash)
+        if run:
+            run.log_tail.reset()
+        return ""
 
-        # Start background processing thread
-        bg_thread = threading.Thread(target=process_in_background)
-        CURRENT_PROCESS = bg_thread  # Record current process
-        bg_thread.start()
+    def refresh_session_logs(request: gr.Request):
+        return get_session_logs(request.session_hash, 100)
 
-        # While waiting for processing to complete, update logs once per second
-        while bg_thread.is_alive():
-            # Update conversation record display
-            logs2 = get_latest_logs(100, LOG_QUEUE)
+    def stop_session_run(request: gr.Request):
+        """Cancel this session's queued or running task"""
+        if RUN_MANAGER.cancel_session(request.session_hash):
+            return "<span class='status-indicator status-running'></span> Stopping after the current round..."
+        return "<span class='status-indicator status-success'></span> Nothing to stop"
 
-            # Always update status
+    # Create a real-time log update function
+    def process_with_live_logs(question, module_name, request: gr.Request):
+        """Process questions in this session's run and update its logs in real-time"""
+        session_id = request.session_hash
+        try:
+            run = RUN_MANAGER.submit(session_id, question, module_name)
+        except RunAdmissionError as e:
             yield (
                 "0",
-                "<span class='status-indicator status-running'></span> Processing...",
-                logs2,
+                f"<span class='status-indicator status-error'></span> {e.message}",
+                get_session_logs(session_id, 100),
             )
+            return
 
+        # While waiting for processing to complete, update logs once per second
+        while run.is_active:
+            position = RUN_MANAGER.queue_position(run)
+            if position:
+                status = f"<span class='status-indicator status-running'></span> Queued (position {position})..."
+            else:
+                status = "<span class='status-indicator status-running'></span> Processing..."
+            yield "0", status, get_session_logs(session_id, 100)
             time.sleep(1)
 
         # Processing complete, get results
-        if not result_queue.empty():
-            result = result_queue.get()
-            answer, token_count, status = result
-
-            # Final update of conversation record
-            logs2 = get_latest_logs(100, LOG_QUEUE)
-
-            # Set different indicators based on status
-            if "Error" in status:
-                status_with_indicator = (
-                    f"<span class='status-indicator status-error'></span> {status}"
-                )
-            else:
-                status_with_indicator = (
-                    f"<span class='status-indicator status-success'></span> {status}"
-                )
-
-            yield token_count, status_with_indicator, logs2
-        else:
-            logs2 = get_latest_logs(100, LOG_QUEUE)
+        logs2 = get_session_logs(session_id, 100)
+        if run.status == RunStatus.CANCELLED:
             yield (
                 "0",
                 "<span class='status-indicator status-error'></span> Terminated",
                 logs2,
             )
+            return
+
+        answer, token_count, status = run.result
+        # Set different indicators based on status
+        if "Error" in status:
+            status_with_indicator = (
+                f"<span class='status-indicator status-error'></span> {status}"
+            )
+        else:
+            status_with_indicator = (
+                f"<span class='status-indicator status-success'></span> {status}"
+            )
+
+        yield token_count, status_with_indicator, logs2
 
     with gr.Blocks(title="OWL", theme=gr.themes.Soft(primary_hue="blue")) as app:
         gr.Markdown(
@@ -5303,6 +5611,7 @@ def create_authenticated_ui():
                     run_button = gr.Button(
                         "Run", variant="primary", elem_classes="primary"
                     )
+                    stop_button = gr.Button("Stop", variant="secondary")
 
                 status_output = gr.HTML(
                     value="<span class='status-indicator status-success'></span> Ready",
@@ -5533,6 +5842,8 @@ def create_authenticated_ui():
             outputs=[token_count_output, status_output, log_display2],
         )
 
+        stop_button.click(fn=stop_session_run, outputs=[status_output])
+
         # Module selection updates description
         module_dropdown.change(
             fn=update_module_description,
@@ -5541,11 +5852,9 @@ def create_authenticated_ui():
         )
 
         # Conversation record related event handling
-        refresh_logs_button2.click(
-            fn=lambda: get_latest_logs(100, LOG_QUEUE), outputs=[log_display2]
-        )
+        refresh_logs_button2.click(fn=refresh_session_logs, outputs=[log_display2])
 
-        clear_logs_button2.click(fn=clear_log_file, outputs=[log_display2])
+        clear_logs_button2.click(fn=clear_session_logs, outputs=[log_display2])
 
         # Auto refresh control
         def toggle_auto_refresh(enabled):
@@ -5576,12 +5885,15 @@ def main():
         # Create default users
         create_default_users()
 
-        # Start log reading thread
-        log_thread = threading.Thread(
-            target=log_reader_thread, args=(LOG_FILE,), daemon=True
-        )
-        log_thread.start()
-        logging.info("Log reading thread started")
+        # Give each session's runs their own log channel
+        RUN_MANAGER.attach_logging()
+
+        # Optionally import example modules before first use
+        prewarm = os.environ.get("OWL_PREWARM_MODULES", "").strip()
+        if prewarm:
+            MODULE_REGISTRY.prewarm(
+                None if prewarm == "all" else [name.strip() for name in prewarm.split(",")]
+            )
 
         # Initialize .env file (if it doesn't exist)
         init_env_file()
@@ -5602,9 +5914,8 @@ def main():
         traceback.print_exc()
 
     finally:
-        # Ensure log thread stops
-        STOP_LOG_THREAD.set()
         STOP_REQUESTED.set()
+        RUN_MANAGER.shutdown()
         logging.info("Application closed")
 
 